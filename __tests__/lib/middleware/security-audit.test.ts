@@ -3,12 +3,15 @@
  */
 
 import { NextRequest } from 'next/server';
+
+import { setSecurityEventSink } from '@/lib/security/security-event-sink';
 import {
   logSecurityEvent,
   securityAuditMiddleware,
   getRecentSecurityEvents,
   getSecurityStats,
   cleanupOldEvents,
+  querySecurityEvents,
 } from '../../../lib/middleware/security-audit';
 
 describe('lib/middleware/security-audit', () => {
@@ -620,4 +623,72 @@ describe('lib/middleware/security-audit', () => {
       });
     });
   });
+
+  describe('querySecurityEvents', () => {
+    it('should filter events by ip and event type', () => {
+      const createRequest = (ip: string) => ({
+        method: 'GET',
+        url: 'http://localhost/api/test',
+        nextUrl: { pathname: '/api/test' },
+        headers: {
+          get: jest.fn().mockReturnValue(ip),
+        },
+      }) as unknown as NextRequest;
+
+      logSecurityEvent(createRequest('198.51.100.1'), 'failed_login', 'low', {});
+      logSecurityEvent(createRequest('198.51.100.1'), 'invalid_token', 'low', {});
+      logSecurityEvent(createRequest('198.51.100.2'), 'failed_login', 'low', {});
+
+      const events = querySecurityEvents({
+        ip: '198.51.100.1',
+        eventType: 'failed_login',
+      });
+
+      expect(events).toHaveLength(1);
+      expect(events[0]).toMatchObject({ ip: '198.51.100.1', eventType: 'failed_login' });
+    });
+  });
+
+  describe('Scan limits', () => {
+    it('should only inspect the first bytes of very large bodies', () => {
+      const mockRequest = {
+        method: 'POST',
+        url: 'http://localhost/api/upload',
+        nextUrl: { pathname: '/api/upload', toString: () => 'http://localhost/api/upload' },
+        headers: {
+          get: jest.fn().mockReturnValue('Mozilla/5.0'),
+        },
+        body: { toString: () => `${'a'.repeat(64 * 1024)}<script>alert(1)</script>` },
+      } as unknown as NextRequest;
+
+      expect(securityAuditMiddleware(mockRequest)).toBeNull();
+    });
+  });
+
+  describe('Audit trail', () => {
+    it('should forward every security event to the durable audit log', () => {
+      const mockRequest = {
+        method: 'GET',
+        url: 'http://localhost/api/test',
+        nextUrl: { pathname: '/api/test' },
+        headers: {
+          get: jest.fn().mockReturnValue('Mozilla/5.0'),
+        },
+      } as unknown as NextRequest;
+
+      const sink = jest.fn();
+      setSecurityEventSink(sink);
+
+      logSecurityEvent(mockRequest, 'invalid_token', 'medium', {}, 'user-9');
+      setSecurityEventSink(undefined);
+
+      expect(sink).toHaveBeenCalledWith(
+        expect.objectContaining({
+          eventType: 'invalid_token',
+          userId: 'user-9',
+          endpoint: '/api/test',
+        })
+      );
+    });
+  });
 });
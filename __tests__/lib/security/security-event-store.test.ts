@@ -0,0 +1,77 @@
+/**
+ * @jest-environment node
+ */
+
+import {
+  SecurityEvent,
+  SecurityEventStore,
+} from '../../../lib/security/security-event-store';
+
+function buildEvent(overrides: Partial<SecurityEvent> = {}): SecurityEvent {
+  return {
+    timestamp: new Date().toISOString(),
+    ip: '10.0.0.1',
+    userAgent: 'Mozilla/5.0',
+    endpoint: '/api/test',
+    method: 'GET',
+    eventType: 'suspicious_request',
+    severity: 'low',
+    details: {},
+    ...overrides,
+  };
+}
+
+describe('lib/security/security-event-store', () => {
+  it('should evict the oldest event and update counters when full', () => {
+    const store = new SecurityEventStore(3);
+
+    store.add(buildEvent({ ip: '1.1.1.1', severity: 'critical' }));
+    store.add(buildEvent({ ip: '2.2.2.2' }));
+    store.add(buildEvent({ ip: '2.2.2.2' }));
+    store.add(buildEvent({ ip: '3.3.3.3' }));
+
+    expect(store.length).toBe(3);
+    expect(store.countsBySeverity()).toEqual({ low: 3 });
+    expect(store.topIPs(10)).toEqual([
+      { ip: '2.2.2.2', count: 2 },
+      { ip: '3.3.3.3', count: 1 },
+    ]);
+    expect(store.query({ ip: '1.1.1.1' })).toEqual([]);
+  });
+
+  it('should query by index newest first with combined filters', () => {
+    const store = new SecurityEventStore(100);
+
+    for (let i = 0; i < 10; i++) {
+      store.add(
+        buildEvent({
+          ip: i % 2 === 0 ? '10.0.0.2' : '10.0.0.3',
+          eventType: i % 3 === 0 ? 'failed_login' : 'suspicious_request',
+          details: { i },
+        })
+      );
+    }
+
+    const events = store.query({ ip: '10.0.0.2', eventType: 'failed_login' });
+
+    expect(events.map(event => event.details.i)).toEqual([6, 0]);
+    expect(store.query({ severity: 'high' })).toEqual([]);
+    expect(store.query({ limit: 3 }).map(event => event.details.i)).toEqual([
+      9, 8, 7,
+    ]);
+  });
+
+  it('should count and remove events by time', () => {
+    const store = new SecurityEventStore(10);
+    const now = Date.now();
+
+    store.add(buildEvent({ timestamp: new Date(now - 3 * 3600_000).toISOString() }));
+    store.add(buildEvent({ timestamp: new Date(now - 2 * 3600_000).toISOString() }));
+    store.add(buildEvent({ timestamp: new Date(now - 60_000).toISOString() }));
+
+    expect(store.countSince(new Date(now - 3600_000))).toBe(1);
+    expect(store.removeOlderThan(new Date(now - 150 * 60_000))).toBe(1);
+    expect(store.length).toBe(2);
+    expect(store.countsByType()).toEqual({ suspicious_request: 2 });
+  });
+});
@@ -25,7 +25,22 @@ jest.mock('@/lib/services/application-metrics', () => ({
   })),
 }));
 
+jest.mock('@/lib/prisma', () => ({
+  __esModule: true,
+  default: {
+    alertRule: { findMany: jest.fn().mockResolvedValue([]) },
+    alert: {
+      findMany: jest.fn().mockResolvedValue([]),
+      create: jest.fn(),
+    },
+    alertNotification: { create: jest.fn().mockResolvedValue({}) },
+    applicationMetric: { findFirst: jest.fn().mockResolvedValue(null) },
+    $queryRaw: jest.fn().mockResolvedValue([]),
+  },
+}));
+
 // ✅ NOW we can import the service
+import prisma from '@/lib/prisma';
 import {
   alertService,
   AlertRule,
@@ -173,4 +188,79 @@ describe('lib/services/alert-service', () => {
       expect(stats.active_alerts).toBe(25);
     });
   });
+
+  describe('checkAlerts', () => {
+    const mockPrisma = prisma as unknown as {
+      alertRule: { findMany: jest.Mock };
+      alert: { findMany: jest.Mock; create: jest.Mock };
+      $queryRaw: jest.Mock;
+    };
+
+    const buildRule = (id: string, metric: string, threshold: number) => ({
+      id,
+      name: `Rule ${id}`,
+      description: `Rule ${id}`,
+      metric,
+      condition: 'greater_than',
+      threshold,
+      severity: 'high',
+      enabled: true,
+      cooldownMinutes: 15,
+      createdAt: new Date(),
+      updatedAt: new Date(),
+    });
+
+    it('should evaluate every rule against a single metric snapshot', async () => {
+      mockPrisma.alertRule.findMany.mockResolvedValueOnce([
+        buildRule('r1', 'error_rate', 5),
+        buildRule('r2', 'error_rate', 10),
+        buildRule('r3', 'avg_response_time', 2000),
+        buildRule('r4', 'success_rate', 200),
+      ]);
+      mockPrisma.$queryRaw.mockResolvedValueOnce([
+        {
+          performance_total: BigInt(100),
+          performance_errors: BigInt(8),
+          avg_duration: 300,
+          database_errors: BigInt(0),
+        },
+      ]);
+      mockPrisma.alert.findMany.mockResolvedValueOnce([]);
+      mockPrisma.alert.create.mockImplementation(({ data }) =>
+        Promise.resolve({
+          ...data,
+          id: `alert-${data.ruleId}`,
+          resolvedAt: null,
+          acknowledgedAt: null,
+          acknowledgedBy: null,
+        })
+      );
+
+      const alerts = await alertService.checkAlerts();
+
+      expect(mockPrisma.$queryRaw).toHaveBeenCalledTimes(1);
+      expect(mockPrisma.alert.findMany).toHaveBeenCalledTimes(1);
+      expect(alerts.map(alert => alert.rule_id)).toEqual(['r1']);
+    });
+
+    it('should skip rules that already have an active alert', async () => {
+      mockPrisma.alertRule.findMany.mockResolvedValueOnce([
+        buildRule('r5', 'error_rate', 1),
+      ]);
+      mockPrisma.$queryRaw.mockResolvedValueOnce([
+        {
+          performance_total: BigInt(10),
+          performance_errors: BigInt(5),
+          avg_duration: null,
+          database_errors: BigInt(0),
+        },
+      ]);
+      mockPrisma.alert.findMany.mockResolvedValueOnce([{ ruleId: 'r5' }]);
+
+      const alerts = await alertService.checkAlerts();
+
+      expect(alerts).toHaveLength(0);
+      expect(mockPrisma.alert.create).not.toHaveBeenCalled();
+    });
+  });
 });
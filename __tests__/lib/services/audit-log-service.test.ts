@@ -0,0 +1,106 @@
+/**
+ * @jest-environment node
+ */
+
+jest.mock('@/lib/prisma', () => ({
+  __esModule: true,
+  default: {
+    auditLog: {
+      createMany: jest.fn().mockResolvedValue({ count: 0 }),
+      findMany: jest.fn().mockResolvedValue([]),
+    },
+    $queryRaw: jest.fn().mockResolvedValue([]),
+  },
+}));
+
+import prisma from '@/lib/prisma';
+import {
+  AuditLogService,
+  decodeAuditCursor,
+  encodeAuditCursor,
+} from '@/lib/services/audit-log-service';
+
+describe('lib/services/audit-log-service', () => {
+  const mockPrisma = prisma as unknown as {
+    auditLog: { createMany: jest.Mock; findMany: jest.Mock };
+    $queryRaw: jest.Mock;
+  };
+
+  beforeEach(() => {
+    jest.clearAllMocks();
+  });
+
+  it('should round-trip pagination cursors', () => {
+    const occurredAt = new Date('2026-03-01T10:00:00.000Z');
+    const cursor = encodeAuditCursor(occurredAt, 'abc');
+
+    expect(decodeAuditCursor(cursor)).toEqual({ occurredAt, id: 'abc' });
+    expect(decodeAuditCursor('not-a-cursor')).toBeNull();
+  });
+
+  it('should batch writes and ensure each monthly partition once', async () => {
+    const service = new AuditLogService();
+
+    service.record({
+      action: 'security.failed_login',
+      occurredAt: new Date('2026-03-01T10:00:00Z'),
+    });
+    service.record({
+      action: 'ordem_servico.status_changed',
+      actorId: 'user-1',
+      occurredAt: new Date('2026-03-02T10:00:00Z'),
+    });
+    await service.flush();
+
+    service.record({ action: 'security.xss_attempt', occurredAt: new Date('2026-03-03T10:00:00Z') });
+    await service.flush();
+
+    expect(mockPrisma.$queryRaw).toHaveBeenCalledTimes(1);
+    expect(mockPrisma.auditLog.createMany).toHaveBeenCalledTimes(2);
+    expect(mockPrisma.auditLog.createMany.mock.calls[0][0].data).toEqual([
+      expect.objectContaining({ action: 'security.failed_login', actorType: 'anonymous' }),
+      expect.objectContaining({ actorId: 'user-1', actorType: 'user' }),
+    ]);
+  });
+
+  it('should page with a keyset cursor over (occurredAt, id)', async () => {
+    const service = new AuditLogService();
+    const rows = [3, 2, 1].map(day => ({
+      id: `id-${day}`,
+      occurredAt: new Date(`2026-03-0${day}T00:00:00Z`),
+      actorId: 'user-1',
+      action: 'ordem_servico.status_changed',
+    }));
+    mockPrisma.auditLog.findMany.mockResolvedValueOnce(rows);
+
+    const page = await service.query({
+      actorId: 'user-1',
+      from: new Date('2026-01-01T00:00:00Z'),
+      to: new Date('2026-04-01T00:00:00Z'),
+      limit: 2,
+    });
+
+    const args = mockPrisma.auditLog.findMany.mock.calls[0][0];
+    expect(args.take).toBe(3);
+    expect(args.where).toMatchObject({
+      actorId: 'user-1',
+      occurredAt: {
+        gte: new Date('2026-01-01T00:00:00Z'),
+        lt: new Date('2026-04-01T00:00:00Z'),
+      },
+    });
+    expect(page.items.map(item => item.id)).toEqual(['id-3', 'id-2']);
+    expect(decodeAuditCursor(page.nextCursor!)).toEqual({
+      occurredAt: rows[1].occurredAt,
+      id: 'id-2',
+    });
+
+    mockPrisma.auditLog.findMany.mockResolvedValueOnce([]);
+    await service.query({ cursor: page.nextCursor! });
+
+    expect(mockPrisma.auditLog.findMany.mock.calls[1][0].where.OR).toEqual([
+      { occurredAt: { lt: rows[1].occurredAt } },
+      { occurredAt: rows[1].occurredAt, id: { lt: 'id-2' } },
+    ]);
+  });
+});
@@ -0,0 +1,132 @@
+/**
+ * @jest-environment node
+ */
+
+import { BufferedWriter, shutdownAllWriters } from '@/lib/services/buffered-writer';
+
+describe('lib/services/buffered-writer', () => {
+  const writers: BufferedWriter<number>[] = [];
+
+  function createWriter(
+    persist: (_batch: number[]) => Promise<void>,
+    overrides: { maxBatchSize?: number; maxQueueSize?: number } = {}
+  ) {
+    const writer = new BufferedWriter<number>({
+      name: 'test',
+      maxBatchSize: overrides.maxBatchSize ?? 100,
+      maxQueueSize: overrides.maxQueueSize ?? 1000,
+      flushIntervalMs: 60 * 1000,
+      persist,
+    });
+    writers.push(writer);
+    return writer;
+  }
+
+  afterEach(async () => {
+    await Promise.all(writers.map(writer => writer.shutdown()));
+    writers.length = 0;
+  });
+
+  it('should flush in batches of maxBatchSize', async () => {
+    const persist = jest.fn().mockResolvedValue(undefined);
+    const writer = createWriter(persist, { maxBatchSize: 3 });
+
+    [1, 2, 3, 4, 5, 6, 7].forEach(value => writer.enqueue(value));
+    await writer.flush();
+
+    expect(persist).toHaveBeenCalledTimes(3);
+    expect(persist.mock.calls[0][0]).toEqual([1, 2, 3]);
+    expect(writer.getStats()).toMatchObject({ flushed: 7, queued: 0 });
+  });
+
+  it('should drop the oldest items when the queue is full', async () => {
+    const persist = jest.fn().mockResolvedValue(undefined);
+    const writer = createWriter(persist, { maxBatchSize: 100, maxQueueSize: 3 });
+
+    [1, 2, 3, 4, 5].forEach(value => writer.enqueue(value));
+
+    expect(writer.getStats()).toMatchObject({ dropped: 2, queued: 3 });
+
+    await writer.flush();
+    expect(persist).toHaveBeenCalledWith([3, 4, 5]);
+  });
+
+  it('should count failed batches without retrying forever', async () => {
+    const persist = jest.fn().mockRejectedValue(new Error('db down'));
+    const consoleSpy = jest.spyOn(console, 'error').mockImplementation(() => {});
+    const writer = createWriter(persist);
+
+    writer.enqueue(1);
+    writer.enqueue(2);
+    await writer.flush();
+
+    expect(writer.getStats()).toMatchObject({ failed: 2, flushed: 0, queued: 0 });
+    consoleSpy.mockRestore();
+  });
+
+  it('should write pending items on shutdown', async () => {
+    const persist = jest.fn().mockResolvedValue(undefined);
+    const writer = createWriter(persist);
+
+    writer.enqueue(42);
+    await writer.shutdown();
+
+    expect(persist).toHaveBeenCalledWith([42]);
+  });
+
+  it('should flush every active writer on process shutdown', async () => {
+    const persistA = jest.fn().mockResolvedValue(undefined);
+    const persistB = jest.fn().mockResolvedValue(undefined);
+    createWriter(persistA).enqueue(1);
+    createWriter(persistB).enqueue(2);
+
+    await shutdownAllWriters(1000);
+
+    expect(persistA).toHaveBeenCalledWith([1]);
+    expect(persistB).toHaveBeenCalledWith([2]);
+  });
+
+  it('should stop waiting for a stuck writer after the deadline', async () => {
+    const consoleSpy = jest.spyOn(console, 'error').mockImplementation(() => {});
+    const writer = createWriter(() => new Promise<void>(() => {}));
+    writer.enqueue(1);
+
+    await shutdownAllWriters(20);
+
+    expect(consoleSpy).toHaveBeenCalledWith(expect.stringContaining('excedeu 20ms'));
+    consoleSpy.mockRestore();
+    writers.length = 0;
+  });
+
+  it('should share the registry between module instances', async () => {
+    const persist = jest.fn().mockResolvedValue(undefined);
+    createWriter(persist).enqueue(7);
+
+    let isolatedShutdown: typeof shutdownAllWriters | undefined;
+    jest.isolateModules(() => {
+      isolatedShutdown = require('@/lib/services/buffered-writer').shutdownAllWriters;
+    });
+    await isolatedShutdown!(1000);
+
+    expect(persist).toHaveBeenCalledWith([7]);
+  });
+
+  it('should flush on SIGTERM without exiting when other listeners handle shutdown', async () => {
+    const exitSpy = jest.spyOn(process, 'exit').mockImplementation((() => undefined) as never);
+    const otherListener = jest.fn();
+    process.on('SIGTERM', otherListener);
+
+    const persist = jest.fn().mockResolvedValue(undefined);
+    createWriter(persist).enqueue(3);
+
+    process.emit('SIGTERM');
+    await new Promise(resolve => setTimeout(resolve, 10));
+
+    expect(persist).toHaveBeenCalledWith([3]);
+    expect(otherListener).toHaveBeenCalled();
+    expect(exitSpy).not.toHaveBeenCalled();
+
+    process.removeListener('SIGTERM', otherListener);
+    exitSpy.mockRestore();
+  });
+});
@@ -0,0 +1,84 @@
+/**
+ * @jest-environment node
+ */
+
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+
+import { CepIndex, CepIndexService } from '@/lib/services/cep-index';
+
+const { buildCepIndex } = require('../../../scripts/build-cep-index');
+
+describe('lib/services/cep-index', () => {
+  let dir: string;
+  let file: string;
+
+  const registros = [
+    { inicio: 35500000, fim: 35504999, logradouro: '', bairro: '', cidade: 'Divinópolis', uf: 'MG' },
+    { inicio: 1310100, fim: 1310100, logradouro: 'Avenida Paulista', bairro: 'Bela Vista', cidade: 'São Paulo', uf: 'SP' },
+    { inicio: 35500010, fim: 35500010, logradouro: 'Rua Goiás', bairro: 'Centro', cidade: 'Divinópolis', uf: 'MG' },
+  ];
+
+  beforeEach(() => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), 'cep-index-'));
+    file = path.join(dir, 'cep.bin');
+    fs.writeFileSync(file, buildCepIndex(registros));
+  });
+
+  afterEach(() => {
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  it('encontra CEPs exatos, inclusive com zero à esquerda', () => {
+    const index = CepIndex.open(file);
+
+    expect(index.lookup('01310-100')).toEqual({
+      cep: '01310-100',
+      logradouro: 'Avenida Paulista',
+      complemento: '',
+      bairro: 'Bela Vista',
+      localidade: 'São Paulo',
+      uf: 'SP',
+    });
+    index.close();
+  });
+
+  it('usa o registro mais específico dentro de uma faixa', () => {
+    const index = CepIndex.open(file);
+
+    expect(index.lookup('35500010')).toMatchObject({ logradouro: 'Rua Goiás', bairro: 'Centro' });
+    expect(index.lookup('35500011')).toMatchObject({ logradouro: '', localidade: 'Divinópolis' });
+    expect(index.lookup('35505000')).toBeNull();
+    expect(index.lookup('01000000')).toBeNull();
+    index.close();
+  });
+
+  it('rejeita arquivos em outro formato', () => {
+    fs.writeFileSync(file, 'cep,logradouro\n');
+    expect(() => CepIndex.open(file)).toThrow('inválido');
+  });
+
+  it('recarrega o índice quando o arquivo é substituído', () => {
+    const service = new CepIndexService({ path: file, refreshCheckMs: 0 });
+    expect(service.lookup('99999999')).toBeNull();
+
+    const novo = path.join(dir, 'novo.bin');
+    fs.writeFileSync(
+      novo,
+      buildCepIndex([{ inicio: 99999999, fim: 99999999, logradouro: 'Rua Nova', bairro: '', cidade: 'X', uf: 'SP' }])
+    );
+    fs.renameSync(novo, file);
+    // Garantir mtime diferente em sistemas de arquivos com resolução baixa
+    fs.utimesSync(file, new Date(), new Date(Date.now() + 5000));
+
+    expect(service.lookup('99999999')).toMatchObject({ logradouro: 'Rua Nova' });
+    expect(service.getStats()).toMatchObject({ carregado: true, recargas: 1 });
+  });
+
+  it('fica desabilitado sem caminho configurado', () => {
+    const service = new CepIndexService({ refreshCheckMs: 0 });
+    expect(service.lookup('01310100')).toBeNull();
+    expect(service.enabled).toBe(false);
+  });
+});
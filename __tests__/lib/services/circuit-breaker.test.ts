@@ -0,0 +1,131 @@
+/**
+ * @jest-environment node
+ */
+
+jest.mock('@/lib/services/metrics-service', () => ({
+  metricsService: {
+    onMetric: jest.fn(() => () => {}),
+  },
+}));
+
+import { ChannelHealthMonitor } from '@/lib/services/channel-health';
+import { CircuitBreaker, CircuitOpenError } from '@/lib/services/circuit-breaker';
+import { metricsService } from '@/lib/services/metrics-service';
+
+describe('lib/services/circuit-breaker', () => {
+  const options = {
+    windowSize: 10,
+    minimumCalls: 4,
+    failureRateThreshold: 0.5,
+    slowCallMs: 1000,
+    openDurationMs: 1000,
+    maxOpenDurationMs: 4000,
+    probeTimeoutMs: 500,
+  };
+
+  function failTimes(breaker: CircuitBreaker, count: number, now: number) {
+    for (let i = 0; i < count; i++) breaker.record(false, 100, now);
+  }
+
+  it('permanece fechado abaixo do mínimo de chamadas', () => {
+    const breaker = new CircuitBreaker(options);
+    failTimes(breaker, 3, 0);
+
+    expect(breaker.getState(0)).toBe('closed');
+  });
+
+  it('abre quando a taxa de falhas passa do limite e recusa chamadas', async () => {
+    const breaker = new CircuitBreaker(options);
+    breaker.record(true, 100, 0);
+    failTimes(breaker, 3, 0);
+
+    expect(breaker.getState(0)).toBe('open');
+    expect(breaker.isAvailable(0)).toBe(false);
+    await expect(breaker.execute(async () => 'ok')).rejects.toBeInstanceOf(CircuitOpenError);
+  });
+
+  it('permite uma única sondagem em half-open e fecha no sucesso', () => {
+    const breaker = new CircuitBreaker(options);
+    failTimes(breaker, 4, 0);
+
+    expect(breaker.getState(1000)).toBe('half_open');
+    expect(breaker.tryAcquire(1000)).toBe(true);
+    expect(breaker.tryAcquire(1100)).toBe(false);
+
+    breaker.record(true, 100, 1200);
+    expect(breaker.getState(1200)).toBe('closed');
+    expect(breaker.tryAcquire(1200)).toBe(true);
+  });
+
+  it('reabre com espera dobrada quando a sondagem falha', () => {
+    const breaker = new CircuitBreaker(options);
+    failTimes(breaker, 4, 0);
+
+    breaker.tryAcquire(1000);
+    breaker.record(false, 100, 1000);
+
+    expect(breaker.getState(2500)).toBe('open');
+    expect(breaker.getState(3000)).toBe('half_open');
+  });
+
+  it('libera a vaga de sondagem que não retornou resultado', () => {
+    const breaker = new CircuitBreaker(options);
+    failTimes(breaker, 4, 0);
+
+    expect(breaker.tryAcquire(1000)).toBe(true);
+    expect(breaker.tryAcquire(1400)).toBe(false);
+    expect(breaker.tryAcquire(1500)).toBe(true);
+  });
+
+  it('marca como degradado quando a maioria das chamadas é lenta', () => {
+    const breaker = new CircuitBreaker(options);
+    for (let i = 0; i < 4; i++) breaker.record(true, 2000, 0);
+
+    expect(breaker.getState(0)).toBe('closed');
+    expect(breaker.isDegraded(0)).toBe(true);
+    expect(breaker.getSnapshot(0).latencyEwmaMs).toBe(2000);
+  });
+
+  describe('ChannelHealthMonitor', () => {
+    it('assina as métricas ao carregar o módulo', () => {
+      expect(metricsService.onMetric).toHaveBeenCalled();
+    });
+
+    it('assina as métricas uma única vez', () => {
+      (metricsService.onMetric as jest.Mock).mockClear();
+      const monitor = new ChannelHealthMonitor();
+      monitor.attach();
+      monitor.attach();
+
+      expect(metricsService.onMetric).toHaveBeenCalledTimes(1);
+    });
+
+    it('abre o circuito do canal a partir das métricas de envio', () => {
+      const monitor = new ChannelHealthMonitor({ minimumCalls: 3 });
+      for (let i = 0; i < 3; i++) {
+        monitor.handleMetric({ service: 'whatsapp', operation: 'sendMessage', success: false, duration: 50 });
+      }
+
+      expect(monitor.isAvailable('whatsapp')).toBe(false);
+      expect(monitor.rank(['whatsapp', 'sms', 'email'])).toEqual(['sms', 'email']);
+    });
+
+    it('ignora operações que não são envio', () => {
+      const monitor = new ChannelHealthMonitor({ minimumCalls: 3 });
+      for (let i = 0; i < 3; i++) {
+        monitor.handleMetric({ service: 'email', operation: 'testConnection', success: false, duration: 50 });
+      }
+
+      expect(monitor.isAvailable('email')).toBe(true);
+    });
+
+    it('coloca canais lentos depois dos saudáveis', () => {
+      const monitor = new ChannelHealthMonitor({ minimumCalls: 3 });
+      for (let i = 0; i < 3; i++) {
+        monitor.handleMetric({ service: 'sms', operation: 'sendSMS', success: true, duration: 10_000 });
+      }
+
+      expect(monitor.rank(['sms', 'whatsapp'])).toEqual(['whatsapp', 'sms']);
+    });
+  });
+});
@@ -0,0 +1,228 @@
+/**
+ * @jest-environment node
+ */
+
+jest.mock('@/lib/prisma', () => ({
+  __esModule: true,
+  default: {
+    cliente: {
+      findMany: jest.fn(),
+      createMany: jest.fn(),
+      create: jest.fn(),
+    },
+  },
+}));
+
+jest.mock('@/lib/services/number-allocator', () => ({
+  allocateNumerosCliente: jest.fn(),
+  isNumberConflict: jest.requireActual('@/lib/services/number-allocator').isNumberConflict,
+  nextNumeroCliente: jest.fn(),
+  resyncNumeroCliente: jest.fn(),
+}));
+
+import { Prisma } from '@prisma/client';
+
+import prisma from '@/lib/prisma';
+import {
+  allocateNumerosCliente,
+  nextNumeroCliente,
+  resyncNumeroCliente,
+} from '@/lib/services/number-allocator';
+import {
+  ClientImportService,
+  parseClientImport,
+} from '@/lib/services/client-import';
+
+const mockCliente = prisma.cliente as unknown as Record<string, jest.Mock>;
+
+async function* chunks(...parts: string[]) {
+  for (const part of parts) yield new TextEncoder().encode(part);
+}
+
+async function collect<T>(iterable: AsyncIterable<T>): Promise<T[]> {
+  const items: T[] = [];
+  for await (const item of iterable) items.push(item);
+  return items;
+}
+
+describe('lib/services/client-import', () => {
+  const year = new Date().getFullYear();
+  let service: ClientImportService;
+
+  beforeEach(() => {
+    jest.clearAllMocks();
+    jest.spyOn(console, 'error').mockImplementation(() => {});
+    mockCliente.findMany.mockResolvedValue([]);
+    let ultimo = 41;
+    const numero = () => `CL${year}${String(++ultimo).padStart(6, '0')}`;
+    (allocateNumerosCliente as jest.Mock).mockImplementation(async (count: number) =>
+      Array.from({ length: count }, numero)
+    );
+    (nextNumeroCliente as jest.Mock).mockImplementation(async () => numero());
+    mockCliente.createMany.mockImplementation(async ({ data }) => ({ count: data.length }));
+    service = new ClientImportService({ batchSize: 2, maxReportedErrors: 10 });
+  });
+
+  afterEach(() => {
+    jest.restoreAllMocks();
+  });
+
+  describe('parseClientImport', () => {
+    it('lê CSV em pedaços com aspas e separador ;', async () => {
+      const rows = await collect(
+        parseClientImport(
+          chunks('nome;email;cidade\r\n"Silva; Ana";ana@x.com;Div', 'inópolis\n\nJoão;joao@x.com;BH'),
+          'csv'
+        )
+      );
+
+      expect(rows).toEqual([
+        { linha: 2, dados: { nome: 'Silva; Ana', email: 'ana@x.com', cidade: 'Divinópolis' } },
+        { linha: 4, dados: { nome: 'João', email: 'joao@x.com', cidade: 'BH' } },
+      ]);
+    });
+
+    it('mantém quebras de linha dentro de campos entre aspas', async () => {
+      const rows = await collect(
+        parseClientImport(
+          chunks('nome,email,endereco\nAna,ana@x.com,"Rua A, 10\r\nApto ', '2 ""fundos"""\nJoão,joao@x.com,Rua B\n'),
+          'csv'
+        )
+      );
+
+      expect(rows).toEqual([
+        { linha: 2, dados: { nome: 'Ana', email: 'ana@x.com', endereco: 'Rua A, 10\nApto 2 "fundos"' } },
+        { linha: 4, dados: { nome: 'João', email: 'joao@x.com', endereco: 'Rua B' } },
+      ]);
+    });
+
+    it('marca linhas NDJSON inválidas', async () => {
+      const rows = await collect(parseClientImport(chunks('{"nome":"Ana"}\n{quebrado\nnull\n'), 'ndjson'));
+
+      expect(rows.map(row => row.dados)).toEqual([
+        { nome: 'Ana' },
+        { __erro: 'JSON inválido' },
+        { __erro: 'Linha deve ser um objeto JSON' },
+      ]);
+    });
+  });
+
+  describe('import', () => {
+    function row(linha: number, dados: Record<string, unknown>) {
+      return { linha, dados };
+    }
+
+    async function* rows(...items: ReturnType<typeof row>[]) {
+      yield* items;
+    }
+
+    it('valida, remove duplicados e insere em lotes com números em bloco', async () => {
+      mockCliente.findMany
+        .mockResolvedValueOnce([{ email: 'EXISTE@x.com', cpfCnpj: null }])
+        .mockResolvedValueOnce([]);
+
+      const report = await service.import(
+        rows(
+          row(2, { nome: 'Ana', email: 'ana@x.com', cpf_cnpj: '529.982.247-25' }),
+          row(3, { nome: 'Existe', email: 'existe@x.com' }),
+          row(4, { nome: 'Bruno', email: 'bruno@x.com', cnpj: '11.222.333/0001-81', uf: 'mg' }),
+          row(5, { nome: 'Ana de novo', email: 'outra@x.com', cpf: '52998224725' }),
+          row(6, { nome: 'Sem email' })
+        ),
+        { createdBy: 'user-1' }
+      );
+
+      expect(report).toMatchObject({ total: 5, importados: 2, duplicados: 2, invalidos: 1 });
+      expect(report.erros).toEqual([
+        { linha: 3, erro: 'Já existe um cliente cadastrado com este email' },
+        { linha: 5, erro: 'Já existe um cliente cadastrado com este CPF/CNPJ' },
+        { linha: 6, erro: 'Nome e email são obrigatórios' },
+      ]);
+
+      // Uma consulta de duplicados por lote
+      expect(mockCliente.findMany).toHaveBeenCalledTimes(2);
+      expect(mockCliente.createMany).toHaveBeenCalledTimes(2);
+      expect(mockCliente.createMany.mock.calls[0][0].data).toEqual([
+        expect.objectContaining({
+          email: 'ana@x.com',
+          cpfCnpj: '52998224725',
+          tipoPessoa: 'fisica',
+          numeroCliente: `CL${year}000042`,
+          createdBy: 'user-1',
+        }),
+      ]);
+      expect(mockCliente.createMany.mock.calls[1][0].data[0]).toMatchObject({
+        cpfCnpj: '11222333000181',
+        tipoPessoa: 'juridica',
+        estado: 'MG',
+      });
+    });
+
+    it('rejeita CPF/CNPJ com dígito verificador inválido', async () => {
+      const report = await service.import(
+        rows(row(2, { nome: 'Ana', email: 'ana@x.com', cpf_cnpj: '12345678900' }))
+      );
+
+      expect(report.erros).toEqual([{ linha: 2, erro: 'CPF inválido' }]);
+      expect(mockCliente.findMany).not.toHaveBeenCalled();
+    });
+
+    it('não grava nada em modo simulação', async () => {
+      const report = await service.import(
+        rows(row(2, { nome: 'Ana', email: 'ana@x.com' })),
+        { dryRun: true }
+      );
+
+      expect(report).toMatchObject({ importados: 1, dryRun: true });
+      expect(mockCliente.createMany).not.toHaveBeenCalled();
+    });
+
+    it('insere linha a linha quando o lote é recusado', async () => {
+      mockCliente.createMany.mockRejectedValueOnce(new Error('value too long'));
+      mockCliente.create
+        .mockResolvedValueOnce({ id: 'c-1' })
+        .mockRejectedValueOnce(new Error('value too long'));
+
+      const report = await service.import(
+        rows(row(2, { nome: 'Ana', email: 'ana@x.com' }), row(3, { nome: 'Bia', email: 'bia@x.com' }))
+      );
+
+      expect(report).toMatchObject({ importados: 1, invalidos: 1 });
+      expect(report.erros).toEqual([{ linha: 3, erro: 'Erro ao inserir cliente' }]);
+    });
+
+    it('não realinha o contador em conflito de outra coluna', async () => {
+      mockCliente.createMany.mockRejectedValueOnce(
+        new Prisma.PrismaClientKnownRequestError('Unique constraint failed', {
+          code: 'P2002',
+          clientVersion: 'test',
+          meta: { target: ['email'] },
+        })
+      );
+      mockCliente.create.mockResolvedValueOnce({ id: 'c-1' });
+
+      const report = await service.import(rows(row(2, { nome: 'Ana', email: 'ana@x.com' })));
+
+      expect(report).toMatchObject({ importados: 1 });
+      expect(resyncNumeroCliente).not.toHaveBeenCalled();
+      expect(mockCliente.create).toHaveBeenCalledTimes(1);
+    });
+
+    it('realinha o contador e repete o lote em conflito de número', async () => {
+      mockCliente.createMany.mockRejectedValueOnce(
+        new Prisma.PrismaClientKnownRequestError('Unique constraint failed', {
+          code: 'P2002',
+          clientVersion: 'test',
+          meta: { target: ['numeroCliente'] },
+        })
+      );
+
+      const report = await service.import(rows(row(2, { nome: 'Ana', email: 'ana@x.com' })));
+
+      expect(report).toMatchObject({ importados: 1, invalidos: 0 });
+      expect(resyncNumeroCliente).toHaveBeenCalledTimes(1);
+      expect(mockCliente.createMany.mock.calls[1][0].data[0].numeroCliente).toBe(`CL${year}000043`);
+      expect(mockCliente.create).not.toHaveBeenCalled();
+    });
+  });
+});
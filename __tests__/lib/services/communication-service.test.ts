@@ -18,6 +18,7 @@ jest.mock('@/lib/supabase/client', () => ({
 jest.mock('@/lib/services/metrics-service', () => ({
   metricsService: {
     recordMetric: jest.fn().mockResolvedValue(undefined),
+    onMetric: jest.fn(() => () => {}),
   },
 }));
 
@@ -0,0 +1,151 @@
+/**
+ * @jest-environment node
+ */
+
+jest.mock('@/lib/prisma', () => ({
+  __esModule: true,
+  default: {
+    comunicacaoEstatistica: { findUnique: jest.fn(), findMany: jest.fn(), groupBy: jest.fn() },
+    comunicacaoEstatisticaDiaria: { aggregate: jest.fn() },
+    comunicacaoCliente: { groupBy: jest.fn(), count: jest.fn(), findMany: jest.fn() },
+    cliente: { findUnique: jest.fn() },
+  },
+}));
+
+import prisma from '@/lib/prisma';
+import {
+  CommunicationStatsService,
+  STATS_SENTINEL,
+} from '@/lib/services/communication-stats';
+
+const mockEstatistica = prisma.comunicacaoEstatistica as unknown as Record<string, jest.Mock>;
+const mockDiaria = prisma.comunicacaoEstatisticaDiaria as unknown as Record<string, jest.Mock>;
+const mockComunicacao = prisma.comunicacaoCliente as unknown as Record<string, jest.Mock>;
+const mockCliente = prisma.cliente as unknown as Record<string, jest.Mock>;
+
+describe('lib/services/communication-stats', () => {
+  const service = new CommunicationStatsService();
+
+  beforeEach(() => {
+    jest.clearAllMocks();
+    jest.spyOn(console, 'error').mockImplementation(() => {});
+    jest.spyOn(console, 'warn').mockImplementation(() => {});
+    mockEstatistica.findUnique.mockResolvedValue({ escopo: STATS_SENTINEL.escopo });
+    mockCliente.findUnique.mockResolvedValue(null);
+  });
+
+  afterEach(() => {
+    jest.restoreAllMocks();
+  });
+
+  it('lê os contadores do cliente sem tocar no histórico', async () => {
+    mockEstatistica.findMany.mockResolvedValueOnce([
+      { tipo: 'email', total: 6, enviados: 5 },
+      { tipo: 'sms', total: 4, enviados: 3 },
+    ]);
+    mockDiaria.aggregate.mockResolvedValueOnce({ _sum: { total: 2 } });
+
+    const stats = await service.getStats('cliente-1');
+
+    expect(stats).toEqual({
+      total: 10,
+      byChannel: { email: 6, sms: 4 },
+      successRate: 80,
+      lastWeek: 2,
+    });
+    expect(mockEstatistica.findMany).toHaveBeenCalledWith(
+      expect.objectContaining({ where: { escopo: 'cliente-1' } })
+    );
+    expect(mockComunicacao.findMany).not.toHaveBeenCalled();
+  });
+
+  it('soma os escopos por canal quando não há cliente', async () => {
+    mockEstatistica.groupBy.mockResolvedValueOnce([
+      { tipo: 'email', _sum: { total: 3, enviados: 3 } },
+      { tipo: 'sms', _sum: { total: 1, enviados: 0 } },
+    ]);
+    mockDiaria.aggregate.mockResolvedValueOnce({ _sum: { total: null } });
+
+    const stats = await service.getStats();
+
+    expect(stats).toEqual({ total: 4, byChannel: { email: 3, sms: 1 }, successRate: 75, lastWeek: 0 });
+    expect(mockEstatistica.groupBy).toHaveBeenCalledWith(
+      expect.objectContaining({ by: ['tipo'], where: { escopo: { not: STATS_SENTINEL.escopo } } })
+    );
+    expect(mockDiaria.aggregate.mock.calls[0][0].where).not.toHaveProperty('escopo');
+    expect(mockEstatistica.findMany).not.toHaveBeenCalled();
+  });
+
+  it('agrega no banco quando a migração não gravou a sentinela', async () => {
+    mockEstatistica.findUnique.mockResolvedValue(null);
+    mockEstatistica.findMany.mockResolvedValue([]);
+    mockDiaria.aggregate.mockResolvedValue({ _sum: { total: null } });
+    mockComunicacao.groupBy.mockResolvedValue([
+      { tipo: 'email', status: 'enviado', _count: { _all: 2 } },
+    ]);
+    mockComunicacao.count.mockResolvedValue(2);
+
+    await expect(service.getStats('cliente-1')).resolves.toMatchObject({ total: 2, lastWeek: 2 });
+    await service.getStats('cliente-1');
+
+    expect(mockComunicacao.groupBy).toHaveBeenCalledTimes(2);
+    expect(console.warn).toHaveBeenCalledTimes(1);
+  });
+
+  it('agrega no banco quando os contadores não estão disponíveis', async () => {
+    mockEstatistica.findMany.mockRejectedValueOnce(new Error('relation does not exist'));
+    mockDiaria.aggregate.mockResolvedValueOnce({ _sum: { total: 0 } });
+    mockComunicacao.groupBy.mockResolvedValueOnce([
+      { tipo: 'whatsapp', status: 'enviado', _count: { _all: 3 } },
+      { tipo: 'whatsapp', status: 'erro', _count: { _all: 1 } },
+    ]);
+    mockComunicacao.count.mockResolvedValueOnce(4);
+
+    const stats = await service.getStats('cliente-1');
+
+    expect(stats).toEqual({
+      total: 4,
+      byChannel: { whatsapp: 4 },
+      successRate: 75,
+      lastWeek: 4,
+    });
+    expect(mockComunicacao.groupBy.mock.calls[0][0].where).toEqual({
+      clientePortalId: 'cliente-1',
+    });
+  });
+
+  it('casa um id de Cliente também pelo telefone e email', async () => {
+    mockCliente.findUnique.mockResolvedValueOnce({ telefone: '31999999999', email: 'ana@example.com' });
+    mockComunicacao.groupBy.mockResolvedValueOnce([
+      { tipo: 'sms', status: 'enviado', _count: { _all: 2 } },
+    ]);
+    mockComunicacao.count.mockResolvedValueOnce(1);
+
+    const stats = await service.getStats('cliente-1');
+
+    expect(stats).toMatchObject({ total: 2, lastWeek: 1 });
+    expect(mockComunicacao.groupBy.mock.calls[0][0].where).toEqual({
+      OR: [
+        { clientePortalId: 'cliente-1' },
+        { clienteTelefone: { in: ['31999999999', 'ana@example.com'] } },
+        { destinatario: { in: ['31999999999', 'ana@example.com'] } },
+      ],
+    });
+    expect(mockEstatistica.findMany).not.toHaveBeenCalled();
+  });
+
+  it('usa os mesmos dias de calendário (UTC) dos contadores na última semana', async () => {
+    mockEstatistica.findUnique.mockResolvedValue(null);
+    mockEstatistica.findMany.mockResolvedValue([]);
+    mockDiaria.aggregate.mockResolvedValue({ _sum: { total: null } });
+    mockComunicacao.groupBy.mockResolvedValue([]);
+    mockComunicacao.count.mockResolvedValue(0);
+
+    await service.getStats('cliente-1');
+
+    const diaContadores = mockDiaria.aggregate.mock.calls[0][0].where.dia.gte as Date;
+    const diaAgregado = mockComunicacao.count.mock.calls[0][0].where.dataEnvio.gte as Date;
+    expect(diaAgregado).toEqual(diaContadores);
+    expect(diaAgregado.toISOString()).toMatch(/T00:00:00\.000Z$/);
+  });
+});
@@ -0,0 +1,96 @@
+/**
+ * @jest-environment node
+ */
+
+jest.mock('@/lib/services/cache-service', () => ({
+  cacheService: {
+    get: jest.fn(async () => null),
+    set: jest.fn(async () => true),
+  },
+}));
+
+import { cacheService } from '@/lib/services/cache-service';
+import { LookupCache } from '@/lib/services/document-lookup';
+
+const mockCache = cacheService as unknown as Record<string, jest.Mock>;
+
+describe('lib/services/document-lookup', () => {
+  let load: jest.Mock;
+  let cache: LookupCache<{ nome: string; erro?: boolean }>;
+
+  beforeEach(() => {
+    jest.clearAllMocks();
+    load = jest.fn();
+    cache = new LookupCache({
+      namespace: 'teste',
+      maxEntries: 10,
+      hitTtlSeconds: 3600,
+      missTtlSeconds: 60,
+      maxMemoryTtlSeconds: 600,
+      load,
+      classify: value => {
+        if (value && !value.erro) return 'encontrado';
+        return value ? 'indisponivel' : 'nao_encontrado';
+      },
+    });
+  });
+
+  it('agrupa consultas simultâneas em uma única chamada externa', async () => {
+    let resolveLoad: (_value: { nome: string }) => void = () => {};
+    load.mockReturnValueOnce(new Promise(resolve => (resolveLoad = resolve)));
+
+    const consultas = Promise.all([cache.get('1'), cache.get('1'), cache.get('1')]);
+    await new Promise(resolve => setImmediate(resolve));
+    resolveLoad({ nome: 'Empresa' });
+
+    await expect(consultas).resolves.toEqual([
+      { nome: 'Empresa' },
+      { nome: 'Empresa' },
+      { nome: 'Empresa' },
+    ]);
+    expect(load).toHaveBeenCalledTimes(1);
+    expect(cache.getStats()).toMatchObject({ consultas: 1, agrupadas: 2 });
+  });
+
+  it('responde da memória depois da primeira consulta', async () => {
+    load.mockResolvedValueOnce({ nome: 'Empresa' });
+
+    await cache.get('1');
+    await expect(cache.get('1')).resolves.toEqual({ nome: 'Empresa' });
+
+    expect(load).toHaveBeenCalledTimes(1);
+    expect(mockCache.set).toHaveBeenCalledWith(
+      'lookup:teste:1',
+      { value: { nome: 'Empresa' } },
+      3600
+    );
+  });
+
+  it('guarda "não encontrado" com TTL curto', async () => {
+    load.mockResolvedValueOnce(null);
+
+    await expect(cache.get('2')).resolves.toBeNull();
+    await expect(cache.get('2')).resolves.toBeNull();
+
+    expect(load).toHaveBeenCalledTimes(1);
+    expect(mockCache.set).toHaveBeenCalledWith('lookup:teste:2', { value: null }, 60);
+  });
+
+  it('não guarda falhas dos provedores', async () => {
+    load.mockResolvedValueOnce({ nome: '', erro: true });
+    load.mockRejectedValueOnce(new Error('timeout'));
+
+    await cache.get('3');
+    await expect(cache.get('3')).rejects.toThrow('timeout');
+
+    expect(load).toHaveBeenCalledTimes(2);
+    expect(mockCache.set).not.toHaveBeenCalled();
+  });
+
+  it('usa o valor compartilhado no Redis', async () => {
+    mockCache.get.mockResolvedValueOnce({ value: { nome: 'Redis' } });
+
+    await expect(cache.get('4')).resolves.toEqual({ nome: 'Redis' });
+    expect(load).not.toHaveBeenCalled();
+  });
+});
@@ -0,0 +1,81 @@
+/**
+ * @jest-environment node
+ */
+
+import { mkdir, mkdtemp, readdir, readFile, rm } from 'fs/promises';
+import os from 'os';
+import path from 'path';
+
+import { LogFileSink } from '@/lib/services/log-file-sink';
+
+describe('lib/services/log-file-sink', () => {
+  let directory: string;
+
+  beforeEach(async () => {
+    directory = await mkdtemp(path.join(os.tmpdir(), 'log-sink-'));
+  });
+
+  afterEach(async () => {
+    await rm(directory, { recursive: true, force: true });
+  });
+
+  it('should append batches as NDJSON lines', async () => {
+    const sink = new LogFileSink({ directory, compress: false });
+
+    await sink.write([JSON.stringify({ n: 1 }), JSON.stringify({ n: 2 })]);
+    await sink.write([JSON.stringify({ n: 3 })]);
+    await sink.close();
+
+    const [file] = await readdir(directory);
+    const content = await readFile(path.join(directory, file), 'utf8');
+    const lines = content.trim().split('\n').map(line => JSON.parse(line));
+
+    expect(file).toMatch(/^app-\d{4}-\d{2}-\d{2}\.log$/);
+    expect(lines).toEqual([{ n: 1 }, { n: 2 }, { n: 3 }]);
+  });
+
+  it('should rotate when the file exceeds maxFileSize', async () => {
+    const sink = new LogFileSink({ directory, maxFileSize: 64, compress: false });
+    const line = 'x'.repeat(40);
+
+    await sink.write([line]);
+    await sink.write([line]);
+    await sink.write([line]);
+    await sink.close();
+
+    const files = (await readdir(directory)).sort();
+    expect(files).toHaveLength(3);
+    expect(files.filter(file => /\.\d+\.log$/.test(file))).toHaveLength(2);
+  });
+
+  it('should keep at most maxFiles rotated files', async () => {
+    const sink = new LogFileSink({
+      directory,
+      maxFileSize: 16,
+      maxFiles: 2,
+      compress: false,
+    });
+
+    for (let i = 0; i < 6; i++) {
+      await sink.write([`line-${i}-padding`]);
+    }
+    await sink.close();
+
+    const rotated = (await readdir(directory)).filter(file =>
+      /\.\d+\.log$/.test(file)
+    );
+    expect(rotated).toHaveLength(2);
+  });
+
+  it('should not hang waiting for drain when the stream fails', async () => {
+    const consoleSpy = jest.spyOn(console, 'error').mockImplementation(() => {});
+    // Um diretório no lugar do arquivo faz o stream falhar (EISDIR) sem nunca emitir 'drain'
+    const today = new Date().toISOString().slice(0, 10);
+    await mkdir(path.join(directory, `app-${today}.log`));
+
+    const sink = new LogFileSink({ directory, compress: false });
+
+    await expect(sink.write(['x'.repeat(64 * 1024)])).rejects.toThrow();
+    consoleSpy.mockRestore();
+  });
+});
@@ -0,0 +1,146 @@
+/**
+ * @jest-environment node
+ */
+
+import { mkdtemp, readdir, rm } from 'fs/promises';
+import os from 'os';
+import path from 'path';
+import { gunzipSync } from 'zlib';
+
+import { LogShipper, LogShipperOptions } from '@/lib/services/log-shipper';
+
+describe('lib/services/log-shipper', () => {
+  const originalFetch = global.fetch;
+  const shippers: LogShipper[] = [];
+  let fetchMock: jest.Mock;
+
+  function createShipper(overrides: Partial<LogShipperOptions> = {}) {
+    const shipper = new LogShipper({
+      endpoint: 'https://logs.example.com/ingest',
+      flushIntervalMs: 60 * 1000,
+      ...overrides,
+    });
+    shippers.push(shipper);
+    return shipper;
+  }
+
+  function okResponse() {
+    return {
+      ok: true,
+      status: 200,
+      statusText: 'OK',
+      arrayBuffer: () => Promise.resolve(new ArrayBuffer(0)),
+    };
+  }
+
+  function decodeBody(call: unknown[]): { logs: unknown[] } {
+    const init = call[1] as { body: Buffer };
+    return JSON.parse(gunzipSync(init.body).toString('utf8'));
+  }
+
+  beforeEach(() => {
+    fetchMock = jest.fn().mockResolvedValue(okResponse());
+    global.fetch = fetchMock as unknown as typeof fetch;
+  });
+
+  afterEach(async () => {
+    await Promise.all(shippers.map(shipper => shipper.shutdown()));
+    shippers.length = 0;
+    global.fetch = originalFetch;
+  });
+
+  it('should send gzip batches capped by bytes', async () => {
+    const shipper = createShipper({ maxBatchBytes: 60 });
+    const line = JSON.stringify({ message: 'x'.repeat(10) });
+
+    shipper.enqueue([line, line, line]);
+    await shipper.flush();
+
+    expect(fetchMock).toHaveBeenCalledTimes(2);
+    expect(fetchMock.mock.calls[0][1].headers['Content-Encoding']).toBe('gzip');
+    expect(decodeBody(fetchMock.mock.calls[0]).logs).toHaveLength(2);
+    expect(decodeBody(fetchMock.mock.calls[1]).logs).toHaveLength(1);
+    expect(shipper.getStats()).toMatchObject({ shipped: 3, queued: 0 });
+  });
+
+  it('should drop the oldest entries when the queue is full', async () => {
+    const shipper = createShipper({ maxQueueSize: 2 });
+
+    shipper.enqueue(['{"n":1}', '{"n":2}', '{"n":3}']);
+    await shipper.flush();
+
+    expect(shipper.getStats().dropped).toBe(1);
+    expect(decodeBody(fetchMock.mock.calls[0]).logs).toEqual([{ n: 2 }, { n: 3 }]);
+  });
+
+  it('should back off after a failure instead of retrying immediately', async () => {
+    const consoleSpy = jest.spyOn(console, 'error').mockImplementation(() => {});
+    fetchMock.mockRejectedValue(new Error('collector down'));
+    const shipper = createShipper({ baseBackoffMs: 60 * 1000 });
+    jest.spyOn(Math, 'random').mockReturnValue(0.5);
+
+    shipper.enqueue(['{"n":1}']);
+    await shipper.flush();
+    await shipper.flush();
+
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+    expect(shipper.getStats()).toMatchObject({
+      failedAttempts: 1,
+      consecutiveFailures: 1,
+      queued: 1,
+    });
+
+    (Math.random as jest.Mock).mockRestore();
+    consoleSpy.mockRestore();
+  });
+
+  it('should spool batches to disk after maxRetries and replay them', async () => {
+    const consoleSpy = jest.spyOn(console, 'error').mockImplementation(() => {});
+    const spoolDirectory = await mkdtemp(path.join(os.tmpdir(), 'log-spool-'));
+    const shipper = createShipper({
+      maxRetries: 1,
+      baseBackoffMs: 0,
+      spoolDirectory,
+    });
+
+    fetchMock.mockRejectedValueOnce(new Error('collector down'));
+    shipper.enqueue(['{"n":1}']);
+    await shipper.flush();
+
+    expect(await readdir(spoolDirectory)).toHaveLength(1);
+    expect(shipper.getStats().spooled).toBe(1);
+
+    await shipper.flush();
+
+    expect(await readdir(spoolDirectory)).toHaveLength(0);
+    expect(decodeBody(fetchMock.mock.calls[1]).logs).toEqual([{ n: 1 }]);
+    expect(shipper.getStats()).toMatchObject({ shipped: 1, spooled: 0 });
+
+    await rm(spoolDirectory, { recursive: true, force: true });
+    consoleSpy.mockRestore();
+  });
+
+  it('should discard the oldest spool files beyond maxSpoolBytes', async () => {
+    const consoleSpy = jest.spyOn(console, 'error').mockImplementation(() => {});
+    const spoolDirectory = await mkdtemp(path.join(os.tmpdir(), 'log-spool-'));
+    const shipper = createShipper({
+      maxRetries: 1,
+      baseBackoffMs: 0,
+      spoolDirectory,
+      maxSpoolBytes: 20, // cada lote ocupa 8 bytes
+    });
+    fetchMock.mockRejectedValue(new Error('collector down'));
+
+    for (const n of [1, 2, 3]) {
+      shipper.enqueue([`{"n":${n}}`]);
+      await shipper.flush();
+    }
+
+    const files = (await readdir(spoolDirectory)).sort();
+    expect(files).toHaveLength(2);
+    expect(shipper.getStats()).toMatchObject({ spooled: 2, dropped: 1 });
+
+    await rm(spoolDirectory, { recursive: true, force: true });
+    consoleSpy.mockRestore();
+  });
+});
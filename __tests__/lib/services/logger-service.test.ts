@@ -358,6 +358,21 @@ describe('lib/services/logger-service', () => {
       expect(logger).toBeDefined();
     });
 
+    it('should enable remote output when LOG_REMOTE_ENDPOINT is set', () => {
+      const original = process.env.LOG_REMOTE_ENDPOINT;
+      process.env.LOG_REMOTE_ENDPOINT = 'https://logs.example.com/api/logs';
+      try {
+        const logger = createLogger({ enableConsole: false });
+        expect(logger.getStats().config.enableRemote).toBe(true);
+      } finally {
+        if (original === undefined) {
+          delete process.env.LOG_REMOTE_ENDPOINT;
+        } else {
+          process.env.LOG_REMOTE_ENDPOINT = original;
+        }
+      }
+    });
+
     it('should support multiple output destinations', () => {
       const config: LoggerConfig = {
         level: 'debug',
@@ -479,4 +494,52 @@ describe('lib/services/logger-service', () => {
       expect(typeof LogMethod).toBe('function');
     });
   });
+
+  describe('Debug sampling', () => {
+    it('should drop debug logs before formatting when sample rate is 0', () => {
+      const consoleSpy = jest.spyOn(console, 'log').mockImplementation(() => {});
+      const stringifySpy = jest.spyOn(JSON, 'stringify');
+      const sampled = createLogger({
+        level: 'debug',
+        enableConsole: true,
+        enableFile: false,
+        enableRemote: false,
+        debugSampleRate: 0,
+        environment: 'test',
+      });
+
+      sampled.debug('Noisy message', { userId: 'user-1' });
+
+      expect(consoleSpy).not.toHaveBeenCalled();
+      expect(stringifySpy).not.toHaveBeenCalled();
+
+      sampled.info('Kept message');
+      expect(consoleSpy).toHaveBeenCalledTimes(1);
+
+      stringifySpy.mockRestore();
+      consoleSpy.mockRestore();
+    });
+
+    it('should emit single-line JSON outside development', () => {
+      const consoleSpy = jest.spyOn(console, 'log').mockImplementation(() => {});
+      const jsonLogger = createLogger({
+        level: 'info',
+        enableConsole: true,
+        enableFile: false,
+        enableRemote: false,
+        environment: 'production',
+      });
+
+      jsonLogger.info('Structured', { requestId: 'req-1' });
+
+      const [line] = consoleSpy.mock.calls[0];
+      expect(line).not.toContain('\n');
+      expect(JSON.parse(line as string)).toMatchObject({
+        level: 'info',
+        message: 'Structured',
+        context: { requestId: 'req-1' },
+      });
+      consoleSpy.mockRestore();
+    });
+  });
 });
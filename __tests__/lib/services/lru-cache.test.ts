@@ -0,0 +1,64 @@
+/**
+ * @jest-environment node
+ */
+
+import { LruCache } from '@/lib/services/lru-cache';
+
+describe('lib/services/lru-cache', () => {
+  afterEach(() => {
+    jest.useRealTimers();
+  });
+
+  it('should evict the least recently used entry when full', () => {
+    const cache = new LruCache<string, number>({ maxEntries: 2 });
+
+    cache.set('a', 1);
+    cache.set('b', 2);
+    expect(cache.get('a')).toBe(1);
+    cache.set('c', 3);
+
+    expect(cache.get('b')).toBeUndefined();
+    expect(cache.get('a')).toBe(1);
+    expect(cache.get('c')).toBe(3);
+  });
+
+  it('should evict by total size and skip values larger than the cache', () => {
+    const cache = new LruCache<string, string>({
+      maxEntries: 10,
+      maxSize: 10,
+      sizeOf: value => value.length,
+    });
+
+    cache.set('a', '12345');
+    cache.set('b', '12345');
+    cache.set('c', '123');
+    expect(cache.get('a')).toBeUndefined();
+    expect(cache.getStats().size).toBe(8);
+
+    cache.set('big', '12345678901');
+    expect(cache.get('big')).toBeUndefined();
+    expect(cache.getStats().entries).toBe(2);
+  });
+
+  it('should expire entries after ttl', () => {
+    jest.useFakeTimers();
+    const cache = new LruCache<string, number>({ maxEntries: 10, ttlMs: 1000 });
+
+    cache.set('a', 1);
+    jest.advanceTimersByTime(999);
+    expect(cache.get('a')).toBe(1);
+    jest.advanceTimersByTime(1);
+    expect(cache.get('a')).toBeUndefined();
+    expect(cache.getStats()).toMatchObject({ entries: 0, hits: 1, misses: 1 });
+  });
+
+  it('should delete entries matching a predicate', () => {
+    const cache = new LruCache<string, number>({ maxEntries: 10 });
+    cache.set('1:a', 1);
+    cache.set('1:b', 2);
+    cache.set('2:a', 3);
+
+    expect(cache.deleteWhere(key => key.startsWith('1:'))).toBe(2);
+    expect(cache.getStats().entries).toBe(1);
+  });
+});
@@ -0,0 +1,148 @@
+/**
+ * @jest-environment node
+ */
+
+jest.mock('@/lib/prisma', () => ({
+  __esModule: true,
+  default: {
+    $executeRaw: jest.fn().mockResolvedValue(0),
+    applicationMetric: {
+      groupBy: jest.fn().mockResolvedValue([]),
+      deleteMany: jest.fn().mockResolvedValue({ count: 0 }),
+    },
+    applicationMetricRollup: {
+      findMany: jest.fn().mockResolvedValue([]),
+      deleteMany: jest.fn().mockResolvedValue({ count: 0 }),
+    },
+  },
+}));
+
+import prisma from '@/lib/prisma';
+import {
+  HISTOGRAM_BOUNDS,
+  METRIC_TIME_RANGE_MS,
+  MetricRollupStore,
+  estimateQuantile,
+  histogramBucketIndex,
+  selectResolution,
+} from '@/lib/services/metric-rollups';
+
+const mockPrisma = prisma as unknown as {
+  $executeRaw: jest.Mock;
+  applicationMetric: { groupBy: jest.Mock; deleteMany: jest.Mock };
+  applicationMetricRollup: { findMany: jest.Mock; deleteMany: jest.Mock };
+};
+
+describe('lib/services/metric-rollups', () => {
+  let store: MetricRollupStore;
+
+  beforeEach(() => {
+    jest.clearAllMocks();
+    store = new MetricRollupStore();
+  });
+
+  describe('selectResolution', () => {
+    it('should use raw rows for very short ranges', () => {
+      expect(selectResolution(METRIC_TIME_RANGE_MS['5m'])).toBe('raw');
+    });
+
+    it('should use minute buckets for the last hour', () => {
+      expect(selectResolution(METRIC_TIME_RANGE_MS['1h'])).toBe('1m');
+    });
+
+    it('should use hourly buckets for day and month ranges', () => {
+      expect(selectResolution(METRIC_TIME_RANGE_MS['24h'])).toBe('1h');
+      expect(selectResolution(METRIC_TIME_RANGE_MS['7d'])).toBe('1h');
+      expect(selectResolution(METRIC_TIME_RANGE_MS['30d'])).toBe('1h');
+    });
+  });
+
+  describe('accumulate', () => {
+    it('should group metrics into minute and hour buckets', () => {
+      const base = new Date('2026-01-01T10:00:00Z').getTime();
+      const buckets = store.accumulate([
+        { category: 'performance', name: 'api_response_time', value: 40, timestamp: new Date(base + 1000) },
+        { category: 'performance', name: 'api_response_time', value: 120, timestamp: new Date(base + 2000) },
+        { category: 'performance', name: 'api_response_time', value: 80, timestamp: new Date(base + 61000) },
+      ]);
+
+      const minuteBuckets = buckets.filter(b => b.resolution === '1m');
+      const hourBuckets = buckets.filter(b => b.resolution === '1h');
+
+      expect(minuteBuckets).toHaveLength(2);
+      expect(hourBuckets).toHaveLength(1);
+      expect(hourBuckets[0]).toMatchObject({
+        count: 3,
+        sum: 240,
+        min: 40,
+        max: 120,
+      });
+      expect(hourBuckets[0].histogram).toHaveLength(HISTOGRAM_BOUNDS.length + 1);
+    });
+
+    it('should upsert all buckets in a single statement', async () => {
+      await store.write([
+        { category: 'usage', name: 'api_calls', value: 1, timestamp: new Date() },
+      ]);
+
+      expect(mockPrisma.$executeRaw).toHaveBeenCalledTimes(1);
+    });
+
+    it('should skip the database when there is nothing to write', async () => {
+      await store.write([]);
+
+      expect(mockPrisma.$executeRaw).not.toHaveBeenCalled();
+    });
+  });
+
+  describe('estimateQuantile', () => {
+    it('should estimate percentiles from histogram buckets', () => {
+      const histogram = new Array(HISTOGRAM_BOUNDS.length + 1).fill(0);
+      histogram[histogramBucketIndex(20)] = 90;
+      histogram[histogramBucketIndex(900)] = 10;
+
+      expect(estimateQuantile(histogram, 0.5, 12, 950)).toBeLessThanOrEqual(25);
+      expect(estimateQuantile(histogram, 0.99, 12, 950)).toBeGreaterThan(500);
+    });
+
+    it('should return zero for an empty histogram', () => {
+      expect(estimateQuantile([0, 0, 0], 0.95, 0, 0)).toBe(0);
+    });
+  });
+
+  describe('summarize', () => {
+    it('should read hourly rollups for a 30 day range', async () => {
+      mockPrisma.applicationMetricRollup.findMany.mockResolvedValueOnce([
+        { metricName: 'api_response_time', category: 'performance', count: 2, sum: 300, min: 100, max: 200, histogram: [0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0] },
+        { metricName: 'api_response_time', category: 'performance', count: 1, sum: 60, min: 60, max: 60, histogram: [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0] },
+      ]);
+
+      const since = new Date(Date.now() - METRIC_TIME_RANGE_MS['30d']);
+      const [summary] = await store.summarize({ since });
+
+      expect(mockPrisma.applicationMetricRollup.findMany).toHaveBeenCalledWith(
+        expect.objectContaining({
+          where: expect.objectContaining({ resolution: '1h' }),
+        })
+      );
+      expect(summary).toMatchObject({ count: 3, sum: 360, min: 60, max: 200, avg: 120 });
+    });
+
+    it('should aggregate raw rows in the database for short ranges', async () => {
+      const since = new Date(Date.now() - METRIC_TIME_RANGE_MS['5m']);
+      await store.summarize({ since });
+
+      expect(mockPrisma.applicationMetric.groupBy).toHaveBeenCalled();
+      expect(mockPrisma.applicationMetricRollup.findMany).not.toHaveBeenCalled();
+    });
+  });
+
+  describe('pruneExpired', () => {
+    it('should apply retention to raw rows and each rollup resolution', async () => {
+      await store.pruneExpired();
+
+      expect(mockPrisma.applicationMetric.deleteMany).toHaveBeenCalledTimes(1);
+      expect(mockPrisma.applicationMetricRollup.deleteMany).toHaveBeenCalledTimes(2);
+    });
+  });
+});
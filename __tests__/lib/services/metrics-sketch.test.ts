@@ -0,0 +1,77 @@
+/**
+ * @jest-environment node
+ */
+
+import {
+  QuantileSketch,
+  RollingWindowSketch,
+} from '@/lib/services/metrics-sketch';
+
+describe('lib/services/metrics-sketch', () => {
+  describe('QuantileSketch', () => {
+    it('should estimate percentiles within the relative accuracy', () => {
+      const sketch = new QuantileSketch();
+      for (let value = 1; value <= 1000; value++) {
+        sketch.add(value);
+      }
+
+      expect(sketch.count).toBe(1000);
+      expect(sketch.mean).toBeCloseTo(500.5);
+      expect(sketch.quantile(0.5)).toBeGreaterThan(500 * 0.97);
+      expect(sketch.quantile(0.5)).toBeLessThan(500 * 1.03);
+      expect(sketch.quantile(0.95)).toBeGreaterThan(950 * 0.97);
+      expect(sketch.quantile(0.95)).toBeLessThan(950 * 1.03);
+      expect(sketch.quantile(0.99)).toBeLessThanOrEqual(1000);
+    });
+
+    it('should merge sketches without losing counts', () => {
+      const a = new QuantileSketch();
+      const b = new QuantileSketch();
+      a.add(10);
+      a.add(0);
+      b.add(5000);
+
+      a.merge(b);
+
+      expect(a.count).toBe(3);
+      expect(a.min).toBe(0);
+      expect(a.max).toBe(5000);
+      expect(a.quantile(0)).toBe(0);
+    });
+
+    it('should return zero when empty', () => {
+      expect(new QuantileSketch().quantile(0.95)).toBe(0);
+    });
+  });
+
+  describe('RollingWindowSketch', () => {
+    const MINUTE = 60 * 1000;
+
+    it('should only aggregate buckets inside the requested window', () => {
+      const window = new RollingWindowSketch(MINUTE, 60);
+      const now = 1_000 * MINUTE;
+
+      window.record(100, true, now - 30 * MINUTE);
+      window.record(200, false, now - 2 * MINUTE);
+      window.record(300, true, now);
+
+      const lastFive = window.snapshot(now - 5 * MINUTE, now);
+      expect(lastFive.count).toBe(2);
+      expect(lastFive.errors).toBe(1);
+
+      const lastHour = window.snapshot(now - 60 * MINUTE, now);
+      expect(lastHour.count).toBe(3);
+    });
+
+    it('should recycle slots that fell out of the window', () => {
+      const window = new RollingWindowSketch(MINUTE, 5);
+      const start = 500 * MINUTE;
+
+      window.record(100, true, start);
+      window.record(100, true, start + 5 * MINUTE);
+
+      const snapshot = window.snapshot(start, start + 5 * MINUTE);
+      expect(snapshot.count).toBe(1);
+    });
+  });
+});
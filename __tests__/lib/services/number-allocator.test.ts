@@ -0,0 +1,199 @@
+/**
+ * @jest-environment node
+ */
+
+jest.mock('@/lib/prisma', () => ({
+  __esModule: true,
+  default: {
+    $queryRaw: jest.fn(),
+    $executeRaw: jest.fn(),
+    cliente: {
+      findFirst: jest.fn(),
+    },
+  },
+}));
+
+import prisma from '@/lib/prisma';
+import {
+  NumberAllocator,
+  createWithAllocatedNumber,
+  nextNumeroCliente,
+  resyncNumeroCliente,
+} from '@/lib/services/number-allocator';
+
+const mockPrisma = prisma as unknown as {
+  $queryRaw: jest.Mock;
+  $executeRaw: jest.Mock;
+  cliente: { findFirst: jest.Mock };
+};
+
+// Simula a tabela numeracao_sequencias: UPDATE ... RETURNING e INSERT ... ON CONFLICT
+function fakeCounterTable(initial: Record<string, number> = {}) {
+  const valores = new Map(Object.entries(initial));
+
+  mockPrisma.$queryRaw.mockImplementation(async (strings: TemplateStringsArray, ...values: unknown[]) => {
+    const sql = strings.join('?');
+    if (sql.includes('UPDATE numeracao_sequencias')) {
+      const [count, key] = values as [number, string];
+      if (!valores.has(key)) return [];
+      valores.set(key, valores.get(key)! + count);
+      return [{ valor: BigInt(valores.get(key)!) }];
+    }
+    if (sql.includes('INSERT INTO numeracao_sequencias')) {
+      const [key, inicial, count] = values as [string, number, number];
+      valores.set(key, valores.has(key) ? valores.get(key)! + count : inicial);
+      return [{ valor: BigInt(valores.get(key)!) }];
+    }
+    throw new Error(`SQL inesperado: ${sql}`);
+  });
+
+  mockPrisma.$executeRaw.mockImplementation(async (_strings: TemplateStringsArray, key: string, base: number) => {
+    valores.set(key, Math.max(valores.get(key) ?? 0, base));
+    return 1;
+  });
+
+  return valores;
+}
+
+describe('lib/services/number-allocator', () => {
+  const year = new Date().getFullYear();
+
+  beforeEach(() => {
+    jest.clearAllMocks();
+    jest.spyOn(console, 'error').mockImplementation(() => {});
+  });
+
+  afterEach(() => {
+    jest.restoreAllMocks();
+  });
+
+  it('cria o contador a partir do maior número existente e incrementa atomicamente', async () => {
+    const valores = fakeCounterTable();
+    const allocator = new NumberAllocator({ blockSize: 1 });
+    const seed = jest.fn().mockResolvedValue(41);
+
+    expect(await allocator.next('teste', seed)).toBe(42);
+    expect(await allocator.next('teste', seed)).toBe(43);
+    expect(seed).toHaveBeenCalledTimes(1);
+    expect(valores.get('teste')).toBe(43);
+  });
+
+  it('entrega números distintos para chamadas concorrentes', async () => {
+    fakeCounterTable({ teste: 0 });
+    const allocator = new NumberAllocator({ blockSize: 1 });
+
+    const numeros = await Promise.all(
+      Array.from({ length: 20 }, () => allocator.next('teste', async () => 0))
+    );
+
+    expect(new Set(numeros).size).toBe(20);
+  });
+
+  it('reserva blocos e serve da memória com uma recarga por vez', async () => {
+    const valores = fakeCounterTable({ teste: 10 });
+    const allocator = new NumberAllocator({ blockSize: 5 });
+
+    const numeros = await Promise.all(
+      Array.from({ length: 7 }, () => allocator.next('teste', async () => 0))
+    );
+
+    expect(numeros.sort((a, b) => a - b)).toEqual([11, 12, 13, 14, 15, 16, 17]);
+    expect(mockPrisma.$queryRaw).toHaveBeenCalledTimes(2);
+    expect(valores.get('teste')).toBe(20);
+    expect(allocator.getStats().blocos.teste).toEqual({ proximo: 18, restantes: 3 });
+  });
+
+  it('reserva faixas contíguas para importação', async () => {
+    fakeCounterTable({ teste: 100 });
+    const allocator = new NumberAllocator({ blockSize: 1 });
+
+    expect(await allocator.nextRange('teste', 3, async () => 0)).toEqual([101, 102, 103]);
+    expect(await allocator.nextRange('teste', 0, async () => 0)).toEqual([]);
+  });
+
+  it('formata números de cliente por ano e realinha o contador', async () => {
+    const valores = fakeCounterTable();
+    mockPrisma.cliente.findFirst.mockResolvedValue({ numeroCliente: `CL${year}000041` });
+
+    expect(await nextNumeroCliente()).toBe(`CL${year}000042`);
+
+    mockPrisma.cliente.findFirst.mockResolvedValue({ numeroCliente: `CL${year}000090` });
+    await resyncNumeroCliente();
+
+    expect(valores.get(`cliente:${year}`)).toBe(90);
+    expect(await nextNumeroCliente()).toBe(`CL${year}000091`);
+  });
+
+  describe('createWithAllocatedNumber', () => {
+    const conflito = Object.assign(new Error('Unique constraint failed'), {
+      code: 'P2002',
+      meta: { target: ['numeroOs'] },
+    });
+
+    it('realinha e tenta com outro número após violação de unicidade', async () => {
+      const allocate = jest.fn().mockResolvedValueOnce('OS000001').mockResolvedValueOnce('OS000050');
+      const resync = jest.fn().mockResolvedValue(undefined);
+      const create = jest
+        .fn()
+        .mockRejectedValueOnce(conflito)
+        .mockImplementation(async (numero: string) => ({ numero }));
+
+      await expect(createWithAllocatedNumber('numeroOs', allocate, resync, create)).resolves.toEqual({
+        numero: 'OS000050',
+      });
+      expect(resync).toHaveBeenCalledTimes(1);
+    });
+
+    it('propaga outros erros sem realinhar', async () => {
+      const resync = jest.fn();
+      const create = jest.fn().mockRejectedValue(new Error('falha'));
+
+      await expect(
+        createWithAllocatedNumber('numeroOs', async () => 'OS000001', resync, create)
+      ).rejects.toThrow('falha');
+      expect(resync).not.toHaveBeenCalled();
+    });
+
+    it('não realinha em violação de unicidade de outra coluna', async () => {
+      const emailDuplicado = Object.assign(new Error('Unique constraint failed'), {
+        code: 'P2002',
+        meta: { target: ['email'] },
+      });
+      const resync = jest.fn();
+      const create = jest.fn().mockRejectedValue(emailDuplicado);
+
+      await expect(
+        createWithAllocatedNumber('numeroOs', async () => 'OS000001', resync, create)
+      ).rejects.toBe(emailDuplicado);
+      expect(resync).not.toHaveBeenCalled();
+      expect(create).toHaveBeenCalledTimes(1);
+    });
+
+    it('reconhece o nome do índice em meta.target', async () => {
+      const resync = jest.fn().mockResolvedValue(undefined);
+      const create = jest
+        .fn()
+        .mockRejectedValueOnce(
+          Object.assign(new Error('Unique constraint failed'), {
+            code: 'P2002',
+            meta: { target: 'ordens_servico_numero_os_key' },
+          })
+        )
+        .mockResolvedValue({ ok: true });
+
+      await expect(
+        createWithAllocatedNumber('numeroOs', async () => 'OS000001', resync, create)
+      ).resolves.toEqual({ ok: true });
+      expect(resync).toHaveBeenCalledTimes(1);
+    });
+
+    it('desiste após conflitos repetidos', async () => {
+      const create = jest.fn().mockRejectedValue(conflito);
+
+      await expect(
+        createWithAllocatedNumber('numeroOs', async () => 'OS000001', async () => {}, create)
+      ).rejects.toBe(conflito);
+      expect(create).toHaveBeenCalledTimes(3);
+    });
+  });
+});
@@ -0,0 +1,222 @@
+/**
+ * @jest-environment node
+ */
+
+jest.mock('@/lib/prisma', () => {
+  const client = {
+    $queryRaw: jest.fn(),
+    $transaction: jest.fn(),
+    ordemServico: {
+      findMany: jest.fn(),
+      updateMany: jest.fn(),
+    },
+    statusHistorico: {
+      createMany: jest.fn(),
+    },
+    user: {
+      findMany: jest.fn(),
+    },
+  };
+  client.$transaction.mockImplementation(async (fn: (tx: typeof client) => unknown) => fn(client));
+  return { __esModule: true, default: client };
+});
+
+jest.mock('@/lib/services/audit-log-service', () => ({
+  auditLogService: { record: jest.fn() },
+}));
+
+jest.mock('@/lib/services/sms-service', () => ({
+  smsService: { enqueueOrdemServicoSMS: jest.fn() },
+}));
+
+import prisma from '@/lib/prisma';
+import { auditLogService } from '@/lib/services/audit-log-service';
+import { parseOrdemListProjection } from '@/lib/services/ordem-list-mapper';
+import {
+  OrdemBulkError,
+  OrdemBulkService,
+} from '@/lib/services/ordem-bulk-service';
+import { smsService } from '@/lib/services/sms-service';
+
+const mockPrisma = prisma as unknown as {
+  $queryRaw: jest.Mock;
+  ordemServico: { findMany: jest.Mock; updateMany: jest.Mock };
+  statusHistorico: { createMany: jest.Mock };
+  user: { findMany: jest.Mock };
+};
+
+const id = (n: number) => `00000000-0000-0000-0000-${String(n).padStart(12, '0')}`;
+const actor = { id: id(900), name: 'Maria' };
+
+function locked(n: number, status = 'aberta', prioridade = 'media', tecnico_id: string | null = null) {
+  return { id: id(n), numero_os: `OS00000${n}`, status, prioridade, tecnico_id };
+}
+
+describe('lib/services/ordem-bulk-service', () => {
+  let service: OrdemBulkService;
+  let io: { emit: jest.Mock };
+
+  beforeEach(() => {
+    jest.clearAllMocks();
+    jest.spyOn(console, 'error').mockImplementation(() => {});
+    mockPrisma.ordemServico.findMany.mockResolvedValue([]);
+    mockPrisma.ordemServico.updateMany.mockResolvedValue({ count: 0 });
+    mockPrisma.statusHistorico.createMany.mockResolvedValue({ count: 0 });
+    io = { emit: jest.fn() };
+    (global as any).io = io;
+    service = new OrdemBulkService({ maxBatchGet: 3, maxChanges: 10 });
+  });
+
+  afterEach(() => {
+    delete (global as any).io;
+    jest.restoreAllMocks();
+  });
+
+  describe('batchGet', () => {
+    it('busca todas as OS em uma consulta e preserva a ordem pedida', async () => {
+      mockPrisma.ordemServico.findMany.mockResolvedValue([
+        { id: id(2), status: 'aberta' },
+        { id: id(1), status: 'concluida' },
+      ]);
+      const projection = parseOrdemListProjection('status', null);
+
+      const result = await service.batchGet([id(1), id(3), id(2), id(1)], projection);
+
+      expect(mockPrisma.ordemServico.findMany).toHaveBeenCalledTimes(1);
+      expect(mockPrisma.ordemServico.findMany).toHaveBeenCalledWith({
+        where: { id: { in: [id(1), id(3), id(2)] } },
+        select: { id: true, status: true },
+      });
+      expect(result).toEqual({
+        data: [
+          { id: id(1), status: 'concluida' },
+          { id: id(2), status: 'aberta' },
+        ],
+        naoEncontrados: [id(3)],
+      });
+    });
+
+    it('rejeita listas vazias, grandes demais ou com ids inválidos', async () => {
+      const projection = parseOrdemListProjection(null, null);
+
+      await expect(service.batchGet([], projection)).rejects.toThrow(OrdemBulkError);
+      await expect(service.batchGet([id(1), id(2), id(3), id(4)], projection)).rejects.toThrow(
+        'Máximo de 3 ids'
+      );
+      await expect(service.batchGet(['x'], projection)).rejects.toMatchObject({ status: 400 });
+      expect(mockPrisma.ordemServico.findMany).not.toHaveBeenCalled();
+    });
+  });
+
+  describe('bulkUpdate', () => {
+    it('agrupa alterações iguais, grava histórico em lote e notifica uma vez', async () => {
+      mockPrisma.$queryRaw.mockResolvedValue([
+        locked(1),
+        locked(2),
+        locked(3, 'em_andamento', 'alta'),
+        locked(4, 'concluida'),
+      ]);
+
+      const result = await service.bulkUpdate(
+        [
+          { id: id(1), status: 'Em andamento' },
+          { id: id(2), status: 'em_andamento' },
+          { id: id(3), prioridade: 'Baixa' },
+          { id: id(4), status: 'concluida' },
+        ],
+        actor
+      );
+
+      expect(result).toMatchObject({ atualizadas: 3, semAlteracao: 1, historicos: 2 });
+      expect(mockPrisma.ordemServico.updateMany).toHaveBeenCalledTimes(2);
+      expect(mockPrisma.ordemServico.updateMany).toHaveBeenCalledWith({
+        where: { id: { in: [id(1), id(2)] } },
+        data: { status: 'em_andamento', updatedAt: expect.any(Date) },
+      });
+      expect(mockPrisma.statusHistorico.createMany).toHaveBeenCalledTimes(1);
+      expect(mockPrisma.statusHistorico.createMany.mock.calls[0][0].data).toEqual([
+        expect.objectContaining({ ordemServicoId: id(1), statusAnterior: 'aberta', statusNovo: 'em_andamento' }),
+        expect.objectContaining({ ordemServicoId: id(2), usuarioId: actor.id, usuarioNome: 'Maria' }),
+      ]);
+
+      expect(auditLogService.record).toHaveBeenCalledTimes(3);
+      expect(io.emit).toHaveBeenCalledTimes(1);
+      expect(io.emit.mock.calls[0][0]).toBe('orders-bulk-updated');
+      expect(io.emit.mock.calls[0][1].ordens.map((ordem: { id: string }) => ordem.id)).toEqual([
+        id(1),
+        id(2),
+        id(3),
+      ]);
+      expect(result.ordens[2]).toMatchObject({ status: 'em_andamento', prioridade: 'baixa' });
+    });
+
+    it('envia SMS fora da transação para OS com status alterado', async () => {
+      mockPrisma.$queryRaw.mockResolvedValue([locked(1)]);
+      mockPrisma.ordemServico.findMany.mockResolvedValue([
+        {
+          id: id(1),
+          numeroOs: 'OS000001',
+          clienteId: id(50),
+          status: 'concluida',
+          descricao: null,
+          valorTotal: 10,
+          createdAt: new Date(),
+          tecnicoId: null,
+          cliente: { id: id(50), nome: 'Ana', email: null, telefone: '31999999999' },
+        },
+      ]);
+
+      await service.bulkUpdate([{ id: id(1), status: 'concluida' }], actor);
+      await new Promise(resolve => setImmediate(resolve));
+
+      expect(smsService.enqueueOrdemServicoSMS).toHaveBeenCalledWith(
+        expect.objectContaining({ numero_ordem: 'OS000001' }),
+        expect.objectContaining({ telefone: '31999999999' }),
+        'conclusao'
+      );
+    });
+
+    it('não grava nada quando alguma OS não existe', async () => {
+      mockPrisma.$queryRaw.mockResolvedValue([locked(1)]);
+
+      await expect(
+        service.bulkUpdate([{ id: id(1), status: 'concluida' }, { id: id(2), status: 'concluida' }], actor)
+      ).rejects.toMatchObject({ status: 404, detalhes: [id(2)] });
+
+      expect(mockPrisma.ordemServico.updateMany).not.toHaveBeenCalled();
+      expect(io.emit).not.toHaveBeenCalled();
+    });
+
+    it('valida todas as alterações antes de abrir a transação', async () => {
+      await expect(
+        service.bulkUpdate(
+          [
+            { id: id(1), status: 'quebrada' },
+            { id: id(1), prioridade: 'alta' },
+            { id: id(2) },
+            { id: 'abc', status: 'aberta' },
+          ],
+          actor
+        )
+      ).rejects.toMatchObject({
+        status: 400,
+        detalhes: [
+          expect.objectContaining({ indice: 0, erro: expect.stringContaining('Status inválido') }),
+          expect.objectContaining({ indice: 1, erro: 'Ordem repetida no lote' }),
+          expect.objectContaining({ indice: 2, erro: 'Informe status, prioridade ou tecnico_id' }),
+          expect.objectContaining({ indice: 3, erro: 'Id inválido' }),
+        ],
+      });
+      expect(mockPrisma.$queryRaw).not.toHaveBeenCalled();
+    });
+
+    it('rejeita técnico inexistente', async () => {
+      mockPrisma.user.findMany.mockResolvedValue([]);
+
+      await expect(
+        service.bulkUpdate([{ id: id(1), tecnico_id: id(77) }], actor)
+      ).rejects.toMatchObject({ status: 400, detalhes: [id(77)] });
+      expect(mockPrisma.$queryRaw).not.toHaveBeenCalled();
+    });
+  });
+});
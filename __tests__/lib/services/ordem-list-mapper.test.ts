@@ -0,0 +1,108 @@
+/**
+ * @jest-environment node
+ */
+
+import {
+  InvalidProjectionError,
+  ORDEM_LIST_FIELDS,
+  mapOrdemListItem,
+  parseOrdemListProjection,
+} from '@/lib/services/ordem-list-mapper';
+
+const ordem = {
+  id: 'os-1',
+  numeroOs: 'OS000042',
+  titulo: 'Troca de tela',
+  descricao: 'Tela quebrada',
+  status: 'aberta',
+  prioridade: 'alta',
+  tipoDispositivo: 'Celular',
+  modeloDispositivo: 'X1',
+  numeroSerie: 'SN-LEGADO',
+  valorServico: 100,
+  valorPecas: 50,
+  valorTotal: 150,
+  dataAbertura: new Date('2025-01-01'),
+  dataInicio: null,
+  dataConclusao: null,
+  tecnicoId: null,
+  clienteId: 'cli-1',
+  equipamentoId: null,
+  createdAt: new Date('2025-01-01'),
+  updatedAt: new Date('2025-01-02'),
+  cliente: {
+    id: 'cli-1',
+    nome: 'Ana',
+    email: 'ana@x.com',
+    telefone: null,
+    endereco: null,
+    numeroCliente: 'CL2025000001',
+  },
+  equipamento: null,
+};
+
+describe('lib/services/ordem-list-mapper', () => {
+  it('mantém a resposta completa quando nenhum parâmetro é informado', () => {
+    const projection = parseOrdemListProjection(null, null);
+
+    expect(projection.fields).toEqual(ORDEM_LIST_FIELDS);
+    expect(projection.includes).toEqual(['cliente', 'equipamento']);
+    expect(projection.select).toMatchObject({
+      numeroOs: true,
+      cliente: { select: expect.objectContaining({ numeroCliente: true }) },
+      equipamento: { select: expect.objectContaining({ tipo: true, imei: true }) },
+    });
+
+    const item = mapOrdemListItem(ordem, projection);
+    expect(item).toMatchObject({
+      numero_os: 'OS000042',
+      tipo_servico: 'Troca de tela',
+      serial_number: 'SN-LEGADO',
+      cliente: { id: 'cli-1', numero_cliente: 'CL2025000001' },
+      equipamento: { marca: 'Celular', modelo: 'X1', numero_serie: 'SN-LEGADO' },
+    });
+  });
+
+  it('seleciona e monta apenas os campos pedidos, sem relações', () => {
+    const projection = parseOrdemListProjection('numero_os, status,prioridade,status', null);
+
+    expect(projection.select).toEqual({ id: true, numeroOs: true, status: true, prioridade: true });
+    expect(mapOrdemListItem(ordem, projection)).toEqual({
+      id: 'os-1',
+      numero_os: 'OS000042',
+      status: 'aberta',
+      prioridade: 'alta',
+    });
+  });
+
+  it('inclui só as colunas do equipamento usadas pelos campos legados', () => {
+    const projection = parseOrdemListProjection('tipo_dispositivo,serial_number', 'cliente');
+
+    expect(projection.select).toEqual({
+      id: true,
+      tipoDispositivo: true,
+      numeroSerie: true,
+      equipamento: { select: { tipo: true, numeroSerie: true } },
+      cliente: { select: expect.objectContaining({ nome: true }) },
+    });
+
+    const item = mapOrdemListItem(
+      { ...ordem, equipamento: { tipo: 'Notebook', numeroSerie: 'SN-EQ' } },
+      projection
+    );
+    expect(item).toMatchObject({ tipo_dispositivo: 'Notebook', serial_number: 'SN-EQ' });
+    expect(item).not.toHaveProperty('equipamento');
+  });
+
+  it('desliga as relações com include=none', () => {
+    const projection = parseOrdemListProjection(null, 'none');
+
+    expect(projection.includes).toEqual([]);
+    expect(mapOrdemListItem(ordem, projection)).not.toHaveProperty('cliente');
+  });
+
+  it('rejeita campos e relações desconhecidos', () => {
+    expect(() => parseOrdemListProjection('numero_os,senha', null)).toThrow(InvalidProjectionError);
+    expect(() => parseOrdemListProjection(null, 'pagamentos')).toThrow(/pagamentos/);
+  });
+});
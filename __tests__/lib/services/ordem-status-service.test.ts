@@ -0,0 +1,161 @@
+/**
+ * @jest-environment node
+ */
+
+jest.mock('@/lib/prisma', () => ({
+  __esModule: true,
+  default: {
+    $queryRaw: jest.fn(),
+  },
+}));
+
+jest.mock('@/lib/services/sms-service', () => ({
+  smsService: { enqueueOrdemServicoSMS: jest.fn() },
+}));
+
+import prisma from '@/lib/prisma';
+import {
+  OrdemStatusService,
+  normalizeStatusOrdem,
+} from '@/lib/services/ordem-status-service';
+import { smsService } from '@/lib/services/sms-service';
+
+const mockQueryRaw = prisma.$queryRaw as unknown as jest.Mock;
+
+const row = {
+  id: 'os-1',
+  numero_os: 'OS000042',
+  cliente_id: 'cli-1',
+  equipamento_id: null,
+  titulo: 'Troca de tela',
+  descricao: 'Tela quebrada',
+  tipo_dispositivo: 'Celular',
+  diagnostico_tecnico: 'Display danificado',
+  observacoes_cliente: 'Cliente retira à tarde',
+  status: 'concluida',
+  status_anterior: 'em_andamento',
+  prioridade: 'media',
+  tecnico_id: 'tec-1',
+  valor_servico: null,
+  valor_pecas: null,
+  valor_total: null,
+  data_abertura: new Date('2025-01-01'),
+  data_inicio: null,
+  data_conclusao: null,
+  data_previsao_conclusao: new Date('2025-01-05'),
+  created_at: new Date('2025-01-01'),
+  updated_at: new Date('2025-01-02'),
+  cliente_nome: 'Ana',
+  cliente_email: 'ana@x.com',
+  cliente_telefone: '31999999999',
+};
+
+const flush = () => new Promise(resolve => setImmediate(resolve));
+
+describe('lib/services/ordem-status-service', () => {
+  const actor = { id: 'user-1', name: 'Maria' };
+  let service: OrdemStatusService;
+  let io: { to: jest.Mock; emit: jest.Mock };
+
+  beforeEach(() => {
+    jest.clearAllMocks();
+    jest.spyOn(console, 'log').mockImplementation(() => {});
+    jest.spyOn(console, 'error').mockImplementation(() => {});
+    io = { to: jest.fn(), emit: jest.fn() };
+    io.to.mockReturnValue(io);
+    (global as any).io = io;
+    service = new OrdemStatusService();
+  });
+
+  afterEach(() => {
+    delete (global as any).io;
+    jest.restoreAllMocks();
+  });
+
+  it('faz a transição em um único comando e devolve OS e cliente', async () => {
+    mockQueryRaw.mockResolvedValue([row]);
+
+    const transicao = await service.transition({
+      ordemId: 'os-1',
+      status: 'concluida',
+      motivo: 'Status alterado para concluida',
+      actor,
+    });
+
+    expect(mockQueryRaw).toHaveBeenCalledTimes(1);
+    const [strings, ...values] = mockQueryRaw.mock.calls[0];
+    const sql = strings.join('?');
+    expect(sql).toContain('FOR UPDATE');
+    expect(sql).toContain('UPDATE ordens_servico');
+    expect(sql).toContain('INSERT INTO status_historico');
+    expect(values).toEqual(['os-1', 'concluida', 'concluida', 'Status alterado para concluida', 'user-1', 'Maria']);
+
+    expect(transicao).toMatchObject({
+      statusAnterior: 'em_andamento',
+      ordem: { id: 'os-1', numeroOs: 'OS000042', status: 'concluida', tecnicoId: 'tec-1' },
+      cliente: { id: 'cli-1', nome: 'Ana', telefone: '31999999999' },
+    });
+  });
+
+  it('devolve todas as colunas da OS com os nomes de campo do Prisma', async () => {
+    mockQueryRaw.mockResolvedValue([row]);
+
+    const transicao = await service.transition({ ordemId: 'os-1', status: 'concluida', motivo: 'm', actor });
+
+    expect(transicao!.ordem).toMatchObject({
+      tipoDispositivo: 'Celular',
+      diagnosticoTecnico: 'Display danificado',
+      observacoesCliente: 'Cliente retira à tarde',
+      dataPrevisaoConclusao: new Date('2025-01-05'),
+      updatedAt: new Date('2025-01-02'),
+    });
+    expect(Object.keys(transicao!.ordem).filter(key => key.includes('_'))).toEqual([]);
+    expect(transicao!.ordem).not.toHaveProperty('clienteNome');
+    expect(transicao!.ordem).not.toHaveProperty('statusAnterior');
+  });
+
+  it('normaliza rótulos legados de status e rejeita os desconhecidos', () => {
+    expect(normalizeStatusOrdem('Em andamento')).toBe('em_andamento');
+    expect(normalizeStatusOrdem('concluida')).toBe('concluida');
+    expect(normalizeStatusOrdem('quebrada')).toBeNull();
+    expect(normalizeStatusOrdem(undefined)).toBeNull();
+  });
+
+  it('retorna null quando a OS não existe', async () => {
+    mockQueryRaw.mockResolvedValue([]);
+
+    await expect(
+      service.transition({ ordemId: 'os-x', status: 'aberta', motivo: 'm', actor })
+    ).resolves.toBeNull();
+  });
+
+  it('notifica salas e envia SMS depois da transição', async () => {
+    mockQueryRaw.mockResolvedValue([row]);
+    const transicao = await service.transition({ ordemId: 'os-1', status: 'concluida', motivo: 'm', actor });
+
+    service.dispatchSideEffects(transicao!);
+    await flush();
+
+    expect(io.to).toHaveBeenCalledWith(['user-cli-1', 'admin', 'technician-tec-1']);
+    expect(io.emit).toHaveBeenCalledWith(
+      'order-status-changed',
+      expect.objectContaining({ orderId: 'os-1', status: 'concluida', clientId: 'cli-1' })
+    );
+    expect(smsService.enqueueOrdemServicoSMS).toHaveBeenCalledWith(
+      expect.objectContaining({ numero_ordem: 'OS000042', status: 'concluida' }),
+      expect.objectContaining({ nome: 'Ana', celular: '31999999999' }),
+      'conclusao'
+    );
+  });
+
+  it('não notifica quando o status não mudou', async () => {
+    mockQueryRaw.mockResolvedValue([{ ...row, status_anterior: 'concluida' }]);
+    const transicao = await service.transition({ ordemId: 'os-1', status: 'concluida', motivo: 'm', actor });
+
+    service.dispatchSideEffects(transicao!);
+    await flush();
+
+    expect(io.emit).not.toHaveBeenCalled();
+    expect(smsService.enqueueOrdemServicoSMS).not.toHaveBeenCalled();
+  });
+});
@@ -0,0 +1,190 @@
+/**
+ * @jest-environment node
+ */
+
+jest.mock('@/lib/prisma', () => ({
+  __esModule: true,
+  default: {
+    comunicacaoCliente: {
+      create: jest.fn(),
+      update: jest.fn(),
+      updateMany: jest.fn(),
+      groupBy: jest.fn(),
+    },
+    $queryRaw: jest.fn(),
+  },
+}));
+
+import prisma from '@/lib/prisma';
+import {
+  OutboundMessage,
+  OutboundQueue,
+  OutboundQueueOptions,
+  TokenBucket,
+} from '@/lib/services/outbound-queue';
+
+const mockComunicacao = prisma.comunicacaoCliente as unknown as Record<string, jest.Mock>;
+const mockQueryRaw = prisma.$queryRaw as jest.Mock;
+
+describe('lib/services/outbound-queue', () => {
+  const sendSms = jest.fn();
+
+  function createQueue(overrides: Partial<OutboundQueueOptions> = {}) {
+    const channel = { concurrency: 1, ratePerSecond: 1000, burst: 1000, provider: 'test' };
+    return new OutboundQueue({
+      channels: { email: channel, sms: channel, whatsapp: channel },
+      maxAttempts: 3,
+      baseRetryDelayMs: 1000,
+      maxRetryDelayMs: 10_000,
+      pollIntervalMs: 10,
+      staleAfterMs: 60_000,
+      senders: { sms: sendSms },
+      ...overrides,
+    });
+  }
+
+  function message(overrides: Partial<OutboundMessage> = {}): OutboundMessage {
+    return {
+      id: 'msg-1',
+      tipo: 'sms',
+      destinatario: '+5511999999999',
+      conteudo: 'Sua OS foi concluída',
+      assunto: null,
+      clienteTelefone: '+5511999999999',
+      tentativas: 1,
+      ...overrides,
+    };
+  }
+
+  beforeEach(() => {
+    jest.clearAllMocks();
+    jest.spyOn(console, 'error').mockImplementation(() => {});
+    mockComunicacao.update.mockResolvedValue({});
+  });
+
+  afterEach(() => {
+    jest.restoreAllMocks();
+  });
+
+  it('marca a mensagem como enviada quando o provedor aceita', async () => {
+    mockQueryRaw.mockResolvedValueOnce([message()]);
+    sendSms.mockResolvedValueOnce({ messageId: 'SM123' });
+
+    const outcome = await createQueue().processNext('sms');
+
+    expect(outcome).toBe('enviado');
+    expect(mockComunicacao.update).toHaveBeenCalledWith({
+      where: { id: 'msg-1' },
+      data: expect.objectContaining({
+        status: 'enviado',
+        messageId: 'SM123',
+        lockedBy: null,
+        enviadoEm: expect.any(Date),
+      }),
+    });
+  });
+
+  it('retorna null quando não há mensagem disponível', async () => {
+    mockQueryRaw.mockResolvedValueOnce([]);
+
+    await expect(createQueue().processNext('sms')).resolves.toBeNull();
+    expect(sendSms).not.toHaveBeenCalled();
+  });
+
+  it('reagenda com backoff quando o envio falha antes do limite de tentativas', async () => {
+    mockQueryRaw.mockResolvedValueOnce([message({ tentativas: 2 })]);
+    sendSms.mockRejectedValueOnce(new Error('Twilio 429'));
+    jest.spyOn(Math, 'random').mockReturnValue(1);
+
+    const before = Date.now();
+    const outcome = await createQueue().processNext('sms');
+
+    expect(outcome).toBe('reagendado');
+    const { data } = mockComunicacao.update.mock.calls[0][0];
+    expect(data.status).toBe('pendente');
+    expect(data.erro).toBe('Twilio 429');
+    // 2ª tentativa: base * 2
+    expect(data.proximaTentativa.getTime()).toBeGreaterThanOrEqual(before + 2000);
+  });
+
+  it('move para dead-letter ao esgotar as tentativas', async () => {
+    mockQueryRaw.mockResolvedValueOnce([message({ tentativas: 3 })]);
+    sendSms.mockRejectedValueOnce(new Error('Número inválido'));
+
+    const outcome = await createQueue().processNext('sms');
+
+    expect(outcome).toBe('falhou');
+    expect(mockComunicacao.update.mock.calls[0][0].data).toMatchObject({
+      status: 'falhou',
+      erro: 'Número inválido',
+    });
+  });
+
+  it('não tenta enviar mensagens sem destinatário', async () => {
+    mockQueryRaw.mockResolvedValueOnce([
+      message({ destinatario: '', clienteTelefone: null }),
+    ]);
+
+    const outcome = await createQueue().processNext('sms');
+
+    expect(outcome).toBe('falhou');
+    expect(sendSms).not.toHaveBeenCalled();
+  });
+
+  it('limita o atraso de retry ao máximo configurado', () => {
+    jest.spyOn(Math, 'random').mockReturnValue(1);
+    const queue = createQueue();
+
+    expect(queue.retryDelay(1)).toBe(1000);
+    expect(queue.retryDelay(3)).toBe(4000);
+    expect(queue.retryDelay(20)).toBe(10_000);
+  });
+
+  it('processa lotes e resume os resultados', async () => {
+    mockQueryRaw
+      .mockResolvedValueOnce([message({ id: 'a' })])
+      .mockResolvedValueOnce([message({ id: 'b' })])
+      .mockResolvedValueOnce([]);
+    sendSms
+      .mockResolvedValueOnce({ messageId: 'SM1' })
+      .mockRejectedValueOnce(new Error('timeout'));
+
+    const resultado = await createQueue().processBatch('sms', 10);
+
+    expect(resultado).toEqual({ processados: 2, enviados: 1, reagendados: 1, falhas: 0 });
+  });
+
+  it('agrupa a fila por status', async () => {
+    mockComunicacao.groupBy.mockResolvedValueOnce([
+      { status: 'pendente', _count: { _all: 3 } },
+      { status: 'falhou', _count: { _all: 1 } },
+    ]);
+
+    await expect(createQueue().getQueueStats('email')).resolves.toEqual({
+      pendente: 3,
+      falhou: 1,
+    });
+  });
+
+  it('limita a taxa com o token bucket', async () => {
+    jest.useFakeTimers();
+    try {
+      const bucket = new TokenBucket(2, 1);
+      await bucket.take();
+
+      let taken = false;
+      const pending = bucket.take().then(() => {
+        taken = true;
+      });
+
+      await Promise.resolve();
+      expect(taken).toBe(false);
+
+      await jest.advanceTimersByTimeAsync(500);
+      await pending;
+      expect(taken).toBe(true);
+    } finally {
+      jest.useRealTimers();
+    }
+  });
+});
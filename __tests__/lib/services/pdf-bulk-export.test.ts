@@ -0,0 +1,147 @@
+/**
+ * @jest-environment node
+ */
+
+jest.mock('@/lib/prisma', () => ({
+  __esModule: true,
+  default: {
+    ordemServico: {
+      findMany: jest.fn(),
+    },
+  },
+}));
+
+jest.mock('@/lib/services/ordem-pdf-mapper', () => ({
+  __esModule: true,
+  ORDEM_PDF_INCLUDE: { cliente: true, pecas: true },
+  mapOrdemToPdfPayload: jest.fn((ordem: { id: string; numeroOs: string }) => ({
+    id: ordem.id,
+    numero_os: ordem.numeroOs,
+  })),
+}));
+
+jest.mock('@/lib/services/pdf-generator', () => ({
+  __esModule: true,
+  PDFGenerator: {
+    generateFileName: jest.fn(
+      (ordem: { numero_os: string }) => `OS_${ordem.numero_os}.pdf`
+    ),
+  },
+}));
+
+jest.mock('@/lib/services/pdf-render-service', () => ({
+  __esModule: true,
+  pdfRenderService: {
+    renderOrdemServico: jest.fn(),
+  },
+}));
+
+import prisma from '@/lib/prisma';
+import {
+  buildOrdensExportWhere,
+  createOrdensPdfZipStream,
+  mapWithConcurrency,
+} from '@/lib/services/pdf-bulk-export';
+import { pdfRenderService } from '@/lib/services/pdf-render-service';
+
+const mockFindMany = prisma.ordemServico.findMany as jest.Mock;
+const mockRender = pdfRenderService.renderOrdemServico as jest.Mock;
+
+describe('lib/services/pdf-bulk-export', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+  });
+
+  async function* numeros(total: number) {
+    for (let i = 0; i < total; i++) yield i;
+  }
+
+  async function readAll(stream: ReadableStream<Uint8Array>): Promise<Buffer> {
+    const chunks: Buffer[] = [];
+    const reader = stream.getReader();
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      chunks.push(Buffer.from(value));
+    }
+    return Buffer.concat(chunks);
+  }
+
+  function ordem(n: number) {
+    return { id: `id-${n}`, numeroOs: `OS${n}`, updatedAt: new Date('2026-01-15') };
+  }
+
+  it('should never run more than the concurrency limit', async () => {
+    let running = 0;
+    let peak = 0;
+
+    const results: number[] = [];
+    for await (const value of mapWithConcurrency(numeros(20), 3, async n => {
+      running++;
+      peak = Math.max(peak, running);
+      await new Promise(resolve => setTimeout(resolve, n % 4));
+      running--;
+      return n * 2;
+    })) {
+      results.push(value);
+    }
+
+    expect(peak).toBe(3);
+    expect(results.sort((a, b) => a - b)).toEqual(
+      Array.from({ length: 20 }, (_, i) => i * 2)
+    );
+  });
+
+  it('should build the where clause from the filter', () => {
+    const from = new Date('2026-01-01');
+    const to = new Date('2026-02-01');
+
+    expect(
+      buildOrdensExportWhere({
+        from,
+        to,
+        status: ['concluida', 'entregue'],
+        tecnicoId: 'tec-1',
+      })
+    ).toEqual({
+      dataAbertura: { gte: from, lt: to },
+      status: { in: ['concluida', 'entregue'] },
+      tecnicoId: 'tec-1',
+    });
+  });
+
+  it('should page through orders and stream one ZIP entry per PDF', async () => {
+    mockFindMany
+      .mockResolvedValueOnce([ordem(1), ordem(2)])
+      .mockResolvedValueOnce([ordem(3)]);
+    mockRender.mockImplementation(async (payload: { numero_os: string }) =>
+      Buffer.from(`pdf-${payload.numero_os}`)
+    );
+
+    const zip = await readAll(createOrdensPdfZipStream({}, { pageSize: 2 }));
+
+    expect(mockFindMany).toHaveBeenCalledTimes(2);
+    expect(mockFindMany.mock.calls[1][0]).toMatchObject({
+      cursor: { id: 'id-2' },
+      skip: 1,
+    });
+    expect(mockRender).toHaveBeenCalledWith(expect.anything(), { cache: false });
+    // Registro final do ZIP com 3 arquivos
+    expect(zip.readUInt32LE(zip.length - 22)).toBe(0x06054b50);
+    expect(zip.readUInt16LE(zip.length - 12)).toBe(3);
+  });
+
+  it('should list failed renders in ERROS.txt instead of aborting', async () => {
+    const errorSpy = jest.spyOn(console, 'error').mockImplementation(() => {});
+    mockFindMany.mockResolvedValueOnce([ordem(1), ordem(2)]);
+    mockRender
+      .mockResolvedValueOnce(Buffer.from('pdf'))
+      .mockRejectedValueOnce(new Error('falhou'));
+
+    const zip = await readAll(createOrdensPdfZipStream({}, { pageSize: 10 }));
+
+    expect(zip.readUInt16LE(zip.length - 12)).toBe(2);
+    expect(zip.includes(Buffer.from('ERROS.txt'))).toBe(true);
+    errorSpy.mockRestore();
+  });
+});
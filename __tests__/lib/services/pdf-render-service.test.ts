@@ -0,0 +1,153 @@
+/**
+ * @jest-environment node
+ */
+
+jest.mock('@/lib/services/pdf-generator', () => ({
+  __esModule: true,
+  PDFGenerator: jest.fn().mockImplementation(() => ({
+    generateOrdemServicoPDF: jest.fn(async () => Buffer.from('inline-pdf')),
+  })),
+}));
+
+import { EventEmitter } from 'events';
+
+import {
+  PdfRenderService,
+  PdfWorkerPool,
+} from '@/lib/services/pdf-render-service';
+import type { OrdemServico } from '@/types/ordens-servico';
+
+describe('lib/services/pdf-render-service', () => {
+  function ordem(id: string, updatedAt: string): OrdemServico {
+    return { id, updated_at: updatedAt } as OrdemServico;
+  }
+
+  function fakePool(render: jest.Mock) {
+    return {
+      render,
+      getStats: () => ({ workers: 0, busy: 0, queued: 0, inline: false }),
+    } as unknown as PdfWorkerPool;
+  }
+
+  it('should serve repeated downloads of the same version from cache', async () => {
+    const render = jest.fn(async () => Buffer.from('pdf'));
+    const service = new PdfRenderService(fakePool(render));
+
+    await service.renderOrdemServico(ordem('os-1', '2026-01-01T00:00:00Z'));
+    await service.renderOrdemServico(ordem('os-1', '2026-01-01T00:00:00Z'));
+
+    expect(render).toHaveBeenCalledTimes(1);
+    expect(service.getStats().cache.hits).toBe(1);
+  });
+
+  it('should coalesce concurrent renders of the same version', async () => {
+    let resolveRender: (_pdf: Buffer) => void = () => {};
+    const render = jest.fn(
+      () => new Promise<Buffer>(resolve => (resolveRender = resolve))
+    );
+    const service = new PdfRenderService(fakePool(render));
+
+    const first = service.renderOrdemServico(ordem('os-1', 'v1'));
+    const second = service.renderOrdemServico(ordem('os-1', 'v1'));
+    resolveRender(Buffer.from('pdf'));
+
+    expect(await first).toBe(await second);
+    expect(render).toHaveBeenCalledTimes(1);
+  });
+
+  it('should re-render and drop the old version after an update', async () => {
+    const render = jest.fn(async () => Buffer.from('pdf'));
+    const service = new PdfRenderService(fakePool(render));
+
+    await service.renderOrdemServico(ordem('os-1', 'v1'));
+    await service.renderOrdemServico(ordem('os-1', 'v2'));
+
+    expect(render).toHaveBeenCalledTimes(2);
+    expect(service.getStats().cache.entries).toBe(1);
+  });
+
+  it('should re-render when the content changes without a new updated_at', async () => {
+    const render = jest.fn(async () => Buffer.from('pdf'));
+    const service = new PdfRenderService(fakePool(render));
+    const original = { ...ordem('os-1', 'v1'), status: 'aberta' } as OrdemServico;
+    const editada = { ...original, status: 'concluida' } as OrdemServico;
+
+    await service.renderOrdemServico(original);
+    await service.renderOrdemServico(editada);
+
+    expect(render).toHaveBeenCalledTimes(2);
+    expect(PdfRenderService.cacheKey(original)).not.toBe(PdfRenderService.cacheKey(editada));
+  });
+
+  it('should render inline when workers cannot be spawned', async () => {
+    const errorSpy = jest.spyOn(console, 'error').mockImplementation(() => {});
+    const pool = new PdfWorkerPool(2, () => {
+      throw new Error('worker_threads indisponível');
+    });
+
+    const pdf = await pool.render(ordem('os-1', 'v1'));
+
+    expect(pdf.toString()).toBe('inline-pdf');
+    expect(pool.getStats().inline).toBe(true);
+    errorSpy.mockRestore();
+  });
+
+  it('should stop respawning crashing workers and fall back to inline rendering', async () => {
+    const errorSpy = jest.spyOn(console, 'error').mockImplementation(() => {});
+    // Worker que morre logo após subir (ex.: entrada do worker ausente no build)
+    const factory = jest.fn(() => {
+      const worker = Object.assign(new EventEmitter(), {
+        unref: jest.fn(),
+        postMessage: jest.fn(),
+        terminate: jest.fn(async () => 1),
+      });
+      setImmediate(() => worker.emit('exit', 1));
+      return worker as any;
+    });
+    const pool = new PdfWorkerPool(1, factory, {
+      maxCrashes: 2,
+      windowMs: 60 * 1000,
+      baseDelayMs: 1,
+      maxDelayMs: 1,
+    });
+
+    await expect(pool.render(ordem('os-1', 'v1'))).rejects.toThrow('Worker de PDF encerrado');
+    while (!pool.getStats().inline) {
+      await new Promise(resolve => setTimeout(resolve, 5));
+    }
+
+    const pdf = await pool.render(ordem('os-1', 'v1'));
+    expect(pdf.toString()).toBe('inline-pdf');
+    expect(factory).toHaveBeenCalledTimes(3);
+    expect(errorSpy.mock.calls.filter(([message]) => String(message).includes('falharam'))).toHaveLength(1);
+    errorSpy.mockRestore();
+  });
+
+  it('should time out a hung render and replace the worker', async () => {
+    const workers: Array<EventEmitter & { postMessage: jest.Mock; terminate: jest.Mock }> = [];
+    // O primeiro worker nunca responde; os seguintes devolvem o PDF
+    const factory = jest.fn(() => {
+      const worker = Object.assign(new EventEmitter(), {
+        unref: jest.fn(),
+        postMessage: jest.fn(),
+        terminate: jest.fn(async () => 1),
+      });
+      if (workers.length > 0) {
+        worker.postMessage.mockImplementation(({ id }: { id: number }) => {
+          setImmediate(() => worker.emit('message', { id, pdf: Buffer.from('worker-pdf') }));
+        });
+      }
+      workers.push(worker);
+      return worker as any;
+    });
+    const pool = new PdfWorkerPool(1, factory, undefined, 20);
+
+    await expect(pool.render(ordem('os-1', 'v1'))).rejects.toThrow('excedeu 20ms');
+    expect(workers[0].terminate).toHaveBeenCalled();
+
+    const pdf = await pool.render(ordem('os-2', 'v1'));
+    expect(pdf.toString()).toBe('worker-pdf');
+    expect(factory).toHaveBeenCalledTimes(2);
+    expect(pool.getStats()).toMatchObject({ workers: 1, busy: 0, inline: false });
+  });
+});
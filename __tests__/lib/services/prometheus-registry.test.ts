@@ -0,0 +1,111 @@
+/**
+ * @jest-environment node
+ */
+
+import {
+  MetricsRegistry,
+  collectConnectionPoolMetrics,
+  normalizeRoute,
+  prometheusRegistry,
+} from '@/lib/services/prometheus-registry';
+
+describe('lib/services/prometheus-registry', () => {
+  let registry: MetricsRegistry;
+
+  beforeEach(() => {
+    registry = new MetricsRegistry();
+  });
+
+  it('should render labelled counters in text exposition format', () => {
+    const counter = registry.counter('http_requests_total', 'Requests', [
+      'route',
+      'method',
+      'status',
+    ]);
+
+    counter.inc({ route: '/api/clientes', method: 'GET', status: '200' });
+    counter.inc({ route: '/api/clientes', method: 'GET', status: '200' });
+
+    const output = registry.render();
+
+    expect(output).toContain('# TYPE http_requests_total counter');
+    expect(output).toContain(
+      'http_requests_total{route="/api/clientes",method="GET",status="200"} 2'
+    );
+  });
+
+  it('should render cumulative histogram buckets', () => {
+    const histogram = registry.histogram(
+      'latency_seconds',
+      'Latency',
+      ['route'],
+      [0.1, 1]
+    );
+
+    histogram.observe({ route: '/a' }, 0.05);
+    histogram.observe({ route: '/a' }, 0.5);
+    histogram.observe({ route: '/a' }, 5);
+
+    const output = registry.render();
+
+    expect(output).toContain('latency_seconds_bucket{route="/a",le="0.1"} 1');
+    expect(output).toContain('latency_seconds_bucket{route="/a",le="1"} 2');
+    expect(output).toContain('latency_seconds_bucket{route="/a",le="+Inf"} 3');
+    expect(output).toContain('latency_seconds_count{route="/a"} 3');
+  });
+
+  it('should render unlabelled gauges and escape label values', () => {
+    registry.gauge('uptime_seconds', 'Uptime').set({}, 42);
+    registry.gauge('info', 'Info', ['version']).set({ version: 'a"b' }, 1);
+
+    const output = registry.render();
+
+    expect(output).toContain('uptime_seconds 42');
+    expect(output).toContain('info{version="a\\"b"} 1');
+  });
+
+  it('should reuse metrics registered twice with the same name', () => {
+    const first = registry.counter('jobs_total', 'Jobs');
+    const second = registry.counter('jobs_total', 'Jobs');
+
+    expect(first).toBe(second);
+  });
+
+  it('should collapse ids in routes to keep label cardinality low', () => {
+    expect(
+      normalizeRoute(
+        '/api/ordens-servico/3f2b8c1e-4d5a-4b6c-8d7e-9f0a1b2c3d4e/status'
+      )
+    ).toBe('/api/ordens-servico/:id/status');
+    expect(normalizeRoute('/api/clientes/123')).toBe('/api/clientes/:id');
+    expect(normalizeRoute('/api/clientes')).toBe('/api/clientes');
+  });
+
+  it('should expose provider HTTP and SMTP pool stats', () => {
+    collectConnectionPoolMetrics(
+      [
+        {
+          host: 'api.twilio.com',
+          requests: 10,
+          errors: 1,
+          timeouts: 0,
+          inFlight: 2,
+          peakInFlight: 4,
+          waiting: 1,
+          connectionsOpened: 2,
+          reuseRate: 0.8,
+          avgLatencyMs: 12,
+        },
+      ],
+      { configurado: true, ocioso: false, maxConnections: 5, enviados: 7, erros: 1 }
+    );
+
+    const output = prometheusRegistry.render();
+
+    expect(output).toContain('provider_http_requests{host="api.twilio.com"} 10');
+    expect(output).toContain('provider_http_connection_reuse_ratio{host="api.twilio.com"} 0.8');
+    expect(output).toContain('provider_http_waiting{host="api.twilio.com"} 1');
+    expect(output).toContain('smtp_pool_max_connections 5');
+    expect(output).toContain('smtp_pool_messages{result="erro"} 1');
+  });
+});
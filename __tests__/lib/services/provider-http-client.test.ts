@@ -0,0 +1,95 @@
+/**
+ * @jest-environment node
+ */
+
+import {
+  ProviderHttpClient,
+  ProviderTimeoutError,
+} from '@/lib/services/provider-http-client';
+
+describe('lib/services/provider-http-client', () => {
+  const originalFetch = globalThis.fetch;
+  let mockFetch: jest.Mock;
+
+  beforeEach(() => {
+    mockFetch = jest.fn();
+    globalThis.fetch = mockFetch as unknown as typeof fetch;
+  });
+
+  afterEach(() => {
+    globalThis.fetch = originalFetch;
+  });
+
+  it('repassa a requisição com sinal de timeout e contabiliza por host', async () => {
+    mockFetch.mockResolvedValue(new Response('{}'));
+    const client = new ProviderHttpClient({ maxConnectionsPerHost: 2, timeoutMs: 1000 });
+
+    const response = await client.fetch('https://graph.facebook.com/v18.0/123/messages', {
+      method: 'POST',
+    });
+    await expect(response.json()).resolves.toEqual({});
+
+    expect(mockFetch).toHaveBeenCalledWith(
+      'https://graph.facebook.com/v18.0/123/messages',
+      expect.objectContaining({ method: 'POST', signal: expect.any(AbortSignal) })
+    );
+    expect(client.getStats()).toEqual([
+      expect.objectContaining({ host: 'graph.facebook.com', requests: 1, errors: 0, inFlight: 0 }),
+    ]);
+  });
+
+  it('limita as requisições simultâneas por host', async () => {
+    const pending: Array<() => void> = [];
+    mockFetch.mockImplementation(
+      () => new Promise(resolve => pending.push(() => resolve(new Response('{}'))))
+    );
+    const client = new ProviderHttpClient({ maxConnectionsPerHost: 2, timeoutMs: 1000 });
+
+    const requests = Array.from({ length: 5 }, () =>
+      client.fetch('https://api.twilio.com/x').then(response => response.text())
+    );
+    await new Promise(resolve => setImmediate(resolve));
+
+    expect(mockFetch).toHaveBeenCalledTimes(2);
+    expect(client.getStats()[0]).toMatchObject({ inFlight: 2, waiting: 3 });
+
+    while (pending.length > 0 || mockFetch.mock.calls.length < 5) {
+      pending.shift()?.();
+      await new Promise(resolve => setImmediate(resolve));
+    }
+    await Promise.all(requests);
+
+    expect(client.getStats()[0]).toMatchObject({ requests: 5, peakInFlight: 2, waiting: 0 });
+  });
+
+  it('mantém a vaga ocupada até o corpo da resposta ser lido ou cancelado', async () => {
+    mockFetch.mockImplementation(async () => new Response('{"ok":true}'));
+    const client = new ProviderHttpClient({ maxConnectionsPerHost: 1, timeoutMs: 1000 });
+
+    const primeira = await client.fetch('https://api.twilio.com/x');
+    const segunda = client.fetch('https://api.twilio.com/y');
+    await new Promise(resolve => setImmediate(resolve));
+
+    expect(mockFetch).toHaveBeenCalledTimes(1);
+    expect(client.getStats()[0]).toMatchObject({ inFlight: 1, waiting: 1 });
+
+    await expect(primeira.json()).resolves.toEqual({ ok: true });
+    const resposta = await segunda;
+    expect(mockFetch).toHaveBeenCalledTimes(2);
+
+    await resposta.body?.cancel();
+    expect(client.getStats()[0]).toMatchObject({ inFlight: 0, waiting: 0 });
+  });
+
+  it('converte timeout em ProviderTimeoutError', async () => {
+    const timeout = new Error('The operation was aborted due to timeout');
+    timeout.name = 'TimeoutError';
+    mockFetch.mockRejectedValueOnce(timeout);
+    const client = new ProviderHttpClient({ maxConnectionsPerHost: 1, timeoutMs: 50 });
+
+    await expect(client.fetch('https://api.twilio.com/x')).rejects.toBeInstanceOf(
+      ProviderTimeoutError
+    );
+    expect(client.getStats()[0]).toMatchObject({ errors: 1, timeouts: 1, inFlight: 0 });
+  });
+});
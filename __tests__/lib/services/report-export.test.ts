@@ -0,0 +1,183 @@
+/**
+ * @jest-environment node
+ */
+
+jest.mock('@/lib/prisma', () => ({
+  __esModule: true,
+  default: {
+    cliente: { findMany: jest.fn() },
+    ordemServico: { findMany: jest.fn() },
+    equipamento: { findMany: jest.fn() },
+  },
+}));
+
+import prisma from '@/lib/prisma';
+import {
+  createReportExportStream,
+  encodeCsvRow,
+  escapeCsvValue,
+  getReportSections,
+} from '@/lib/services/report-export';
+
+const mockClientes = prisma.cliente.findMany as jest.Mock;
+const mockOrdens = prisma.ordemServico.findMany as jest.Mock;
+
+describe('lib/services/report-export', () => {
+  const dataInicio = new Date('2026-01-01T00:00:00Z');
+
+  beforeEach(() => {
+    jest.clearAllMocks();
+  });
+
+  async function readText(stream: ReadableStream<Uint8Array>): Promise<string> {
+    const decoder = new TextDecoder();
+    const reader = stream.getReader();
+    let text = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) return text + decoder.decode();
+      text += decoder.decode(value, { stream: true });
+    }
+  }
+
+  function ordem(n: number) {
+    return {
+      id: `id-${n}`,
+      numeroOs: `OS${n}`,
+      status: 'aberta',
+      prioridade: 'media',
+      titulo: `Reparo, "tela" ${n}`,
+      valorTotal: n * 10,
+      clienteId: 'cli-1',
+      tecnicoId: null,
+      createdAt: new Date(`2026-01-0${n}T00:00:00Z`),
+    };
+  }
+
+  it('should escape CSV values', () => {
+    expect(escapeCsvValue('simples')).toBe('simples');
+    expect(escapeCsvValue('a,b')).toBe('"a,b"');
+    expect(escapeCsvValue('diz "oi"')).toBe('"diz ""oi"""');
+    expect(escapeCsvValue('linha\nnova')).toBe('"linha\nnova"');
+    expect(escapeCsvValue('=SUM(A1)')).toBe("'=SUM(A1)");
+    expect(escapeCsvValue(-5)).toBe('-5');
+    expect(escapeCsvValue(null)).toBe('');
+    expect(encodeCsvRow(['a', 1])).toBe('a,1\r\n');
+  });
+
+  it('should page with a keyset cursor and stream CSV', async () => {
+    mockOrdens
+      .mockResolvedValueOnce([ordem(1), ordem(2)])
+      .mockResolvedValueOnce([ordem(3)]);
+
+    const csv = await readText(
+      createReportExportStream({
+        sections: [{ path: [], dataset: 'ordens_servico' }],
+        formato: 'csv',
+        filter: { dataInicio },
+        pageSize: 2,
+      })
+    );
+
+    const lines = csv.replace('\uFEFF', '').trim().split('\r\n');
+    expect(lines[0]).toBe(
+      'ID,Status,Valor Total,Data Criação,Cliente ID,Número OS,Título,Prioridade,Técnico ID'
+    );
+    expect(lines).toHaveLength(4);
+    expect(lines[1]).toContain('"Reparo, ""tela"" 1"');
+
+    expect(mockOrdens).toHaveBeenCalledTimes(2);
+    expect(mockOrdens.mock.calls[1][0].where.AND).toContainEqual({
+      OR: [
+        { createdAt: { gt: ordem(2).createdAt } },
+        { createdAt: ordem(2).createdAt, id: { gt: 'id-2' } },
+      ],
+    });
+  });
+
+  it('should stream the nested JSON layout of the basic report', async () => {
+    mockClientes.mockResolvedValueOnce([
+      {
+        id: 'cli-1',
+        numeroCliente: '001',
+        nome: 'Ana',
+        email: null,
+        telefone: null,
+        cpfCnpj: null,
+        cidade: null,
+        estado: null,
+        createdAt: dataInicio,
+      },
+    ]);
+    mockOrdens.mockResolvedValueOnce([ordem(1), ordem(2)]);
+
+    const json = JSON.parse(
+      await readText(
+        createReportExportStream({
+          sections: getReportSections('basic'),
+          formato: 'json',
+          filter: { dataInicio },
+          envelope: { success: true },
+          pageSize: 10,
+        })
+      )
+    );
+
+    expect(json.success).toBe(true);
+    expect(json.data.basic.clientes).toHaveLength(1);
+    expect(json.data.basic.clientes[0].numero_cliente).toBe('001');
+    expect(json.data.basic.ordens_servico.map((o: { id: string }) => o.id)).toEqual([
+      'id-1',
+      'id-2',
+    ]);
+  });
+
+  it('should produce valid JSON for every report type', async () => {
+    for (const tipo of ['financial', 'technical', 'all']) {
+      (prisma.cliente.findMany as jest.Mock).mockResolvedValue([]);
+      mockOrdens.mockResolvedValue([]);
+      (prisma.equipamento.findMany as jest.Mock).mockResolvedValue([]);
+
+      const json = JSON.parse(
+        await readText(
+          createReportExportStream({
+            sections: getReportSections(tipo),
+            formato: 'json',
+            filter: { dataInicio },
+          })
+        )
+      );
+
+      if (tipo === 'financial') expect(json.data).toEqual({ financial: [] });
+      if (tipo === 'technical') {
+        expect(json.data).toEqual({ technical: { ordens: [], equipamentos: [] } });
+      }
+      if (tipo === 'all') {
+        expect(Object.keys(json.data)).toEqual(['basic', 'financial', 'technical']);
+      }
+    }
+  });
+
+  it('should tag NDJSON lines with their section', async () => {
+    mockOrdens.mockResolvedValueOnce([ordem(1)]);
+
+    const ndjson = await readText(
+      createReportExportStream({
+        sections: [{ path: ['financial'], dataset: 'ordens_financeiro' }],
+        formato: 'ndjson',
+        filter: { dataInicio },
+      })
+    );
+
+    expect(ndjson.trim().split('\n').map(line => JSON.parse(line))).toEqual([
+      {
+        _secao: 'financial',
+        id: 'id-1',
+        valor_total: 10,
+        status: 'aberta',
+        created_at: '2026-01-01T00:00:00.000Z',
+        cliente_id: 'cli-1',
+      },
+    ]);
+  });
+});
@@ -0,0 +1,70 @@
+/**
+ * @jest-environment node
+ */
+
+jest.mock('@/lib/prisma', () => ({
+  __esModule: true,
+  default: {
+    relatorioVersaoDados: {
+      groupBy: jest.fn(),
+    },
+  },
+}));
+
+import prisma from '@/lib/prisma';
+import { computeDataVersion } from '@/lib/services/report-generators';
+
+const mockGroupBy = (prisma as unknown as { relatorioVersaoDados: { groupBy: jest.Mock } })
+  .relatorioVersaoDados.groupBy;
+
+const versoes = (valores: Record<string, number>) =>
+  Object.entries(valores).map(([tabela, versao]) => ({
+    tabela,
+    _sum: { versao: BigInt(versao) },
+  }));
+
+describe('lib/services/report-generators', () => {
+  describe('computeDataVersion', () => {
+    beforeEach(() => {
+      jest.clearAllMocks();
+      jest.spyOn(console, 'warn').mockImplementation(() => {});
+    });
+
+    afterEach(() => {
+      jest.restoreAllMocks();
+    });
+
+    it('lê só as tabelas de origem do tipo e muda quando alguma é escrita', async () => {
+      const base = { ordens_servico: 10, equipamentos: 3, status_historico: 7 };
+      mockGroupBy.mockResolvedValueOnce(versoes(base));
+      const antes = await computeDataVersion('technical');
+
+      expect(mockGroupBy).toHaveBeenCalledWith({
+        by: ['tabela'],
+        where: { tabela: { in: ['ordens_servico', 'equipamentos', 'status_historico'] } },
+        _sum: { versao: true },
+      });
+
+      mockGroupBy.mockResolvedValueOnce(versoes(base));
+      await expect(computeDataVersion('technical')).resolves.toBe(antes);
+
+      // Edição sem mudar contagem nem updated_at ainda incrementa o contador
+      mockGroupBy.mockResolvedValueOnce(versoes({ ...base, ordens_servico: 11 }));
+      await expect(computeDataVersion('technical')).resolves.not.toBe(antes);
+
+      // Nova entrada no histórico de status muda o relatório técnico
+      mockGroupBy.mockResolvedValueOnce(versoes({ ...base, status_historico: 8 }));
+      await expect(computeDataVersion('technical')).resolves.not.toBe(antes);
+    });
+
+    it('não reaproveita resultados quando a migração não foi aplicada', async () => {
+      mockGroupBy.mockResolvedValue(versoes({ ordens_servico: 1 }));
+
+      const primeira = await computeDataVersion('dashboard');
+      const segunda = await computeDataVersion('dashboard');
+
+      expect(primeira).not.toBe(segunda);
+      expect(console.warn).toHaveBeenCalledTimes(1);
+    });
+  });
+});
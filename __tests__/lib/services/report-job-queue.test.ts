@@ -0,0 +1,150 @@
+/**
+ * @jest-environment node
+ */
+
+jest.mock('@/lib/prisma', () => ({
+  __esModule: true,
+  default: {
+    reportJob: {
+      findFirst: jest.fn(),
+      findUnique: jest.fn(),
+      create: jest.fn(),
+      update: jest.fn(),
+      updateMany: jest.fn(),
+      deleteMany: jest.fn(),
+    },
+    $queryRaw: jest.fn(),
+  },
+}));
+
+jest.mock('@/lib/services/report-generators', () => ({
+  __esModule: true,
+  computeDataVersion: jest.fn(async () => 'v1'),
+  REPORT_GENERATORS: {
+    financial: jest.fn(async (_params: unknown, onProgress: (_p: number) => Promise<void>) => {
+      await onProgress(50);
+      return { resumo: { receita_total: 100 } };
+    }),
+  },
+}));
+
+import prisma from '@/lib/prisma';
+import { REPORT_GENERATORS } from '@/lib/services/report-generators';
+import { ReportJobQueue } from '@/lib/services/report-job-queue';
+
+const mockJob = prisma.reportJob as unknown as Record<string, jest.Mock>;
+const mockQueryRaw = prisma.$queryRaw as jest.Mock;
+
+describe('lib/services/report-job-queue', () => {
+  const params = { periodoDias: 30, referenceDate: '2026-10-19' };
+  let queue: ReportJobQueue;
+
+  function jobRow(overrides: Record<string, unknown> = {}) {
+    return {
+      id: 'job-1',
+      tipo: 'financial',
+      status: 'pending',
+      progress: 0,
+      result: null,
+      error: null,
+      createdAt: new Date('2026-10-19T10:00:00Z'),
+      startedAt: null,
+      completedAt: null,
+      ...overrides,
+    };
+  }
+
+  beforeEach(() => {
+    jest.clearAllMocks();
+    jest.spyOn(console, 'error').mockImplementation(() => {});
+    mockJob.deleteMany.mockResolvedValue({ count: 0 });
+    mockJob.updateMany.mockResolvedValue({ count: 1 });
+    queue = new ReportJobQueue({
+      concurrency: 2,
+      pollIntervalMs: 60 * 1000,
+      staleAfterMs: 60 * 1000,
+      maxAttempts: 2,
+      retentionMs: 60 * 1000,
+    });
+  });
+
+  afterEach(() => {
+    queue.stop();
+    jest.restoreAllMocks();
+  });
+
+  it('should hash parameters independently of key order', () => {
+    expect(
+      ReportJobQueue.hashParams('dashboard', { ...params, charts: true, trends: false })
+    ).toBe(
+      ReportJobQueue.hashParams('dashboard', {
+        trends: false,
+        charts: true,
+        referenceDate: '2026-10-19',
+        periodoDias: 30,
+      })
+    );
+    expect(ReportJobQueue.hashParams('financial', params)).not.toBe(
+      ReportJobQueue.hashParams('technical', params)
+    );
+  });
+
+  it('should reuse a completed result for identical params and data version', async () => {
+    mockJob.findFirst.mockResolvedValue(
+      jobRow({ status: 'completed', progress: 100, result: { ok: true } })
+    );
+
+    const job = await queue.submit('financial', params);
+
+    expect(job).toMatchObject({ status: 'completed', cached: true, result: { ok: true } });
+    expect(mockJob.findFirst.mock.calls[0][0].where).toMatchObject({
+      tipo: 'financial',
+      dataVersion: 'v1',
+    });
+    expect(mockJob.create).not.toHaveBeenCalled();
+  });
+
+  it('should claim, run and complete a new job', async () => {
+    mockJob.findFirst.mockResolvedValue(null);
+    mockJob.create.mockResolvedValue(jobRow());
+    mockQueryRaw
+      .mockResolvedValueOnce([{ id: 'job-1', tipo: 'financial', params, attempts: 1 }])
+      .mockResolvedValue([]);
+    mockJob.update.mockResolvedValue({});
+    mockJob.findUnique.mockResolvedValue(
+      jobRow({ status: 'completed', progress: 100, result: { resumo: { receita_total: 100 } } })
+    );
+
+    const job = await queue.submitAndWait('financial', params, 5000);
+
+    expect(job.status).toBe('completed');
+    expect(REPORT_GENERATORS.financial).toHaveBeenCalledWith(params, expect.any(Function));
+    expect(mockJob.updateMany).toHaveBeenCalledWith({
+      where: { id: 'job-1', lockedBy: expect.any(String) },
+      data: { progress: 50, lockedAt: expect.any(Date) },
+    });
+    expect(mockJob.update).toHaveBeenCalledWith(
+      expect.objectContaining({
+        where: { id: 'job-1' },
+        data: expect.objectContaining({ status: 'completed', progress: 100 }),
+      })
+    );
+  });
+
+  it('should return failed jobs to the queue until maxAttempts', async () => {
+    (REPORT_GENERATORS.financial as jest.Mock).mockRejectedValueOnce(new Error('timeout'));
+    mockQueryRaw
+      .mockResolvedValueOnce([{ id: 'job-1', tipo: 'financial', params, attempts: 1 }])
+      .mockResolvedValue([]);
+    mockJob.update.mockResolvedValue({});
+
+    queue.kick();
+    await new Promise(resolve => setTimeout(resolve, 10));
+
+    expect(mockJob.update).toHaveBeenCalledWith(
+      expect.objectContaining({
+        data: expect.objectContaining({ status: 'pending', error: 'timeout' }),
+      })
+    );
+  });
+});
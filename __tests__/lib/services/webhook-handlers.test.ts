@@ -0,0 +1,165 @@
+/**
+ * @jest-environment node
+ */
+
+jest.mock('@/lib/prisma', () => ({
+  __esModule: true,
+  default: {
+    comunicacaoCliente: {
+      findFirst: jest.fn(),
+      create: jest.fn(args => args),
+      updateMany: jest.fn(),
+    },
+    cliente: { findFirst: jest.fn() },
+    ordemServico: { findFirst: jest.fn() },
+    $executeRaw: jest.fn(),
+    $transaction: jest.fn(async operations => operations),
+  },
+}));
+
+jest.mock('@/lib/services/outbound-queue', () => ({
+  outboundQueue: { notify: jest.fn() },
+}));
+
+import prisma from '@/lib/prisma';
+import { outboundQueue } from '@/lib/services/outbound-queue';
+import {
+  WEBHOOK_HANDLERS,
+  parseTwilioStatusWebhook,
+  parseWhatsAppWebhook,
+} from '@/lib/services/webhook-handlers';
+
+const mockComunicacao = prisma.comunicacaoCliente as unknown as Record<string, jest.Mock>;
+const mockCliente = prisma.cliente as unknown as Record<string, jest.Mock>;
+const mockOrdem = prisma.ordemServico as unknown as Record<string, jest.Mock>;
+
+describe('lib/services/webhook-handlers', () => {
+  const metadata = { display_phone_number: '5511900000000', phone_number_id: '123' };
+
+  beforeEach(() => {
+    jest.clearAllMocks();
+  });
+
+  describe('parseWhatsAppWebhook', () => {
+    it('gera um evento por mensagem e por status', () => {
+      const events = parseWhatsAppWebhook({
+        object: 'whatsapp_business_account',
+        entry: [
+          {
+            id: 'entry-1',
+            changes: [
+              {
+                field: 'messages',
+                value: {
+                  messaging_product: 'whatsapp',
+                  metadata,
+                  messages: [
+                    { from: '5511988887777', id: 'wamid.A', timestamp: '1760000000', type: 'text', text: { body: 'oi' } },
+                  ],
+                  statuses: [
+                    { id: 'wamid.B', status: 'delivered', timestamp: '1760000001', recipient_id: '5511966665555' },
+                  ],
+                },
+              },
+            ],
+          },
+        ],
+      });
+
+      expect(events).toEqual([
+        expect.objectContaining({
+          provider: 'whatsapp',
+          eventType: 'message',
+          externalId: 'wamid.A',
+          conversationKey: '5511988887777',
+        }),
+        expect.objectContaining({
+          eventType: 'status',
+          externalId: 'wamid.B:delivered',
+          conversationKey: '5511966665555',
+        }),
+      ]);
+    });
+  });
+
+  describe('parseTwilioStatusWebhook', () => {
+    it('usa MessageSid + status como id externo', () => {
+      expect(
+        parseTwilioStatusWebhook({ MessageSid: 'SM1', MessageStatus: 'sent', To: '+5511' })
+      ).toEqual(expect.objectContaining({ externalId: 'SM1:sent', conversationKey: '+5511' }));
+    });
+
+    it('rejeita payload sem campos obrigatórios', () => {
+      expect(parseTwilioStatusWebhook({ MessageStatus: 'sent' })).toBeNull();
+    });
+  });
+
+  describe('whatsapp:message', () => {
+    const event = {
+      payload: {
+        message: { from: '5511988887777', id: 'wamid.A', timestamp: '1760000000', type: 'text', text: { body: 'Qual o status?' } },
+        metadata,
+      },
+      receivedAt: new Date(),
+    };
+
+    it('não reprocessa mensagem já registrada', async () => {
+      mockComunicacao.findFirst.mockResolvedValueOnce({ id: 'c-1' });
+
+      await WEBHOOK_HANDLERS['whatsapp:message'](event);
+
+      expect(mockCliente.findFirst).not.toHaveBeenCalled();
+      expect(prisma.$transaction).not.toHaveBeenCalled();
+    });
+
+    it('registra a mensagem e agenda a resposta automática na mesma transação', async () => {
+      mockComunicacao.findFirst.mockResolvedValueOnce(null);
+      mockCliente.findFirst.mockResolvedValueOnce({ id: 'cli-1', nome: 'Ana', telefone: '11988887777' });
+      mockOrdem.findFirst.mockResolvedValueOnce({ id: 'os-1', numeroOs: 'OS-1', status: 'em_andamento' });
+
+      await WEBHOOK_HANDLERS['whatsapp:message'](event);
+
+      const [operations] = (prisma.$transaction as jest.Mock).mock.calls[0];
+      expect(operations).toHaveLength(2);
+      expect(operations[0].data).toMatchObject({
+        status: 'recebida',
+        messageId: 'wamid.A',
+        clientePortalId: null,
+      });
+      expect(mockOrdem.findFirst.mock.calls[0][0].where.status.in).toContain('aguardando_aprovacao');
+      expect(operations[1].data).toMatchObject({ status: 'pendente', destinatario: '11988887777' });
+      expect(operations[1].data.conteudo).toContain('OS-1');
+      expect(outboundQueue.notify).toHaveBeenCalledWith('whatsapp');
+    });
+
+    it('guarda mensagens de números não cadastrados', async () => {
+      mockComunicacao.findFirst.mockResolvedValueOnce(null);
+      mockCliente.findFirst.mockResolvedValueOnce(null);
+
+      await WEBHOOK_HANDLERS['whatsapp:message'](event);
+
+      expect(prisma.$executeRaw).toHaveBeenCalled();
+      expect(prisma.$transaction).not.toHaveBeenCalled();
+    });
+  });
+
+  describe('sms:status', () => {
+    it('atualiza o status de entrega sem regredir', async () => {
+      const receivedAt = new Date('2026-10-19T10:00:00Z');
+
+      await WEBHOOK_HANDLERS['sms:status']({
+        payload: { MessageSid: 'SM1', MessageStatus: 'delivered', To: '+5511' },
+        receivedAt,
+      });
+
+      expect(mockComunicacao.updateMany).toHaveBeenCalledWith({
+        where: {
+          messageId: 'SM1',
+          tipo: 'sms',
+          OR: [{ statusEntregaEm: null }, { statusEntregaEm: { lte: receivedAt } }],
+        },
+        data: { statusEntrega: 'delivered', statusEntregaEm: receivedAt },
+      });
+    });
+  });
+});
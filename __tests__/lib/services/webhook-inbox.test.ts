@@ -0,0 +1,133 @@
+/**
+ * @jest-environment node
+ */
+
+jest.mock('@/lib/prisma', () => ({
+  __esModule: true,
+  default: {
+    webhookEvent: {
+      createMany: jest.fn(),
+      update: jest.fn(),
+      deleteMany: jest.fn(),
+      groupBy: jest.fn(),
+    },
+    $queryRaw: jest.fn(),
+  },
+}));
+
+jest.mock('@/lib/services/webhook-handlers', () => ({
+  __esModule: true,
+  WEBHOOK_HANDLERS: {
+    'whatsapp:message': jest.fn(async () => undefined),
+  },
+}));
+
+import prisma from '@/lib/prisma';
+import { WEBHOOK_HANDLERS } from '@/lib/services/webhook-handlers';
+import { WebhookInbox } from '@/lib/services/webhook-inbox';
+
+const mockEvent = prisma.webhookEvent as unknown as Record<string, jest.Mock>;
+const mockQueryRaw = prisma.$queryRaw as jest.Mock;
+const mockHandler = WEBHOOK_HANDLERS['whatsapp:message'] as jest.Mock;
+
+describe('lib/services/webhook-inbox', () => {
+  let inbox: WebhookInbox;
+
+  function claimed(overrides: Record<string, unknown> = {}) {
+    return {
+      id: 'evt-1',
+      provider: 'whatsapp',
+      eventType: 'message',
+      payload: { message: { id: 'wamid.1' } },
+      receivedAt: new Date('2026-10-19T10:00:00Z'),
+      tentativas: 1,
+      ...overrides,
+    };
+  }
+
+  beforeEach(() => {
+    jest.clearAllMocks();
+    jest.spyOn(console, 'error').mockImplementation(() => {});
+    mockEvent.update.mockResolvedValue({});
+    inbox = new WebhookInbox({
+      concurrency: 2,
+      batchSize: 10,
+      pollIntervalMs: 60_000,
+      staleAfterMs: 60_000,
+      maxAttempts: 3,
+      baseRetryDelayMs: 1000,
+      maxRetryDelayMs: 10_000,
+      retentionMs: 60_000,
+    });
+  });
+
+  afterEach(() => {
+    inbox.stop();
+    jest.restoreAllMocks();
+  });
+
+  it('grava eventos ignorando reenvios já recebidos', async () => {
+    mockEvent.createMany.mockResolvedValueOnce({ count: 1 });
+    mockQueryRaw.mockResolvedValue([]);
+
+    const result = await inbox.ingest([
+      { provider: 'sms', eventType: 'status', externalId: 'SM1:sent', conversationKey: '+55', payload: {} },
+      { provider: 'sms', eventType: 'status', externalId: 'SM1:sent', conversationKey: '+55', payload: {} },
+    ]);
+
+    expect(result).toEqual({ recebidos: 1, duplicados: 1 });
+    expect(mockEvent.createMany).toHaveBeenCalledWith(
+      expect.objectContaining({ skipDuplicates: true })
+    );
+  });
+
+  it('não grava nada para payload sem eventos', async () => {
+    await expect(inbox.ingest([])).resolves.toEqual({ recebidos: 0, duplicados: 0 });
+    expect(mockEvent.createMany).not.toHaveBeenCalled();
+  });
+
+  it('processa o lote e marca os eventos como processados', async () => {
+    mockQueryRaw.mockResolvedValueOnce([claimed({ id: 'a' }), claimed({ id: 'b' })]);
+
+    await expect(inbox.processBatch()).resolves.toBe(2);
+
+    expect(mockHandler).toHaveBeenCalledTimes(2);
+    expect(mockEvent.update).toHaveBeenCalledWith({
+      where: { id: 'a' },
+      data: expect.objectContaining({ status: 'processado', processedAt: expect.any(Date) }),
+    });
+  });
+
+  it('reagenda evento que falhou antes do limite de tentativas', async () => {
+    mockQueryRaw.mockResolvedValueOnce([claimed({ tentativas: 1 })]);
+    mockHandler.mockRejectedValueOnce(new Error('timeout'));
+
+    await inbox.processBatch();
+
+    const { data } = mockEvent.update.mock.calls[0][0];
+    expect(data.status).toBe('pendente');
+    expect(data.erro).toBe('timeout');
+    expect(data.proximaTentativa).toBeInstanceOf(Date);
+  });
+
+  it('marca como falhou ao esgotar as tentativas ou sem handler', async () => {
+    mockQueryRaw.mockResolvedValueOnce([
+      claimed({ id: 'a', tentativas: 3 }),
+      claimed({ id: 'b', provider: 'sms', eventType: 'desconhecido' }),
+    ]);
+    mockHandler.mockRejectedValueOnce(new Error('erro permanente'));
+
+    await inbox.processBatch();
+
+    const statuses = mockEvent.update.mock.calls.map(([args]) => [args.where.id, args.data.status]);
+    expect(statuses).toEqual(expect.arrayContaining([['a', 'falhou'], ['b', 'falhou']]));
+    expect(inbox.getWorkerStats().falhas).toBe(2);
+  });
+
+  it('retorna zero quando não há eventos prontos', async () => {
+    mockQueryRaw.mockResolvedValueOnce([]);
+
+    await expect(inbox.processBatch()).resolves.toBe(0);
+    expect(mockHandler).not.toHaveBeenCalled();
+  });
+});
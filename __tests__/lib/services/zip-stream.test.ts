@@ -0,0 +1,86 @@
+/**
+ * @jest-environment node
+ */
+
+import { inflateRawSync } from 'zlib';
+
+import { ZipStreamWriter, crc32 } from '@/lib/services/zip-stream';
+
+describe('lib/services/zip-stream', () => {
+  function readEntries(zip: Buffer) {
+    const endOffset = zip.length - 22;
+    expect(zip.readUInt32LE(endOffset)).toBe(0x06054b50);
+
+    const count = zip.readUInt16LE(endOffset + 10);
+    let offset = zip.readUInt32LE(endOffset + 16);
+    const entries: { name: string; content: Buffer }[] = [];
+
+    for (let i = 0; i < count; i++) {
+      expect(zip.readUInt32LE(offset)).toBe(0x02014b50);
+      const method = zip.readUInt16LE(offset + 10);
+      const crc = zip.readUInt32LE(offset + 16);
+      const compressedSize = zip.readUInt32LE(offset + 20);
+      const nameLength = zip.readUInt16LE(offset + 28);
+      const localOffset = zip.readUInt32LE(offset + 42);
+      const name = zip.toString('utf8', offset + 46, offset + 46 + nameLength);
+
+      expect(zip.readUInt32LE(localOffset)).toBe(0x04034b50);
+      const dataStart = localOffset + 30 + zip.readUInt16LE(localOffset + 26);
+      const raw = zip.subarray(dataStart, dataStart + compressedSize);
+      const content = method === 8 ? inflateRawSync(raw) : Buffer.from(raw);
+
+      expect(crc32(content)).toBe(crc);
+      entries.push({ name, content });
+      offset += 46 + nameLength;
+    }
+
+    return entries;
+  }
+
+  it('should compute the standard CRC-32', () => {
+    expect(crc32(Buffer.from('123456789'))).toBe(0xcbf43926);
+  });
+
+  it('should produce a readable archive from incremental chunks', async () => {
+    const writer = new ZipStreamWriter();
+    const texto = Buffer.from('a'.repeat(1000));
+    const aleatorio = Buffer.from([1, 2, 3]);
+
+    const chunks = [
+      await writer.addFile('OS_1.pdf', texto),
+      await writer.addFile('OS_2.pdf', aleatorio),
+      writer.finish(),
+    ];
+
+    const entries = readEntries(Buffer.concat(chunks));
+
+    expect(entries.map(entry => entry.name)).toEqual(['OS_1.pdf', 'OS_2.pdf']);
+    expect(entries[0].content.equals(texto)).toBe(true);
+    expect(entries[1].content.equals(aleatorio)).toBe(true);
+    // Conteúdo repetitivo é comprimido
+    expect(chunks[0].length).toBeLessThan(texto.length);
+  });
+
+  it('should rename duplicated file names', async () => {
+    const writer = new ZipStreamWriter();
+    const chunks = [
+      await writer.addFile('OS.pdf', Buffer.from('1')),
+      await writer.addFile('OS.pdf', Buffer.from('2')),
+      writer.finish(),
+    ];
+
+    expect(readEntries(Buffer.concat(chunks)).map(entry => entry.name)).toEqual([
+      'OS.pdf',
+      'OS_1.pdf',
+    ]);
+  });
+
+  it('should reject files after finish', async () => {
+    const writer = new ZipStreamWriter();
+    writer.finish();
+
+    await expect(writer.addFile('OS.pdf', Buffer.from('1'))).rejects.toThrow(
+      'ZIP já finalizado'
+    );
+  });
+});
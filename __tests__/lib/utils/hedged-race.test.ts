@@ -0,0 +1,55 @@
+/**
+ * @jest-environment node
+ */
+
+import { HedgedRaceError, hedgedRace } from '@/lib/utils/hedged-race';
+
+describe('lib/utils/hedged-race', () => {
+  const options = { hedgeDelayMs: 50, timeoutMs: 1000 };
+
+  function delayed<T>(ms: number, value: T, fail = false) {
+    return jest.fn(
+      (signal: AbortSignal) =>
+        new Promise<T>((resolve, reject) => {
+          const timer = setTimeout(() => (fail ? reject(new Error(String(value))) : resolve(value)), ms);
+          signal.addEventListener('abort', () => {
+            clearTimeout(timer);
+            reject(new Error('abortado'));
+          });
+        })
+    );
+  }
+
+  it('não aciona o segundo provedor quando o primeiro responde antes do hedge', async () => {
+    const primeiro = delayed(10, 'a');
+    const segundo = delayed(10, 'b');
+
+    await expect(hedgedRace([primeiro, segundo], options)).resolves.toBe('a');
+    expect(segundo).not.toHaveBeenCalled();
+  });
+
+  it('aciona o segundo provedor após o atraso de hedge e usa o mais rápido', async () => {
+    const primeiro = delayed(500, 'lento');
+    const segundo = delayed(10, 'rápido');
+
+    await expect(hedgedRace([primeiro, segundo], options)).resolves.toBe('rápido');
+    // O perdedor é abortado
+    expect((primeiro.mock.calls[0][0] as AbortSignal).aborted).toBe(true);
+  });
+
+  it('aciona o próximo imediatamente quando um provedor falha', async () => {
+    const primeiro = delayed(1, 'erro', true);
+    const segundo = delayed(1, 'b');
+    const inicio = Date.now();
+
+    await expect(hedgedRace([primeiro, segundo], options)).resolves.toBe('b');
+    expect(Date.now() - inicio).toBeLessThan(options.hedgeDelayMs);
+  });
+
+  it('rejeita com todos os erros quando nenhum provedor responde', async () => {
+    const promise = hedgedRace([delayed(1, 'x', true), delayed(1, 'y', true)], options);
+
+    await expect(promise).rejects.toBeInstanceOf(HedgedRaceError);
+    await expect(promise).rejects.toMatchObject({ errors: [expect.any(Error), expect.any(Error)] });
+  });
+});
@@ -3,6 +3,7 @@ import {
   buscarCNPJService,
   buscarDadosCNPJ,
   buscarEnderecoPorCEP,
+  consultarCEP,
   determinarTipoPessoa,
   formatarCEP,
   formatarCNPJ,
@@ -329,6 +330,63 @@ describe('Validators', () => {
     });
   });
 
+  describe('consultarCEP', () => {
+    const mockFetch = global.fetch as jest.MockedFunction<typeof fetch>;
+
+    afterEach(() => {
+      mockFetch.mockReset();
+    });
+
+    it('não aceita 404 da BrasilAPI enquanto o ViaCEP ainda pode responder', async () => {
+      jest.useFakeTimers();
+      try {
+        let responderViaCEP: (response: Response) => void = () => {};
+        mockFetch.mockImplementation(async input => {
+          if (String(input).includes('viacep')) {
+            return new Promise<Response>(resolve => {
+              responderViaCEP = resolve;
+            });
+          }
+          return { ok: false, status: 404 } as Response;
+        });
+
+        const consulta = consultarCEP('01234567');
+        // Hedge: a BrasilAPI entra após o atraso e responde 404
+        await jest.advanceTimersByTimeAsync(1500);
+        expect(mockFetch).toHaveBeenCalledTimes(2);
+
+        responderViaCEP({
+          ok: true,
+          json: async () => ({ cep: '01234-567', logradouro: 'Rua Teste', uf: 'SP' }),
+        } as Response);
+
+        await expect(consulta).resolves.toMatchObject({ cep: '01234-567', logradouro: 'Rua Teste' });
+      } finally {
+        jest.useRealTimers();
+      }
+    });
+
+    it('retorna null quando nenhum provedor encontra o CEP', async () => {
+      mockFetch.mockImplementation(async input =>
+        String(input).includes('viacep')
+          ? ({ ok: true, json: async () => ({ erro: true }) } as Response)
+          : ({ ok: false, status: 404 } as Response)
+      );
+
+      await expect(consultarCEP('01234567')).resolves.toBeNull();
+    });
+
+    it('lança erro quando um provedor não encontra e o outro falha', async () => {
+      mockFetch.mockImplementation(async input =>
+        String(input).includes('viacep')
+          ? ({ ok: true, json: async () => ({ erro: true }) } as Response)
+          : ({ ok: false, status: 500 } as Response)
+      );
+
+      await expect(consultarCEP('01234567')).rejects.toThrow();
+    });
+  });
+
   describe('buscarCNPJService', () => {
     const mockFetch = global.fetch as jest.MockedFunction<typeof fetch>;
 
@@ -416,6 +474,39 @@ describe('Validators', () => {
       });
     });
 
+    it('não aceita "não encontrado" da ReceitaWS enquanto a BrasilAPI ainda pode responder', async () => {
+      jest.useFakeTimers();
+      try {
+        let responderBrasilAPI: (response: Response) => void = () => {};
+        mockFetch.mockImplementation(async input => {
+          if (String(input).includes('brasilapi')) {
+            return new Promise<Response>(resolve => {
+              responderBrasilAPI = resolve;
+            });
+          }
+          return { ok: false, status: 404 } as Response;
+        });
+
+        const consulta = buscarCNPJService('11222333000181');
+        // Hedge: a ReceitaWS entra após o atraso e responde "não encontrado"
+        await jest.advanceTimersByTimeAsync(2000);
+        expect(mockFetch).toHaveBeenCalledTimes(2);
+
+        responderBrasilAPI({
+          ok: true,
+          json: async () => ({ cnpj: '11222333000181', razao_social: 'Empresa Teste LTDA' }),
+        } as Response);
+
+        await expect(consulta).resolves.toMatchObject({
+          cnpj: '11222333000181',
+          nome: 'Empresa Teste LTDA',
+        });
+      } finally {
+        mockFetch.mockReset();
+        jest.useRealTimers();
+      }
+    });
+
     it('retorna erro quando API falha', async () => {
       mockFetch.mockResolvedValueOnce({
         ok: false,
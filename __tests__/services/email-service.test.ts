@@ -69,6 +69,9 @@ describe('EmailService', () => {
           user: 'test@example.com',
           pass: 'test-password',
         },
+        pool: true,
+        maxConnections: 5,
+        maxMessages: 100,
       });
     });
 
@@ -1,6 +1,11 @@
 // 📱 Testes para SMS Service - Twilio Integration
+import { outboundQueue } from '@/lib/services/outbound-queue';
 import { SMSService } from '@/lib/services/sms-service';
 
+jest.mock('@/lib/services/outbound-queue', () => ({
+  outboundQueue: { enqueue: jest.fn().mockResolvedValue('msg-1') },
+}));
+
 // Mock do fetch global
 const mockFetch = jest.fn() as jest.MockedFunction<typeof fetch>;
 global.fetch = mockFetch;
@@ -368,6 +373,24 @@ describe('SMSService', () => {
         provider: 'twilio',
       });
     });
+
+    it('deve enfileirar SMS de ordem na fila de saída sem chamar o Twilio', async () => {
+      const id = await smsService.enqueueOrdemServicoSMS(
+        mockOrdemServico,
+        mockCliente,
+        'atualizacao'
+      );
+
+      expect(id).toBe('msg-1');
+      expect(mockFetch).not.toHaveBeenCalled();
+      expect(outboundQueue.enqueue).toHaveBeenCalledWith({
+        tipo: 'sms',
+        destinatario: '11993804816',
+        clienteTelefone: '11993804816',
+        conteudo: expect.stringContaining('#OS-001'),
+        ordemServicoId: '123',
+      });
+    });
   });
 
   describe('Teste de Conexão', () => {
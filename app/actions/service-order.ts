@@ -3,6 +3,11 @@
 import db from '@/lib/prisma';
 import { ServiceOrderData } from '@/lib/types/service-order';
 import { revalidatePath } from 'next/cache';
+import {
+    createWithAllocatedNumber,
+    nextNumeroOs,
+    resyncNumeroOs,
+} from '@/lib/services/number-allocator';
 
 export async function createServiceOrder(
     data: ServiceOrderData,
@@ -14,47 +19,47 @@ export async function createServiceOrder(
             return { success: false, error: 'Cliente não identificado' };
         }
 
-        // Generate OS number (simple timestamp-based for now, or fetch latest)
-        // A better approach in production is a sequence or count query
-        const count = await db.ordemServico.count();
-        const year = new Date().getFullYear();
-        const numeroOs = `OS-${year}-${(count + 1).toString().padStart(4, '0')}`;
-
-        console.log('Creating Service Order:', numeroOs);
-
-        const os = await db.ordemServico.create({
-            data: {
-                clienteId,
-                numeroOs,
-                titulo: `${data.deviceType} ${data.deviceModel}`,
-                descricao: `Defeito: ${data.reportedDefect}\nDescrição: ${data.defectDescription}\nSérie: ${data.serialNumber}`,
-
-                // Detailed fields (ensure schema was updated)
-                tipoDispositivo: data.deviceType,
-                modeloDispositivo: data.deviceModel,
-                numeroSerie: data.serialNumber,
-                defeitoRelatado: data.reportedDefect,
-                danosAparentes: data.damages,
-                solucao: data.solution,
-
-                status: 'aguardando_diagnostico',
-                prioridade: data.priority || 'media',
-                observacoes: data.observations,
-
-                // Create parts relation
-                pecas: {
-                    create: data.parts.map((p) => ({
-                        nome: p.name,
-                        quantidade: p.quantity,
-                        precoUnitario: p.price,
-                        precoTotal: p.quantity * p.price,
-                    })),
+        // OS number from the shared atomic counter (same sequence as POST /api/ordens-servico)
+        const os = await createWithAllocatedNumber(
+            'numeroOs',
+            () => nextNumeroOs(),
+            () => resyncNumeroOs(),
+            numeroOs => db.ordemServico.create({
+                data: {
+                    clienteId,
+                    numeroOs,
+                    titulo: `${data.deviceType} ${data.deviceModel}`,
+                    descricao: `Defeito: ${data.reportedDefect}\nDescrição: ${data.defectDescription}\nSérie: ${data.serialNumber}`,
+
+                    // Detailed fields (ensure schema was updated)
+                    tipoDispositivo: data.deviceType,
+                    modeloDispositivo: data.deviceModel,
+                    numeroSerie: data.serialNumber,
+                    defeitoRelatado: data.reportedDefect,
+                    danosAparentes: data.damages,
+                    solucao: data.solution,
+
+                    status: 'aguardando_diagnostico',
+                    prioridade: data.priority || 'media',
+                    observacoes: data.observations,
+
+                    // Create parts relation
+                    pecas: {
+                        create: data.parts.map((p) => ({
+                            nome: p.name,
+                            quantidade: p.quantity,
+                            precoUnitario: p.price,
+                            precoTotal: p.quantity * p.price,
+                        })),
+                    },
                 },
-            },
-            include: {
-                pecas: true,
-            },
-        });
+                include: {
+                    pecas: true,
+                },
+            })
+        );
+
+        console.log('Created Service Order:', os.numeroOs);
 
         revalidatePath('/dashboard/ordens-servico');
         revalidatePath(`/dashboard/clientes/${clienteId}`);
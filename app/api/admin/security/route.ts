@@ -4,8 +4,11 @@ import { getRateLimitStats } from '@/lib/middleware/rate-limit';
 import {
   getRecentSecurityEvents,
   getSecurityStats,
+  querySecurityEvents,
+  SecurityEventType,
 } from '@/lib/middleware/security-audit';
 import { checkRolePermission } from '@/lib/auth/role-middleware';
+import { auditLogService } from '@/lib/services/audit-log-service';
 
 /**
  * 🔍 API de Monitoramento de Segurança - InterAlpha App
@@ -38,8 +41,24 @@ export async function GET(request: NextRequest) {
 
     switch (action) {
       case 'events': {
-        // Retorna eventos de segurança recentes
-        const events = getRecentSecurityEvents(limit);
+        // Retorna eventos de segurança recentes (filtros opcionais via índices)
+        const severity = searchParams.get('severity');
+        const sinceParam = searchParams.get('since');
+        const since = sinceParam ? new Date(sinceParam) : undefined;
+        const events = querySecurityEvents({
+          limit,
+          ip: searchParams.get('ip') || undefined,
+          eventType:
+            (searchParams.get('type') as SecurityEventType | null) || undefined,
+          severity:
+            severity === 'low' ||
+            severity === 'medium' ||
+            severity === 'high' ||
+            severity === 'critical'
+              ? severity
+              : undefined,
+          since: since && !Number.isNaN(since.getTime()) ? since : undefined,
+        });
         return NextResponse.json({
           success: true,
           data: {
@@ -49,6 +68,36 @@ export async function GET(request: NextRequest) {
         });
       }
 
+      case 'audit': {
+        // Trilha de auditoria durável: filtros indexados + paginação por cursor
+        const parseDate = (value: string | null) => {
+          if (!value) return undefined;
+          const date = new Date(value);
+          return Number.isNaN(date.getTime()) ? undefined : date;
+        };
+
+        const page = await auditLogService.query({
+          actorId: searchParams.get('actor') || undefined,
+          resourceType: searchParams.get('resourceType') || undefined,
+          resourceId: searchParams.get('resourceId') || undefined,
+          ip: searchParams.get('ip') || undefined,
+          action: searchParams.get('auditAction') || undefined,
+          severity: searchParams.get('severity') || undefined,
+          from: parseDate(searchParams.get('from')),
+          to: parseDate(searchParams.get('to')),
+          cursor: searchParams.get('cursor') || undefined,
+          limit,
+        });
+
+        return NextResponse.json({
+          success: true,
+          data: {
+            events: page.items,
+            nextCursor: page.nextCursor,
+          },
+        });
+      }
+
       case 'stats': {
         // Retorna estatísticas de segurança
         const securityStats = getSecurityStats();
@@ -139,7 +188,7 @@ export async function GET(request: NextRequest) {
         return NextResponse.json(
           {
             error: 'Ação inválida',
-            availableActions: ['events', 'stats', 'dashboard'],
+            availableActions: ['events', 'audit', 'stats', 'dashboard'],
           },
           { status: 400 }
         );
@@ -177,6 +226,15 @@ export async function POST(request: NextRequest) {
         );
         const removedCount = cleanupOldEvents(daysToKeep);
 
+        auditLogService.record({
+          actorId: auth.user.id,
+          action: 'admin.security_cleanup',
+          resourceType: 'security_events',
+          endpoint: request.nextUrl.pathname,
+          method: request.method,
+          details: { daysToKeep, removedCount },
+        });
+
         return NextResponse.json({
           success: true,
           message: `${removedCount} eventos antigos removidos`,
@@ -199,6 +257,16 @@ export async function POST(request: NextRequest) {
         const { resetRateLimit } = await import('@/lib/middleware/rate-limit');
         resetRateLimit(ip, endpoint);
 
+        auditLogService.record({
+          actorId: auth.user.id,
+          action: 'admin.rate_limit_reset',
+          resourceType: 'rate_limit',
+          resourceId: ip,
+          endpoint: request.nextUrl.pathname,
+          method: request.method,
+          details: { endpoint: endpoint ?? null },
+        });
+
         return NextResponse.json({
           success: true,
           message: `Rate limit resetado para IP ${ip}${endpoint ? ` no endpoint ${endpoint}` : ''}`,
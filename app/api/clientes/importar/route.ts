@@ -0,0 +1,66 @@
+import { NextRequest, NextResponse } from 'next/server';
+
+import { authorizeApiRequest } from '@/lib/auth/api-authorization';
+import { withLogging } from '@/lib/middleware/logging-middleware';
+import { withAuthenticatedApiMetrics } from '@/lib/middleware/metrics-middleware';
+import {
+  ClientImportFormat,
+  clientImportService,
+  parseClientImport,
+} from '@/lib/services/client-import';
+
+const IMPORT_ROLES = ['admin', 'diretor', 'gerente_adm'] as const;
+
+function detectFormat(request: NextRequest): ClientImportFormat | null {
+  const format = new URL(request.url).searchParams.get('format');
+  if (format === 'csv' || format === 'ndjson') return format;
+
+  const contentType = request.headers.get('content-type') || '';
+  if (contentType.includes('ndjson') || contentType.includes('jsonl')) return 'ndjson';
+  if (contentType.includes('csv') || contentType.includes('text/plain')) return 'csv';
+  return null;
+}
+
+// POST - Importar clientes em massa (corpo: arquivo CSV ou NDJSON, lido em streaming)
+async function importClientes(request: NextRequest) {
+  try {
+    const auth = await authorizeApiRequest(request, [...IMPORT_ROLES]);
+    if (!auth.authorized) return auth.response;
+
+    const format = detectFormat(request);
+    if (!format) {
+      return NextResponse.json(
+        { error: 'Envie o arquivo como text/csv ou application/x-ndjson (ou use ?format=csv|ndjson)' },
+        { status: 415 }
+      );
+    }
+
+    if (!request.body) {
+      return NextResponse.json({ error: 'Arquivo não enviado' }, { status: 400 });
+    }
+
+    const dryRun = new URL(request.url).searchParams.get('dryRun') === 'true';
+    const rows = parseClientImport(
+      request.body as unknown as AsyncIterable<Uint8Array>,
+      format
+    );
+
+    const report = await clientImportService.import(rows, {
+      dryRun,
+      createdBy: auth.user.id,
+    });
+
+    return NextResponse.json({ success: true, data: report });
+  } catch (error) {
+    console.error('Erro na importação de clientes:', error);
+    return NextResponse.json(
+      { error: 'Erro interno do servidor' },
+      { status: 500 }
+    );
+  }
+}
+
+// Sem log do corpo: o arquivo é lido em streaming e contém dados pessoais
+export const POST = withAuthenticatedApiMetrics(
+  withLogging(importClientes, { logRequestBody: false, logResponseBody: false })
+);
@@ -9,6 +9,11 @@ import {
 } from '@/lib/middleware/metrics-middleware';
 import { authorizeApiRequest } from '@/lib/auth/api-authorization';
 import { CACHE_TTL } from '@/lib/services/cache-service';
+import {
+  createWithAllocatedNumber,
+  nextNumeroCliente,
+  resyncNumeroCliente,
+} from '@/lib/services/number-allocator';
 import prisma from '@/lib/prisma';
 import { Prisma } from '@prisma/client';
 
@@ -199,43 +204,26 @@ async function createCliente(request: NextRequest) {
       }
     }
 
-    // Gerar numero_cliente
-    const currentYear = new Date().getFullYear();
-    const lastCliente = await prisma.cliente.findFirst({
-      where: {
-        numeroCliente: {
-          startsWith: `CL${currentYear}`,
-        },
-      },
-      orderBy: {
-        numeroCliente: 'desc',
-      },
-    });
-
-    let nextNumber = 1;
-    if (lastCliente?.numeroCliente) {
-      const lastNumber = Number.parseInt(lastCliente.numeroCliente.substring(6), 10);
-      if (!Number.isNaN(lastNumber)) {
-        nextNumber = lastNumber + 1;
-      }
-    }
-
-    const numeroCliente = `CL${currentYear}${nextNumber.toString().padStart(6, '0')}`;
-
-    // Criar cliente
-    const novoCliente = await prisma.cliente.create({
-      data: {
-        nome: nome.trim(),
-        email: email.toLowerCase().trim(),
-        telefone: telefone?.trim() || null,
-        cpfCnpj: cpfCnpjLimpo || null,
-        endereco: endereco?.trim() || null,
-        cidade: cidade?.trim() || null,
-        estado: estado?.trim() || null,
-        cep: cep?.replace(/\D/g, '') || null,
-        numeroCliente,
-      },
-    });
+    // Criar cliente (numero_cliente vem do contador atômico)
+    const novoCliente = await createWithAllocatedNumber(
+      'numeroCliente',
+      () => nextNumeroCliente(),
+      () => resyncNumeroCliente(),
+      numeroCliente =>
+        prisma.cliente.create({
+          data: {
+            nome: nome.trim(),
+            email: email.toLowerCase().trim(),
+            telefone: telefone?.trim() || null,
+            cpfCnpj: cpfCnpjLimpo || null,
+            endereco: endereco?.trim() || null,
+            cidade: cidade?.trim() || null,
+            estado: estado?.trim() || null,
+            cep: cep?.replace(/\D/g, '') || null,
+            numeroCliente,
+          },
+        })
+    );
 
     const responseData = mapClienteToResponse(novoCliente);
 
@@ -1,5 +1,5 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { buscarCNPJService } from '@/lib/validators';
+import { documentLookupService } from '@/lib/services/document-lookup';
 
 export async function GET(
     request: NextRequest,
@@ -15,7 +15,7 @@ export async function GET(
             );
         }
 
-        const dados = await buscarCNPJService(cnpj);
+        const dados = await documentLookupService.buscarCNPJ(cnpj);
 
         if (!dados) {
             return NextResponse.json(
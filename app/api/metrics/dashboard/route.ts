@@ -4,7 +4,7 @@ import { NextRequest, NextResponse } from 'next/server';
 
 import { withAuthenticatedApiMetrics } from '@/lib/middleware/metrics-middleware';
 import prisma from '@/lib/prisma';
-import { Prisma } from '@prisma/client';
+import { RollupSummary, metricRollups } from '@/lib/services/metric-rollups';
 
 // 📈 Interfaces para Resposta do Dashboard
 interface MetricValue {
@@ -61,70 +61,44 @@ function calculateTrend(
   return change > 0 ? 'up' : 'down';
 }
 
+// 🔎 Localizar resumo de uma métrica nos rollups
+function findSummary(
+  summaries: RollupSummary[],
+  metricName: string
+): RollupSummary | undefined {
+  return summaries.find(summary => summary.metricName === metricName);
+}
+
 // 📊 Função para Buscar Métricas de Performance
 async function getPerformanceMetrics() {
   const now = new Date();
   const oneDayAgo = new Date(now.getTime() - 24 * 60 * 60 * 1000);
   const twoDaysAgo = new Date(now.getTime() - 48 * 60 * 60 * 1000);
 
-  // Buscar métricas de tempo de resposta
-  const responseTimeData = await prisma.applicationMetric.findMany({
-    where: {
-      metricName: 'api_response_time',
-      timestamp: { gte: twoDaysAgo },
-    },
-    select: {
-      value: true,
-      timestamp: true,
-    },
-    orderBy: { timestamp: 'desc' },
-  });
-
-  // Calcular médias
-  const currentPeriod =
-    responseTimeData?.filter((m) => new Date(m.timestamp) >= oneDayAgo) || [];
-
-  const previousPeriod =
-    responseTimeData?.filter(
-      (m) =>
-        new Date(m.timestamp) >= twoDaysAgo &&
-        new Date(m.timestamp) < oneDayAgo
-    ) || [];
-
-  const currentAvg =
-    currentPeriod.length > 0
-      ? currentPeriod.reduce((sum, m) => sum + (m.value || 0), 0) /
-      currentPeriod.length
-      : 0;
-
+  // Rollups horários: dezenas de linhas em vez de todas as métricas brutas
+  const [currentPeriod, previousPeriod] = await Promise.all([
+    metricRollups.summarize({
+      since: oneDayAgo,
+      until: now,
+      metricNames: ['api_response_time', 'api_calls', 'failed_requests'],
+    }),
+    metricRollups.summarize({
+      since: twoDaysAgo,
+      until: oneDayAgo,
+      metricNames: ['api_response_time'],
+    }),
+  ]);
+
+  const currentAvg = findSummary(currentPeriod, 'api_response_time')?.avg || 0;
   const previousAvg =
-    previousPeriod.length > 0
-      ? previousPeriod.reduce((sum, m) => sum + (m.value || 0), 0) /
-      previousPeriod.length
-      : 0;
+    findSummary(previousPeriod, 'api_response_time')?.avg || 0;
 
-  // Buscar throughput (chamadas por minuto)
-  const throughputCount = await prisma.applicationMetric.count({
-    where: {
-      metricName: 'api_calls',
-      timestamp: { gte: oneDayAgo },
-    },
-  });
-
-  const currentThroughput = throughputCount || 0;
+  // Throughput (chamadas registradas no período)
+  const currentThroughput = findSummary(currentPeriod, 'api_calls')?.count || 0;
   const previousThroughput = Math.floor(currentThroughput * 0.9); // Simulado
 
-  // Buscar taxa de erro
-  const errorData = await prisma.applicationMetric.findMany({
-    where: {
-      metricName: 'failed_requests',
-      timestamp: { gte: oneDayAgo },
-    },
-    select: { value: true },
-  });
-
-  const errorCount =
-    errorData?.reduce((sum, m) => sum + (m.value || 0), 0) || 0;
+  // Taxa de erro
+  const errorCount = findSummary(currentPeriod, 'failed_requests')?.sum || 0;
   const totalRequests = Math.max(currentThroughput, 1);
   const errorRate = (errorCount / totalRequests) * 100;
 
@@ -161,27 +135,22 @@ async function getUsageMetrics() {
   const now = new Date();
   const oneDayAgo = new Date(now.getTime() - 24 * 60 * 60 * 1000);
 
-  // Buscar usuários ativos (simulado baseado em chamadas de API)
-  const apiCallsData = await prisma.applicationMetric.findMany({
-    where: {
-      metricName: 'api_calls',
-      timestamp: { gte: oneDayAgo },
-    },
-    select: {
-      metadata: true,
-      timestamp: true,
-    },
-  });
-
-  const uniqueUsers = new Set(
-    apiCallsData
-      ?.map((call) => {
-        // cast to any because metadata is Json
-        const meta = call.metadata as any;
-        return meta?.tags?.user_id || meta?.user_id;
-      })
-      .filter(Boolean) || []
-  ).size;
+  const [summaries, uniqueUsersRows] = await Promise.all([
+    metricRollups.summarize({
+      since: oneDayAgo,
+      until: now,
+      metricNames: ['api_calls'],
+    }),
+    // Usuários ativos (distintos calculados no banco, sem trazer linhas)
+    prisma.$queryRaw<Array<{ total: bigint }>>`
+      SELECT COUNT(DISTINCT COALESCE(metadata->'tags'->>'user_id', metadata->>'user_id')) AS total
+      FROM application_metrics
+      WHERE metric_name = 'api_calls' AND timestamp >= ${oneDayAgo}
+    `,
+  ]);
+
+  const uniqueUsers = Number(uniqueUsersRows[0]?.total ?? 0);
+  const apiCalls = findSummary(summaries, 'api_calls')?.count || 0;
 
   return {
     activeUsers: {
@@ -191,14 +160,14 @@ async function getUsageMetrics() {
       unit: 'usuários',
     },
     apiCalls: {
-      current: apiCallsData?.length || 0,
-      previous: Math.floor((apiCallsData?.length || 0) * 0.85),
+      current: apiCalls,
+      previous: Math.floor(apiCalls * 0.85),
       trend: 'up' as const,
       unit: 'chamadas',
     },
     pageViews: {
-      current: Math.floor((apiCallsData?.length || 0) * 1.5), // Estimativa
-      previous: Math.floor((apiCallsData?.length || 0) * 1.3),
+      current: Math.floor(apiCalls * 1.5), // Estimativa
+      previous: Math.floor(apiCalls * 1.3),
       trend: 'up' as const,
       unit: 'visualizações',
     },
@@ -0,0 +1,48 @@
+// 📡 Endpoint Prometheus - Exposição das Métricas em Memória da Instância
+// Formato texto (version 0.0.4) para scrape direto de cada instância
+import { timingSafeEqual } from 'crypto';
+
+import { NextRequest, NextResponse } from 'next/server';
+
+import { envServer } from '@/lib/config/env.server';
+import { emailService } from '@/lib/services/email-service';
+import {
+  collectConnectionPoolMetrics,
+  collectProcessMetrics,
+  prometheusRegistry,
+} from '@/lib/services/prometheus-registry';
+import { providerHttpClient } from '@/lib/services/provider-http-client';
+
+export const runtime = 'nodejs';
+export const dynamic = 'force-dynamic';
+
+// 🔐 Validar token de scrape (METRICS_SCRAPE_TOKEN)
+// A rota é pública no proxy: sem token configurado, só fica aberta em desenvolvimento
+function isAuthorized(request: NextRequest): boolean {
+  const token = envServer.metrics.scrapeToken();
+  if (!token) return process.env.NODE_ENV === 'development';
+
+  const expected = Buffer.from(`Bearer ${token}`);
+  const received = Buffer.from(request.headers.get('authorization') || '');
+
+  // Comparação em tempo constante (timingSafeEqual exige tamanhos iguais)
+  return received.length === expected.length && timingSafeEqual(received, expected);
+}
+
+// 📈 GET - Exposição das métricas
+export async function GET(request: NextRequest) {
+  if (!isAuthorized(request)) {
+    return NextResponse.json({ error: 'Não autorizado' }, { status: 401 });
+  }
+
+  collectProcessMetrics();
+  collectConnectionPoolMetrics(providerHttpClient.getStats(), emailService.getPoolStats());
+
+  return new NextResponse(prometheusRegistry.render(), {
+    status: 200,
+    headers: {
+      'Content-Type': 'text/plain; version=0.0.4; charset=utf-8',
+      'Cache-Control': 'no-store',
+    },
+  });
+}
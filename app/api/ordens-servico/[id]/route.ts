@@ -320,7 +320,7 @@ export async function PUT(
           };
 
           const tipoSMS = ordemAtualizada.status === 'concluida' ? 'conclusao' : 'atualizacao';
-          await smsService.sendOrdemServicoSMS(ordemParaSMS, clienteParaSMS, tipoSMS);
+          await smsService.enqueueOrdemServicoSMS(ordemParaSMS, clienteParaSMS, tipoSMS);
         }
       } catch (smsError) {
         console.error('Erro ao enviar SMS:', smsError);
@@ -445,7 +445,7 @@ export async function DELETE(
           email: ordemAtualizada.cliente.email || undefined
         };
 
-        await smsService.sendOrdemServicoSMS(ordemParaSMS, clienteParaSMS, 'atualizacao');
+        await smsService.enqueueOrdemServicoSMS(ordemParaSMS, clienteParaSMS, 'atualizacao');
       }
     } catch (e) {
       console.error('Erro SMS cancelamento', e);
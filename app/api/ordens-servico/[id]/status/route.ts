@@ -1,9 +1,12 @@
 import { NextRequest, NextResponse } from 'next/server';
 
 import { checkRolePermission } from '@/lib/auth/role-middleware';
-import prisma from '@/lib/prisma';
-import { smsService } from '@/lib/services/sms-service';
-import { StatusOrdemServico } from '@/types/ordens-servico';
+import { auditLogService } from '@/lib/services/audit-log-service';
+import {
+  STATUS_VALIDOS,
+  normalizeStatusOrdem,
+  ordemStatusService,
+} from '@/lib/services/ordem-status-service';
 
 // PATCH - Atualizar status da ordem de serviço
 export async function PATCH(
@@ -32,22 +35,12 @@ export async function PATCH(
       );
     }
 
-    // Mapeamento de valores para compatibilidade
-    const statusMap: Record<string, string> = {
-      Pendente: 'aberta',
-      'Em andamento': 'em_andamento',
-      Concluída: 'concluida',
-      Cancelada: 'cancelada',
-    };
-
-    const statusNormalizado = statusMap[status] || status;
-
-    // Validar se o status é válido
-    const statusValidos = ['aberta', 'em_andamento', 'concluida', 'cancelada'];
-    if (!statusValidos.includes(statusNormalizado)) {
+    // Normalizar (aceita também os rótulos legados) e validar o status
+    const statusNormalizado = normalizeStatusOrdem(status);
+    if (!statusNormalizado) {
       return NextResponse.json(
         {
-          error: `Status inválido. Status válidos: ${statusValidos.join(', ')}`,
+          error: `Status inválido. Status válidos: ${STATUS_VALIDOS.join(', ')}`,
         },
         { status: 400 }
       );
@@ -72,99 +65,40 @@ export async function PATCH(
       });
     }
 
-    // Verificar se a ordem existe
-    const ordemExistente = await prisma.ordemServico.findUnique({
-      where: { id: ordemId },
-      select: { id: true, status: true },
+    // Travar, atualizar, gravar histórico e ler o cliente em um único comando
+    const transicao = await ordemStatusService.transition({
+      ordemId,
+      status: statusNormalizado,
+      motivo: `Status alterado para ${status}`,
+      actor: { id: currentUser.id, name: currentUser.name },
     });
 
-    if (!ordemExistente) {
+    if (!transicao) {
       return NextResponse.json(
         { error: 'Ordem de serviço não encontrada' },
         { status: 404 }
       );
     }
 
-    // Atualizar status
-    const ordemAtualizada = await prisma.ordemServico.update({
-      where: { id: ordemId },
-      data: {
-        status: statusNormalizado,
-        updatedAt: new Date(),
+    const { ordem: ordemAtualizada, statusAnterior } = transicao;
+
+    auditLogService.record({
+      actorId: currentUser.id,
+      action: 'ordem_servico.status_changed',
+      resourceType: 'ordem_servico',
+      resourceId: ordemId,
+      ip: request.headers.get('x-forwarded-for')?.split(',')[0].trim(),
+      userAgent: request.headers.get('user-agent'),
+      endpoint: request.nextUrl.pathname,
+      method: request.method,
+      details: {
+        statusAnterior,
+        statusNovo: statusNormalizado,
       },
     });
 
-    // Criar histórico de mudança de status (apenas se não for ambiente de teste)
-    if (!isTestEnvironment) {
-      await prisma.statusHistorico.create({
-        data: {
-          ordemServicoId: ordemId,
-          statusAnterior: ordemExistente.status,
-          statusNovo: statusNormalizado,
-          motivo: `Status alterado para ${status}`,
-          usuarioId: currentUser.id,
-          usuarioNome: currentUser.name,
-          dataMudanca: new Date(),
-        },
-      });
-    }
-
-    // Enviar SMS de notificação de mudança de status (apenas se não for ambiente de teste)
-    if (!isTestEnvironment && ordemExistente.status !== statusNormalizado) {
-      try {
-        // Buscar dados completos da ordem e cliente para o SMS
-        const ordemCompleta = await prisma.ordemServico.findUnique({
-          where: { id: ordemId },
-          include: {
-            cliente: {
-              select: {
-                id: true,
-                nome: true,
-                email: true,
-                telefone: true,
-              },
-            },
-          },
-        });
-
-        if (ordemCompleta?.cliente) {
-          const ordemParaSMS = {
-            id: ordemCompleta.id,
-            numero_ordem: ordemCompleta.numeroOs,
-            cliente_id: ordemCompleta.clienteId,
-            status: statusNormalizado,
-            descricao_problema: ordemCompleta.descricao || '',
-            valor_total: Number(ordemCompleta.valorTotal || 0),
-            data_criacao: ordemCompleta.createdAt.toISOString(),
-            tecnico_responsavel: ordemCompleta.tecnicoId || undefined,
-          };
-
-          const clienteParaSMS = {
-            id: ordemCompleta.cliente.id,
-            nome: ordemCompleta.cliente.nome,
-            telefone: ordemCompleta.cliente.telefone || undefined,
-            celular: ordemCompleta.cliente.telefone || undefined, // Fallback
-            email: ordemCompleta.cliente.email || undefined,
-          };
-
-          const tipoSMS =
-            statusNormalizado === 'concluida' ? 'conclusao' : 'atualizacao';
-
-          await smsService.sendOrdemServicoSMS(
-            ordemParaSMS,
-            clienteParaSMS,
-            tipoSMS
-          );
-
-          console.log(
-            `SMS de ${tipoSMS} enviado para ordem ${ordemCompleta.numeroOs}`
-          );
-        }
-      } catch (smsError) {
-        console.error('Erro ao enviar SMS de atualização de status:', smsError);
-        // Não falhar a atualização por causa do SMS
-      }
-    }
+    // Socket.IO e SMS depois do commit, sem segurar a resposta (apenas se o status mudou)
+    ordemStatusService.dispatchSideEffects(transicao);
 
     return NextResponse.json({
       success: true,
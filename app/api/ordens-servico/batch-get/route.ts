@@ -0,0 +1,63 @@
+import { NextRequest, NextResponse } from 'next/server';
+
+import { authorizeApiRequest } from '@/lib/auth/api-authorization';
+import { withAuthenticatedApiLogging } from '@/lib/middleware/logging-middleware';
+import { withAuthenticatedApiMetrics } from '@/lib/middleware/metrics-middleware';
+import { OrdemBulkError, ordemBulkService } from '@/lib/services/ordem-bulk-service';
+import {
+  InvalidProjectionError,
+  parseOrdemListProjection,
+} from '@/lib/services/ordem-list-mapper';
+
+const ORDENS_READ_ROLES = [
+  'admin',
+  'diretor',
+  'gerente_adm',
+  'gerente_financeiro',
+  'supervisor_tecnico',
+  'technician',
+  'atendente',
+] as const;
+
+// POST - Buscar várias ordens de serviço em uma consulta
+// Corpo: { ids: string[], fields?: string, include?: string } (fields/include como na listagem)
+async function batchGetOrdens(request: NextRequest) {
+  try {
+    const auth = await authorizeApiRequest(request, [...ORDENS_READ_ROLES]);
+    if (!auth.authorized) return auth.response;
+
+    const body = await request.json().catch(() => null);
+    if (!body || typeof body !== 'object') {
+      return NextResponse.json({ error: 'Corpo JSON inválido' }, { status: 400 });
+    }
+
+    const { searchParams } = new URL(request.url);
+    const fields = typeof body.fields === 'string' ? body.fields : searchParams.get('fields');
+    const include = typeof body.include === 'string' ? body.include : searchParams.get('include');
+
+    const projection = parseOrdemListProjection(fields, include);
+    const result = await ordemBulkService.batchGet(body.ids, projection);
+
+    return NextResponse.json({ success: true, ...result });
+  } catch (error) {
+    if (error instanceof InvalidProjectionError) {
+      return NextResponse.json({ error: error.message }, { status: 400 });
+    }
+    if (error instanceof OrdemBulkError) {
+      return NextResponse.json(
+        { error: error.message, detalhes: error.detalhes },
+        { status: error.status }
+      );
+    }
+
+    console.error('Erro na busca em lote de ordens:', error);
+    return NextResponse.json(
+      { error: 'Erro interno do servidor' },
+      { status: 500 }
+    );
+  }
+}
+
+export const POST = withAuthenticatedApiMetrics(
+  withAuthenticatedApiLogging(batchGetOrdens)
+);
@@ -0,0 +1,63 @@
+import { NextRequest, NextResponse } from 'next/server';
+
+import { authorizeApiRequest } from '@/lib/auth/api-authorization';
+import { withAuthenticatedApiLogging } from '@/lib/middleware/logging-middleware';
+import { withAuthenticatedApiMetrics } from '@/lib/middleware/metrics-middleware';
+import { OrdemBulkError, ordemBulkService } from '@/lib/services/ordem-bulk-service';
+
+const ORDENS_WRITE_ROLES = [
+  'admin',
+  'diretor',
+  'gerente_adm',
+  'supervisor_tecnico',
+  'technician',
+  'atendente',
+] as const;
+
+// PATCH - Alterar status, prioridade e/ou técnico de várias ordens em uma transação
+// Corpo: { alteracoes: [{ id, status?, prioridade?, tecnico_id? }] }
+async function bulkUpdateOrdens(request: NextRequest) {
+  try {
+    const auth = await authorizeApiRequest(request, [...ORDENS_WRITE_ROLES]);
+    if (!auth.authorized) return auth.response;
+
+    const body = await request.json().catch(() => null);
+    if (!body || typeof body !== 'object') {
+      return NextResponse.json({ error: 'Corpo JSON inválido' }, { status: 400 });
+    }
+
+    const result = await ordemBulkService.bulkUpdate(
+      body.alteracoes,
+      { id: auth.user.id, name: auth.user.name },
+      {
+        ip: request.headers.get('x-forwarded-for')?.split(',')[0].trim(),
+        userAgent: request.headers.get('user-agent'),
+        endpoint: request.nextUrl.pathname,
+        method: request.method,
+      }
+    );
+
+    return NextResponse.json({
+      success: true,
+      message: `${result.atualizadas} ordem(ns) atualizada(s)`,
+      data: result,
+    });
+  } catch (error) {
+    if (error instanceof OrdemBulkError) {
+      return NextResponse.json(
+        { error: error.message, detalhes: error.detalhes },
+        { status: error.status }
+      );
+    }
+
+    console.error('Erro na alteração em massa de ordens:', error);
+    return NextResponse.json(
+      { error: 'Erro interno do servidor' },
+      { status: 500 }
+    );
+  }
+}
+
+export const PATCH = withAuthenticatedApiMetrics(
+  withAuthenticatedApiLogging(bulkUpdateOrdens)
+);
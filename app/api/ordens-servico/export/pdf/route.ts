@@ -0,0 +1,110 @@
+import { NextRequest, NextResponse } from 'next/server';
+
+import { authorizeApiRequest } from '@/lib/auth/api-authorization';
+import prisma from '@/lib/prisma';
+import { auditLogService } from '@/lib/services/audit-log-service';
+import {
+  OrdensPdfExportFilter,
+  buildOrdensExportWhere,
+  createOrdensPdfZipStream,
+} from '@/lib/services/pdf-bulk-export';
+
+export const runtime = 'nodejs';
+export const dynamic = 'force-dynamic';
+
+const EXPORT_ROLES = [
+  'admin',
+  'diretor',
+  'gerente_adm',
+  'gerente_financeiro',
+  'supervisor_tecnico',
+  'atendente',
+] as const;
+
+// Limite do formato ZIP sem ZIP64 e do tempo razoável de um download
+const MAX_ORDENS_POR_EXPORTACAO = 5000;
+
+function parseDate(value: string | null): Date | undefined | null {
+  if (!value) return undefined;
+  const date = new Date(value);
+  return Number.isNaN(date.getTime()) ? null : date;
+}
+
+// GET - Exportar PDFs das OS filtradas em um único ZIP
+// ?from=2026-01-01&to=2026-02-01&status=concluida,entregue&tecnico_id=<uuid>
+export async function GET(request: NextRequest) {
+  try {
+    const auth = await authorizeApiRequest(request, [...EXPORT_ROLES]);
+    if (!auth.authorized) return auth.response;
+
+    const { searchParams } = new URL(request.url);
+    const from = parseDate(searchParams.get('from'));
+    const to = parseDate(searchParams.get('to'));
+
+    if (from === null || to === null) {
+      return NextResponse.json(
+        { error: 'Parâmetros from/to devem ser datas válidas' },
+        { status: 400 }
+      );
+    }
+
+    const filter: OrdensPdfExportFilter = {
+      from,
+      to,
+      status: searchParams
+        .get('status')
+        ?.split(',')
+        .map(status => status.trim())
+        .filter(Boolean),
+      tecnicoId: searchParams.get('tecnico_id') || undefined,
+    };
+
+    const total = await prisma.ordemServico.count({
+      where: buildOrdensExportWhere(filter),
+    });
+
+    if (total === 0) {
+      return NextResponse.json(
+        { error: 'Nenhuma ordem de serviço encontrada para o filtro' },
+        { status: 404 }
+      );
+    }
+
+    if (total > MAX_ORDENS_POR_EXPORTACAO) {
+      return NextResponse.json(
+        {
+          error: `Exportação limitada a ${MAX_ORDENS_POR_EXPORTACAO} ordens (${total} encontradas). Reduza o período.`,
+        },
+        { status: 400 }
+      );
+    }
+
+    auditLogService.record({
+      actorId: auth.user.id,
+      action: 'ordem_servico.pdf_bulk_export',
+      resourceType: 'ordem_servico',
+      ip: request.headers.get('x-forwarded-for')?.split(',')[0].trim(),
+      userAgent: request.headers.get('user-agent'),
+      endpoint: request.nextUrl.pathname,
+      method: request.method,
+      details: { ...filter, total },
+    });
+
+    const filename = `OS_PDFs_${new Date().toISOString().split('T')[0]}.zip`;
+
+    return new NextResponse(createOrdensPdfZipStream(filter), {
+      headers: {
+        'Content-Type': 'application/zip',
+        'Content-Disposition': `attachment; filename="${filename}"`,
+        'Cache-Control': 'no-store',
+        'X-Total-Count': String(total),
+      },
+    });
+  } catch (error) {
+    console.error('Erro na exportação de PDFs:', error);
+    return NextResponse.json(
+      { error: 'Erro interno ao exportar PDFs' },
+      { status: 500 }
+    );
+  }
+}
@@ -1,178 +1,62 @@
+// 📧 API Processar emails - Fila de Envio
+// O envio é feito pelos workers de lib/services/outbound-queue.ts (rate limit, retry e dead-letter)
 import { NextRequest, NextResponse } from 'next/server';
 
-import EmailService from '@/lib/services/email-service';
-import { createClient } from '@/lib/supabase/server';
+import { outboundQueue } from '@/lib/services/outbound-queue';
 
-export async function POST(_request: NextRequest) {
-  try {
-    const supabase = await createClient();
-
-    // Buscar emails pendentes
-    const { data: emailsPendentes, error } = await supabase
-      .from('comunicacoes_cliente')
-      .select(
-        `
-        *,
-        ordens_servico (
-          id,
-          numero_os,
-          descricao,
-          valor,
-          data_inicio,
-          status,
-          clientes (
-            id,
-            nome,
-            email,
-            telefone
-          )
-        ),
-        clientes_portal (
-          id,
-          cliente_id
-        )
-      `
-      )
-      .eq('tipo', 'email')
-      .eq('status', 'pendente')
-      .order('created_at')
-      .limit(10);
-
-    if (error) {
-      console.error('Erro ao buscar emails pendentes:', error);
-      return NextResponse.json(
-        { error: 'Erro ao buscar emails pendentes' },
-        { status: 500 }
-      );
-    }
-
-    if (!emailsPendentes || emailsPendentes.length === 0) {
-      return NextResponse.json({
-        message: 'Nenhum email pendente encontrado',
-        processados: 0,
-      });
-    }
-
-    const emailService = new EmailService();
-    let emailsProcessados = 0;
-    let emailsComErro = 0;
-
-    // Processar cada email
-    for (const emailPendente of emailsPendentes) {
-      try {
-        const ordemServico = emailPendente.ordens_servico;
-
-        if (!ordemServico?.clientes?.email) {
-          // Marcar como erro - cliente sem email
-          await supabase
-            .from('comunicacoes_cliente')
-            .update({
-              status: 'erro',
-              erro_detalhes: 'Cliente não possui email cadastrado',
-              tentativas: emailPendente.tentativas + 1,
-            })
-            .eq('id', emailPendente.id);
-
-          emailsComErro++;
-          continue;
-        }
-
-        // Preparar dados para o email
-        const ordemServicoEmail = {
-          id: ordemServico.id,
-          numero_os: ordemServico.numero_os,
-          descricao: ordemServico.descricao,
-          valor: ordemServico.valor,
-          data_inicio: ordemServico.data_inicio,
-          cliente: {
-            nome: ordemServico.clientes.nome,
-            email: ordemServico.clientes.email,
-            telefone: ordemServico.clientes.telefone,
-          },
-        };
+const MAX_BATCH = 100;
 
-        // Enviar email
-        const resultado =
-          await emailService.sendOrdemServicoEmail(ordemServicoEmail);
-
-        // Marcar como enviado
-        await supabase
-          .from('comunicacoes_cliente')
-          .update({
-            status: 'enviado',
-            enviado_em: new Date().toISOString(),
-            tentativas: emailPendente.tentativas + 1,
-          })
-          .eq('id', emailPendente.id);
-
-        emailsProcessados++;
-      } catch (error) {
-        console.error(`Erro ao processar email ${emailPendente.id}:`, error);
+// 📤 POST - Garantir os workers da fila de emails e processar um lote imediatamente
+// Body opcional: { limit?: number, action?: 'requeue' } ('requeue' devolve o dead-letter à fila)
+export async function POST(request: NextRequest) {
+  try {
+    const body = (await request.json().catch(() => null)) ?? {};
+    const limit = Math.min(Math.max(Number(body.limit ?? 10) || 0, 0), MAX_BATCH);
 
-        // Marcar como erro
-        await supabase
-          .from('comunicacoes_cliente')
-          .update({
-            status: 'erro',
-            erro_detalhes:
-              error instanceof Error ? error.message : 'Erro desconhecido',
-            tentativas: emailPendente.tentativas + 1,
-          })
-          .eq('id', emailPendente.id);
+    outboundQueue.start();
 
-        emailsComErro++;
-      }
-    }
+    const reenfileirados =
+      body.action === 'requeue' ? await outboundQueue.requeueDeadLetters('email') : 0;
+    const resultado = await outboundQueue.processBatch('email', limit);
 
     return NextResponse.json({
-      message: 'Processamento de emails concluído',
-      processados: emailsProcessados,
-      erros: emailsComErro,
-      total: emailsPendentes.length,
+      success: true,
+      message: `Processamento concluído: ${resultado.enviados} enviados, ${resultado.reagendados} reagendados, ${resultado.falhas} falhas`,
+      ...resultado,
+      reenfileirados,
+      fila: await outboundQueue.getQueueStats('email'),
     });
   } catch (error) {
-    console.error('Erro ao processar emails:', error);
+    console.error('❌ Erro no processamento da fila de emails:', error);
     return NextResponse.json(
-      { error: 'Erro interno do servidor' },
+      { success: false, error: 'Erro interno do servidor' },
       { status: 500 }
     );
   }
 }
 
-// Endpoint GET para verificar status da fila
+// 📊 GET - Status da fila de emails
 export async function GET() {
   try {
-    const supabase = await createClient();
-
-    // Contar emails por status
-    const { data: statusCount, error } = await supabase
-      .from('comunicacoes_cliente')
-      .select('status')
-      .eq('tipo', 'email');
-
-    if (error) {
-      return NextResponse.json(
-        { error: 'Erro ao consultar status dos emails' },
-        { status: 500 }
-      );
-    }
-
-    const stats = statusCount.reduce(
-      (acc, item) => {
-        acc[item.status] = (acc[item.status] || 0) + 1;
-        return acc;
-      },
-      {} as Record<string, number>
-    );
+    const contadores = await outboundQueue.getQueueStats('email');
 
     return NextResponse.json({
-      message: 'Status da fila de emails',
-      estatisticas: stats,
+      success: true,
+      fila: {
+        pendentes: contadores.pendente || 0,
+        processando: contadores.processando || 0,
+        enviados: contadores.enviado || 0,
+        falhas: contadores.falhou || 0,
+        total: Object.values(contadores).reduce((acc, count) => acc + count, 0),
+      },
+      estatisticas: contadores,
+      workers: outboundQueue.getWorkerStats().channels.email,
+      timestamp: new Date().toISOString(),
     });
   } catch (error) {
-    console.error('Erro ao consultar fila de emails:', error);
+    console.error('❌ Erro ao verificar fila de emails:', error);
     return NextResponse.json(
-      { error: 'Erro interno do servidor' },
+      { success: false, error: 'Erro interno do servidor' },
       { status: 500 }
     );
   }
@@ -1,179 +1,62 @@
+// 💬 API Processar WhatsApp - Fila de Envio
+// O envio é feito pelos workers de lib/services/outbound-queue.ts (rate limit, retry e dead-letter)
 import { NextRequest, NextResponse } from 'next/server';
 
-import WhatsAppService from '@/lib/services/whatsapp-service';
-import { createClient } from '@/lib/supabase/server';
+import { outboundQueue } from '@/lib/services/outbound-queue';
 
-export async function POST(_request: NextRequest) {
-  try {
-    const supabase = await createClient();
-
-    // Buscar mensagens WhatsApp pendentes
-    const { data: whatsappPendentes, error } = await supabase
-      .from('comunicacoes_cliente')
-      .select(
-        `
-        *,
-        ordens_servico (
-          id,
-          numero_os,
-          descricao,
-          valor,
-          data_inicio,
-          status,
-          clientes (
-            id,
-            nome,
-            telefone
-          )
-        )
-      `
-      )
-      .eq('tipo', 'whatsapp')
-      .eq('status', 'pendente')
-      .order('created_at')
-      .limit(10);
-
-    if (error) {
-      console.error('Erro ao buscar WhatsApp pendentes:', error);
-      return NextResponse.json(
-        { error: 'Erro ao buscar mensagens WhatsApp pendentes' },
-        { status: 500 }
-      );
-    }
-
-    if (!whatsappPendentes || whatsappPendentes.length === 0) {
-      return NextResponse.json({
-        message: 'Nenhuma mensagem WhatsApp pendente encontrada',
-        processados: 0,
-      });
-    }
-
-    const whatsappService = new WhatsAppService();
-    let mensagensProcessadas = 0;
-    let mensagensComErro = 0;
-
-    // Processar cada mensagem
-    for (const whatsappPendente of whatsappPendentes) {
-      try {
-        const ordemServico = whatsappPendente.ordens_servico;
-        const cliente = Array.isArray(ordemServico?.clientes)
-          ? ordemServico.clientes[0]
-          : ordemServico?.clientes;
-
-        if (!cliente?.telefone) {
-          // Marcar como erro - cliente sem telefone
-          await supabase
-            .from('comunicacoes_cliente')
-            .update({
-              status: 'erro',
-              erro_detalhes: 'Cliente não possui telefone cadastrado',
-              tentativas: whatsappPendente.tentativas + 1,
-            })
-            .eq('id', whatsappPendente.id);
-
-          mensagensComErro++;
-          continue;
-        }
-
-        // Preparar dados para o WhatsApp
-        const ordemServicoWhatsApp = {
-          id: ordemServico.id,
-          numero_os: ordemServico.numero_os,
-          descricao: ordemServico.descricao,
-          valor: ordemServico.valor,
-          data_inicio: ordemServico.data_inicio,
-          cliente: {
-            nome: cliente.nome,
-            telefone: cliente.telefone,
-          },
-        };
+const MAX_BATCH = 100;
 
-        // Enviar mensagem WhatsApp
-        const resultado =
-          await whatsappService.sendOrdemServicoMessage(ordemServicoWhatsApp);
-
-        // Marcar como enviado
-        await supabase
-          .from('comunicacoes_cliente')
-          .update({
-            status: 'enviado',
-            enviado_em: new Date().toISOString(),
-            whatsapp_message_id: resultado.messages[0]?.id,
-            tentativas: whatsappPendente.tentativas + 1,
-          })
-          .eq('id', whatsappPendente.id);
-
-        mensagensProcessadas++;
-      } catch (error) {
-        console.error(
-          `Erro ao processar WhatsApp ${whatsappPendente.id}:`,
-          error
-        );
+// 📤 POST - Garantir os workers da fila de WhatsApp e processar um lote imediatamente
+// Body opcional: { limit?: number, action?: 'requeue' } ('requeue' devolve o dead-letter à fila)
+export async function POST(request: NextRequest) {
+  try {
+    const body = (await request.json().catch(() => null)) ?? {};
+    const limit = Math.min(Math.max(Number(body.limit ?? 10) || 0, 0), MAX_BATCH);
 
-        // Marcar como erro
-        await supabase
-          .from('comunicacoes_cliente')
-          .update({
-            status: 'erro',
-            erro_detalhes:
-              error instanceof Error ? error.message : 'Erro desconhecido',
-            tentativas: whatsappPendente.tentativas + 1,
-          })
-          .eq('id', whatsappPendente.id);
+    outboundQueue.start();
 
-        mensagensComErro++;
-      }
-    }
+    const reenfileirados =
+      body.action === 'requeue' ? await outboundQueue.requeueDeadLetters('whatsapp') : 0;
+    const resultado = await outboundQueue.processBatch('whatsapp', limit);
 
     return NextResponse.json({
-      message: 'Processamento de mensagens WhatsApp concluído',
-      processados: mensagensProcessadas,
-      erros: mensagensComErro,
-      total: whatsappPendentes.length,
+      success: true,
+      message: `Processamento concluído: ${resultado.enviados} enviados, ${resultado.reagendados} reagendados, ${resultado.falhas} falhas`,
+      ...resultado,
+      reenfileirados,
+      fila: await outboundQueue.getQueueStats('whatsapp'),
     });
   } catch (error) {
-    console.error('Erro ao processar WhatsApp:', error);
+    console.error('❌ Erro no processamento da fila de WhatsApp:', error);
     return NextResponse.json(
-      { error: 'Erro interno do servidor' },
+      { success: false, error: 'Erro interno do servidor' },
       { status: 500 }
     );
   }
 }
 
-// Endpoint GET para verificar status da fila WhatsApp
+// 📊 GET - Status da fila de WhatsApp
 export async function GET() {
   try {
-    const supabase = await createClient();
-
-    // Contar mensagens WhatsApp por status
-    const { data: statusCount, error } = await supabase
-      .from('comunicacoes_cliente')
-      .select('status')
-      .eq('tipo', 'whatsapp');
-
-    if (error) {
-      return NextResponse.json(
-        { error: 'Erro ao consultar status das mensagens WhatsApp' },
-        { status: 500 }
-      );
-    }
-
-    const stats = statusCount.reduce(
-      (acc, item) => {
-        acc[item.status] = (acc[item.status] || 0) + 1;
-        return acc;
-      },
-      {} as Record<string, number>
-    );
+    const contadores = await outboundQueue.getQueueStats('whatsapp');
 
     return NextResponse.json({
-      message: 'Status da fila de mensagens WhatsApp',
-      estatisticas: stats,
+      success: true,
+      fila: {
+        pendentes: contadores.pendente || 0,
+        processando: contadores.processando || 0,
+        enviados: contadores.enviado || 0,
+        falhas: contadores.falhou || 0,
+        total: Object.values(contadores).reduce((acc, count) => acc + count, 0),
+      },
+      estatisticas: contadores,
+      workers: outboundQueue.getWorkerStats().channels.whatsapp,
+      timestamp: new Date().toISOString(),
     });
   } catch (error) {
-    console.error('Erro ao consultar fila WhatsApp:', error);
+    console.error('❌ Erro ao verificar fila de WhatsApp:', error);
     return NextResponse.json(
-      { error: 'Erro interno do servidor' },
+      { success: false, error: 'Erro interno do servidor' },
       { status: 500 }
     );
   }
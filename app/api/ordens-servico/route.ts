@@ -12,6 +12,17 @@ import {
 } from '@/lib/middleware/metrics-middleware';
 import { authorizeApiRequest } from '@/lib/auth/api-authorization';
 import prisma from '@/lib/prisma';
+import {
+  InvalidProjectionError,
+  OrdemListProjection,
+  mapOrdemListItem,
+  parseOrdemListProjection,
+} from '@/lib/services/ordem-list-mapper';
+import {
+  createWithAllocatedNumber,
+  nextNumeroOs,
+  resyncNumeroOs,
+} from '@/lib/services/number-allocator';
 import {
   StatusOrdemServico,
   TipoServico,
@@ -64,6 +75,17 @@ async function getOrdensServico(request: NextRequest) {
     const sortField = searchParams.get('sortField') || 'createdAt'; // Maps to createdAt
     const sortOrder = searchParams.get('sortOrder') || 'desc';
 
+    // Sparse fieldsets: ?fields=id,numero_os,status&include=cliente (select only what is returned)
+    let projection: OrdemListProjection;
+    try {
+      projection = parseOrdemListProjection(searchParams.get('fields'), searchParams.get('include'));
+    } catch (error) {
+      if (error instanceof InvalidProjectionError) {
+        return NextResponse.json({ error: error.message }, { status: 400 });
+      }
+      throw error;
+    }
+
     // Construir filtros (WhereInput)
     const where: any = {};
 
@@ -96,63 +118,12 @@ async function getOrdensServico(request: NextRequest) {
         orderBy: {
           [orderByField]: sortOrder === 'asc' ? 'asc' : 'desc'
         },
-        include: {
-          cliente: {
-            select: { id: true, nome: true, email: true, telefone: true, endereco: true, numeroCliente: true }
-          },
-          equipamento: true, // Incluindo dados do equipamento
-        }
+        select: projection.select
       })
     ]);
 
-    // Map to snake_case for frontend compatibility
-    const data = orders.map((order: any) => ({
-      id: order.id,
-      numero_os: order.numeroOs,
-      titulo: order.titulo,
-      descricao: order.descricao,
-      status: order.status,
-      prioridade: order.prioridade,
-      tipo_servico: order.titulo, // Mapped from Titulo in legacy? Or keeps as is.
-      // Legacy mapping kept for compatibility:
-      tipo_dispositivo: order.equipamento ? order.equipamento.tipo : order.tipoDispositivo,
-      modelo_dispositivo: order.equipamento ? order.equipamento.modelo : order.modeloDispositivo,
-      serial_number: order.equipamento ? order.equipamento.numeroSerie : order.numeroSerie,
-
-      valor_servico: order.valorServico,
-      valor_pecas: order.valorPecas,
-      valor_total: order.valorTotal,
-      data_abertura: order.dataAbertura,
-      data_inicio: order.dataInicio,
-      data_conclusao: order.dataConclusao,
-      tecnico_id: order.tecnicoId,
-      cliente_id: order.clienteId,
-      equipamento_id: order.equipamentoId,
-
-      created_at: order.createdAt,
-      updated_at: order.updatedAt,
-      cliente: order.cliente ? {
-        id: order.cliente.id,
-        nome: order.cliente.nome,
-        email: order.cliente.email,
-        telefone: order.cliente.telefone,
-        endereco: order.cliente.endereco,
-        numero_cliente: (order.cliente as any).numeroCliente
-      } : null,
-      equipamento: order.equipamento ? {
-        id: order.equipamento.id,
-        tipo: order.equipamento.tipo,
-        marca: order.equipamento.marca,
-        modelo: order.equipamento.modelo,
-        numero_serie: order.equipamento.numeroSerie,
-        imei: order.equipamento.imei
-      } : {
-        // Fallback fields if no relation
-        marca: order.tipoDispositivo,
-        modelo: order.modeloDispositivo,
-        numero_serie: order.numeroSerie
-      }
-    }));
+    // Map to snake_case for frontend compatibility (only the requested shape)
+    const data = orders.map(order => mapOrdemListItem(order, projection));
 
     return NextResponse.json({
       success: true,
@@ -258,25 +229,11 @@ async function createOrdemServico(request: NextRequest) {
       }, { status: 201 });
     }
 
-    // Generate OS Number
-    const lastOrder = await prisma.ordemServico.findFirst({
-      orderBy: { createdAt: 'desc' },
-      select: { numeroOs: true }
-    });
-
-    let proximoNumero = 1;
-    if (lastOrder?.numeroOs) {
-      const numeroAtual = parseInt(lastOrder.numeroOs.replace(/\D/g, ''), 10);
-      proximoNumero = numeroAtual + 1;
-    }
-    const numeroOS = `OS${proximoNumero.toString().padStart(6, '0')}`;
-
     const valorServico = parseFloat(formData.valor_servico) || 0;
     const valorPecas = parseFloat(formData.valor_pecas) || 0;
 
     // Create payload
     const dataToCreate: any = {
-      numeroOs: numeroOS,
       clienteId: formData.cliente_id,
       equipamentoId: formData.equipamento_id || null, // Link to equipment if provided
       titulo: formData.titulo,
@@ -303,13 +260,20 @@ async function createOrdemServico(request: NextRequest) {
       observacoesTecnico: formData.observacoes_tecnico,
     };
 
-    const novaOrdem = await prisma.ordemServico.create({
-      data: dataToCreate,
-      include: {
-        cliente: true,
-        equipamento: true
-      }
-    });
+    // OS Number comes from the atomic counter (no "last order" query, no duplicates under concurrency)
+    const novaOrdem = await createWithAllocatedNumber(
+      'numeroOs',
+      () => nextNumeroOs(),
+      () => resyncNumeroOs(),
+      numeroOs =>
+        prisma.ordemServico.create({
+          data: { ...dataToCreate, numeroOs },
+          include: {
+            cliente: true,
+            equipamento: true
+          }
+        })
+    );
 
     const novaOrdemMapped = {
       ...novaOrdem,
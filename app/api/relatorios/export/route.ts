@@ -1,104 +1,172 @@
 import { NextRequest, NextResponse } from 'next/server';
 
-import { createClient } from '@/lib/supabase/server';
+import { authorizeApiRequest } from '@/lib/auth/api-authorization';
+import { PermissionManager, UserRole } from '@/lib/auth/permissions';
+import { auditLogService } from '@/lib/services/audit-log-service';
+import {
+  ReportExportPlan,
+  ReportFormato,
+  ReportSection,
+  createReportExportStream,
+  getReportSections,
+} from '@/lib/services/report-export';
+
+export const runtime = 'nodejs';
+export const dynamic = 'force-dynamic';
+
+const EXPORT_ROLES = [
+  'admin',
+  'diretor',
+  'gerente_adm',
+  'gerente_financeiro',
+  'supervisor_tecnico',
+  'atendente',
+] as const;
+
+// Permissão exigida por tipo de relatório ('all' exige todas)
+const EXPORT_PERMISSIONS: Record<string, string[]> = {
+  basic: ['relatorios.view_basic'],
+  financial: ['relatorios.view_financial'],
+  technical: ['relatorios.view_technical'],
+  all: ['relatorios.view_basic', 'relatorios.view_financial', 'relatorios.view_technical'],
+};
+
+const FORMATOS: ReportFormato[] = ['json', 'csv', 'ndjson'];
+const MAX_PERIODO_DIAS = 3650;
+
+const CONTENT_TYPES: Record<ReportFormato, string> = {
+  json: 'application/json; charset=utf-8',
+  csv: 'text/csv; charset=utf-8',
+  ndjson: 'application/x-ndjson; charset=utf-8',
+};
+
+function parsePeriodo(periodo: string): number | null {
+  const dias = parseInt(periodo, 10);
+  return Number.isInteger(dias) && dias > 0 && dias <= MAX_PERIODO_DIAS ? dias : null;
+}
+
+// `tipo` da exportação personalizada é livre e vai para o nome do arquivo (Content-Disposition):
+// só [a-z0-9_-], para que aspas ou quebras de linha não corrompam o cabeçalho
+function sanitizeTipo(tipo: unknown): string {
+  const slug = typeof tipo === 'string'
+    ? tipo.toLowerCase().replace(/[^a-z0-9_-]+/g, '_').replace(/^_+|_+$/g, '').slice(0, 64)
+    : '';
+  return slug || 'personalizado';
+}
+
+function streamResponse(
+  plan: ReportExportPlan,
+  tipo: string
+): NextResponse {
+  const data = new Date().toISOString().split('T')[0];
+  const headers: Record<string, string> = {
+    'Content-Type': CONTENT_TYPES[plan.formato],
+    'Cache-Control': 'no-store',
+  };
+
+  if (plan.formato !== 'json') {
+    headers['Content-Disposition'] =
+      `attachment; filename="relatorio_${tipo}_${data}.${plan.formato}"`;
+  }
+
+  return new NextResponse(createReportExportStream(plan), { status: 200, headers });
+}
+
+function badRequest(message: string) {
+  return NextResponse.json({ success: false, message }, { status: 400 });
+}
+
+function canExport(role: UserRole, permissions: string[]): boolean {
+  return permissions.every(permission => PermissionManager.hasPermission(role, permission));
+}
+
+function recordExport(
+  request: NextRequest,
+  actorId: string,
+  details: Record<string, unknown>
+): void {
+  auditLogService.record({
+    actorId,
+    action: 'relatorios.export',
+    resourceType: 'relatorio',
+    ip: request.headers.get('x-forwarded-for')?.split(',')[0].trim(),
+    userAgent: request.headers.get('user-agent'),
+    endpoint: request.nextUrl.pathname,
+    method: request.method,
+    details,
+  });
+}
 
 export async function GET(request: NextRequest) {
   try {
+    const auth = await authorizeApiRequest(request, [...EXPORT_ROLES]);
+    if (!auth.authorized) return auth.response;
+
     const { searchParams } = new URL(request.url);
     const tipo = searchParams.get('tipo') || 'basic';
-    const formato = searchParams.get('formato') || 'json';
+    const formato = (searchParams.get('formato') || 'json') as ReportFormato;
     const periodo = searchParams.get('periodo') || '30';
+    const dataset = searchParams.get('dataset');
 
-    const supabase = await createClient();
-
-    // Data de início baseada no período
-    const dataInicio = new Date();
-    dataInicio.setDate(dataInicio.getDate() - parseInt(periodo, 10));
-
-    const dados: any = {};
-
-    // Buscar dados baseado no tipo de relatório
-    if (tipo === 'basic' || tipo === 'all') {
-      const { data: clientes } = await supabase
-        .from('clientes')
-        .select('*')
-        .gte('created_at', dataInicio.toISOString());
-
-      const { data: ordens } = await supabase
-        .from('ordens_servico')
-        .select('*')
-        .gte('created_at', dataInicio.toISOString());
-
-      dados.basic = {
-        clientes: clientes || [],
-        ordens_servico: ordens || [],
-      };
+    const dias = parsePeriodo(periodo);
+    if (dias === null) {
+      return badRequest(`Período inválido (1 a ${MAX_PERIODO_DIAS} dias)`);
     }
-
-    if (tipo === 'financial' || tipo === 'all') {
-      const { data: ordensFinanceiro } = await supabase
-        .from('ordens_servico')
-        .select('id, valor_total, status, created_at, cliente_id')
-        .gte('created_at', dataInicio.toISOString());
-
-      dados.financial = ordensFinanceiro || [];
+    if (!FORMATOS.includes(formato)) {
+      return badRequest(`Formato inválido. Formatos válidos: ${FORMATOS.join(', ')}`);
     }
 
-    if (tipo === 'technical' || tipo === 'all') {
-      const { data: ordensTecnico } = await supabase
-        .from('ordens_servico')
-        .select(
-          'id, status, tipo_servico, tecnico_responsavel, created_at, updated_at'
-        )
-        .gte('created_at', dataInicio.toISOString());
-
-      const { data: equipamentos } = await supabase
-        .from('equipamentos')
-        .select('*');
-
-      dados.technical = {
-        ordens: ordensTecnico || [],
-        equipamentos: equipamentos || [],
-      };
+    let sections = getReportSections(tipo);
+    if (sections.length === 0) {
+      return badRequest('Tipo de relatório inválido');
+    }
+    if (!canExport(auth.user.role, EXPORT_PERMISSIONS[tipo] ?? [])) {
+      return NextResponse.json({ error: 'Acesso negado' }, { status: 403 });
     }
 
-    // Preparar resposta baseada no formato
+    // CSV é uma única tabela: usa `dataset` ou a primeira seção do tipo
     if (formato === 'csv') {
-      // Converter para CSV (implementação simplificada)
-      let csvContent = '';
-
-      if (dados.basic?.ordens_servico) {
-        csvContent += 'ID,Status,Valor Total,Data Criação,Cliente ID\n';
-        dados.basic.ordens_servico.forEach((ordem: any) => {
-          csvContent += `${ordem.id},${ordem.status},${ordem.valor_total || 0},${ordem.created_at},${ordem.cliente_id}\n`;
-        });
+      const selected = dataset
+        ? sections.find(section => section.dataset === dataset)
+        : sections[0];
+      if (!selected) {
+        return badRequest(
+          `Dataset inválido para o tipo ${tipo}: ${sections.map(s => s.dataset).join(', ')}`
+        );
       }
-
-      return new NextResponse(csvContent, {
-        status: 200,
-        headers: {
-          'Content-Type': 'text/csv',
-          'Content-Disposition': `attachment; filename="relatorio_${tipo}_${new Date().toISOString().split('T')[0]}.csv"`,
-        },
-      });
+      sections = [selected];
     }
 
-    // Retornar JSON por padrão
-    return NextResponse.json(
+    // Data de início baseada no período
+    const dataInicio = new Date();
+    dataInicio.setDate(dataInicio.getDate() - dias);
+
+    recordExport(request, auth.user.id, {
+      tipo,
+      formato,
+      periodo_dias: dias,
+      datasets: sections.map(section => section.dataset),
+    });
+
+    return streamResponse(
       {
-        success: true,
-        message: 'Dados exportados com sucesso',
-        data: dados,
-        metadata: {
-          tipo_relatorio: tipo,
-          formato,
-          periodo_dias: parseInt(periodo, 10),
-          data_inicio: dataInicio.toISOString(),
-          data_fim: new Date().toISOString(),
-          exportado_em: new Date().toISOString(),
+        sections,
+        formato,
+        filter: { dataInicio },
+        envelope: {
+          success: true,
+          message: 'Dados exportados com sucesso',
+          metadata: {
+            tipo_relatorio: tipo,
+            formato,
+            periodo_dias: dias,
+            data_inicio: dataInicio.toISOString(),
+            data_fim: new Date().toISOString(),
+            exportado_em: new Date().toISOString(),
+          },
         },
       },
-      { status: 200 }
+      tipo
     );
   } catch (error) {
     console.error('Erro ao exportar relatório:', error);
@@ -115,53 +183,64 @@ export async function GET(request: NextRequest) {
 
 export async function POST(request: NextRequest) {
   try {
-    const body = await request.json();
-    const { tipo, formato = 'json', periodo = '30', filtros = {} } = body;
+    const auth = await authorizeApiRequest(request, [...EXPORT_ROLES]);
+    if (!auth.authorized) return auth.response;
 
-    const supabase = await createClient();
-
-    // Data de início baseada no período
-    const dataInicio = new Date();
-    dataInicio.setDate(dataInicio.getDate() - parseInt(periodo, 10));
-
-    // Implementar lógica de exportação com filtros personalizados
-    // Esta é uma implementação básica que pode ser expandida
+    // Exportação personalizada lista ordens de serviço (relatório básico)
+    if (!canExport(auth.user.role, EXPORT_PERMISSIONS.basic)) {
+      return NextResponse.json({ error: 'Acesso negado' }, { status: 403 });
+    }
 
-    let query = supabase
-      .from('ordens_servico')
-      .select('*')
-      .gte('created_at', dataInicio.toISOString());
+    const body = (await request.json()) ?? {};
+    const { formato = 'json', periodo = '30', filtros = {} } = body;
+    const tipo = sanitizeTipo(body.tipo);
 
-    // Aplicar filtros se fornecidos
-    if (filtros.status) {
-      query = query.eq('status', filtros.status);
+    const dias = parsePeriodo(String(periodo));
+    if (dias === null) {
+      return badRequest(`Período inválido (1 a ${MAX_PERIODO_DIAS} dias)`);
     }
-    if (filtros.tecnico_responsavel) {
-      query = query.eq('tecnico_responsavel', filtros.tecnico_responsavel);
+    if (!FORMATOS.includes(formato)) {
+      return badRequest(`Formato inválido. Formatos válidos: ${FORMATOS.join(', ')}`);
     }
 
-    const { data: ordens, error } = await query;
+    // Data de início baseada no período
+    const dataInicio = new Date();
+    dataInicio.setDate(dataInicio.getDate() - dias);
 
-    if (error) {
-      throw new Error('Erro ao buscar dados para exportação');
-    }
+    // Exportação personalizada: ordens de serviço filtradas, `data` é a própria lista
+    const sections: ReportSection[] = [{ path: [], dataset: 'ordens_servico' }];
 
-    return NextResponse.json(
+    recordExport(request, auth.user.id, {
+      tipo,
+      formato,
+      periodo_dias: dias,
+      filtros,
+    });
+
+    return streamResponse(
       {
-        success: true,
-        message: 'Exportação personalizada gerada com sucesso',
-        data: ordens,
-        filtros_aplicados: filtros,
-        metadata: {
-          tipo_relatorio: tipo,
-          formato,
-          periodo_dias: parseInt(periodo, 10),
-          data_inicio: dataInicio.toISOString(),
-          data_fim: new Date().toISOString(),
-          exportado_em: new Date().toISOString(),
+        sections,
+        formato,
+        filter: {
+          dataInicio,
+          status: filtros.status,
+          tecnicoId: filtros.tecnico_id ?? filtros.tecnico_responsavel,
+        },
+        envelope: {
+          success: true,
+          message: 'Exportação personalizada gerada com sucesso',
+          filtros_aplicados: filtros,
+          metadata: {
+            tipo_relatorio: tipo,
+            formato,
+            periodo_dias: dias,
+            data_inicio: dataInicio.toISOString(),
+            data_fim: new Date().toISOString(),
+            exportado_em: new Date().toISOString(),
+          },
         },
       },
-      { status: 200 }
+      tipo
     );
   } catch (error) {
     console.error('Erro ao exportar relatório personalizado:', error);
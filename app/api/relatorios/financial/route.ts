@@ -1,73 +1,66 @@
 import { NextRequest, NextResponse } from 'next/server';
 
-import { createClient } from '@/lib/supabase/server';
+import { checkRolePermission } from '@/lib/auth/role-middleware';
+import { PermissionManager } from '@/lib/auth/permissions';
+import { REPORT_PERMISSIONS, createReportParams } from '@/lib/services/report-generators';
+import { reportJobQueue } from '@/lib/services/report-job-queue';
+
+// Tempo máximo aguardando o job antes de responder 202 com o id para polling
+const SYNC_WAIT_MS = 8000;
+const MAX_PERIODO_DIAS = 3650;
 
 export async function GET(request: NextRequest) {
   try {
-    const { searchParams } = new URL(request.url);
-    const periodo = searchParams.get('periodo') || '30'; // dias
-
-    const supabase = await createClient();
+    const auth = await checkRolePermission(request);
+    if (!auth.authenticated || !auth.user) {
+      return NextResponse.json({ error: 'Não autenticado' }, { status: 401 });
+    }
 
-    // Data de início baseada no período
-    const dataInicio = new Date();
-    dataInicio.setDate(dataInicio.getDate() - parseInt(periodo, 10));
+    if (!PermissionManager.hasPermission(auth.user.role, REPORT_PERMISSIONS.financial)) {
+      return NextResponse.json({ error: 'Acesso negado' }, { status: 403 });
+    }
 
-    // Buscar dados financeiros
-    const { data: ordens, error: errorOrdens } = await supabase
-      .from('ordens_servico')
-      .select('id, valor_total, status, created_at')
-      .gte('created_at', dataInicio.toISOString());
+    const { searchParams } = new URL(request.url);
+    const periodo = searchParams.get('periodo') || '30'; // dias
+    const periodoDias = parseInt(periodo, 10);
 
-    if (errorOrdens) {
-      throw new Error('Erro ao buscar ordens de serviço');
+    if (!Number.isInteger(periodoDias) || periodoDias < 1 || periodoDias > MAX_PERIODO_DIAS) {
+      return NextResponse.json(
+        { success: false, message: `Período inválido (1 a ${MAX_PERIODO_DIAS} dias)` },
+        { status: 400 }
+      );
     }
 
-    // Calcular métricas financeiras
-    const ordensFinalizadas =
-      ordens?.filter(ordem => ordem.status === 'finalizada') || [];
-    const receitaTotal = ordensFinalizadas.reduce(
-      (acc, ordem) => acc + (ordem.valor_total || 0),
-      0
+    // Gerado pela fila de jobs; resultados idênticos são reaproveitados enquanto os dados não mudam
+    const job = await reportJobQueue.submitAndWait(
+      'financial',
+      createReportParams(periodoDias),
+      searchParams.get('async') === 'true' ? 0 : SYNC_WAIT_MS,
+      auth.user.id
     );
-    const ticketMedio =
-      ordensFinalizadas.length > 0
-        ? receitaTotal / ordensFinalizadas.length
-        : 0;
 
-    // Receita por mês (últimos 12 meses)
-    const receitaPorMes: { [key: string]: number } = {};
-    ordensFinalizadas.forEach(ordem => {
-      const mes = new Date(ordem.created_at).toISOString().substring(0, 7); // YYYY-MM
-      receitaPorMes[mes] = (receitaPorMes[mes] || 0) + (ordem.valor_total || 0);
-    });
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Falha na geração do relatório');
+    }
 
-    const relatorio = {
-      resumo: {
-        receita_total: receitaTotal,
-        ordens_finalizadas: ordensFinalizadas.length,
-        ticket_medio: ticketMedio,
-        periodo_dias: parseInt(periodo, 10),
-      },
-      receita_por_mes: receitaPorMes,
-      ordens_por_status: ordens?.reduce((acc: any, ordem: any) => {
-        acc[ordem.status] = (acc[ordem.status] || 0) + 1;
-        return acc;
-      }, {}),
-      metadata: {
-        periodo_dias: parseInt(periodo, 10),
-        data_inicio: dataInicio.toISOString(),
-        data_fim: new Date().toISOString(),
-        tipo_relatorio: 'financial',
-        gerado_em: new Date().toISOString(),
-      },
-    };
+    if (job.status !== 'completed') {
+      return NextResponse.json(
+        {
+          success: true,
+          message: 'Relatório financeiro em processamento',
+          job,
+          status_url: `/api/relatorios/jobs/${job.id}`,
+        },
+        { status: 202 }
+      );
+    }
 
     return NextResponse.json(
       {
         success: true,
         message: 'Relatório financeiro gerado com sucesso',
-        data: relatorio,
+        data: job.result,
+        job: { id: job.id, cached: job.cached },
       },
       { status: 200 }
     );
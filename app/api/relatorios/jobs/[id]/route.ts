@@ -0,0 +1,39 @@
+import { NextRequest, NextResponse } from 'next/server';
+
+import { checkRolePermission } from '@/lib/auth/role-middleware';
+import { PermissionManager } from '@/lib/auth/permissions';
+import { REPORT_PERMISSIONS, ReportTipo } from '@/lib/services/report-generators';
+import { reportJobQueue } from '@/lib/services/report-job-queue';
+
+// GET - Status, progresso e resultado de um job de relatório
+export async function GET(
+  request: NextRequest,
+  { params }: { params: Promise<{ id: string }> }
+) {
+  try {
+    const auth = await checkRolePermission(request);
+    if (!auth.authenticated || !auth.user) {
+      return NextResponse.json({ error: 'Não autenticado' }, { status: 401 });
+    }
+
+    const { id } = await params;
+    const job = await reportJobQueue.get(id);
+
+    if (!job) {
+      return NextResponse.json({ error: 'Job não encontrado' }, { status: 404 });
+    }
+
+    const permission = REPORT_PERMISSIONS[job.tipo as ReportTipo];
+    if (!permission || !PermissionManager.hasPermission(auth.user.role, permission)) {
+      return NextResponse.json({ error: 'Acesso negado' }, { status: 403 });
+    }
+
+    return NextResponse.json({ success: true, job });
+  } catch (error) {
+    console.error('Erro ao consultar job de relatório:', error);
+    return NextResponse.json(
+      { error: 'Erro interno do servidor' },
+      { status: 500 }
+    );
+  }
+}
@@ -0,0 +1,68 @@
+import { NextRequest, NextResponse } from 'next/server';
+
+import { checkRolePermission } from '@/lib/auth/role-middleware';
+import { PermissionManager } from '@/lib/auth/permissions';
+import {
+  REPORT_PERMISSIONS,
+  REPORT_TIPOS,
+  ReportTipo,
+  createReportParams,
+} from '@/lib/services/report-generators';
+import { reportJobQueue } from '@/lib/services/report-job-queue';
+
+const MAX_PERIODO_DIAS = 3650;
+
+// POST - Enfileirar geração de relatório
+// Body: { tipo: 'financial' | 'technical' | 'dashboard', periodo?: number, charts?: boolean, trends?: boolean }
+export async function POST(request: NextRequest) {
+  try {
+    const auth = await checkRolePermission(request);
+    if (!auth.authenticated || !auth.user) {
+      return NextResponse.json({ error: 'Não autenticado' }, { status: 401 });
+    }
+
+    const body = await request.json();
+    const tipo = body.tipo as ReportTipo;
+
+    if (!REPORT_TIPOS.includes(tipo)) {
+      return NextResponse.json(
+        { error: `Tipo inválido. Tipos válidos: ${REPORT_TIPOS.join(', ')}` },
+        { status: 400 }
+      );
+    }
+
+    if (!PermissionManager.hasPermission(auth.user.role, REPORT_PERMISSIONS[tipo])) {
+      return NextResponse.json({ error: 'Acesso negado' }, { status: 403 });
+    }
+
+    const periodo = parseInt(String(body.periodo ?? 30), 10);
+    if (!Number.isInteger(periodo) || periodo < 1 || periodo > MAX_PERIODO_DIAS) {
+      return NextResponse.json(
+        { error: `Período inválido (1 a ${MAX_PERIODO_DIAS} dias)` },
+        { status: 400 }
+      );
+    }
+
+    const job = await reportJobQueue.submit(
+      tipo,
+      createReportParams(
+        periodo,
+        tipo === 'dashboard'
+          ? { charts: body.charts !== false, trends: body.trends !== false }
+          : {}
+      ),
+      auth.user.id
+    );
+
+    return NextResponse.json(
+      { success: true, job, status_url: `/api/relatorios/jobs/${job.id}` },
+      { status: job.status === 'completed' ? 200 : 202 }
+    );
+  } catch (error) {
+    console.error('Erro ao enfileirar relatório:', error);
+    return NextResponse.json(
+      { error: 'Erro interno do servidor' },
+      { status: 500 }
+    );
+  }
+}
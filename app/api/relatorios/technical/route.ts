@@ -1,100 +1,66 @@
 import { NextRequest, NextResponse } from 'next/server';
 
-import { createClient } from '@/lib/supabase/server';
+import { checkRolePermission } from '@/lib/auth/role-middleware';
+import { PermissionManager } from '@/lib/auth/permissions';
+import { REPORT_PERMISSIONS, createReportParams } from '@/lib/services/report-generators';
+import { reportJobQueue } from '@/lib/services/report-job-queue';
+
+// Tempo máximo aguardando o job antes de responder 202 com o id para polling
+const SYNC_WAIT_MS = 8000;
+const MAX_PERIODO_DIAS = 3650;
 
 export async function GET(request: NextRequest) {
   try {
-    const { searchParams } = new URL(request.url);
-    const periodo = searchParams.get('periodo') || '30'; // dias
-
-    const supabase = await createClient();
-
-    // Data de início baseada no período
-    const dataInicio = new Date();
-    dataInicio.setDate(dataInicio.getDate() - parseInt(periodo, 10));
-
-    // Buscar dados técnicos
-    const { data: ordens, error: errorOrdens } = await supabase
-      .from('ordens_servico')
-      .select(
-        'id, status, tipo_servico, tecnico_responsavel, created_at, updated_at'
-      )
-      .gte('created_at', dataInicio.toISOString());
-
-    const { data: equipamentos, error: errorEquipamentos } = await supabase
-      .from('equipamentos')
-      .select('id, tipo, modelo, status');
-
-    if (errorOrdens || errorEquipamentos) {
-      throw new Error('Erro ao buscar dados técnicos');
+    const auth = await checkRolePermission(request);
+    if (!auth.authenticated || !auth.user) {
+      return NextResponse.json({ error: 'Não autenticado' }, { status: 401 });
     }
 
-    // Análise de performance técnica
-    const ordensFinalizadas =
-      ordens?.filter(ordem => ordem.status === 'finalizada') || [];
-
-    // Tempo médio de resolução (em dias)
-    const temposResolucao = ordensFinalizadas.map(ordem => {
-      const inicio = new Date(ordem.created_at);
-      const fim = new Date(ordem.updated_at);
-      return (fim.getTime() - inicio.getTime()) / (1000 * 60 * 60 * 24); // dias
-    });
+    if (!PermissionManager.hasPermission(auth.user.role, REPORT_PERMISSIONS.technical)) {
+      return NextResponse.json({ error: 'Acesso negado' }, { status: 403 });
+    }
 
-    const tempoMedioResolucao =
-      temposResolucao.length > 0
-        ? temposResolucao.reduce((acc, tempo) => acc + tempo, 0) /
-          temposResolucao.length
-        : 0;
+    const { searchParams } = new URL(request.url);
+    const periodo = searchParams.get('periodo') || '30'; // dias
+    const periodoDias = parseInt(periodo, 10);
 
-    // Análise por tipo de serviço
-    const servicosPorTipo = ordens?.reduce((acc: any, ordem: any) => {
-      const tipo = ordem.tipo_servico || 'Não especificado';
-      acc[tipo] = (acc[tipo] || 0) + 1;
-      return acc;
-    }, {});
+    if (!Number.isInteger(periodoDias) || periodoDias < 1 || periodoDias > MAX_PERIODO_DIAS) {
+      return NextResponse.json(
+        { success: false, message: `Período inválido (1 a ${MAX_PERIODO_DIAS} dias)` },
+        { status: 400 }
+      );
+    }
 
-    // Análise por técnico
-    const ordensPorTecnico = ordens?.reduce((acc: any, ordem: any) => {
-      const tecnico = ordem.tecnico_responsavel || 'Não atribuído';
-      acc[tecnico] = (acc[tecnico] || 0) + 1;
-      return acc;
-    }, {});
+    // Gerado pela fila de jobs; resultados idênticos são reaproveitados enquanto os dados não mudam
+    const job = await reportJobQueue.submitAndWait(
+      'technical',
+      createReportParams(periodoDias),
+      searchParams.get('async') === 'true' ? 0 : SYNC_WAIT_MS,
+      auth.user.id
+    );
 
-    // Análise de equipamentos
-    const equipamentosPorTipo = equipamentos?.reduce((acc: any, equip: any) => {
-      acc[equip.tipo] = (acc[equip.tipo] || 0) + 1;
-      return acc;
-    }, {});
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Falha na geração do relatório');
+    }
 
-    const relatorio = {
-      performance: {
-        tempo_medio_resolucao_dias: Math.round(tempoMedioResolucao * 100) / 100,
-        ordens_finalizadas: ordensFinalizadas.length,
-        taxa_finalizacao: ordens?.length
-          ? (ordensFinalizadas.length / ordens.length) * 100
-          : 0,
-      },
-      servicos_por_tipo: servicosPorTipo,
-      ordens_por_tecnico: ordensPorTecnico,
-      equipamentos_por_tipo: equipamentosPorTipo,
-      ordens_por_status: ordens?.reduce((acc: any, ordem: any) => {
-        acc[ordem.status] = (acc[ordem.status] || 0) + 1;
-        return acc;
-      }, {}),
-      metadata: {
-        periodo_dias: parseInt(periodo, 10),
-        data_inicio: dataInicio.toISOString(),
-        data_fim: new Date().toISOString(),
-        tipo_relatorio: 'technical',
-        gerado_em: new Date().toISOString(),
-      },
-    };
+    if (job.status !== 'completed') {
+      return NextResponse.json(
+        {
+          success: true,
+          message: 'Relatório técnico em processamento',
+          job,
+          status_url: `/api/relatorios/jobs/${job.id}`,
+        },
+        { status: 202 }
+      );
+    }
 
     return NextResponse.json(
       {
         success: true,
         message: 'Relatório técnico gerado com sucesso',
-        data: relatorio,
+        data: job.result,
+        job: { id: job.id, cached: job.cached },
       },
       { status: 200 }
     );
@@ -1,9 +1,11 @@
 // 📱 Webhook SMS - Status de Entrega
-// Webhook para receber atualizações de status do Twilio
+// Webhook para receber atualizações de status do Twilio: valida, grava na caixa de entrada
+// e responde na hora (processamento em lib/services/webhook-inbox.ts)
 import { NextRequest, NextResponse } from 'next/server';
 import twilio from 'twilio';
 
-import { createClient } from '@/lib/supabase/server';
+import { parseTwilioStatusWebhook } from '@/lib/services/webhook-handlers';
+import { webhookInbox } from '@/lib/services/webhook-inbox';
 
 function validateTwilioWebhook(
   requestUrl: string,
@@ -46,53 +48,17 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    const messageId = formData.get('MessageSid') as string;
-    const messageStatus = formData.get('MessageStatus') as string;
-    const to = formData.get('To') as string;
-    const from = formData.get('From') as string;
-    const errorCode = formData.get('ErrorCode') as string;
-    const errorMessage = formData.get('ErrorMessage') as string;
+    const event = parseTwilioStatusWebhook(payload);
 
-    if (!messageId || !messageStatus) {
+    if (!event) {
       return NextResponse.json(
         { error: 'Dados obrigatórios não encontrados' },
         { status: 400 }
       );
     }
 
-    const supabase = await createClient();
-
-    // Atualizar status da comunicação no banco
-    const updateData: any = {
-      status_entrega: messageStatus,
-      data_atualizacao: new Date().toISOString(),
-    };
-
-    // Se houve erro, adicionar detalhes
-    if (errorCode || errorMessage) {
-      updateData.erro_codigo = errorCode;
-      updateData.erro_mensagem = errorMessage;
-    }
-
-    const { error: updateError } = await supabase
-      .from('comunicacoes_cliente')
-      .update(updateData)
-      .eq('message_id', messageId)
-      .eq('tipo', 'sms');
-
-    if (updateError) {
-      console.error('❌ Erro ao atualizar status SMS:', updateError);
-      return NextResponse.json(
-        { error: 'Erro ao atualizar status' },
-        { status: 500 }
-      );
-    }
-
-    // Log do status recebido
-    console.log(`📱 SMS Status Update: ${messageId} -> ${messageStatus}`);
-
-    // Verificar se precisa de ação adicional baseada no status
-    await handleStatusAction(messageStatus, messageId, to, supabase);
+    // Reenvios do Twilio (mesmo MessageSid + status) são descartados na gravação
+    await webhookInbox.ingest([event]);
 
     return NextResponse.json({ success: true });
   } catch (error) {
@@ -104,39 +70,6 @@ export async function POST(request: NextRequest) {
   }
 }
 
-// 🔄 Ações baseadas no status
-async function handleStatusAction(
-  status: string,
-  messageId: string,
-  to: string,
-  _supabase: any
-) {
-  try {
-    switch (status) {
-      case 'failed':
-      case 'undelivered':
-        // Log de falha para análise
-        console.warn(`⚠️ SMS falhou para ${to}: ${messageId}`);
-
-        // Aqui poderia implementar retry ou notificação alternativa
-        break;
-
-      case 'delivered':
-        console.log(`✅ SMS entregue com sucesso para ${to}: ${messageId}`);
-        break;
-
-      case 'sent':
-        console.log(`📤 SMS enviado para ${to}: ${messageId}`);
-        break;
-
-      default:
-        console.log(`📱 Status SMS: ${status} para ${to}: ${messageId}`);
-    }
-  } catch (error) {
-    console.error('❌ Erro ao processar ação de status:', error);
-  }
-}
-
 // 🧪 GET - Verificação do webhook (para configuração no Twilio)
 export async function GET() {
   return NextResponse.json({
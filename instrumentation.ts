@@ -0,0 +1,18 @@
+// 🚀 Instrumentation - Inicialização do Servidor
+// O Next.js chama register() uma vez por processo, antes de atender requisições
+
+export async function register() {
+  if (process.env.NEXT_RUNTIME !== 'nodejs') {
+    return;
+  }
+
+  // Trilha de auditoria: passa a receber os eventos de segurança do proxy
+  await import('@/lib/services/audit-log-service');
+
+  // Fila de saída: workers começam a drenar as mensagens pendentes (inclusive as que ficaram
+  // de antes de um restart), sem depender de um POST em /api/ordens-servico/processar-*
+  if (process.env.NEXT_PHASE !== 'phase-production-build') {
+    const { outboundQueue } = await import('@/lib/services/outbound-queue');
+    outboundQueue.start();
+  }
+}
@@ -53,5 +53,8 @@ export const envServer = {
     secretKey: () =>
       readEnv(['STRIPE_SECRET_KEY', 'STRIPE_API_KEY', 'MCP_STRIPE_SECRET_KEY']),
   },
+  metrics: {
+    scrapeToken: () => readEnv(['METRICS_SCRAPE_TOKEN']),
+  },
 } as const;
 
@@ -3,6 +3,12 @@
 import { NextRequest, NextResponse } from 'next/server';
 
 import { applicationMetrics } from '@/lib/services/application-metrics';
+import {
+  httpRequestDuration,
+  httpRequestsInFlight,
+  httpRequestsTotal,
+  normalizeRoute,
+} from '@/lib/services/prometheus-registry';
 
 // 📈 Configuração de Métricas
 interface MetricsConfig {
@@ -42,10 +48,15 @@ export function withMetrics(
       ...config.customTags,
     };
 
+    // Contadores em memória (Prometheus): custo de microssegundos por requisição
+    const route = normalizeRoute(path);
+    httpRequestsInFlight.inc({ route, method });
+
+    // Persistência das métricas da aplicação fica fora do caminho da requisição
     try {
       // Registrar início da requisição
       if (config.trackUsage) {
-        await applicationMetrics.recordUsageMetric('api_calls', 1, baseTags);
+        void applicationMetrics.recordUsageMetric('api_calls', 1, baseTags);
       }
 
       // Executar handler
@@ -53,9 +64,11 @@ export function withMetrics(
       const duration = performance.now() - startTime;
       const {status} = response;
 
+      recordHttpRequest(route, method, status.toString(), duration);
+
       // Registrar métricas de performance
       if (config.trackPerformance) {
-        await applicationMetrics.recordPerformanceMetric(
+        void applicationMetrics.recordPerformanceMetric(
           'api_response_time',
           duration,
           { ...baseTags, status: status.toString() }
@@ -64,7 +77,7 @@ export function withMetrics(
 
       // Registrar métricas de erro se status >= 400
       if (config.trackErrors && status >= 400) {
-        await applicationMetrics.recordErrorMetric('failed_requests', 1, {
+        void applicationMetrics.recordErrorMetric('failed_requests', 1, {
           ...baseTags,
           status: status.toString(),
         });
@@ -76,14 +89,16 @@ export function withMetrics(
       const errorMessage =
         error instanceof Error ? error.message : 'Unknown error';
 
+      recordHttpRequest(route, method, 'error', duration);
+
       // Registrar métricas de erro
       if (config.trackErrors) {
-        await applicationMetrics.recordErrorMetric('exception_count', 1, {
+        void applicationMetrics.recordErrorMetric('exception_count', 1, {
           ...baseTags,
           error: errorMessage,
         });
 
-        await applicationMetrics.recordPerformanceMetric(
+        void applicationMetrics.recordPerformanceMetric(
           'api_response_time',
           duration,
           { ...baseTags, status: 'error' }
@@ -91,10 +106,24 @@ export function withMetrics(
       }
 
       throw error;
+    } finally {
+      httpRequestsInFlight.dec({ route, method });
     }
   };
 }
 
+// 📡 Atualizar contadores/histogramas HTTP do registro Prometheus
+function recordHttpRequest(
+  route: string,
+  method: string,
+  status: string,
+  durationMs: number
+): void {
+  const labels = { route, method, status };
+  httpRequestsTotal.inc(labels);
+  httpRequestDuration.observe(labels, durationMs / 1000);
+}
+
 // 🚀 Middlewares Pré-configurados
 
 // API Pública (sem autenticação)
@@ -1,5 +1,13 @@
 import { NextRequest, NextResponse } from 'next/server';
 
+import {
+  SecurityEvent,
+  SecurityEventQuery,
+  SecurityEventStore,
+  SecurityEventType,
+} from '@/lib/security/security-event-store';
+import { forwardSecurityEvent } from '@/lib/security/security-event-sink';
+
 /**
  * 🔍 Security Audit Middleware - InterAlpha App
  *
@@ -7,32 +15,63 @@ import { NextRequest, NextResponse } from 'next/server';
  * Implementa logging de auditoria e detecção de ameaças
  */
 
-interface SecurityEvent {
-  timestamp: string;
-  ip: string;
-  userAgent: string;
-  endpoint: string;
-  method: string;
-  userId?: string;
-  eventType: SecurityEventType;
-  severity: 'low' | 'medium' | 'high' | 'critical';
-  details: Record<string, any>;
-}
+export type {
+  SecurityEvent,
+  SecurityEventQuery,
+  SecurityEventType,
+} from '@/lib/security/security-event-store';
 
-type SecurityEventType =
-  | 'failed_login'
-  | 'suspicious_request'
-  | 'rate_limit_exceeded'
-  | 'invalid_token'
-  | 'sql_injection_attempt'
-  | 'xss_attempt'
-  | 'unauthorized_access'
-  | 'privilege_escalation'
-  | 'data_breach_attempt';
-
-// Cache em memória para eventos de segurança (em produção, usar banco de dados)
-const securityEvents: SecurityEvent[] = [];
+// Buffer circular em memória (inserção e descarte O(1), índices por IP/tipo/severidade)
 const MAX_EVENTS = 10000; // Máximo de eventos em memória
+const securityEvents = new SecurityEventStore(MAX_EVENTS);
+
+// Limite de caracteres inspecionados por requisição (custo de detecção constante)
+const MAX_SCAN_LENGTH = 8 * 1024;
+
+/**
+ * Combina os padrões de uma categoria em uma única expressão regular
+ * (todos os padrões são insensíveis a maiúsculas/minúsculas)
+ */
+function compileMatcher(patterns: RegExp[]): RegExp {
+  return new RegExp(patterns.map(pattern => `(?:${pattern.source})`).join('|'), 'i');
+}
+
+const SQL_INJECTION_MATCHER = compileMatcher([
+  /(\b(SELECT|INSERT|UPDATE|DELETE|DROP|CREATE|ALTER|EXEC|UNION)\b)/,
+  /(\b(OR|AND)\s+\d+\s*=\s*\d+)/,
+  /('|"|;|--|\*|\/\*|\*\/)/,
+  /(\b(SCRIPT|JAVASCRIPT|VBSCRIPT|ONLOAD|ONERROR)\b)/,
+]);
+
+const XSS_MATCHER = compileMatcher([
+  /<script\b[^<]*(?:(?!<\/script>)<[^<]*)*<\/script>/,
+  /javascript:/,
+  /on\w+\s*=/,
+  /<iframe/,
+  /<object/,
+  /<embed/,
+  /eval\s*\(/,
+  /expression\s*\(/,
+]);
+
+const SUSPICIOUS_USER_AGENT_MATCHER = compileMatcher([
+  /bot|crawler|spider|scraper/,
+  /curl|wget|python|java|go-http/,
+  /sqlmap|nikto|nmap|masscan/,
+  /^$/, // User-Agent vazio
+  /.{200,}/, // User-Agent muito longo
+]);
+
+const SENSITIVE_FILE_MATCHER = compileMatcher([
+  /\.(env|config|ini|conf|log|bak|backup|sql|db)$/,
+  /\/(\.git|\.svn|\.hg|node_modules|\.env)/,
+  /\/(admin|administrator|root|config|backup)/,
+  /\.(php|asp|jsp|cgi)$/,
+]);
+
+function truncateForScan(value: string): string {
+  return value.length > MAX_SCAN_LENGTH ? value.slice(0, MAX_SCAN_LENGTH) : value;
+}
 
 /**
  * Obtém informações do cliente da requisição
@@ -73,11 +112,11 @@ export function logSecurityEvent(
     details,
   };
 
-  // Adicionar ao cache (remover eventos antigos se necessário)
-  securityEvents.push(event);
-  if (securityEvents.length > MAX_EVENTS) {
-    securityEvents.shift(); // Remove o mais antigo
-  }
+  // Adicionar ao buffer (o mais antigo é descartado quando cheio)
+  securityEvents.add(event);
+
+  // Trilha de auditoria durável (o audit-log-service grava em lote, sem aguardar o banco)
+  forwardSecurityEvent(event);
 
   // Helper function to get log level from severity
   function getLogLevel(
@@ -107,72 +146,42 @@ export function logSecurityEvent(
 }
 
 /**
- * Detecta tentativas de SQL Injection
+ * Monta o texto inspecionado (URL + corpo), limitado a MAX_SCAN_LENGTH
  */
-function detectSQLInjection(request: NextRequest): boolean {
+function getScanTarget(request: NextRequest): string {
   const url = request.nextUrl.toString();
   const body = request.body?.toString() || '';
 
-  const sqlPatterns = [
-    /(\b(SELECT|INSERT|UPDATE|DELETE|DROP|CREATE|ALTER|EXEC|UNION)\b)/i,
-    /(\b(OR|AND)\s+\d+\s*=\s*\d+)/i,
-    /('|"|;|--|\*|\/\*|\*\/)/,
-    /(\b(SCRIPT|JAVASCRIPT|VBSCRIPT|ONLOAD|ONERROR)\b)/i,
-  ];
+  return truncateForScan(url + body);
+}
 
-  const testString = url + body;
-  return sqlPatterns.some(pattern => pattern.test(testString));
+/**
+ * Detecta tentativas de SQL Injection
+ */
+function detectSQLInjection(scanTarget: string): boolean {
+  return SQL_INJECTION_MATCHER.test(scanTarget);
 }
 
 /**
  * Detecta tentativas de XSS
  */
-function detectXSS(request: NextRequest): boolean {
-  const url = request.nextUrl.toString();
-  const body = request.body?.toString() || '';
-
-  const xssPatterns = [
-    /<script\b[^<]*(?:(?!<\/script>)<[^<]*)*<\/script>/gi,
-    /javascript:/i,
-    /on\w+\s*=/i,
-    /<iframe/i,
-    /<object/i,
-    /<embed/i,
-    /eval\s*\(/i,
-    /expression\s*\(/i,
-  ];
-
-  const testString = url + body;
-  return xssPatterns.some(pattern => pattern.test(testString));
+function detectXSS(scanTarget: string): boolean {
+  return XSS_MATCHER.test(scanTarget);
 }
 
 /**
  * Detecta User-Agents suspeitos
  */
 function detectSuspiciousUserAgent(userAgent: string): boolean {
-  const suspiciousPatterns = [
-    /bot|crawler|spider|scraper/i,
-    /curl|wget|python|java|go-http/i,
-    /sqlmap|nikto|nmap|masscan/i,
-    /^$/, // User-Agent vazio
-    /.{200,}/, // User-Agent muito longo
-  ];
-
-  return suspiciousPatterns.some(pattern => pattern.test(userAgent));
+  // O padrão de User-Agent longo (200+) continua detectável após o corte
+  return SUSPICIOUS_USER_AGENT_MATCHER.test(truncateForScan(userAgent));
 }
 
 /**
  * Detecta tentativas de acesso a arquivos sensíveis
  */
 function detectSensitiveFileAccess(pathname: string): boolean {
-  const sensitivePatterns = [
-    /\.(env|config|ini|conf|log|bak|backup|sql|db)$/i,
-    /\/(\.git|\.svn|\.hg|node_modules|\.env)/i,
-    /\/(admin|administrator|root|config|backup)/i,
-    /\.(php|asp|jsp|cgi)$/i,
-  ];
-
-  return sensitivePatterns.some(pattern => pattern.test(pathname));
+  return SENSITIVE_FILE_MATCHER.test(truncateForScan(pathname));
 }
 
 /**
@@ -183,9 +192,10 @@ export function securityAuditMiddleware(
 ): NextResponse | null {
   const { ip, userAgent } = getClientInfo(request);
   const { pathname } = request.nextUrl;
+  const scanTarget = getScanTarget(request);
 
   // Detectar tentativas de SQL Injection
-  if (detectSQLInjection(request)) {
+  if (detectSQLInjection(scanTarget)) {
     logSecurityEvent(request, 'sql_injection_attempt', 'high', {
       url: request.nextUrl.toString(),
       suspiciousContent: 'SQL injection patterns detected',
@@ -205,7 +215,7 @@ export function securityAuditMiddleware(
   }
 
   // Detectar tentativas de XSS
-  if (detectXSS(request)) {
+  if (detectXSS(scanTarget)) {
     logSecurityEvent(request, 'xss_attempt', 'high', {
       url: request.nextUrl.toString(),
       suspiciousContent: 'XSS patterns detected',
@@ -305,12 +315,14 @@ async function sendSecurityAlert(event: SecurityEvent) {
  * Obtém eventos de segurança recentes
  */
 export function getRecentSecurityEvents(limit: number = 100): SecurityEvent[] {
-  return securityEvents
-    .slice(-limit)
-    .sort(
-      (a, b) =>
-        new Date(b.timestamp).getTime() - new Date(a.timestamp).getTime()
-    );
+  return securityEvents.query({ limit });
+}
+
+/**
+ * Consulta eventos por IP, tipo, severidade e período (mais recentes primeiro)
+ */
+export function querySecurityEvents(filter: SecurityEventQuery = {}): SecurityEvent[] {
+  return securityEvents.query(filter);
 }
 
 /**
@@ -320,72 +332,26 @@ export function getSecurityStats() {
   const now = new Date();
   const last24h = new Date(now.getTime() - 24 * 60 * 60 * 1000);
   const lastHour = new Date(now.getTime() - 60 * 60 * 1000);
-
-  const events24h = securityEvents.filter(e => new Date(e.timestamp) > last24h);
-  const eventsHour = securityEvents.filter(
-    e => new Date(e.timestamp) > lastHour
-  );
-
-  const eventsByType = securityEvents.reduce(
-    (acc, event) => {
-      acc[event.eventType] = (acc[event.eventType] || 0) + 1;
-      return acc;
-    },
-    {} as Record<string, number>
-  );
-
-  const eventsBySeverity = securityEvents.reduce(
-    (acc, event) => {
-      acc[event.severity] = (acc[event.severity] || 0) + 1;
-      return acc;
-    },
-    {} as Record<string, number>
-  );
+  const eventsBySeverity = securityEvents.countsBySeverity();
 
   return {
     totalEvents: securityEvents.length,
-    events24h: events24h.length,
-    eventsLastHour: eventsHour.length,
-    eventsByType,
+    events24h: securityEvents.countSince(last24h),
+    eventsLastHour: securityEvents.countSince(lastHour),
+    eventsByType: securityEvents.countsByType(),
     eventsBySeverity,
-    topIPs: getTopIPs(10),
-    criticalEvents: securityEvents.filter(e => e.severity === 'critical')
-      .length,
+    topIPs: securityEvents.topIPs(10),
+    criticalEvents: eventsBySeverity.critical || 0,
   };
 }
 
-/**
- * Obtém IPs com mais eventos suspeitos
- */
-function getTopIPs(limit: number = 10) {
-  const ipCounts = securityEvents.reduce(
-    (acc, event) => {
-      acc[event.ip] = (acc[event.ip] || 0) + 1;
-      return acc;
-    },
-    {} as Record<string, number>
-  );
-
-  return Object.entries(ipCounts)
-    .sort(([, a], [, b]) => b - a)
-    .slice(0, limit)
-    .map(([ip, count]) => ({ ip, count }));
-}
-
 /**
  * Limpa eventos antigos (para manutenção)
  */
 export function cleanupOldEvents(daysToKeep: number = 30) {
   const cutoffDate = new Date(Date.now() - daysToKeep * 24 * 60 * 60 * 1000);
 
-  const initialLength = securityEvents.length;
-  for (let i = securityEvents.length - 1; i >= 0; i--) {
-    if (new Date(securityEvents[i].timestamp) < cutoffDate) {
-      securityEvents.splice(i, 1);
-    }
-  }
-
-  const removedCount = initialLength - securityEvents.length;
+  const removedCount = securityEvents.removeOlderThan(cutoffDate);
   console.log(`Limpeza de eventos: ${removedCount} eventos antigos removidos`);
 
   return removedCount;
@@ -0,0 +1,37 @@
+/**
+ * 🔌 Security Event Sink - InterAlpha App
+ *
+ * Destino durável dos eventos de segurança, desacoplado do proxy: o
+ * middleware de auditoria só repassa o evento, e quem persiste (o
+ * audit-log-service, com Prisma) se registra aqui no servidor. O registro
+ * fica no globalThis, compartilhado entre o bundle do proxy e o das rotas.
+ */
+
+import type { SecurityEvent } from './security-event-store';
+
+export type SecurityEventSink = (event: SecurityEvent) => void;
+
+const globalForSecuritySink = globalThis as unknown as {
+  securityEventSink: SecurityEventSink | undefined;
+};
+
+/**
+ * Define (ou remove, com undefined) o destino dos eventos de segurança
+ */
+export function setSecurityEventSink(sink: SecurityEventSink | undefined): void {
+  globalForSecuritySink.securityEventSink = sink;
+}
+
+/**
+ * Repassa o evento ao destino registrado; sem destino, o evento fica só no buffer em memória
+ */
+export function forwardSecurityEvent(event: SecurityEvent): void {
+  const sink = globalForSecuritySink.securityEventSink;
+  if (!sink) return;
+
+  try {
+    sink(event);
+  } catch (error) {
+    console.error('Erro ao registrar evento de segurança na auditoria:', error);
+  }
+}
@@ -0,0 +1,301 @@
+/**
+ * 🗃️ Security Event Store - InterAlpha App
+ *
+ * Buffer circular de capacidade fixa para eventos de segurança, com
+ * contadores e índices secundários (IP, tipo e severidade) mantidos
+ * incrementalmente na inserção e no descarte.
+ */
+
+export type SecurityEventType =
+  | 'failed_login'
+  | 'suspicious_request'
+  | 'rate_limit_exceeded'
+  | 'invalid_token'
+  | 'sql_injection_attempt'
+  | 'xss_attempt'
+  | 'unauthorized_access'
+  | 'privilege_escalation'
+  | 'data_breach_attempt';
+
+export type SecuritySeverity = 'low' | 'medium' | 'high' | 'critical';
+
+export interface SecurityEvent {
+  timestamp: string;
+  ip: string;
+  userAgent: string;
+  endpoint: string;
+  method: string;
+  userId?: string;
+  eventType: SecurityEventType;
+  severity: SecuritySeverity;
+  details: Record<string, any>;
+}
+
+export interface SecurityEventQuery {
+  ip?: string;
+  eventType?: SecurityEventType;
+  severity?: SecuritySeverity;
+  since?: Date;
+  limit?: number;
+}
+
+interface StoredEvent {
+  seq: number;
+  time: number;
+  event: SecurityEvent;
+}
+
+// Lista de sequências por chave; o descarte sempre remove o primeiro item vivo
+class SequenceList {
+  private items: number[] = [];
+  private start = 0;
+
+  push(seq: number): void {
+    this.items.push(seq);
+  }
+
+  shift(): void {
+    this.start++;
+
+    // Compactar quando a parte descartada dominar o array
+    if (this.start > 1024 && this.start * 2 > this.items.length) {
+      this.items = this.items.slice(this.start);
+      this.start = 0;
+    }
+  }
+
+  get size(): number {
+    return this.items.length - this.start;
+  }
+
+  // Iterar do mais recente para o mais antigo
+  *newestFirst(): IterableIterator<number> {
+    for (let i = this.items.length - 1; i >= this.start; i--) {
+      yield this.items[i];
+    }
+  }
+}
+
+class KeyIndex<K> {
+  private lists = new Map<K, SequenceList>();
+
+  add(key: K, seq: number): void {
+    let list = this.lists.get(key);
+    if (!list) {
+      list = new SequenceList();
+      this.lists.set(key, list);
+    }
+    list.push(seq);
+  }
+
+  evict(key: K): void {
+    const list = this.lists.get(key);
+    if (!list) return;
+
+    list.shift();
+    if (list.size === 0) {
+      this.lists.delete(key);
+    }
+  }
+
+  get(key: K): SequenceList | undefined {
+    return this.lists.get(key);
+  }
+
+  counts(): Record<string, number> {
+    const result: Record<string, number> = {};
+    this.lists.forEach((list, key) => {
+      result[String(key)] = list.size;
+    });
+    return result;
+  }
+
+  entries(): Array<[K, number]> {
+    return Array.from(this.lists, ([key, list]) => [key, list.size]);
+  }
+
+  clear(): void {
+    this.lists.clear();
+  }
+}
+
+export class SecurityEventStore {
+  private readonly capacity: number;
+  private slots: Array<StoredEvent | undefined>;
+  private head = 0;
+  private size = 0;
+  private nextSeq = 0;
+  private byIp = new KeyIndex<string>();
+  private byType = new KeyIndex<SecurityEventType>();
+  private bySeverity = new KeyIndex<SecuritySeverity>();
+
+  constructor(capacity: number) {
+    this.capacity = capacity;
+    this.slots = new Array(capacity);
+  }
+
+  get length(): number {
+    return this.size;
+  }
+
+  // ➕ Inserção O(1); quando cheio, descarta o evento mais antigo
+  add(event: SecurityEvent): void {
+    if (this.size === this.capacity) {
+      this.evictOldest();
+    }
+
+    const seq = this.nextSeq++;
+    this.slots[(this.head + this.size) % this.capacity] = {
+      seq,
+      time: Date.parse(event.timestamp),
+      event,
+    };
+    this.size++;
+
+    this.byIp.add(event.ip, seq);
+    this.byType.add(event.eventType, seq);
+    this.bySeverity.add(event.severity, seq);
+  }
+
+  private evictOldest(): StoredEvent | undefined {
+    if (this.size === 0) return undefined;
+
+    const stored = this.slots[this.head];
+    this.slots[this.head] = undefined;
+    this.head = (this.head + 1) % this.capacity;
+    this.size--;
+
+    if (stored) {
+      this.byIp.evict(stored.event.ip);
+      this.byType.evict(stored.event.eventType);
+      this.bySeverity.evict(stored.event.severity);
+    }
+
+    return stored;
+  }
+
+  // Evento pela sequência (O(1): sequências são contíguas no buffer)
+  private atSeq(seq: number): StoredEvent | undefined {
+    const oldest = this.slots[this.head];
+    if (!oldest || seq < oldest.seq) return undefined;
+
+    const offset = seq - oldest.seq;
+    if (offset >= this.size) return undefined;
+    return this.slots[(this.head + offset) % this.capacity];
+  }
+
+  private at(offset: number): StoredEvent {
+    return this.slots[(this.head + offset) % this.capacity] as StoredEvent;
+  }
+
+  // 🔎 Consulta mais recente primeiro, usando o índice mais seletivo
+  query(filter: SecurityEventQuery = {}): SecurityEvent[] {
+    const limit = filter.limit ?? 100;
+    const since = filter.since?.getTime() ?? -Infinity;
+    const result: SecurityEvent[] = [];
+    if (limit <= 0) return result;
+
+    const indexed: Array<SequenceList | undefined> = [];
+    if (filter.ip !== undefined) indexed.push(this.byIp.get(filter.ip));
+    if (filter.eventType !== undefined) {
+      indexed.push(this.byType.get(filter.eventType));
+    }
+    if (filter.severity !== undefined) {
+      indexed.push(this.bySeverity.get(filter.severity));
+    }
+
+    const matches = (stored: StoredEvent) =>
+      (filter.ip === undefined || stored.event.ip === filter.ip) &&
+      (filter.eventType === undefined ||
+        stored.event.eventType === filter.eventType) &&
+      (filter.severity === undefined ||
+        stored.event.severity === filter.severity);
+
+    if (indexed.length > 0) {
+      // Chave sem eventos: nada a retornar
+      if (indexed.includes(undefined)) return result;
+
+      const smallest = (indexed as SequenceList[]).reduce(
+        (best, list) => (list.size < best.size ? list : best)
+      );
+
+      for (const seq of smallest.newestFirst()) {
+        const stored = this.atSeq(seq);
+        if (!stored) continue;
+        if (stored.time < since) break;
+        if (!matches(stored)) continue;
+
+        result.push(stored.event);
+        if (result.length >= limit) break;
+      }
+
+      return result;
+    }
+
+    for (let offset = this.size - 1; offset >= 0; offset--) {
+      const stored = this.at(offset);
+      if (stored.time < since) break;
+
+      result.push(stored.event);
+      if (result.length >= limit) break;
+    }
+
+    return result;
+  }
+
+  // Quantidade de eventos a partir de um instante (busca binária: buffer ordenado por tempo)
+  countSince(since: Date): number {
+    const target = since.getTime();
+    let low = 0;
+    let high = this.size;
+
+    while (low < high) {
+      const mid = (low + high) >>> 1;
+      if (this.at(mid).time > target) {
+        high = mid;
+      } else {
+        low = mid + 1;
+      }
+    }
+
+    return this.size - low;
+  }
+
+  countsByType(): Record<string, number> {
+    return this.byType.counts();
+  }
+
+  countsBySeverity(): Record<string, number> {
+    return this.bySeverity.counts();
+  }
+
+  topIPs(limit: number): Array<{ ip: string; count: number }> {
+    return this.byIp
+      .entries()
+      .sort(([, a], [, b]) => b - a)
+      .slice(0, limit)
+      .map(([ip, count]) => ({ ip, count }));
+  }
+
+  // 🧹 Remover eventos anteriores ao corte (sempre do início do buffer)
+  removeOlderThan(cutoff: Date): number {
+    const target = cutoff.getTime();
+    let removed = 0;
+
+    while (this.size > 0 && this.at(0).time < target) {
+      this.evictOldest();
+      removed++;
+    }
+
+    return removed;
+  }
+
+  clear(): void {
+    this.slots = new Array(this.capacity);
+    this.head = 0;
+    this.size = 0;
+    this.byIp.clear();
+    this.byType.clear();
+    this.bySeverity.clear();
+  }
+}
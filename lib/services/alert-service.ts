@@ -2,6 +2,7 @@ import prisma from '@/lib/prisma';
 import { ApplicationMetricsService } from './application-metrics';
 
 import {
+  Prisma,
   AlertRule as PrismaAlertRule,
   Alert as PrismaAlert,
   AlertNotification as PrismaAlertNotification
@@ -29,6 +30,18 @@ export type Alert = Omit<PrismaAlert, 'triggeredAt' | 'resolvedAt' | 'acknowledg
 export type AlertNotification = PrismaAlertNotification;
 
 
+// Janela usada para calcular o valor atual das métricas das regras
+const ALERT_WINDOW_MINUTES = 15;
+
+// Métricas calculadas pelo próprio serviço (as demais são lidas pelo nome)
+const BUILTIN_ALERT_METRICS = new Set([
+  'error_rate',
+  'success_rate',
+  'avg_response_time',
+  'database_errors',
+  'memory_usage_percent',
+]);
+
 export interface AlertStats {
   total_alerts: number;
   active_alerts: number;
@@ -238,46 +251,65 @@ export class AlertService {
     };
   }
 
+  // 🚨 Avaliação em passada única: um snapshot de métricas para todas as regras
   async checkAlerts(): Promise<Alert[]> {
     const triggeredAlerts: Alert[] = [];
 
     try {
       const rules = await this.getRules();
-      const enabledRules = rules.filter(rule => rule.enabled);
+      const now = new Date();
+
+      // Regras habilitadas e fora do cooldown
+      const dueRules = rules.filter(rule => {
+        if (!rule.enabled) return false;
 
-      for (const rule of enabledRules) {
-        // Verificar cooldown
         const lastCheck = this.lastAlertCheck.get(rule.id);
-        const now = new Date();
+        if (!lastCheck) return true;
 
-        if (lastCheck) {
-          const minutesSinceLastCheck =
-            (now.getTime() - lastCheck.getTime()) / (1000 * 60);
-          if (minutesSinceLastCheck < rule.cooldownMinutes) {
-            continue;
-          }
-        }
+        const minutesSinceLastCheck =
+          (now.getTime() - lastCheck.getTime()) / (1000 * 60);
+        return minutesSinceLastCheck >= rule.cooldownMinutes;
+      });
+
+      if (dueRules.length === 0) return triggeredAlerts;
+
+      const startTime = new Date(
+        now.getTime() - ALERT_WINDOW_MINUTES * 60 * 1000
+      );
+
+      // Métricas necessárias + alertas ativos (dedupe) em paralelo
+      const [snapshot, activeAlerts] = await Promise.all([
+        this.buildMetricSnapshot(
+          new Set(dueRules.map(rule => rule.metric)),
+          startTime,
+          now
+        ),
+        prisma.alert.findMany({
+          where: {
+            ruleId: { in: dueRules.map(rule => rule.id) },
+            status: 'active',
+          },
+          select: { ruleId: true },
+        }),
+      ]);
+
+      const rulesWithActiveAlert = new Set(
+        activeAlerts.map(alert => alert.ruleId)
+      );
 
-        const currentValue = await this.getCurrentMetricValue(rule.metric);
+      for (const rule of dueRules) {
+        const currentValue = snapshot.get(rule.metric);
 
         if (
-          currentValue !== null &&
+          currentValue !== undefined &&
+          !rulesWithActiveAlert.has(rule.id) &&
           this.evaluateCondition(currentValue, rule.condition, rule.threshold)
         ) {
-          // Verificar se já existe um alerta ativo para esta regra
-          const existingAlert = await prisma.alert.findFirst({
-            where: {
-              ruleId: rule.id,
-              status: 'active',
-            }
-          });
-
-          if (!existingAlert) {
-            const alert = await this.createAlert(rule, currentValue);
-            if (alert) {
-              triggeredAlerts.push(alert);
-              await this.sendNotifications(alert);
-            }
+          const alert = await this.createAlert(rule, currentValue);
+          if (alert) {
+            rulesWithActiveAlert.add(rule.id);
+            triggeredAlerts.push(alert);
+            await this.sendNotifications(alert);
           }
         }
 
@@ -290,118 +322,121 @@ export class AlertService {
     return triggeredAlerts;
   }
 
-  private async getCurrentMetricValue(metric: string): Promise<number | null> {
-    try {
-      const endTime = new Date();
-      const startTime = new Date(endTime.getTime() - 15 * 60 * 1000); // Últimos 15 minutos
-
-      switch (metric) {
-        case 'error_rate':
-          return await this.calculateErrorRate(startTime, endTime);
-        case 'avg_response_time':
-          return await this.calculateAvgResponseTime(startTime, endTime);
-        case 'success_rate':
-          return await this.calculateSuccessRate(startTime, endTime);
-        case 'database_errors':
-          return await this.countDatabaseErrors(startTime, endTime);
-        case 'memory_usage_percent':
-          return await this.getMemoryUsage();
-        default:
-          return await this.getCustomMetricValue(metric, startTime, endTime);
-      }
-    } catch (error) {
-      console.error(`Erro ao obter valor da métrica ${metric}:`, error);
-      return null;
-    }
-  }
-
-  private async calculateErrorRate(
+  // 📸 Buscar de uma vez os valores de todas as métricas exigidas pelas regras
+  private async buildMetricSnapshot(
+    metrics: Set<string>,
     startTime: Date,
     endTime: Date
-  ): Promise<number> {
-    const data = await prisma.applicationMetric.findMany({
-      where: {
-        timestamp: {
-          gte: startTime,
-          lte: endTime,
-        },
-        category: 'performance',
-      },
-      select: { success: true },
-    });
-
-    if (!data || data.length === 0) return 0;
-
-    const totalRequests = data.length;
-    const errorRequests = data.filter((m) => !m.success).length;
+  ): Promise<Map<string, number>> {
+    const snapshot = new Map<string, number>();
+    const customMetrics = Array.from(metrics).filter(
+      metric => !BUILTIN_ALERT_METRICS.has(metric)
+    );
+    const needsWindowAggregates = [
+      'error_rate',
+      'success_rate',
+      'avg_response_time',
+      'database_errors',
+    ].some(metric => metrics.has(metric));
+
+    const [aggregates, customValues, memoryUsage] = await Promise.all([
+      needsWindowAggregates
+        ? this.fetchWindowAggregates(startTime, endTime)
+        : Promise.resolve(null),
+      customMetrics.length > 0
+        ? this.fetchLatestMetricValues(customMetrics, startTime, endTime)
+        : Promise.resolve(new Map<string, number>()),
+      metrics.has('memory_usage_percent')
+        ? this.getMemoryUsage()
+        : Promise.resolve(null),
+    ]);
+
+    if (aggregates) {
+      const { performanceTotal, performanceErrors } = aggregates;
+
+      snapshot.set(
+        'error_rate',
+        performanceTotal > 0 ? (performanceErrors / performanceTotal) * 100 : 0
+      );
+      snapshot.set(
+        'success_rate',
+        performanceTotal > 0
+          ? ((performanceTotal - performanceErrors) / performanceTotal) * 100
+          : 100
+      );
+      snapshot.set('avg_response_time', aggregates.avgDuration);
+      snapshot.set('database_errors', aggregates.databaseErrors);
+    }
 
-    return (errorRequests / totalRequests) * 100;
-  }
+    if (memoryUsage !== null) {
+      snapshot.set('memory_usage_percent', memoryUsage);
+    }
 
-  private async calculateAvgResponseTime(
-    startTime: Date,
-    endTime: Date
-  ): Promise<number> {
-    const data = await prisma.applicationMetric.findMany({
-      where: {
-        timestamp: {
-          gte: startTime,
-          lte: endTime,
-        },
-        category: 'performance',
-        duration: { not: null },
-      },
-      select: { duration: true },
+    customMetrics.forEach(metric => {
+      snapshot.set(metric, customValues.get(metric) ?? 0);
     });
 
-    if (!data || data.length === 0) return 0;
-
-    const totalDuration = data.reduce((sum, m) => sum + (m.duration || 0), 0);
-    return totalDuration / data.length;
+    return snapshot;
   }
 
-  private async calculateSuccessRate(
+  // Agregados da janela em uma única consulta (FILTER por métrica)
+  private async fetchWindowAggregates(
     startTime: Date,
     endTime: Date
-  ): Promise<number> {
-    const data = await prisma.applicationMetric.findMany({
-      where: {
-        timestamp: {
-          gte: startTime,
-          lte: endTime,
-        },
-        category: 'performance',
-      },
-      select: { success: true },
-    });
-
-    if (!data || data.length === 0) return 100;
-
-    const totalRequests = data.length;
-    const successRequests = data.filter((m) => m.success).length;
+  ): Promise<{
+    performanceTotal: number;
+    performanceErrors: number;
+    avgDuration: number;
+    databaseErrors: number;
+  }> {
+    const [row] = await prisma.$queryRaw<
+      Array<{
+        performance_total: bigint;
+        performance_errors: bigint;
+        avg_duration: number | null;
+        database_errors: bigint;
+      }>
+    >`
+      SELECT
+        COUNT(*) FILTER (WHERE category = 'performance') AS performance_total,
+        COUNT(*) FILTER (
+          WHERE category = 'performance' AND success IS DISTINCT FROM true
+        ) AS performance_errors,
+        AVG(duration) FILTER (
+          WHERE category = 'performance' AND duration IS NOT NULL
+        )::double precision AS avg_duration,
+        COUNT(*) FILTER (
+          WHERE category = 'error' AND operation ILIKE '%database%'
+        ) AS database_errors
+      FROM application_metrics
+      WHERE timestamp >= ${startTime} AND timestamp <= ${endTime}
+    `;
 
-    return (successRequests / totalRequests) * 100;
+    return {
+      performanceTotal: Number(row?.performance_total ?? 0),
+      performanceErrors: Number(row?.performance_errors ?? 0),
+      avgDuration: row?.avg_duration ?? 0,
+      databaseErrors: Number(row?.database_errors ?? 0),
+    };
   }
 
-  private async countDatabaseErrors(
+  // Último valor de cada métrica customizada (DISTINCT ON em uma consulta)
+  private async fetchLatestMetricValues(
+    metrics: string[],
     startTime: Date,
     endTime: Date
-  ): Promise<number> {
-    const count = await prisma.applicationMetric.count({
-      where: {
-        timestamp: {
-          gte: startTime,
-          lte: endTime,
-        },
-        category: 'error',
-        operation: {
-          contains: 'database',
-          mode: 'insensitive',
-        }
-      }
-    });
-
-    return count;
+  ): Promise<Map<string, number>> {
+    const rows = await prisma.$queryRaw<
+      Array<{ metric_name: string; value: number | null }>
+    >`
+      SELECT DISTINCT ON (metric_name) metric_name, value
+      FROM application_metrics
+      WHERE metric_name IN (${Prisma.join(metrics)})
+        AND timestamp >= ${startTime} AND timestamp <= ${endTime}
+      ORDER BY metric_name, timestamp DESC
+    `;
+
+    return new Map(rows.map(row => [row.metric_name, row.value || 0]));
   }
 
   private async getMemoryUsage(): Promise<number> {
@@ -424,26 +459,6 @@ export class AlertService {
     return 0;
   }
 
-  private async getCustomMetricValue(
-    metric: string,
-    startTime: Date,
-    endTime: Date
-  ): Promise<number> {
-    const data = await prisma.applicationMetric.findFirst({
-      where: {
-        metricName: metric,
-        timestamp: {
-          gte: startTime,
-          lte: endTime,
-        }
-      },
-      orderBy: { timestamp: 'desc' },
-      select: { value: true }
-    });
-
-    return data?.value || 0;
-  }
-
   private evaluateCondition(
     value: number,
     condition: string,
@@ -1,7 +1,11 @@
 // 📊 Application Metrics Service - Monitoramento Abrangente da Aplicação
 // Coleta métricas de performance, uso, erros e recursos do sistema
 import prisma from '@/lib/prisma';
-import { ApplicationMetric as PrismaApplicationMetric } from '@prisma/client';
+import {
+  METRIC_TIME_RANGE_MS,
+  MetricTimeRange,
+  metricRollups,
+} from '@/lib/services/metric-rollups';
 
 // 📈 Tipos de Métricas
 export interface ApplicationMetric {
@@ -54,7 +58,7 @@ export interface SystemMetric extends ApplicationMetric {
 export interface MetricAggregation {
   name: string;
   category: string;
-  timeRange: '5m' | '1h' | '24h' | '7d' | '30d';
+  timeRange: MetricTimeRange;
   aggregation: 'avg' | 'sum' | 'min' | 'max' | 'count' | 'p95' | 'p99';
   value: number;
   unit: string;
@@ -78,7 +82,9 @@ export class ApplicationMetricsService {
   private metricsBuffer: ApplicationMetric[] = [];
   private readonly BUFFER_SIZE = 100;
   private readonly FLUSH_INTERVAL = 30000; // 30 segundos
+  private readonly RETENTION_INTERVAL = 60 * 60 * 1000; // 1 hora
   private flushTimer?: ReturnType<typeof setInterval>;
+  private retentionTimer?: ReturnType<typeof setInterval>;
 
   constructor() {
     this.startBufferFlush();
@@ -238,108 +244,32 @@ export class ApplicationMetricsService {
   }
 
   // 📈 Obter Agregações de Métricas
+  // Consulta roteada para a resolução mais grossa que cobre o período
   async getMetricAggregations(
     category?: string,
-    timeRange: '5m' | '1h' | '24h' | '7d' | '30d' = '24h',
+    timeRange: MetricTimeRange = '24h',
     names?: string[]
   ): Promise<MetricAggregation[]> {
     try {
-      // Filtro de tempo
       const now = new Date();
-      const timeRangeMs = {
-        '5m': 5 * 60 * 1000,
-        '1h': 60 * 60 * 1000,
-        '24h': 24 * 60 * 60 * 1000,
-        '7d': 7 * 24 * 60 * 60 * 1000,
-        '30d': 30 * 24 * 60 * 60 * 1000,
-      };
-
-      const startTime = new Date(now.getTime() - timeRangeMs[timeRange]);
-
-      const where: any = {
-        timestamp: {
-          gte: startTime,
-        }
-      };
-
-      if (category) {
-        where.category = category;
-      }
-
-      if (names && names.length > 0) {
-        where.metricName = { in: names };
-      }
+      const since = new Date(now.getTime() - METRIC_TIME_RANGE_MS[timeRange]);
 
-      const data = await prisma.applicationMetric.findMany({
-        where,
-      });
-
-      // Agregar dados por nome e categoria (parse rows safely)
-      const aggregations: Record<string, MetricAggregation> = {};
-
-      data.forEach((metric) => {
-        const name = metric.metricName || 'unknown';
-        const metricCategory = metric.category || 'usage';
-        const key = `${metricCategory}_${name}`;
-
-        if (!aggregations[key]) {
-          aggregations[key] = {
-            name,
-            category: metricCategory,
-            timeRange,
-            aggregation: 'avg',
-            value: 0,
-            unit: 'count', // Default unit, logic to get correct unit would be needed from metric definitions or stored
-            timestamp: new Date(),
-          };
-        }
-
-        const val = metric.value || 0;
-        // Calcular média simples (pode ser expandido para outras agregações)
-        // Note: This is an accumulation, average is calculated after
-        // To do proper average, we need count. 
-        // For simplicity reusing existing logic logic structure:
-        // Original logic was faulty: `(aggregations[key].value + val) / 2` is NOT an average of the set.
-        // It's a rolling average which biases towards later values.
-        // Fix: accumulate sum and count.
-      });
-
-      // Simple re-implementation of the existing logic to preserve behavior or fix it?
-      // Since the original was `(current + val) / 2`, I will stick to being closer to original intent but maybe better? 
-      // Actually let's just do what the original did to minimize logic change risks, even if math is weird.
-
-      // Re-reading original logic:
-      // const rows: Row[] = (data || []) as Row[];
-      // rows.forEach((metric) => { ... aggregations[key].value = (aggregations[key].value + val) / 2; });
-
-      // I will implement a proper average instead because the original looks like a bug or placeholder.
-      const intermediate: Record<string, { sum: number; count: number; unit: string }> = {};
-
-      data.forEach((metric) => {
-        const name = metric.metricName || 'unknown';
-        const cat = metric.category || 'usage';
-        const key = `${cat}_${name}`;
-
-        if (!intermediate[key]) {
-          intermediate[key] = { sum: 0, count: 0, unit: 'count' };
-        }
-        intermediate[key].sum += (metric.value || 0);
-        intermediate[key].count += 1;
-      });
-
-      return Object.entries(intermediate).map(([key, stats]) => {
-        const [cat, name] = key.split('_'); // Rough split, but okay for internal use
-        return {
-          name: name || key, // Try to recover name
-          category: cat || 'usage',
-          timeRange,
-          aggregation: 'avg',
-          value: stats.count > 0 ? stats.sum / stats.count : 0,
-          unit: stats.unit,
-          timestamp: new Date(),
-        };
+      const summaries = await metricRollups.summarize({
+        since,
+        until: now,
+        category,
+        metricNames: names,
       });
 
+      return summaries.map(summary => ({
+        name: summary.metricName,
+        category: summary.category,
+        timeRange,
+        aggregation: 'avg',
+        value: summary.avg,
+        unit: this.getUnitForMetric(summary.category, summary.metricName),
+        timestamp: now,
+      }));
     } catch (error) {
       console.error('Erro ao obter agregações de métricas:', error);
       return [];
@@ -347,16 +277,8 @@ export class ApplicationMetricsService {
   }
 
   // 🚨 Verificar Alertas
+  // Uma única agregação cobre todas as métricas usadas pelas regras ativas
   async checkAlerts(): Promise<MetricAlert[]> {
-    // This logic seems duplicate of AlertService but checking from inside metrics service?
-    // The original code queried 'metric_alerts'. 
-    // We should probably rely on AlertService for this, or migrate the logic.
-    // In `alert-service.ts`, we migrated checking logic.
-    // This method in `application-metrics.ts` seems unused or redundant given `alert-service.ts`.
-    // But to keep API surface, we can reuse AlertService? Circular dependency risk.
-    // Let's implement independent checking using Prisma if needed, but `alert-service.ts` seems to be the main place.
-    // For now, I will reimplement reading from `alert_rules` (PrismaAlertRule) and checking like before.
-
     const triggeredAlerts: MetricAlert[] = [];
 
     try {
@@ -365,17 +287,23 @@ export class ApplicationMetricsService {
         where: { enabled: true }
       });
 
-      // Verificar cada alerta
-      for (const alert of alerts) {
-        const recentMetrics = await this.getMetricAggregations(
-          undefined,
-          '5m', // default check window
-          [alert.metric]
-        );
+      if (alerts.length === 0) return triggeredAlerts;
+
+      const metricNames = Array.from(new Set(alerts.map(alert => alert.metric)));
+      const recentMetrics = await this.getMetricAggregations(
+        undefined,
+        '5m', // default check window
+        metricNames
+      );
 
-        const metric = recentMetrics.find(m => m.name === alert.metric);
+      const valuesByName = new Map(
+        recentMetrics.map(metric => [metric.name, metric.value])
+      );
+
+      for (const alert of alerts) {
+        const value = valuesByName.get(alert.metric);
 
-        if (metric && this.shouldTriggerAlert(metric.value, alert as any)) { // Casting because types might differ slightly
+        if (value !== undefined && this.shouldTriggerAlert(value, alert as any)) { // Casting because types might differ slightly
           triggeredAlerts.push({
             id: alert.id,
             name: alert.name,
@@ -421,6 +349,9 @@ export class ApplicationMetricsService {
         }))
       });
 
+      // Atualizar rollups de 1 minuto e 1 hora no mesmo flush
+      await metricRollups.write(metricsToFlush);
+
     } catch (error) {
       console.error('Erro ao salvar métricas:', error);
       // Recolocar métricas no buffer em caso de erro ??
@@ -436,6 +367,12 @@ export class ApplicationMetricsService {
     this.flushTimer = setInterval(() => {
       this.flushMetrics();
     }, this.FLUSH_INTERVAL);
+
+    this.retentionTimer = setInterval(() => {
+      metricRollups.pruneExpired().catch(error => {
+        console.error('Erro ao aplicar retenção de métricas:', error);
+      });
+    }, this.RETENTION_INTERVAL);
   }
 
   // 🎯 Verificar se Alerta Deve Ser Disparado
@@ -459,6 +396,9 @@ export class ApplicationMetricsService {
     if (this.flushTimer) {
       clearInterval(this.flushTimer);
     }
+    if (this.retentionTimer) {
+      clearInterval(this.retentionTimer);
+    }
     this.flushMetrics(); // Flush final
   }
 }
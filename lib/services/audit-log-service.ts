@@ -0,0 +1,233 @@
+// 🧾 Audit Log Service - Trilha de Auditoria Durável
+// Escrita em lotes (fora do caminho da requisição) na tabela audit_logs particionada por mês,
+// com consulta paginada por cursor (occurred_at, id) e filtros indexados
+import { Prisma } from '@prisma/client';
+
+import prisma from '@/lib/prisma';
+import {
+  BufferedWriter,
+  BufferedWriterStats,
+} from '@/lib/services/buffered-writer';
+import { setSecurityEventSink } from '@/lib/security/security-event-sink';
+
+import type { SecurityEvent } from '@/lib/security/security-event-store';
+
+export interface AuditLogEntry {
+  occurredAt?: Date;
+  actorId?: string | null;
+  actorType?: 'user' | 'cliente' | 'system' | 'anonymous';
+  action: string;
+  resourceType?: string | null;
+  resourceId?: string | null;
+  ip?: string | null;
+  userAgent?: string | null;
+  endpoint?: string | null;
+  method?: string | null;
+  severity?: string | null;
+  details?: Record<string, unknown> | null;
+}
+
+export interface AuditLogQuery {
+  actorId?: string;
+  resourceType?: string;
+  resourceId?: string;
+  ip?: string;
+  action?: string;
+  severity?: string;
+  from?: Date;
+  to?: Date;
+  cursor?: string;
+  limit?: number;
+}
+
+export interface AuditLogRecord {
+  id: string;
+  occurredAt: string;
+  actorId: string | null;
+  actorType: string | null;
+  action: string;
+  resourceType: string | null;
+  resourceId: string | null;
+  ip: string | null;
+  userAgent: string | null;
+  endpoint: string | null;
+  method: string | null;
+  severity: string | null;
+  details: Prisma.JsonValue | null;
+}
+
+export interface AuditLogPage {
+  items: AuditLogRecord[];
+  nextCursor: string | null;
+}
+
+export const AUDIT_LOG_DEFAULT_RANGE_DAYS = 30;
+export const AUDIT_LOG_MAX_PAGE_SIZE = 500;
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+// 🔖 Cursor opaco: instante + id do último item da página
+export function encodeAuditCursor(occurredAt: Date, id: string): string {
+  return Buffer.from(`${occurredAt.toISOString()}|${id}`).toString('base64url');
+}
+
+export function decodeAuditCursor(
+  cursor: string
+): { occurredAt: Date; id: string } | null {
+  try {
+    const [iso, id] = Buffer.from(cursor, 'base64url').toString('utf8').split('|');
+    const occurredAt = new Date(iso);
+    if (!id || Number.isNaN(occurredAt.getTime())) return null;
+    return { occurredAt, id };
+  } catch {
+    return null;
+  }
+}
+
+export class AuditLogService {
+  private writer: BufferedWriter<Prisma.AuditLogCreateManyInput>;
+  // Partições mensais já garantidas por este processo ('YYYY-MM')
+  private ensuredPartitions = new Set<string>();
+
+  constructor() {
+    this.writer = new BufferedWriter<Prisma.AuditLogCreateManyInput>({
+      name: 'audit_logs',
+      maxBatchSize: 500,
+      maxQueueSize: 20000,
+      flushIntervalMs: 2000,
+      persist: batch => this.persistBatch(batch),
+    });
+  }
+
+  // ➕ Registrar ação (O(1), nunca aguarda o banco)
+  record(entry: AuditLogEntry): void {
+    this.writer.enqueue({
+      occurredAt: entry.occurredAt ?? new Date(),
+      actorId: entry.actorId ?? null,
+      actorType: entry.actorType ?? (entry.actorId ? 'user' : 'anonymous'),
+      action: entry.action,
+      resourceType: entry.resourceType ?? null,
+      resourceId: entry.resourceId ?? null,
+      ip: entry.ip ?? null,
+      userAgent: entry.userAgent ?? null,
+      endpoint: entry.endpoint ?? null,
+      method: entry.method ?? null,
+      severity: entry.severity ?? null,
+      details: (entry.details ?? undefined) as Prisma.InputJsonValue | undefined,
+    });
+  }
+
+  // 🔐 Evento de segurança do middleware de auditoria
+  recordSecurityEvent(event: SecurityEvent): void {
+    this.record({
+      occurredAt: new Date(event.timestamp),
+      actorId: event.userId ?? null,
+      action: `security.${event.eventType}`,
+      ip: event.ip,
+      userAgent: event.userAgent,
+      endpoint: event.endpoint,
+      method: event.method,
+      severity: event.severity,
+      details: event.details,
+    });
+  }
+
+  private async persistBatch(
+    batch: Prisma.AuditLogCreateManyInput[]
+  ): Promise<void> {
+    await this.ensurePartitions(batch);
+    await prisma.auditLog.createMany({ data: batch });
+  }
+
+  // Criar partições mensais que ainda não existem (a função move para a nova partição as linhas
+  // do mês que já tenham caído na DEFAULT)
+  private async ensurePartitions(
+    batch: Prisma.AuditLogCreateManyInput[]
+  ): Promise<void> {
+    const months = new Set(
+      batch.map(entry => new Date(entry.occurredAt!).toISOString().slice(0, 7))
+    );
+
+    for (const month of months) {
+      if (this.ensuredPartitions.has(month)) continue;
+
+      try {
+        await prisma.$queryRaw`SELECT ensure_audit_log_partition(${`${month}-01`}::date)`;
+        this.ensuredPartitions.add(month);
+      } catch (error) {
+        console.error(`Erro ao garantir partição de auditoria ${month}:`, error);
+      }
+    }
+  }
+
+  // 🔎 Consulta paginada (mais recentes primeiro) com poda de partições por período
+  async query(filter: AuditLogQuery = {}): Promise<AuditLogPage> {
+    const limit = Math.min(
+      Math.max(filter.limit ?? 100, 1),
+      AUDIT_LOG_MAX_PAGE_SIZE
+    );
+    const to = filter.to ?? new Date();
+    const from =
+      filter.from ?? new Date(to.getTime() - AUDIT_LOG_DEFAULT_RANGE_DAYS * DAY_MS);
+    const cursor = filter.cursor ? decodeAuditCursor(filter.cursor) : null;
+
+    const where: Prisma.AuditLogWhereInput = {
+      occurredAt: { gte: from, lt: to },
+      ...(filter.actorId && { actorId: filter.actorId }),
+      ...(filter.resourceType && { resourceType: filter.resourceType }),
+      ...(filter.resourceId && { resourceId: filter.resourceId }),
+      ...(filter.ip && { ip: filter.ip }),
+      ...(filter.action && { action: filter.action }),
+      ...(filter.severity && { severity: filter.severity }),
+      ...(cursor && {
+        OR: [
+          { occurredAt: { lt: cursor.occurredAt } },
+          { occurredAt: cursor.occurredAt, id: { lt: cursor.id } },
+        ],
+      }),
+    };
+
+    const rows = await prisma.auditLog.findMany({
+      where,
+      orderBy: [{ occurredAt: 'desc' }, { id: 'desc' }],
+      take: limit + 1,
+    });
+
+    const page = rows.slice(0, limit);
+    const last = page[page.length - 1];
+
+    return {
+      items: page.map(row => ({
+        ...row,
+        occurredAt: row.occurredAt.toISOString(),
+      })),
+      nextCursor:
+        rows.length > limit && last
+          ? encodeAuditCursor(last.occurredAt, last.id)
+          : null,
+    };
+  }
+
+  getWriterStats(): BufferedWriterStats {
+    return this.writer.getStats();
+  }
+
+  flush(): Promise<void> {
+    return this.writer.flush();
+  }
+}
+
+// 🌟 Instância global (sobrevive a hot reload em desenvolvimento)
+const globalForAuditLog = globalThis as unknown as {
+  auditLogService: AuditLogService | undefined;
+};
+
+export const auditLogService =
+  globalForAuditLog.auditLogService ?? new AuditLogService();
+
+if (process.env.NODE_ENV !== 'production') {
+  globalForAuditLog.auditLogService = auditLogService;
+}
+
+// Eventos do middleware de auditoria de segurança (carregado pelo proxy, sem Prisma) chegam aqui
+setSecurityEventSink(event => auditLogService.recordSecurityEvent(event));
@@ -0,0 +1,207 @@
+// 📦 Buffered Writer - Persistência Assíncrona em Lotes
+// Fila limitada (descarta os mais antigos sob pressão) com flush por tamanho e por tempo
+
+export interface BufferedWriterOptions<T> {
+  name: string;
+  maxBatchSize: number;
+  maxQueueSize: number;
+  flushIntervalMs: number;
+  persist: (_batch: T[]) => Promise<void>;
+}
+
+export interface BufferedWriterStats {
+  queued: number;
+  flushed: number;
+  dropped: number;
+  failed: number;
+  lastFlushAt: Date | null;
+}
+
+export interface ShutdownTask {
+  shutdown(): Promise<void>;
+}
+
+// Prazo para gravar o que restou ao receber SIGTERM/SIGINT
+const SHUTDOWN_TIMEOUT_MS = Number(process.env.BUFFERED_WRITER_SHUTDOWN_TIMEOUT_MS) || 5000;
+
+// Registro e handlers ficam no globalThis: um único conjunto por processo, compartilhado entre
+// bundles (ex.: instrumentation e rotas) e preservado quando o módulo é recarregado em desenvolvimento
+const globalForShutdown = globalThis as unknown as {
+  bufferedWriterShutdownHooks: boolean | undefined;
+  bufferedWriterTasks: Set<ShutdownTask> | undefined;
+};
+
+const activeWriters = globalForShutdown.bufferedWriterTasks ?? new Set<ShutdownTask>();
+globalForShutdown.bufferedWriterTasks = activeWriters;
+
+/**
+ * Gravar a fila de todos os writers ativos, limitado a `timeoutMs`
+ * Chamado nos sinais de encerramento (deploy, parada do container) e no fim natural do processo
+ */
+export async function shutdownAllWriters(timeoutMs: number = SHUTDOWN_TIMEOUT_MS): Promise<void> {
+  let timer: ReturnType<typeof setTimeout> | undefined;
+  const deadline = new Promise<void>(resolve => {
+    timer = setTimeout(() => {
+      console.error(`Encerramento dos buffered writers excedeu ${timeoutMs}ms; itens pendentes descartados`);
+      resolve();
+    }, timeoutMs);
+  });
+
+  try {
+    await Promise.race([
+      Promise.allSettled(Array.from(activeWriters).map(writer => writer.shutdown())),
+      deadline,
+    ]);
+  } finally {
+    clearTimeout(timer);
+  }
+}
+
+function installShutdownHandlers(): void {
+  if (globalForShutdown.bufferedWriterShutdownHooks) return;
+  globalForShutdown.bufferedWriterShutdownHooks = true;
+
+  // beforeExit cobre o fim natural do processo (não dispara em sinais nem em process.exit)
+  process.once('beforeExit', () => {
+    void shutdownAllWriters();
+  });
+
+  // Gravar as filas sem tomar o encerramento para si: se houver outros listeners (ex.: o
+  // graceful shutdown do Next), são eles que encerram o processo. Sair só quando este for o único
+  // listener, já que um listener registrado impede o Node de encerrar sozinho no sinal
+  const onSignal = (signal: NodeJS.Signals) => {
+    void shutdownAllWriters().finally(() => {
+      if (process.listenerCount(signal) <= 1) {
+        process.exit(signal === 'SIGINT' ? 130 : 143);
+      }
+    });
+  };
+  process.on('SIGTERM', onSignal);
+  process.on('SIGINT', onSignal);
+}
+
+/**
+ * Incluir uma fila em memória (ex.: logger, envio remoto de logs) no encerramento do processo
+ * Os writers se registram sozinhos e saem do registro no próprio shutdown()
+ */
+export function registerShutdownTask(task: ShutdownTask): void {
+  if (typeof process === 'undefined' || typeof process.once !== 'function') {
+    return;
+  }
+
+  activeWriters.add(task);
+  installShutdownHandlers();
+}
+
+export function unregisterShutdownTask(task: ShutdownTask): void {
+  activeWriters.delete(task);
+}
+
+export class BufferedWriter<T> {
+  private readonly options: BufferedWriterOptions<T>;
+  private queue: Array<T | undefined>;
+  private head = 0;
+  private size = 0;
+  private flushing: Promise<void> | null = null;
+  private flushTimer?: ReturnType<typeof setInterval>;
+  private stats: Omit<BufferedWriterStats, 'queued'> = {
+    flushed: 0,
+    dropped: 0,
+    failed: 0,
+    lastFlushAt: null,
+  };
+
+  constructor(options: BufferedWriterOptions<T>) {
+    this.options = options;
+    this.queue = new Array(options.maxQueueSize);
+    this.startFlushTimer();
+    registerShutdownTask(this);
+  }
+
+  // ➕ Enfileirar item (O(1), nunca aguarda o banco)
+  enqueue(item: T): void {
+    const capacity = this.options.maxQueueSize;
+
+    if (this.size === capacity) {
+      // Backpressure: descartar o item mais antigo
+      this.queue[this.head] = undefined;
+      this.head = (this.head + 1) % capacity;
+      this.size--;
+      this.stats.dropped++;
+    }
+
+    this.queue[(this.head + this.size) % capacity] = item;
+    this.size++;
+
+    if (this.size >= this.options.maxBatchSize && !this.flushing) {
+      void this.flush();
+    }
+  }
+
+  // 🔄 Gravar tudo que estiver na fila em lotes de maxBatchSize
+  flush(): Promise<void> {
+    if (this.flushing) return this.flushing;
+
+    this.flushing = this.drain().finally(() => {
+      this.flushing = null;
+    });
+
+    return this.flushing;
+  }
+
+  private async drain(): Promise<void> {
+    while (this.size > 0) {
+      const batch = this.take(this.options.maxBatchSize);
+
+      try {
+        await this.options.persist(batch);
+        this.stats.flushed += batch.length;
+        this.stats.lastFlushAt = new Date();
+      } catch (error) {
+        // Lote descartado para não crescer a memória com o banco indisponível
+        this.stats.failed += batch.length;
+        console.error(`Erro ao persistir lote de ${this.options.name}:`, error);
+      }
+    }
+  }
+
+  private take(limit: number): T[] {
+    const capacity = this.options.maxQueueSize;
+    const count = Math.min(limit, this.size);
+    const batch: T[] = [];
+
+    for (let i = 0; i < count; i++) {
+      batch.push(this.queue[this.head] as T);
+      this.queue[this.head] = undefined;
+      this.head = (this.head + 1) % capacity;
+    }
+
+    this.size -= count;
+    return batch;
+  }
+
+  getStats(): BufferedWriterStats {
+    return { ...this.stats, queued: this.size };
+  }
+
+  // 🧹 Encerrar timer e gravar o que restou
+  async shutdown(): Promise<void> {
+    unregisterShutdownTask(this);
+    if (this.flushTimer) {
+      clearInterval(this.flushTimer);
+      this.flushTimer = undefined;
+    }
+    await this.flush();
+  }
+
+  private startFlushTimer(): void {
+    this.flushTimer = setInterval(() => {
+      void this.flush();
+    }, this.options.flushIntervalMs);
+
+    // Não manter o processo vivo apenas por causa do timer
+    if (typeof this.flushTimer === 'object' && 'unref' in this.flushTimer) {
+      this.flushTimer.unref();
+    }
+  }
+}
@@ -0,0 +1,192 @@
+// 📮 CEP Index - Consulta de CEP em índice local (sem rede)
+// Arquivo gerado por scripts/build-cep-index.js (formato documentado lá): a tabela de faixas
+// ordenada fica em memória (16 bytes por faixa) e a busca é binária; os endereços são lidos
+// sob demanda por leitura posicional, servida pelo cache de páginas do sistema operacional.
+// O arquivo pode ser substituído com o servidor rodando: a troca é detectada pelo mtime
+import fs from 'fs';
+
+import type { ViaCepResponse } from '@/lib/validators';
+
+const MAGIC = 'CEPIDX01';
+const VERSION = 1;
+const HEADER_SIZE = 32;
+const RECORD_SIZE = 16;
+
+export class CepIndex {
+  private constructor(
+    private readonly fd: number,
+    private readonly records: Buffer,
+    private readonly count: number,
+    private readonly dataOffset: number,
+    readonly geradoEm: Date
+  ) {}
+
+  static open(path: string): CepIndex {
+    const fd = fs.openSync(path, 'r');
+
+    try {
+      const header = Buffer.alloc(HEADER_SIZE);
+      fs.readSync(fd, header, 0, HEADER_SIZE, 0);
+
+      if (header.toString('ascii', 0, 8) !== MAGIC || header.readUInt32LE(8) !== VERSION) {
+        throw new Error(`Arquivo de índice de CEP inválido: ${path}`);
+      }
+
+      const count = header.readUInt32LE(12);
+      const dataOffset = header.readUInt32LE(16);
+      const records = Buffer.alloc(count * RECORD_SIZE);
+      fs.readSync(fd, records, 0, records.length, HEADER_SIZE);
+
+      return new CepIndex(
+        fd,
+        records,
+        count,
+        dataOffset,
+        new Date(header.readUInt32LE(20) * 1000)
+      );
+    } catch (error) {
+      fs.closeSync(fd);
+      throw error;
+    }
+  }
+
+  get size(): number {
+    return this.count;
+  }
+
+  // 🔍 Busca binária pela última faixa com início <= CEP
+  lookup(cep: string): ViaCepResponse | null {
+    const cleanCep = cep.replace(/\D/g, '');
+    if (cleanCep.length !== 8) return null;
+
+    const value = Number(cleanCep);
+    let low = 0;
+    let high = this.count - 1;
+    let found = -1;
+
+    while (low <= high) {
+      const middle = (low + high) >>> 1;
+      if (this.records.readUInt32LE(middle * RECORD_SIZE) <= value) {
+        found = middle;
+        low = middle + 1;
+      } else {
+        high = middle - 1;
+      }
+    }
+
+    if (found < 0) return null;
+
+    const position = found * RECORD_SIZE;
+    if (this.records.readUInt32LE(position + 4) < value) return null;
+
+    const offset = this.records.readUInt32LE(position + 8);
+    const length = this.records.readUInt16LE(position + 12);
+    const payload = Buffer.alloc(length);
+    fs.readSync(this.fd, payload, 0, length, this.dataOffset + offset);
+
+    const [logradouro = '', bairro = '', localidade = '', uf = ''] = payload
+      .toString('utf8')
+      .split('\t');
+
+    return {
+      cep: `${cleanCep.slice(0, 5)}-${cleanCep.slice(5)}`,
+      logradouro,
+      complemento: '',
+      bairro,
+      localidade,
+      uf,
+    };
+  }
+
+  close(): void {
+    fs.closeSync(this.fd);
+  }
+}
+
+export interface CepIndexServiceOptions {
+  path?: string;
+  refreshCheckMs: number;
+}
+
+export class CepIndexService {
+  private index: CepIndex | null = null;
+  private loadedMtimeMs = 0;
+  private lastCheck = 0;
+  private stats = { encontrados: 0, naoEncontrados: 0, recargas: 0 };
+
+  constructor(private readonly options: CepIndexServiceOptions) {}
+
+  get enabled(): boolean {
+    return Boolean(this.options.path);
+  }
+
+  // Endereço do índice local, ou null (CEP fora do índice ou índice indisponível)
+  lookup(cep: string): ViaCepResponse | null {
+    const index = this.current();
+    if (!index) return null;
+
+    const result = index.lookup(cep);
+    if (result) {
+      this.stats.encontrados++;
+    } else {
+      this.stats.naoEncontrados++;
+    }
+    return result;
+  }
+
+  // Verificar no máximo a cada refreshCheckMs se o arquivo foi substituído
+  private current(): CepIndex | null {
+    const { path, refreshCheckMs } = this.options;
+    if (!path) return this.index;
+
+    const now = Date.now();
+    if (now - this.lastCheck < refreshCheckMs) return this.index;
+    this.lastCheck = now;
+
+    try {
+      const { mtimeMs } = fs.statSync(path);
+      if (this.index && mtimeMs === this.loadedMtimeMs) return this.index;
+
+      const previous = this.index;
+      this.index = CepIndex.open(path);
+      this.loadedMtimeMs = mtimeMs;
+      previous?.close();
+
+      if (previous) this.stats.recargas++;
+      console.info(`📮 Índice de CEPs carregado: ${this.index.size} faixas`);
+    } catch (error) {
+      // Mantém o índice anterior (se houver); sem índice, a consulta segue para a API remota
+      if (!this.index) {
+        console.error('Erro ao carregar índice de CEPs:', error);
+      }
+    }
+
+    return this.index;
+  }
+
+  getStats() {
+    return {
+      habilitado: this.enabled,
+      carregado: this.index !== null,
+      faixas: this.index?.size ?? 0,
+      geradoEm: this.index?.geradoEm ?? null,
+      ...this.stats,
+    };
+  }
+}
+
+// 🌟 Instância global (sobrevive a hot reload em desenvolvimento)
+const globalForCepIndex = globalThis as unknown as {
+  cepIndexService: CepIndexService | undefined;
+};
+
+export const cepIndexService =
+  globalForCepIndex.cepIndexService ??
+  new CepIndexService({
+    path: process.env.CEP_INDEX_PATH,
+    refreshCheckMs: 60 * 1000,
+  });
+
+if (process.env.NODE_ENV !== 'production') {
+  globalForCepIndex.cepIndexService = cepIndexService;
+}
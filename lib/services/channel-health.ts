@@ -0,0 +1,110 @@
+// 🩺 Channel Health - Saúde dos canais de comunicação (WhatsApp, SMS, Email)
+// Um circuit breaker por canal alimentado pelas métricas de envio do metricsService:
+// qualquer envio (comunicação direta, fila de saída, OS) atualiza a saúde do provedor
+import {
+  CircuitBreaker,
+  CircuitBreakerOptions,
+  CircuitSnapshot,
+} from '@/lib/services/circuit-breaker';
+import { MetricData, metricsService } from '@/lib/services/metrics-service';
+
+export type HealthChannel = 'whatsapp' | 'sms' | 'email';
+
+export const HEALTH_CHANNELS: HealthChannel[] = ['whatsapp', 'sms', 'email'];
+
+// Operações que chamam o provedor de fato (testConnection e wrappers de OS ficam de fora)
+const DELIVERY_OPERATIONS: Record<HealthChannel, string[]> = {
+  whatsapp: ['sendMessage'],
+  sms: ['sendSMS'],
+  email: ['sendEmail', 'sendOrdemServicoEmail'],
+};
+
+// SMTP é naturalmente mais lento que as APIs HTTP de WhatsApp e SMS
+const CHANNEL_OPTIONS: Record<HealthChannel, Partial<CircuitBreakerOptions>> = {
+  whatsapp: { slowCallMs: 3000 },
+  sms: { slowCallMs: 3000 },
+  email: { slowCallMs: 8000 },
+};
+
+export class ChannelHealthMonitor {
+  private readonly breakers: Record<HealthChannel, CircuitBreaker>;
+  private unsubscribe: (() => void) | null = null;
+
+  constructor(options: Partial<CircuitBreakerOptions> = {}) {
+    this.breakers = {} as Record<HealthChannel, CircuitBreaker>;
+    for (const channel of HEALTH_CHANNELS) {
+      this.breakers[channel] = new CircuitBreaker({ ...CHANNEL_OPTIONS[channel], ...options });
+    }
+  }
+
+  // 👂 Passar a ouvir as métricas de envio (idempotente)
+  attach(): void {
+    if (this.unsubscribe) return;
+    this.unsubscribe = metricsService.onMetric(metric => this.handleMetric(metric));
+  }
+
+  detach(): void {
+    this.unsubscribe?.();
+    this.unsubscribe = null;
+  }
+
+  handleMetric(metric: Pick<MetricData, 'service' | 'operation' | 'success' | 'duration'>): void {
+    if (metric.service === 'communication') return;
+    if (!DELIVERY_OPERATIONS[metric.service].includes(metric.operation)) return;
+
+    this.breakers[metric.service].record(metric.success, metric.duration);
+  }
+
+  isAvailable(channel: HealthChannel): boolean {
+    return this.breakers[channel].isAvailable();
+  }
+
+  isDegraded(channel: HealthChannel): boolean {
+    return this.breakers[channel].isDegraded();
+  }
+
+  // Reservar o envio (em half-open, ocupa a vaga de sondagem do canal)
+  tryAcquire(channel: HealthChannel): boolean {
+    return this.breakers[channel].tryAcquire();
+  }
+
+  // 🧭 Ordenar candidatos: saudáveis na ordem de preferência, depois os degradados;
+  // canais com circuito aberto ficam de fora
+  rank(candidates: HealthChannel[]): HealthChannel[] {
+    const healthy: HealthChannel[] = [];
+    const degraded: HealthChannel[] = [];
+
+    for (const channel of candidates) {
+      if (!this.isAvailable(channel)) continue;
+      (this.isDegraded(channel) ? degraded : healthy).push(channel);
+    }
+
+    return [...healthy, ...degraded];
+  }
+
+  reset(channel?: HealthChannel): void {
+    (channel ? [channel] : HEALTH_CHANNELS).forEach(name => this.breakers[name].reset());
+  }
+
+  getSnapshot(): Record<HealthChannel, CircuitSnapshot> {
+    return Object.fromEntries(
+      HEALTH_CHANNELS.map(channel => [channel, this.breakers[channel].getSnapshot()])
+    ) as Record<HealthChannel, CircuitSnapshot>;
+  }
+}
+
+// 🌟 Instância global (sobrevive a hot reload em desenvolvimento)
+const globalForChannelHealth = globalThis as unknown as {
+  channelHealthMonitor: ChannelHealthMonitor | undefined;
+};
+
+export const channelHealthMonitor =
+  globalForChannelHealth.channelHealthMonitor ?? new ChannelHealthMonitor();
+
+if (process.env.NODE_ENV !== 'production') {
+  globalForChannelHealth.channelHealthMonitor = channelHealthMonitor;
+}
+
+// Ouvir as métricas desde o carregamento do módulo, e não só quando um CommunicationService
+// é criado: envios da fila de saída e das OS também alimentam os circuitos
+channelHealthMonitor.attach();
@@ -0,0 +1,216 @@
+// ⚡ Circuit Breaker - Proteção contra provedores lentos ou fora do ar
+// closed: tráfego normal | open: chamadas recusadas sem espera | half_open: uma sondagem por vez
+// testa a recuperação; sucesso fecha o circuito, falha reabre com espera dobrada
+
+export type CircuitState = 'closed' | 'open' | 'half_open';
+
+export interface CircuitBreakerOptions {
+  windowSize: number; // últimas N chamadas consideradas
+  windowMs: number; // chamadas mais antigas que isso são descartadas
+  minimumCalls: number; // abaixo disso a taxa de falhas não abre o circuito
+  failureRateThreshold: number; // 0..1
+  slowCallMs: number;
+  slowCallRateThreshold: number; // 0..1 (acima: degradado, mas não aberto)
+  openDurationMs: number;
+  maxOpenDurationMs: number;
+  probeTimeoutMs: number; // sondagem sem resultado libera a vaga após esse tempo
+}
+
+export interface CircuitSnapshot {
+  state: CircuitState;
+  degraded: boolean;
+  calls: number;
+  failureRate: number;
+  slowCallRate: number;
+  latencyEwmaMs: number;
+  openedAt: string | null;
+  retryAt: string | null;
+}
+
+interface CallOutcome {
+  at: number;
+  success: boolean;
+  slow: boolean;
+}
+
+const EWMA_ALPHA = 0.2;
+
+export const DEFAULT_CIRCUIT_OPTIONS: CircuitBreakerOptions = {
+  windowSize: 20,
+  windowMs: 5 * 60 * 1000,
+  minimumCalls: 5,
+  failureRateThreshold: 0.5,
+  slowCallMs: 5000,
+  slowCallRateThreshold: 0.5,
+  openDurationMs: 30 * 1000,
+  maxOpenDurationMs: 5 * 60 * 1000,
+  probeTimeoutMs: 30 * 1000,
+};
+
+export class CircuitBreaker {
+  private readonly options: CircuitBreakerOptions;
+  private outcomes: CallOutcome[] = [];
+  private state: CircuitState = 'closed';
+  private openedAt = 0;
+  private currentOpenDuration: number;
+  private probeStartedAt: number | null = null;
+  private latencyEwma = 0;
+
+  constructor(options: Partial<CircuitBreakerOptions> = {}) {
+    this.options = { ...DEFAULT_CIRCUIT_OPTIONS, ...options };
+    this.currentOpenDuration = this.options.openDurationMs;
+  }
+
+  getState(now = Date.now()): CircuitState {
+    if (this.state === 'open' && now - this.openedAt >= this.currentOpenDuration) {
+      this.state = 'half_open';
+      this.probeStartedAt = null;
+    }
+    return this.state;
+  }
+
+  // Pode enviar agora? Sem efeito colateral (usado para ordenar os canais)
+  isAvailable(now = Date.now()): boolean {
+    const state = this.getState(now);
+    if (state === 'closed') return true;
+    if (state === 'open') return false;
+    return !this.probeInFlight(now);
+  }
+
+  // Reservar a chamada: em half_open ocupa a única vaga de sondagem
+  tryAcquire(now = Date.now()): boolean {
+    if (!this.isAvailable(now)) return false;
+    if (this.state === 'half_open') this.probeStartedAt = now;
+    return true;
+  }
+
+  record(success: boolean, durationMs: number, now = Date.now()): void {
+    this.latencyEwma =
+      this.latencyEwma === 0
+        ? durationMs
+        : this.latencyEwma + EWMA_ALPHA * (durationMs - this.latencyEwma);
+
+    this.outcomes.push({ at: now, success, slow: durationMs >= this.options.slowCallMs });
+    this.prune(now);
+
+    const state = this.getState(now);
+
+    if (state === 'half_open') {
+      if (success) {
+        this.close();
+      } else {
+        // Ainda fora do ar: reabrir com espera dobrada (até o máximo)
+        this.open(now, Math.min(this.currentOpenDuration * 2, this.options.maxOpenDurationMs));
+      }
+      return;
+    }
+
+    if (state === 'closed' && !success) {
+      const { calls, failureRate } = this.rates();
+      if (calls >= this.options.minimumCalls && failureRate >= this.options.failureRateThreshold) {
+        this.open(now, this.options.openDurationMs);
+      }
+    }
+  }
+
+  // Lento demais para ser preferido, mas ainda respondendo
+  isDegraded(now = Date.now()): boolean {
+    this.prune(now);
+    const { calls, slowCallRate } = this.rates();
+    return (
+      calls >= this.options.minimumCalls &&
+      slowCallRate >= this.options.slowCallRateThreshold
+    );
+  }
+
+  async execute<T>(fn: () => Promise<T>): Promise<T> {
+    if (!this.tryAcquire()) {
+      throw new CircuitOpenError();
+    }
+
+    const startTime = Date.now();
+    try {
+      const result = await fn();
+      this.record(true, Date.now() - startTime);
+      return result;
+    } catch (error) {
+      this.record(false, Date.now() - startTime);
+      throw error;
+    }
+  }
+
+  reset(): void {
+    this.outcomes = [];
+    this.latencyEwma = 0;
+    this.close();
+  }
+
+  getSnapshot(now = Date.now()): CircuitSnapshot {
+    const state = this.getState(now);
+    const { calls, failureRate, slowCallRate } = this.rates();
+
+    return {
+      state,
+      degraded: this.isDegraded(now),
+      calls,
+      failureRate,
+      slowCallRate,
+      latencyEwmaMs: Math.round(this.latencyEwma),
+      openedAt: state === 'closed' ? null : new Date(this.openedAt).toISOString(),
+      retryAt:
+        state === 'open'
+          ? new Date(this.openedAt + this.currentOpenDuration).toISOString()
+          : null,
+    };
+  }
+
+  private probeInFlight(now: number): boolean {
+    return (
+      this.probeStartedAt !== null &&
+      now - this.probeStartedAt < this.options.probeTimeoutMs
+    );
+  }
+
+  private open(now: number, duration: number): void {
+    this.state = 'open';
+    this.openedAt = now;
+    this.currentOpenDuration = duration;
+    this.probeStartedAt = null;
+  }
+
+  private close(): void {
+    this.state = 'closed';
+    this.currentOpenDuration = this.options.openDurationMs;
+    this.probeStartedAt = null;
+    // Recomeçar a janela: falhas anteriores à recuperação não devem reabrir o circuito
+    this.outcomes = this.outcomes.slice(-1);
+  }
+
+  private prune(now: number): void {
+    const cutoff = now - this.options.windowMs;
+    let start = Math.max(0, this.outcomes.length - this.options.windowSize);
+    while (start < this.outcomes.length && this.outcomes[start].at < cutoff) start++;
+    if (start > 0) this.outcomes = this.outcomes.slice(start);
+  }
+
+  private rates(): { calls: number; failureRate: number; slowCallRate: number } {
+    const calls = this.outcomes.length;
+    if (calls === 0) return { calls, failureRate: 0, slowCallRate: 0 };
+
+    let failures = 0;
+    let slow = 0;
+    for (const outcome of this.outcomes) {
+      if (!outcome.success) failures++;
+      if (outcome.slow) slow++;
+    }
+
+    return { calls, failureRate: failures / calls, slowCallRate: slow / calls };
+  }
+}
+
+export class CircuitOpenError extends Error {
+  constructor(message = 'Circuito aberto: chamada recusada') {
+    super(message);
+    this.name = 'CircuitOpenError';
+  }
+}
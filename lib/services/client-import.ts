@@ -0,0 +1,451 @@
+// 📦 Client Import - Importação em massa de clientes (CSV ou NDJSON)
+// O arquivo é lido em streaming e processado em lotes: validação local, uma consulta por lote
+// para encontrar emails/CPF/CNPJ já cadastrados, números de cliente alocados em bloco e
+// inserção com createMany. Erros são reportados por linha e não interrompem a importação
+import { Prisma } from '@prisma/client';
+
+import prisma from '@/lib/prisma';
+import {
+  allocateNumerosCliente,
+  isNumberConflict,
+  nextNumeroCliente,
+  resyncNumeroCliente,
+} from '@/lib/services/number-allocator';
+import { validarCNPJ, validarCPF, validarEmail } from '@/lib/validators';
+
+export type ClientImportFormat = 'csv' | 'ndjson';
+
+export interface ClientImportRow {
+  linha: number;
+  dados: Record<string, unknown>;
+}
+
+export interface ClientImportError {
+  linha: number;
+  erro: string;
+}
+
+export interface ClientImportReport {
+  total: number;
+  importados: number;
+  duplicados: number;
+  invalidos: number;
+  erros: ClientImportError[];
+  errosOmitidos: number;
+  dryRun: boolean;
+  duracaoMs: number;
+}
+
+export interface ClientImportOptions {
+  batchSize: number;
+  maxReportedErrors: number;
+}
+
+interface NormalizedCliente {
+  linha: number;
+  nome: string;
+  email: string;
+  telefone: string | null;
+  cpfCnpj: string | null;
+  tipoPessoa: string;
+  endereco: string | null;
+  cidade: string | null;
+  estado: string | null;
+  cep: string | null;
+}
+
+// Colunas aceitas no arquivo → campo do cliente
+const COLUMN_ALIASES: Record<string, keyof NormalizedCliente> = {
+  nome: 'nome',
+  razao_social: 'nome',
+  email: 'email',
+  telefone: 'telefone',
+  celular: 'telefone',
+  cpf_cnpj: 'cpfCnpj',
+  cpfcnpj: 'cpfCnpj',
+  cpf: 'cpfCnpj',
+  cnpj: 'cpfCnpj',
+  endereco: 'endereco',
+  cidade: 'cidade',
+  estado: 'estado',
+  uf: 'estado',
+  cep: 'cep',
+};
+
+// Limites das colunas (um valor acima derrubaria o lote inteiro no createMany)
+const FIELD_LIMITS: Partial<Record<keyof NormalizedCliente, number>> = {
+  nome: 255,
+  email: 255,
+  telefone: 20,
+  cidade: 100,
+  estado: 2,
+  cep: 10,
+};
+
+const MAX_INSERT_ATTEMPTS = 3;
+
+// 📄 Leitura do arquivo em streaming, uma linha por vez
+async function* readLines(chunks: AsyncIterable<Uint8Array | string>): AsyncGenerator<string> {
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  for await (const chunk of chunks) {
+    buffer += typeof chunk === 'string' ? chunk : decoder.decode(chunk, { stream: true });
+
+    let index;
+    while ((index = buffer.indexOf('\n')) !== -1) {
+      yield buffer.slice(0, index).replace(/\r$/, '');
+      buffer = buffer.slice(index + 1);
+    }
+  }
+
+  buffer += decoder.decode();
+  if (buffer) yield buffer.replace(/\r$/, '');
+}
+
+// 🧾 Registros CSV: um campo entre aspas pode conter quebras de linha, então as linhas físicas
+// são unidas enquanto houver aspas abertas. `linha` é a linha física em que o registro começa
+async function* readCsvRecords(
+  chunks: AsyncIterable<Uint8Array | string>
+): AsyncGenerator<{ linha: number; record: string }> {
+  let linha = 0;
+  let inicio = 0;
+  let pending: string | null = null;
+  let quoted = false;
+
+  for await (const line of readLines(chunks)) {
+    linha++;
+    if (pending === null) {
+      pending = line;
+      inicio = linha;
+    } else {
+      pending += `\n${line}`;
+    }
+
+    // Aspas escapadas ("") trocam o estado duas vezes e não alteram o resultado
+    for (const char of line) {
+      if (char === '"') quoted = !quoted;
+    }
+
+    if (!quoted) {
+      yield { linha: inicio, record: pending };
+      pending = null;
+    }
+  }
+
+  // Aspas nunca fechadas: o restante do arquivo vira um único registro
+  if (pending !== null) yield { linha: inicio, record: pending };
+}
+
+// Divide um registro CSV respeitando aspas
+function splitCsvRecord(record: string, delimiter: string): string[] {
+  const fields: string[] = [];
+  let current = '';
+  let quoted = false;
+
+  for (let i = 0; i < record.length; i++) {
+    const char = record[i];
+    if (char === '"') {
+      if (quoted && record[i + 1] === '"') {
+        current += '"';
+        i++;
+      } else {
+        quoted = !quoted;
+      }
+    } else if (char === delimiter && !quoted) {
+      fields.push(current);
+      current = '';
+    } else {
+      current += char;
+    }
+  }
+  fields.push(current);
+  return fields.map(field => field.trim());
+}
+
+export async function* parseClientImport(
+  chunks: AsyncIterable<Uint8Array | string>,
+  format: ClientImportFormat
+): AsyncGenerator<ClientImportRow> {
+  if (format === 'ndjson') {
+    let linha = 0;
+    for await (const rawLine of readLines(chunks)) {
+      linha++;
+      const line = linha === 1 ? rawLine.replace(/^\uFEFF/, '') : rawLine;
+      if (!line.trim()) continue;
+
+      let dados: Record<string, unknown>;
+      try {
+        const parsed = JSON.parse(line);
+        dados =
+          parsed && typeof parsed === 'object' && !Array.isArray(parsed)
+            ? parsed
+            : { __erro: 'Linha deve ser um objeto JSON' };
+      } catch {
+        dados = { __erro: 'JSON inválido' };
+      }
+      yield { linha, dados };
+    }
+    return;
+  }
+
+  let columns: string[] | null = null;
+  let delimiter = ',';
+
+  for await (const { linha, record: rawRecord } of readCsvRecords(chunks)) {
+    const record = linha === 1 ? rawRecord.replace(/^\uFEFF/, '') : rawRecord;
+    if (!record.trim()) continue;
+
+    if (!columns) {
+      delimiter = record.split(';').length > record.split(',').length ? ';' : ',';
+      columns = splitCsvRecord(record, delimiter).map(name => name.toLowerCase());
+      continue;
+    }
+
+    const values = splitCsvRecord(record, delimiter);
+    yield {
+      linha,
+      dados: Object.fromEntries(columns.map((name, index) => [name, values[index] ?? ''])),
+    };
+  }
+}
+
+function text(value: unknown): string | null {
+  if (value === undefined || value === null) return null;
+  const trimmed = String(value).trim();
+  return trimmed || null;
+}
+
+// ✅ Validação e normalização (mesmas regras do POST /api/clientes, com CPF/CNPJ verificado)
+function normalizeRow(row: ClientImportRow): NormalizedCliente | string {
+  if (typeof row.dados.__erro === 'string') return row.dados.__erro;
+
+  const campos: Partial<Record<keyof NormalizedCliente, string | null>> = {};
+  for (const [column, value] of Object.entries(row.dados)) {
+    const field = COLUMN_ALIASES[column.toLowerCase()];
+    if (field && !campos[field]) campos[field] = text(value);
+  }
+
+  const { nome } = campos;
+  const email = campos.email?.toLowerCase();
+
+  if (!nome || !email) return 'Nome e email são obrigatórios';
+  if (!validarEmail(email)) return 'Formato de email inválido';
+
+  const cpfCnpj = campos.cpfCnpj ? campos.cpfCnpj.replace(/\D/g, '') : null;
+  if (cpfCnpj) {
+    if (cpfCnpj.length !== 11 && cpfCnpj.length !== 14) {
+      return 'CPF deve ter 11 dígitos ou CNPJ deve ter 14 dígitos';
+    }
+    if (cpfCnpj.length === 11 ? !validarCPF(cpfCnpj) : !validarCNPJ(cpfCnpj)) {
+      return cpfCnpj.length === 11 ? 'CPF inválido' : 'CNPJ inválido';
+    }
+  }
+
+  const cliente: NormalizedCliente = {
+    linha: row.linha,
+    nome,
+    email,
+    telefone: campos.telefone ?? null,
+    cpfCnpj,
+    tipoPessoa: cpfCnpj?.length === 14 ? 'juridica' : 'fisica',
+    endereco: campos.endereco ?? null,
+    cidade: campos.cidade ?? null,
+    estado: campos.estado?.toUpperCase() ?? null,
+    cep: campos.cep?.replace(/\D/g, '') || null,
+  };
+
+  for (const [field, limit] of Object.entries(FIELD_LIMITS)) {
+    const value = cliente[field as keyof NormalizedCliente];
+    if (typeof value === 'string' && value.length > limit) {
+      return `Campo ${field} excede ${limit} caracteres`;
+    }
+  }
+
+  return cliente;
+}
+
+export class ClientImportService {
+  constructor(private readonly options: ClientImportOptions) {}
+
+  async import(
+    rows: AsyncIterable<ClientImportRow>,
+    { dryRun = false, createdBy }: { dryRun?: boolean; createdBy?: string } = {}
+  ): Promise<ClientImportReport> {
+    const startTime = Date.now();
+    const report: ClientImportReport = {
+      total: 0,
+      importados: 0,
+      duplicados: 0,
+      invalidos: 0,
+      erros: [],
+      errosOmitidos: 0,
+      dryRun,
+      duracaoMs: 0,
+    };
+
+    // Emails e documentos já vistos nesta importação (duplicados dentro do próprio arquivo)
+    const seen = { emails: new Set<string>(), documentos: new Set<string>() };
+    let batch: ClientImportRow[] = [];
+
+    for await (const row of rows) {
+      report.total++;
+      batch.push(row);
+
+      if (batch.length >= this.options.batchSize) {
+        await this.processBatch(batch, report, seen, dryRun, createdBy);
+        batch = [];
+      }
+    }
+    if (batch.length > 0) {
+      await this.processBatch(batch, report, seen, dryRun, createdBy);
+    }
+
+    report.duracaoMs = Date.now() - startTime;
+    return report;
+  }
+
+  private addError(report: ClientImportReport, linha: number, erro: string): void {
+    if (report.erros.length < this.options.maxReportedErrors) {
+      report.erros.push({ linha, erro });
+    } else {
+      report.errosOmitidos++;
+    }
+  }
+
+  private async processBatch(
+    rows: ClientImportRow[],
+    report: ClientImportReport,
+    seen: { emails: Set<string>; documentos: Set<string> },
+    dryRun: boolean,
+    createdBy?: string
+  ): Promise<void> {
+    const validos: NormalizedCliente[] = [];
+
+    for (const row of rows) {
+      const result = normalizeRow(row);
+      if (typeof result === 'string') {
+        report.invalidos++;
+        this.addError(report, row.linha, result);
+      } else {
+        validos.push(result);
+      }
+    }
+    if (validos.length === 0) return;
+
+    // Uma consulta por lote para emails e CPF/CNPJ já cadastrados
+    const emails = validos.map(cliente => cliente.email);
+    const documentos = validos.flatMap(cliente => (cliente.cpfCnpj ? [cliente.cpfCnpj] : []));
+
+    const existentes = await prisma.cliente.findMany({
+      where: {
+        OR: [
+          { email: { in: emails, mode: 'insensitive' } },
+          ...(documentos.length > 0 ? [{ cpfCnpj: { in: documentos } }] : []),
+        ],
+      },
+      select: { email: true, cpfCnpj: true },
+    });
+
+    existentes.forEach(cliente => {
+      if (cliente.email) seen.emails.add(cliente.email.toLowerCase());
+      if (cliente.cpfCnpj) seen.documentos.add(cliente.cpfCnpj);
+    });
+
+    const novos: NormalizedCliente[] = [];
+    for (const cliente of validos) {
+      if (seen.emails.has(cliente.email)) {
+        report.duplicados++;
+        this.addError(report, cliente.linha, 'Já existe um cliente cadastrado com este email');
+        continue;
+      }
+      if (cliente.cpfCnpj && seen.documentos.has(cliente.cpfCnpj)) {
+        report.duplicados++;
+        this.addError(report, cliente.linha, 'Já existe um cliente cadastrado com este CPF/CNPJ');
+        continue;
+      }
+
+      seen.emails.add(cliente.email);
+      if (cliente.cpfCnpj) seen.documentos.add(cliente.cpfCnpj);
+      novos.push(cliente);
+    }
+
+    if (novos.length === 0) return;
+    if (dryRun) {
+      report.importados += novos.length;
+      return;
+    }
+
+    report.importados += await this.insert(novos, report, createdBy);
+  }
+
+  // 💾 Inserir o lote com uma faixa reservada no contador; conflito de número (gravado por fora
+  // do contador) realinha o contador e tenta de novo
+  private async insert(
+    clientes: NormalizedCliente[],
+    report: ClientImportReport,
+    createdBy?: string
+  ): Promise<number> {
+    for (let attempt = 1; attempt <= MAX_INSERT_ATTEMPTS; attempt++) {
+      const numeros = await allocateNumerosCliente(clientes.length);
+
+      try {
+        const { count } = await prisma.cliente.createMany({
+          data: clientes.map((cliente, index) => this.toCreateInput(cliente, numeros[index], createdBy)),
+        });
+        return count;
+      } catch (error) {
+        if (isNumberConflict(error, 'numeroCliente') && attempt < MAX_INSERT_ATTEMPTS) {
+          await resyncNumeroCliente();
+          continue;
+        }
+
+        console.error('Erro ao inserir lote de clientes, inserindo individualmente:', error);
+        break;
+      }
+    }
+
+    // Lote recusado pelo banco: inserir linha a linha para isolar as linhas com problema
+    let inseridos = 0;
+    for (const cliente of clientes) {
+      try {
+        const numeroCliente = await nextNumeroCliente();
+        await prisma.cliente.create({ data: this.toCreateInput(cliente, numeroCliente, createdBy) });
+        inseridos++;
+      } catch (error) {
+        console.error(`Erro ao inserir cliente da linha ${cliente.linha}:`, error);
+        report.invalidos++;
+        this.addError(
+          report,
+          cliente.linha,
+          error instanceof Prisma.PrismaClientKnownRequestError
+            ? `Erro ao inserir cliente (${error.code})`
+            : 'Erro ao inserir cliente'
+        );
+      }
+    }
+    return inseridos;
+  }
+
+  private toCreateInput(
+    cliente: NormalizedCliente,
+    numeroCliente: string,
+    createdBy?: string
+  ): Prisma.ClienteCreateManyInput {
+    const { linha: _linha, ...dados } = cliente;
+    return { ...dados, numeroCliente, createdBy: createdBy ?? null };
+  }
+}
+
+// 🌟 Instância global (sobrevive a hot reload em desenvolvimento)
+const globalForClientImport = globalThis as unknown as {
+  clientImportService: ClientImportService | undefined;
+};
+
+export const clientImportService =
+  globalForClientImport.clientImportService ??
+  new ClientImportService({ batchSize: 500, maxReportedErrors: 1000 });
+
+if (process.env.NODE_ENV !== 'production') {
+  globalForClientImport.clientImportService = clientImportService;
+}
@@ -2,6 +2,8 @@
 // Gerencia automaticamente a escolha entre WhatsApp, SMS e Email
 import prisma from '@/lib/prisma';
 
+import { channelHealthMonitor } from './channel-health';
+import { CommunicationStats, communicationStatsService } from './communication-stats';
 import EmailService from './email-service';
 import { metricsService } from './metrics-service';
 import { SMSService } from './sms-service';
@@ -62,6 +64,8 @@ export class CommunicationService {
   }
 
   // 🧠 Algoritmo Inteligente de Escolha de Canal
+  // A ordem estática (preferência, urgência, prioridade) é filtrada pela saúde dos canais:
+  // canais com circuito aberto são pulados e canais lentos perdem a vez para os saudáveis
   private selectOptimalChannel(
     cliente: Cliente,
     options: CommunicationOptions = {}
@@ -71,50 +75,48 @@ export class CommunicationService {
       return options.forceChannel;
     }
 
-    // Verificar preferência do cliente
-    if (
-      cliente.preferencia_comunicacao &&
-      cliente.preferencia_comunicacao !== 'auto'
-    ) {
-      return cliente.preferencia_comunicacao;
-    }
+    const ranked = this.rankChannels(cliente, options);
+    const [healthiest] = channelHealthMonitor.rank(ranked);
 
+    // Fallback padrão (sem contatos ou todos os circuitos abertos)
+    return healthiest ?? ranked[0] ?? 'email';
+  }
+
+  // 📋 Ordem de preferência dos canais pelas regras de negócio
+  private rankChannels(
+    cliente: Cliente,
+    options: CommunicationOptions
+  ): ('whatsapp' | 'sms' | 'email')[] {
     // Verificar disponibilidade de contatos
-    const hasWhatsApp = !!(cliente.celular || cliente.telefone);
-    const hasSMS = !!(cliente.celular || cliente.telefone);
-    const hasEmail = !!cliente.email;
+    const contacts = this.contactAvailability(cliente);
 
     // Algoritmo baseado em urgência e prioridade
     const { urgency = 'medium', priority = 'reliability' } = options;
 
-    // Para urgência crítica ou alta, priorizar canais instantâneos
-    if (urgency === 'critical' || urgency === 'high') {
-      if (hasWhatsApp) return 'whatsapp';
-      if (hasSMS) return 'sms';
-      if (hasEmail) return 'email';
+    let order: ('whatsapp' | 'sms' | 'email')[];
+    if (urgency === 'critical' || urgency === 'high' || priority === 'speed') {
+      // Para urgência crítica/alta ou prioridade de velocidade, priorizar canais instantâneos
+      order = ['whatsapp', 'sms', 'email'];
+    } else {
+      // Prioridade de custo e de confiabilidade (padrão) começam pelo email
+      order = ['email', 'whatsapp', 'sms'];
     }
 
-    // Para prioridade de velocidade
-    if (priority === 'speed') {
-      if (hasWhatsApp) return 'whatsapp';
-      if (hasSMS) return 'sms';
-      if (hasEmail) return 'email';
-    }
+    const available = order.filter(channel => contacts[channel]);
 
-    // Para prioridade de custo
-    if (priority === 'cost') {
-      if (hasEmail) return 'email';
-      if (hasWhatsApp) return 'whatsapp';
-      if (hasSMS) return 'sms';
+    // Verificar preferência do cliente
+    const preferencia = cliente.preferencia_comunicacao;
+    if (preferencia && preferencia !== 'auto') {
+      return [preferencia, ...available.filter(channel => channel !== preferencia)];
     }
 
-    // Para prioridade de confiabilidade (padrão)
-    if (hasEmail) return 'email';
-    if (hasWhatsApp) return 'whatsapp';
-    if (hasSMS) return 'sms';
+    return available;
+  }
 
-    // Fallback padrão
-    return 'email';
+  // 📇 Contatos disponíveis por canal
+  private contactAvailability(cliente: Cliente): Record<'whatsapp' | 'sms' | 'email', boolean> {
+    const hasPhone = !!(cliente.celular || cliente.telefone);
+    return { whatsapp: hasPhone, sms: hasPhone, email: !!cliente.email };
   }
 
   // 📱 Envio de Comunicação com Fallback Inteligente
@@ -134,17 +136,13 @@ export class CommunicationService {
         const attempts: CommunicationResult['attempts'] = [];
 
         // Tentar envio no canal principal
-        let result = await this.sendToChannel(
+        let result = await this.attemptChannel(
           primaryChannel,
           cliente,
           message,
-          subject
+          subject,
+          attempts
         );
-        attempts.push({
-          channel: primaryChannel,
-          success: result.success,
-          error: result.error,
-        });
 
         if (result.success) {
           // Log sucesso
@@ -165,17 +163,13 @@ export class CommunicationService {
           );
 
           for (const channel of fallbackChannels) {
-            result = await this.sendToChannel(
+            result = await this.attemptChannel(
               channel,
               cliente,
               message,
-              subject
+              subject,
+              attempts
             );
-            attempts.push({
-              channel,
-              success: result.success,
-              error: result.error,
-            });
 
             if (result.success) {
               // Log sucesso fallback
@@ -247,6 +241,32 @@ export class CommunicationService {
   }
 
 
+  // ⚡ Tentativa em um canal respeitando o circuit breaker: circuito aberto falha na hora,
+  // sem esperar o timeout do provedor
+  private async attemptChannel(
+    channel: 'whatsapp' | 'sms' | 'email',
+    cliente: Cliente,
+    message: string,
+    subject: string | undefined,
+    attempts: CommunicationResult['attempts']
+  ): Promise<{ success: boolean; messageId?: string; error?: string }> {
+    // Sem contato o envio falha antes do provedor e não gera métrica: verificar antes de
+    // reservar, para não prender a vaga de sondagem do circuito em half-open
+    const canSend =
+      !this.contactAvailability(cliente)[channel] || channelHealthMonitor.tryAcquire(channel);
+    const result = canSend
+      ? await this.sendToChannel(channel, cliente, message, subject)
+      : { success: false, error: 'Canal indisponível (circuito aberto)' };
+
+    attempts.push({
+      channel,
+      success: result.success,
+      error: result.error,
+    });
+
+    return result;
+  }
+
   // 🔄 Obter Canais de Fallback
   private getFallbackChannels(
     primaryChannel: 'whatsapp' | 'sms' | 'email',
@@ -277,7 +297,9 @@ export class CommunicationService {
         break;
     }
 
-    return channels;
+    // Canais saudáveis primeiro; os de circuito aberto ficam no fim e são pulados sem espera
+    const healthy = channelHealthMonitor.rank(channels);
+    return [...healthy, ...channels.filter(channel => !healthy.includes(channel))];
   }
 
   // 📤 Envio para Canal Específico
@@ -395,11 +417,12 @@ export class CommunicationService {
           selectedChannel
         );
 
+        // Fixar o canal escolhido para que o conteúdo gerado corresponda ao canal usado
         const result = await this.sendCommunication(
           cliente,
           message,
           subject,
-          communicationOptions
+          { ...communicationOptions, forceChannel: selectedChannel }
         );
 
         // Se sucesso, vincular log à ordem de serviço
@@ -624,75 +647,10 @@ export class CommunicationService {
   }
 
   // 📊 Estatísticas de Comunicação
-  async getCommunicationStats(clienteId?: string): Promise<{
-    total: number;
-    byChannel: Record<string, number>;
-    successRate: number;
-    lastWeek: number;
-  }> {
+  // Servidas pelos contadores por cliente/canal (lib/services/communication-stats.ts)
+  async getCommunicationStats(clienteId?: string): Promise<CommunicationStats> {
     try {
-      let where: any = {};
-
-      if (clienteId) {
-        // Buscar contatos do cliente se necessário, ou filtrar por clienteId direto
-        // Supondo que clientePortalId seja a chave para clienteId
-        where = {
-          OR: [
-            { clientePortalId: clienteId },
-            // Fallback para buscar por contatos se o ID não bater (legado?)
-            // Mas Prisma OR queries complexas podem ser pesadas. Vamos confiar no ID por hora.
-            // Para ser compatível com lógica anterior de telefone/email:
-          ]
-        };
-
-        // Se quisermos manter a logica antiga de buscar telefones do cliente:
-        const cliente = await prisma.cliente.findUnique({
-          where: { id: clienteId },
-          select: { telefone: true, email: true }
-        });
-
-        if (cliente) {
-          const contacts = [cliente.telefone, cliente.email].filter(Boolean);
-          if (contacts.length > 0) {
-            where = {
-              OR: [
-                { clientePortalId: clienteId },
-                { clienteTelefone: { in: contacts as string[] } },
-                { destinatario: { in: contacts as string[] } }
-              ]
-            };
-          }
-        }
-      }
-
-      const rows = await prisma.comunicacaoCliente.findMany({
-        where,
-        select: { tipo: true, status: true, dataEnvio: true }
-      });
-
-      const total = rows.length;
-
-      const byChannel = rows.reduce((acc: Record<string, number>, item) => {
-        acc[item.tipo] = (acc[item.tipo] || 0) + 1;
-        return acc;
-      }, {} as Record<string, number>);
-
-      const successful = rows.filter((item) => item.status === 'enviado').length;
-      const successRate = total > 0 ? (successful / total) * 100 : 0;
-
-      const weekAgo = new Date();
-      weekAgo.setDate(weekAgo.getDate() - 7);
-      const lastWeek = rows.filter((item) => {
-        if (!item.dataEnvio) return false;
-        return item.dataEnvio >= weekAgo;
-      }).length;
-
-      return {
-        total,
-        byChannel,
-        successRate,
-        lastWeek,
-      };
+      return await communicationStatsService.getStats(clienteId);
     } catch (error) {
       console.error('❌ Erro ao obter estatísticas:', error);
       return {
@@ -704,6 +662,11 @@ export class CommunicationService {
     }
   }
 
+  // 🩺 Estado dos circuit breakers por canal
+  getChannelHealth() {
+    return channelHealthMonitor.getSnapshot();
+  }
+
   // 🧪 Teste de Todos os Canais
   async testAllChannels(): Promise<{
     whatsapp: { success: boolean; message: string };
@@ -0,0 +1,173 @@
+// 🔢 Communication Stats - Estatísticas de comunicações por cliente e canal
+// Lidas dos contadores mantidos por trigger (comunicacoes_estatisticas*): custo constante por
+// cliente; o total geral soma os escopos. Se a migração não foi aplicada (sem a linha sentinela,
+// ex.: `prisma db push`) ou os contadores não existirem, agrega no banco com groupBy.
+// Um id de Cliente também casa as comunicações pelo telefone/email (destinatario), que os
+// contadores por cliente_portal_id não enxergam: nesse caso a agregação é sempre no banco
+import { Prisma } from '@prisma/client';
+
+import prisma from '@/lib/prisma';
+
+export interface CommunicationStats {
+  total: number;
+  byChannel: Record<string, number>;
+  successRate: number;
+  lastWeek: number;
+}
+
+interface ChannelCounter {
+  tipo: string;
+  total: number;
+  enviados: number;
+}
+
+// Linha gravada pela migração após a carga inicial (cliente_portal_id é UUID, nunca colide)
+export const STATS_SENTINEL = { escopo: '#', tipo: 'carga' } as const;
+
+const DAY_IN_MS = 24 * 60 * 60 * 1000;
+
+// Início (UTC) do dia de 7 dias atrás: os contadores diários usam dias de calendário em UTC
+function inicioUltimaSemana(): Date {
+  const weekAgo = new Date(Date.now() - 7 * DAY_IN_MS);
+  return new Date(`${weekAgo.toISOString().split('T')[0]}T00:00:00.000Z`);
+}
+
+function summarize(counters: ChannelCounter[], lastWeek: number): CommunicationStats {
+  let total = 0;
+  let enviados = 0;
+  const byChannel: Record<string, number> = {};
+
+  for (const counter of counters) {
+    if (counter.total <= 0) continue;
+    byChannel[counter.tipo] = (byChannel[counter.tipo] || 0) + counter.total;
+    total += counter.total;
+    enviados += counter.enviados;
+  }
+
+  return {
+    total,
+    byChannel,
+    successRate: total > 0 ? (enviados / total) * 100 : 0,
+    lastWeek,
+  };
+}
+
+export class CommunicationStatsService {
+  private warnedUninitialized = false;
+
+  // 📊 Estatísticas de um cliente (Cliente ou clientePortalId) ou de todas as comunicações
+  async getStats(clienteId?: string): Promise<CommunicationStats> {
+    if (clienteId) {
+      const where = await this.clienteWhere(clienteId);
+      if (where) return this.fromAggregates(where);
+    }
+
+    try {
+      const stats = await this.fromCounters(clienteId);
+      if (stats) return stats;
+
+      if (!this.warnedUninitialized) {
+        this.warnedUninitialized = true;
+        console.warn(
+          'Contadores de comunicação não inicializados (aplique ' +
+            'migrations/create_comunicacoes_estatisticas.sql); agregando no banco'
+        );
+      }
+    } catch (error) {
+      console.error('Contadores de comunicação indisponíveis, agregando no banco:', error);
+    }
+
+    return this.fromAggregates(clienteId ? { clientePortalId: clienteId } : {});
+  }
+
+  // Id de Cliente com contatos: casar também por telefone e destinatario, como sempre foi.
+  // Retorna null para um clientePortalId (ou Cliente sem contatos), servido pelos contadores
+  private async clienteWhere(clienteId: string): Promise<Prisma.ComunicacaoClienteWhereInput | null> {
+    const cliente = await prisma.cliente.findUnique({
+      where: { id: clienteId },
+      select: { telefone: true, email: true },
+    });
+
+    const contatos = [cliente?.telefone, cliente?.email].filter(
+      (contato): contato is string => !!contato
+    );
+    if (contatos.length === 0) return null;
+
+    return {
+      OR: [
+        { clientePortalId: clienteId },
+        { clienteTelefone: { in: contatos } },
+        { destinatario: { in: contatos } },
+      ],
+    };
+  }
+
+  // Contadores pré-agregados: uma linha por canal + no máximo 8 dias × canais por escopo.
+  // Retorna null se a sentinela da migração não existe (contadores vazios não são confiáveis)
+  private async fromCounters(clienteId?: string): Promise<CommunicationStats | null> {
+    const primeiroDia = inicioUltimaSemana();
+
+    const [sentinela, counters, semana] = await Promise.all([
+      prisma.comunicacaoEstatistica.findUnique({
+        where: { escopo_tipo: STATS_SENTINEL },
+        select: { escopo: true },
+      }),
+      clienteId
+        ? prisma.comunicacaoEstatistica.findMany({
+          where: { escopo: clienteId },
+          select: { tipo: true, total: true, enviados: true },
+        })
+        : this.sumAllScopes(),
+      prisma.comunicacaoEstatisticaDiaria.aggregate({
+        where: { ...(clienteId ? { escopo: clienteId } : {}), dia: { gte: primeiroDia } },
+        _sum: { total: true },
+      }),
+    ]);
+
+    if (!sentinela) return null;
+
+    return summarize(counters, semana._sum.total ?? 0);
+  }
+
+  // Total geral: soma por canal de todos os escopos (sem linha global disputada pelos workers)
+  private async sumAllScopes(): Promise<ChannelCounter[]> {
+    const rows = await prisma.comunicacaoEstatistica.groupBy({
+      by: ['tipo'],
+      where: { escopo: { not: STATS_SENTINEL.escopo } },
+      _sum: { total: true, enviados: true },
+    });
+
+    return rows.map(row => ({
+      tipo: row.tipo,
+      total: row._sum.total ?? 0,
+      enviados: row._sum.enviados ?? 0,
+    }));
+  }
+
+  // groupBy no banco: sem carregar as linhas, mas proporcional ao histórico
+  private async fromAggregates(
+    where: Prisma.ComunicacaoClienteWhereInput
+  ): Promise<CommunicationStats> {
+    const [porCanal, lastWeek] = await Promise.all([
+      prisma.comunicacaoCliente.groupBy({
+        by: ['tipo', 'status'],
+        where,
+        _count: { _all: true },
+      }),
+      prisma.comunicacaoCliente.count({
+        where: { ...where, dataEnvio: { gte: inicioUltimaSemana() } },
+      }),
+    ]);
+
+    return summarize(
+      porCanal.map(row => ({
+        tipo: row.tipo,
+        total: row._count._all,
+        enviados: row.status === 'enviado' ? row._count._all : 0,
+      })),
+      lastWeek
+    );
+  }
+}
+
+export const communicationStatsService = new CommunicationStatsService();
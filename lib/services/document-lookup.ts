@@ -0,0 +1,182 @@
+// 🔎 Document Lookup - Cache das consultas de CEP e CNPJ
+// Camadas: LRU em memória (resposta em microssegundos) → Redis (compartilhado entre instâncias)
+// → provedores externos. Consultas idênticas simultâneas compartilham a mesma chamada externa.
+// Resultados encontrados ficam em cache por muito tempo; "não encontrado" por pouco tempo;
+// falhas dos provedores não são cacheadas
+import { cacheService } from '@/lib/services/cache-service';
+import { cepIndexService } from '@/lib/services/cep-index';
+import { LruCache } from '@/lib/services/lru-cache';
+import {
+  CNPJ_NAO_ENCONTRADO,
+  CNPJResponse,
+  ViaCepResponse,
+  buscarCNPJService,
+  consultarCEP,
+  validarCEP,
+  validarCNPJ,
+} from '@/lib/validators';
+
+export type LookupOutcome = 'encontrado' | 'nao_encontrado' | 'indisponivel';
+
+export interface LookupCacheOptions<T> {
+  namespace: string;
+  maxEntries: number;
+  hitTtlSeconds: number;
+  missTtlSeconds: number;
+  // Teto do TTL em memória: instâncias diferentes não divergem por muito tempo
+  maxMemoryTtlSeconds: number;
+  load: (_key: string) => Promise<T | null>;
+  classify: (_value: T | null) => LookupOutcome;
+}
+
+// Envelope para distinguir "não encontrado" (value: null) de ausência no cache
+interface CachedLookup<T> {
+  value: T | null;
+}
+
+export class LookupCache<T> {
+  private readonly memory: LruCache<string, CachedLookup<T>>;
+  private inFlight = new Map<string, Promise<T | null>>();
+  private stats = { memoria: 0, redis: 0, consultas: 0, agrupadas: 0 };
+
+  constructor(private readonly options: LookupCacheOptions<T>) {
+    this.memory = new LruCache({ maxEntries: options.maxEntries });
+  }
+
+  async get(key: string): Promise<T | null> {
+    const cached = this.memory.get(key);
+    if (cached) {
+      this.stats.memoria++;
+      return cached.value;
+    }
+
+    // Consulta idêntica já em andamento: aguardar a mesma promise
+    const pending = this.inFlight.get(key);
+    if (pending) {
+      this.stats.agrupadas++;
+      return pending;
+    }
+
+    const promise = this.resolve(key).finally(() => this.inFlight.delete(key));
+    this.inFlight.set(key, promise);
+    return promise;
+  }
+
+  private async resolve(key: string): Promise<T | null> {
+    const redisKey = `lookup:${this.options.namespace}:${key}`;
+
+    const shared = await cacheService.get<CachedLookup<T>>(redisKey);
+    if (shared) {
+      this.stats.redis++;
+      const outcome = this.options.classify(shared.value);
+      this.memory.set(key, shared, this.memoryTtlMs(outcome));
+      return shared.value;
+    }
+
+    this.stats.consultas++;
+    const value = await this.options.load(key);
+    const outcome = this.options.classify(value);
+
+    if (outcome !== 'indisponivel') {
+      const entry = { value };
+      this.memory.set(key, entry, this.memoryTtlMs(outcome));
+      await cacheService.set(
+        redisKey,
+        entry,
+        outcome === 'encontrado' ? this.options.hitTtlSeconds : this.options.missTtlSeconds
+      );
+    }
+
+    return value;
+  }
+
+  private memoryTtlMs(outcome: LookupOutcome): number {
+    const ttlSeconds =
+      outcome === 'encontrado' ? this.options.hitTtlSeconds : this.options.missTtlSeconds;
+    return Math.min(ttlSeconds, this.options.maxMemoryTtlSeconds) * 1000;
+  }
+
+  getStats() {
+    return {
+      ...this.stats,
+      emAndamento: this.inFlight.size,
+      memoriaEntradas: this.memory.getStats().entries,
+    };
+  }
+
+  clear(): void {
+    this.memory.clear();
+  }
+}
+
+const HOUR = 60 * 60;
+const DAY = 24 * HOUR;
+
+export class DocumentLookupService {
+  private readonly cep = new LookupCache<ViaCepResponse>({
+    namespace: 'cep',
+    maxEntries: 5000,
+    // Logradouros praticamente não mudam
+    hitTtlSeconds: 30 * DAY,
+    missTtlSeconds: 10 * 60,
+    maxMemoryTtlSeconds: 6 * HOUR,
+    // Falha de todos os provedores lança erro: nada é cacheado
+    load: cep => consultarCEP(cep),
+    classify: value => (value ? 'encontrado' : 'nao_encontrado'),
+  });
+
+  private readonly cnpj = new LookupCache<CNPJResponse>({
+    namespace: 'cnpj',
+    maxEntries: 5000,
+    // Situação cadastral e endereço podem mudar: 1 dia
+    hitTtlSeconds: DAY,
+    missTtlSeconds: 10 * 60,
+    maxMemoryTtlSeconds: HOUR,
+    load: cnpj => buscarCNPJService(cnpj),
+    classify: value => {
+      if (value && !value.erro) return 'encontrado';
+      if (value?.situacao === CNPJ_NAO_ENCONTRADO) return 'nao_encontrado';
+      return 'indisponivel';
+    },
+  });
+
+  // 📮 CEP: null para inválido ou inexistente; lança erro se os provedores estiverem fora
+  async buscarCEP(cep: string): Promise<ViaCepResponse | null> {
+    const cleanCep = cep.replace(/\D/g, '');
+    if (!validarCEP(cleanCep)) return null;
+
+    // Índice local primeiro (quando configurado); ausência nele não é definitiva
+    const local = cepIndexService.lookup(cleanCep);
+    if (local) return local;
+
+    return this.cep.get(cleanCep);
+  }
+
+  // 🏢 CNPJ: mesmo contrato de buscarCNPJService
+  async buscarCNPJ(cnpj: string): Promise<CNPJResponse | null> {
+    const cleanCnpj = cnpj.replace(/\D/g, '');
+    if (!validarCNPJ(cleanCnpj)) return null;
+
+    return this.cnpj.get(cleanCnpj);
+  }
+
+  getStats() {
+    return {
+      cepIndice: cepIndexService.getStats(),
+      cep: this.cep.getStats(),
+      cnpj: this.cnpj.getStats(),
+    };
+  }
+}
+
+// 🌟 Instância global (sobrevive a hot reload em desenvolvimento)
+const globalForDocumentLookup = globalThis as unknown as {
+  documentLookupService: DocumentLookupService | undefined;
+};
+
+export const documentLookupService =
+  globalForDocumentLookup.documentLookupService ?? new DocumentLookupService();
+
+if (process.env.NODE_ENV !== 'production') {
+  globalForDocumentLookup.documentLookupService = documentLookupService;
+}
@@ -12,6 +12,10 @@ interface EmailConfig {
     user: string;
     pass: string;
   };
+  // Pool SMTP: conexões autenticadas reaproveitadas entre envios
+  pool: boolean;
+  maxConnections: number;
+  maxMessages: number;
 }
 
 interface OrdemServicoEmail {
@@ -34,6 +38,8 @@ interface OrdemServicoEmail {
 
 class EmailService {
   private transporter: nodemailer.Transporter | null = null;
+  private poolConfig = { maxConnections: 0, maxMessages: 0 };
+  private poolStats = { enviados: 0, erros: 0 };
 
   constructor() {
     this.initializeTransporter();
@@ -48,6 +54,9 @@ class EmailService {
         user: process.env.SMTP_USER || '',
         pass: process.env.SMTP_PASS || '',
       },
+      pool: true,
+      maxConnections: Math.max(1, Number(process.env.SMTP_POOL_MAX_CONNECTIONS) || 5),
+      maxMessages: Math.max(1, Number(process.env.SMTP_POOL_MAX_MESSAGES) || 100),
     };
 
     if (!config.auth.user || !config.auth.pass) {
@@ -58,6 +67,37 @@ class EmailService {
     }
 
     this.transporter = nodemailer.createTransport(config);
+    this.poolConfig = {
+      maxConnections: config.maxConnections,
+      maxMessages: config.maxMessages,
+    };
+  }
+
+  // Envio pelo pool, contabilizando sucesso e falha
+  private async deliver(mailOptions: nodemailer.SendMailOptions) {
+    if (!this.transporter) {
+      throw new Error('Transporter de email não configurado');
+    }
+
+    try {
+      const result = await this.transporter.sendMail(mailOptions);
+      this.poolStats.enviados++;
+      return result;
+    } catch (error) {
+      this.poolStats.erros++;
+      throw error;
+    }
+  }
+
+  // 📊 Estado do pool SMTP
+  getPoolStats() {
+    return {
+      configurado: this.transporter !== null,
+      // isIdle(): há conexão livre no pool para um novo envio
+      ocioso: this.transporter?.isIdle?.() ?? false,
+      ...this.poolConfig,
+      ...this.poolStats,
+    };
   }
 
   async sendOrdemServicoEmail(
@@ -116,7 +156,7 @@ class EmailService {
         }
 
         try {
-          const result = await this.transporter.sendMail(mailOptions);
+          const result = await this.deliver(mailOptions);
 
           // Registrar comunicação no banco
           await this.registrarComunicacao({
@@ -155,6 +195,33 @@ class EmailService {
     );
   }
 
+  // Envio de conteúdo já renderizado (usado pela fila de envio, que registra o resultado)
+  async sendEmail(
+    to: string,
+    subject: string,
+    html: string
+  ): Promise<{ messageId: string }> {
+    return await metricsService.measureOperation(
+      'email',
+      'sendEmail',
+      async () => {
+        if (!this.transporter) {
+          throw new Error('Transporter de email não configurado');
+        }
+
+        const result = await this.deliver({
+          from: `"InterAlpha" <${process.env.SMTP_USER}>`,
+          to,
+          subject,
+          html,
+        });
+
+        return { messageId: result.messageId };
+      },
+      { destinatario: to }
+    );
+  }
+
   private generateOrdemServicoEmailTemplate(
     ordemServico: OrdemServicoEmail,
     loginCredentials?: { login: string; senha: string }
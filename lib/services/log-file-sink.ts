@@ -0,0 +1,210 @@
+// 📁 Log File Sink - Arquivo NDJSON com Rotação (somente servidor)
+// Um único stream de append por arquivo, escrita em lotes, rotação por tamanho e por dia
+import { createReadStream, createWriteStream, WriteStream } from 'fs';
+import { mkdir, readdir, rename, stat, unlink } from 'fs/promises';
+import path from 'path';
+import { pipeline } from 'stream/promises';
+import { createGzip } from 'zlib';
+
+export interface LogFileSinkOptions {
+  directory: string;
+  baseName: string;
+  maxFileSize: number;
+  maxFiles: number;
+  compress: boolean;
+}
+
+export const DEFAULT_LOG_FILE_SINK_OPTIONS: LogFileSinkOptions = {
+  directory: path.join(process.cwd(), 'logs'),
+  baseName: 'app',
+  maxFileSize: 10 * 1024 * 1024, // 10MB
+  maxFiles: 14,
+  compress: true,
+};
+
+export class LogFileSink {
+  private readonly options: LogFileSinkOptions;
+  private stream: WriteStream | null = null;
+  private currentDate = '';
+  private currentSize = 0;
+  // Escritas e rotações são serializadas para manter a ordem das linhas
+  private chain: Promise<void> = Promise.resolve();
+
+  constructor(options: Partial<LogFileSinkOptions> = {}) {
+    this.options = { ...DEFAULT_LOG_FILE_SINK_OPTIONS, ...options };
+  }
+
+  // ✍️ Gravar um lote de linhas já serializadas (uma por registro)
+  write(lines: string[]): Promise<void> {
+    if (lines.length === 0) return this.chain;
+
+    const chunk = `${lines.join('\n')}\n`;
+    const next = this.chain.then(() => this.writeChunk(chunk));
+    this.chain = next.catch(() => undefined);
+    return next;
+  }
+
+  private async writeChunk(chunk: string): Promise<void> {
+    const bytes = Buffer.byteLength(chunk);
+    const today = new Date().toISOString().slice(0, 10);
+
+    if (
+      this.stream &&
+      (today !== this.currentDate ||
+        this.currentSize + bytes > this.options.maxFileSize)
+    ) {
+      await this.rotate();
+    }
+
+    if (!this.stream) {
+      await this.open(today);
+    }
+
+    const stream = this.stream!;
+    this.currentSize += bytes;
+
+    // Respeitar backpressure do stream sem bloquear o event loop
+    if (!stream.write(chunk)) {
+      await this.waitForDrain(stream);
+    }
+  }
+
+  // Um stream com erro ou fechado nunca emite 'drain': liberar a cadeia de escritas e
+  // descartar o stream para que a próxima escrita reabra o arquivo
+  private waitForDrain(stream: WriteStream): Promise<void> {
+    return new Promise<void>((resolve, reject) => {
+      const settle = (error?: Error) => {
+        stream.off('drain', onDrain);
+        stream.off('error', onError);
+        stream.off('close', onClose);
+        if (error && this.stream === stream) {
+          this.stream = null;
+        }
+        if (error) {
+          reject(error);
+        } else {
+          resolve();
+        }
+      };
+      const onDrain = () => settle();
+      const onError = (error: Error) => settle(error);
+      const onClose = () => settle(new Error('Arquivo de log fechado antes do drain'));
+
+      stream.once('drain', onDrain);
+      stream.once('error', onError);
+      stream.once('close', onClose);
+    });
+  }
+
+  private activeFilePath(date: string): string {
+    return path.join(this.options.directory, `${this.options.baseName}-${date}.log`);
+  }
+
+  private async open(date: string): Promise<void> {
+    await mkdir(this.options.directory, { recursive: true });
+
+    const filePath = this.activeFilePath(date);
+    this.currentDate = date;
+    this.currentSize = await stat(filePath)
+      .then(info => info.size)
+      .catch(() => 0);
+
+    this.stream = createWriteStream(filePath, { flags: 'a' });
+    this.stream.on('error', error => {
+      console.error('Erro no arquivo de log:', error);
+    });
+  }
+
+  private async closeStream(): Promise<void> {
+    const { stream } = this;
+    this.stream = null;
+    if (!stream) return;
+
+    await new Promise<void>(resolve => stream.end(resolve));
+  }
+
+  // 🔄 Fechar o arquivo atual, renomear com sufixo sequencial e comprimir
+  private async rotate(): Promise<void> {
+    const date = this.currentDate;
+    const activePath = this.activeFilePath(date);
+    await this.closeStream();
+
+    try {
+      const rotatedPath = await this.nextRotatedPath(date);
+      await rename(activePath, rotatedPath);
+
+      if (this.options.compress) {
+        // Compressão fora do caminho das escritas seguintes
+        void this.compress(rotatedPath).then(() => this.prune());
+      } else {
+        await this.prune();
+      }
+    } catch (error) {
+      console.error('Erro ao rotacionar arquivo de log:', error);
+    }
+  }
+
+  private async nextRotatedPath(date: string): Promise<string> {
+    const files = await readdir(this.options.directory);
+    const prefix = `${this.options.baseName}-${date}.`;
+    const used = files
+      .filter(file => file.startsWith(prefix))
+      .map(file => Number(file.slice(prefix.length).split('.')[0]))
+      .filter(index => Number.isInteger(index));
+    const nextIndex = used.length > 0 ? Math.max(...used) + 1 : 1;
+
+    return path.join(this.options.directory, `${prefix}${nextIndex}.log`);
+  }
+
+  private async compress(filePath: string): Promise<void> {
+    try {
+      await pipeline(
+        createReadStream(filePath),
+        createGzip(),
+        createWriteStream(`${filePath}.gz`)
+      );
+      await unlink(filePath);
+    } catch (error) {
+      console.error('Erro ao comprimir arquivo de log:', error);
+    }
+  }
+
+  // 🧹 Manter apenas os maxFiles arquivos rotacionados mais recentes
+  private async prune(): Promise<void> {
+    try {
+      const activeName = path.basename(this.activeFilePath(this.currentDate));
+      const files = await readdir(this.options.directory);
+      const rotated = files.filter(
+        file =>
+          file.startsWith(`${this.options.baseName}-`) &&
+          file !== activeName &&
+          /\.\d+\.log(\.gz)?$/.test(file)
+      );
+
+      if (rotated.length <= this.options.maxFiles) return;
+
+      const withTimes = await Promise.all(
+        rotated.map(async file => {
+          const filePath = path.join(this.options.directory, file);
+          const info = await stat(filePath);
+          return { filePath, mtime: info.mtimeMs };
+        })
+      );
+
+      withTimes.sort((a, b) => b.mtime - a.mtime);
+      await Promise.all(
+        withTimes
+          .slice(this.options.maxFiles)
+          .map(entry => unlink(entry.filePath).catch(() => undefined))
+      );
+    } catch (error) {
+      console.error('Erro ao remover arquivos de log antigos:', error);
+    }
+  }
+
+  // 🛑 Aguardar escritas pendentes e fechar o arquivo
+  async close(): Promise<void> {
+    await this.chain;
+    await this.closeStream();
+  }
+}
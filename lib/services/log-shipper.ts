@@ -0,0 +1,319 @@
+// 🌐 Log Shipper - Envio Remoto de Logs em Lotes Comprimidos (somente servidor)
+// Fila circular limitada, lotes gzip limitados por bytes, backoff exponencial com jitter
+// e spool opcional em disco quando o coletor fica indisponível por muito tempo
+import { mkdir, readdir, readFile, stat, unlink, writeFile } from 'fs/promises';
+import path from 'path';
+import { promisify } from 'util';
+import { gzip as gzipCallback } from 'zlib';
+
+const gzip = promisify(gzipCallback);
+
+export interface LogShipperOptions {
+  endpoint: string;
+  maxQueueSize: number; // registros em memória
+  maxBatchBytes: number; // bytes (não comprimidos) por requisição
+  flushIntervalMs: number;
+  baseBackoffMs: number;
+  maxBackoffMs: number;
+  maxRetries: number; // tentativas por lote antes de ir para o spool
+  requestTimeoutMs: number;
+  spoolDirectory?: string;
+  maxSpoolBytes: number; // tamanho máximo do spool; os arquivos mais antigos são descartados
+}
+
+export interface LogShipperStats {
+  queued: number;
+  shipped: number;
+  dropped: number;
+  spooled: number;
+  failedAttempts: number;
+  consecutiveFailures: number;
+  lastShipAt: Date | null;
+}
+
+interface PendingBatch {
+  lines: string[];
+  attempts: number;
+  spoolFile?: string; // lote lido do spool (removido após envio)
+}
+
+export const DEFAULT_LOG_SHIPPER_OPTIONS: Omit<LogShipperOptions, 'endpoint'> = {
+  maxQueueSize: 5000,
+  maxBatchBytes: 256 * 1024,
+  flushIntervalMs: 5000,
+  baseBackoffMs: 1000,
+  maxBackoffMs: 60 * 1000,
+  maxRetries: 5,
+  requestTimeoutMs: 10 * 1000,
+  maxSpoolBytes: 50 * 1024 * 1024,
+};
+
+export class LogShipper {
+  private readonly options: LogShipperOptions;
+  private queue: Array<string | undefined>;
+  private head = 0;
+  private size = 0;
+  private retryBatch: PendingBatch | null = null;
+  private nextAttemptAt = 0;
+  private shipping: Promise<void> | null = null;
+  private flushTimer?: ReturnType<typeof setInterval>;
+  private spoolSequence = 0;
+  private stats: Omit<LogShipperStats, 'queued'> = {
+    shipped: 0,
+    dropped: 0,
+    spooled: 0,
+    failedAttempts: 0,
+    consecutiveFailures: 0,
+    lastShipAt: null,
+  };
+
+  constructor(options: Partial<LogShipperOptions> & { endpoint: string }) {
+    this.options = { ...DEFAULT_LOG_SHIPPER_OPTIONS, ...options };
+    this.queue = new Array(this.options.maxQueueSize);
+    this.startFlushTimer();
+  }
+
+  // ➕ Enfileirar linhas já serializadas (O(1) por linha, nunca aguarda rede)
+  enqueue(lines: string[]): void {
+    const capacity = this.options.maxQueueSize;
+
+    for (const line of lines) {
+      if (this.size === capacity) {
+        // Fila cheia: descartar o registro mais antigo
+        this.queue[this.head] = undefined;
+        this.head = (this.head + 1) % capacity;
+        this.size--;
+        this.stats.dropped++;
+      }
+
+      this.queue[(this.head + this.size) % capacity] = line;
+      this.size++;
+    }
+  }
+
+  // 🚚 Enviar o que estiver pendente (respeitando o backoff atual)
+  flush(): Promise<void> {
+    if (this.shipping) return this.shipping;
+
+    this.shipping = this.drain().finally(() => {
+      this.shipping = null;
+    });
+
+    return this.shipping;
+  }
+
+  private async drain(): Promise<void> {
+    while (Date.now() >= this.nextAttemptAt) {
+      const batch = this.retryBatch ?? this.takeBatch();
+      this.retryBatch = null;
+
+      if (!batch) {
+        // Fila em memória vazia: reenviar o que foi para o spool
+        if (!(await this.replaySpool())) return;
+        continue;
+      }
+
+      try {
+        await this.send(batch.lines);
+        if (batch.spoolFile) {
+          await unlink(batch.spoolFile).catch(() => undefined);
+          this.stats.spooled = Math.max(
+            0,
+            this.stats.spooled - batch.lines.length
+          );
+        }
+        this.stats.shipped += batch.lines.length;
+        this.stats.consecutiveFailures = 0;
+        this.stats.lastShipAt = new Date();
+      } catch (error) {
+        this.stats.failedAttempts++;
+        this.stats.consecutiveFailures++;
+        this.nextAttemptAt = Date.now() + this.backoffDelay();
+
+        const attempts = batch.attempts + 1;
+        if (batch.spoolFile) {
+          // Continua no disco; será relido na próxima janela de envio
+        } else if (attempts >= this.options.maxRetries) {
+          await this.spoolOrDrop(batch.lines);
+        } else {
+          this.retryBatch = { ...batch, attempts };
+        }
+
+        if (this.stats.consecutiveFailures === 1) {
+          console.error('Erro ao enviar logs para endpoint remoto:', error);
+        }
+        return;
+      }
+    }
+  }
+
+  // Retirar da fila um lote limitado por bytes (sempre ao menos uma linha)
+  private takeBatch(): PendingBatch | null {
+    if (this.size === 0) return null;
+
+    const capacity = this.options.maxQueueSize;
+    const lines: string[] = [];
+    let bytes = 0;
+
+    while (this.size > 0) {
+      const line = this.queue[this.head] as string;
+      const lineBytes = Buffer.byteLength(line) + 1;
+
+      if (lines.length > 0 && bytes + lineBytes > this.options.maxBatchBytes) {
+        break;
+      }
+
+      lines.push(line);
+      bytes += lineBytes;
+      this.queue[this.head] = undefined;
+      this.head = (this.head + 1) % capacity;
+      this.size--;
+    }
+
+    return { lines, attempts: 0 };
+  }
+
+  // ⏳ Backoff exponencial com jitter completo
+  private backoffDelay(): number {
+    const exponent = Math.min(this.stats.consecutiveFailures - 1, 16);
+    const ceiling = Math.min(
+      this.options.maxBackoffMs,
+      this.options.baseBackoffMs * 2 ** exponent
+    );
+    return Math.round(Math.random() * ceiling);
+  }
+
+  // Mantém o formato { logs: [...] } do coletor, comprimido com gzip.
+  // O fetch do Node (undici) reutiliza conexões keep-alive por origem.
+  private async send(lines: string[]): Promise<void> {
+    const body = await gzip(`{"logs":[${lines.join(',')}]}`);
+    const controller = new AbortController();
+    const timeout = setTimeout(
+      () => controller.abort(),
+      this.options.requestTimeoutMs
+    );
+
+    try {
+      const response = await fetch(this.options.endpoint, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'Content-Encoding': 'gzip',
+        },
+        body,
+        signal: controller.signal,
+      });
+
+      // Liberar o socket para reuso
+      await response.arrayBuffer().catch(() => undefined);
+
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+      }
+    } finally {
+      clearTimeout(timeout);
+    }
+  }
+
+  // 💾 Spool em disco (se configurado); caso contrário o lote é descartado
+  private async spoolOrDrop(lines: string[]): Promise<void> {
+    const directory = this.options.spoolDirectory;
+
+    if (!directory) {
+      this.stats.dropped += lines.length;
+      return;
+    }
+
+    const content = `${lines.join('\n')}\n`;
+    const bytes = Buffer.byteLength(content);
+    if (bytes > this.options.maxSpoolBytes) {
+      this.stats.dropped += lines.length;
+      return;
+    }
+
+    try {
+      await mkdir(directory, { recursive: true });
+      await this.trimSpool(directory, bytes);
+      const fileName = `spool-${Date.now()}-${this.spoolSequence++}.ndjson`;
+      await writeFile(path.join(directory, fileName), content);
+      this.stats.spooled += lines.length;
+    } catch (error) {
+      this.stats.dropped += lines.length;
+      console.error('Erro ao gravar spool de logs:', error);
+    }
+  }
+
+  // Abrir espaço para `incomingBytes` descartando os arquivos de spool mais antigos
+  private async trimSpool(directory: string, incomingBytes: number): Promise<void> {
+    const files = (await readdir(directory))
+      .filter(file => file.startsWith('spool-') && file.endsWith('.ndjson'))
+      .sort();
+    const sizes = await Promise.all(
+      files.map(file => stat(path.join(directory, file)).then(info => info.size, () => 0))
+    );
+
+    let total = sizes.reduce((sum, size) => sum + size, 0);
+    for (let i = 0; i < files.length && total + incomingBytes > this.options.maxSpoolBytes; i++) {
+      const spoolFile = path.join(directory, files[i]);
+      const content = await readFile(spoolFile, 'utf8').catch(() => '');
+      await unlink(spoolFile).catch(() => undefined);
+
+      const discarded = content.split('\n').filter(Boolean).length;
+      this.stats.dropped += discarded;
+      this.stats.spooled = Math.max(0, this.stats.spooled - discarded);
+      total -= sizes[i];
+    }
+  }
+
+  // Reenviar o arquivo de spool mais antigo; retorna true se algo foi enviado
+  private async replaySpool(): Promise<boolean> {
+    const directory = this.options.spoolDirectory;
+    if (!directory) return false;
+
+    try {
+      const files = (await readdir(directory))
+        .filter(file => file.startsWith('spool-') && file.endsWith('.ndjson'))
+        .sort();
+      if (files.length === 0) return false;
+
+      const spoolFile = path.join(directory, files[0]);
+      const content = await readFile(spoolFile, 'utf8');
+      const lines = content.split('\n').filter(Boolean);
+
+      this.retryBatch = { lines, attempts: 0, spoolFile };
+      return true;
+    } catch (error) {
+      console.error('Erro ao ler spool de logs:', error);
+      return false;
+    }
+  }
+
+  getStats(): LogShipperStats {
+    return {
+      ...this.stats,
+      queued: this.size + (this.retryBatch?.lines.length ?? 0),
+    };
+  }
+
+  // 🛑 Parar timer e tentar um último envio (sem esperar backoff)
+  async shutdown(): Promise<void> {
+    if (this.flushTimer) {
+      clearInterval(this.flushTimer);
+      this.flushTimer = undefined;
+    }
+
+    this.nextAttemptAt = 0;
+    await this.flush();
+  }
+
+  private startFlushTimer(): void {
+    this.flushTimer = setInterval(() => {
+      void this.flush();
+    }, this.options.flushIntervalMs);
+
+    // Não manter o processo vivo apenas por causa do timer
+    if (typeof this.flushTimer === 'object' && 'unref' in this.flushTimer) {
+      this.flushTimer.unref();
+    }
+  }
+}
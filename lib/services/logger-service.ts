@@ -4,6 +4,8 @@
  * Este serviço fornece logging estruturado com diferentes níveis,
  * contexto, métricas e integração com sistemas de monitoramento.
  */
+import { registerShutdownTask } from './buffered-writer';
+import type { LogShipper, LogShipperStats } from './log-shipper';
 
 // 📊 Tipos de log
 export type LogLevel = 'debug' | 'info' | 'warn' | 'error' | 'fatal';
@@ -46,9 +48,22 @@ export interface LoggerConfig {
   remoteEndpoint?: string;
   maxFileSize?: number;
   maxFiles?: number;
+  logDirectory?: string;
+  compressRotatedFiles?: boolean;
+  debugSampleRate?: number; // 0..1, fração dos logs de debug emitidos
+  remoteMaxQueueSize?: number;
+  remoteMaxBatchBytes?: number;
+  remoteSpoolDirectory?: string;
+  remoteMaxSpoolBytes?: number;
   environment: 'development' | 'test' | 'production';
 }
 
+// Contrato mínimo do sink de arquivo (carregado apenas no servidor)
+interface LogFileSinkLike {
+  write(lines: string[]): Promise<void>;
+  close(): Promise<void>;
+}
+
 /**
  * 🏗️ Logger Service - Serviço principal de logging
  */
@@ -58,6 +73,9 @@ export class LoggerService {
   private bufferSize = 100;
   private flushInterval = 5000; // 5 segundos
   private flushTimer?: ReturnType<typeof setTimeout>;
+  private fileSink?: Promise<LogFileSinkLike | null>;
+  private remoteShipper?: Promise<LogShipper | null>;
+  private remoteStats: () => LogShipperStats | null = () => null;
 
   // 📊 Níveis de log em ordem de prioridade
   private static readonly LOG_LEVELS: Record<LogLevel, number> = {
@@ -168,6 +186,11 @@ export class LoggerService {
       return;
     }
 
+    // Amostragem de debug antes de qualquer formatação
+    if (level === 'debug' && !this.shouldSampleDebug()) {
+      return;
+    }
+
     const logEntry: LogEntry = {
       level,
       message,
@@ -177,29 +200,50 @@ export class LoggerService {
       metadata,
     };
 
-    // Adicionar ao buffer
-    this.logBuffer.push(logEntry);
+    // Adicionar ao buffer apenas se houver destino persistente
+    const hasSinks =
+      this.config.enableFile ||
+      (this.config.enableRemote && !!this.config.remoteEndpoint);
+    if (hasSinks) {
+      this.logBuffer.push(logEntry);
+    }
 
     // Console log imediato para desenvolvimento
     if (this.config.enableConsole) {
       this.logToConsole(logEntry);
     }
 
-    // Flush imediato para erros críticos
-    if (level === 'error' || level === 'fatal') {
-      this.flush();
+    // Flush imediato para erros críticos ou buffer cheio (sem aguardar)
+    if (
+      hasSinks &&
+      (level === 'error' ||
+        level === 'fatal' ||
+        this.logBuffer.length >= this.bufferSize)
+    ) {
+      void this.flush();
     }
+  }
 
-    // Flush se buffer estiver cheio
-    if (this.logBuffer.length >= this.bufferSize) {
-      this.flush();
-    }
+  /**
+   * 🎲 Amostragem de logs de debug (debugSampleRate entre 0 e 1)
+   */
+  private shouldSampleDebug(): boolean {
+    const rate = this.config.debugSampleRate ?? 1;
+    if (rate >= 1) return true;
+    if (rate <= 0) return false;
+    return Math.random() < rate;
   }
 
   /**
    * 🖥️ Log para console com formatação
    */
   private logToConsole(entry: LogEntry): void {
+    // Fora de desenvolvimento: uma linha NDJSON por registro
+    if (this.config.environment !== 'development') {
+      console.log(JSON.stringify(entry));
+      return;
+    }
+
     const { level, message, timestamp, context, error, metadata } = entry;
 
     // Cores para diferentes níveis
@@ -219,7 +263,7 @@ export class LoggerService {
 
     // Adicionar contexto se disponível
     if (context && Object.keys(context).length > 0) {
-      logMessage += `\n  Context: ${JSON.stringify(context, null, 2)}`;
+      logMessage += `\n  Context: ${JSON.stringify(context)}`;
     }
 
     // Adicionar erro se disponível
@@ -232,7 +276,7 @@ export class LoggerService {
 
     // Adicionar metadata se disponível
     if (metadata && Object.keys(metadata).length > 0) {
-      logMessage += `\n  Metadata: ${JSON.stringify(metadata, null, 2)}`;
+      logMessage += `\n  Metadata: ${JSON.stringify(metadata)}`;
     }
 
     console.log(logMessage);
@@ -244,82 +288,118 @@ export class LoggerService {
   private async flush(): Promise<void> {
     if (this.logBuffer.length === 0) return;
 
-    const logsToFlush = [...this.logBuffer];
+    const logsToFlush = this.logBuffer;
     this.logBuffer = [];
 
+    // Serializar uma única vez para todos os destinos
+    const lines = logsToFlush.map(log => JSON.stringify(log));
+
     try {
-      // Enviar para arquivo (se habilitado)
-      if (this.config.enableFile) {
-        await this.writeToFile(logsToFlush);
+      // Enviar para endpoint remoto (fila limitada, nunca aguarda a rede)
+      if (this.config.enableRemote && this.config.remoteEndpoint) {
+        await this.sendToRemote(lines);
       }
 
-      // Enviar para endpoint remoto (se habilitado)
-      if (this.config.enableRemote && this.config.remoteEndpoint) {
-        await this.sendToRemote(logsToFlush);
+      // Enviar para arquivo (se habilitado)
+      if (this.config.enableFile) {
+        await this.writeToFile(lines);
       }
     } catch (error) {
+      // Sem recolocar no buffer: a memória não cresce com destinos indisponíveis
       console.error('Erro ao fazer flush dos logs:', error);
-      // Recolocar logs no buffer em caso de erro
-      this.logBuffer.unshift(...logsToFlush);
     }
   }
 
   /**
-   * 📁 Escrever logs em arquivo
+   * 📁 Escrever logs em arquivo (NDJSON com rotação, somente servidor)
    */
-  private async writeToFile(logs: LogEntry[]): Promise<void> {
-    // File logging disabled for client compatibility
-    /*
-    try {
-      const fs = await import('fs/promises');
-      const path = await import('path');
+  private async writeToFile(lines: string[]): Promise<void> {
+    const sink = await this.getFileSink();
+    if (!sink) return;
 
-      const logDir = path.join(process.cwd(), 'logs');
-      const logFile = path.join(
-        logDir,
-        `app-${new Date().toISOString().split('T')[0]}.log`
-      );
-
-      // Criar diretório se não existir
-      try {
-        await fs.mkdir(logDir, { recursive: true });
-      } catch (error) {
-        // Diretório já existe
-      }
-
-      // Formatar logs para arquivo
-      const logLines = `${logs.map(log => JSON.stringify(log)).join('\n')  }\n`;
+    await sink.write(lines);
+  }
 
-      // Escrever no arquivo
-      await fs.appendFile(logFile, logLines);
-    } catch (error) {
-      console.error('Erro ao escrever logs em arquivo:', error);
+  /**
+   * 🗂️ Carregar o sink de arquivo sob demanda (evita fs no bundle do cliente)
+   */
+  private getFileSink(): Promise<LogFileSinkLike | null> {
+    if (!this.fileSink) {
+      this.fileSink =
+        typeof window !== 'undefined'
+          ? Promise.resolve(null)
+          : import('./log-file-sink')
+            .then(
+              ({ LogFileSink }) =>
+                new LogFileSink({
+                  ...(this.config.logDirectory && {
+                    directory: this.config.logDirectory,
+                  }),
+                  ...(this.config.maxFileSize && {
+                    maxFileSize: this.config.maxFileSize,
+                  }),
+                  ...(this.config.maxFiles && {
+                    maxFiles: this.config.maxFiles,
+                  }),
+                  ...(this.config.compressRotatedFiles !== undefined && {
+                    compress: this.config.compressRotatedFiles,
+                  }),
+                })
+            )
+            .catch(error => {
+              console.error('Erro ao inicializar arquivo de log:', error);
+              return null;
+            });
     }
-    */
+
+    return this.fileSink;
   }
 
   /**
-   * 🌐 Enviar logs para endpoint remoto
+   * 🌐 Enviar logs para endpoint remoto (gzip, lotes por bytes, backoff e spool)
    */
-  private async sendToRemote(logs: LogEntry[]): Promise<void> {
-    if (!this.config.remoteEndpoint) return;
+  private async sendToRemote(lines: string[]): Promise<void> {
+    const shipper = await this.getRemoteShipper();
+    shipper?.enqueue(lines);
+  }
 
-    try {
-      const response = await fetch(this.config.remoteEndpoint, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ logs }),
-      });
-
-      if (!response.ok) {
-        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-      }
-    } catch (error) {
-      console.error('Erro ao enviar logs para endpoint remoto:', error);
-      throw error;
+  /**
+   * 🚚 Carregar o shipper remoto sob demanda (somente servidor)
+   */
+  private getRemoteShipper(): Promise<LogShipper | null> {
+    if (!this.remoteShipper) {
+      const endpoint = this.config.remoteEndpoint;
+
+      this.remoteShipper =
+        typeof window !== 'undefined' || !endpoint
+          ? Promise.resolve(null)
+          : import('./log-shipper')
+            .then(({ LogShipper }) => {
+              const shipper = new LogShipper({
+                endpoint,
+                ...(this.config.remoteMaxQueueSize && {
+                  maxQueueSize: this.config.remoteMaxQueueSize,
+                }),
+                ...(this.config.remoteMaxBatchBytes && {
+                  maxBatchBytes: this.config.remoteMaxBatchBytes,
+                }),
+                ...(this.config.remoteSpoolDirectory && {
+                  spoolDirectory: this.config.remoteSpoolDirectory,
+                }),
+                ...(this.config.remoteMaxSpoolBytes && {
+                  maxSpoolBytes: this.config.remoteMaxSpoolBytes,
+                }),
+              });
+              this.remoteStats = () => shipper.getStats();
+              return shipper;
+            })
+            .catch(error => {
+              console.error('Erro ao inicializar envio remoto de logs:', error);
+              return null;
+            });
     }
+
+    return this.remoteShipper;
   }
 
   /**
@@ -327,8 +407,13 @@ export class LoggerService {
    */
   private startFlushTimer(): void {
     this.flushTimer = setInterval(() => {
-      this.flush();
+      void this.flush();
     }, this.flushInterval);
+
+    // Não manter o processo vivo apenas por causa do timer
+    if (typeof this.flushTimer === 'object' && 'unref' in this.flushTimer) {
+      this.flushTimer.unref();
+    }
   }
 
   /**
@@ -339,6 +424,12 @@ export class LoggerService {
       clearInterval(this.flushTimer);
     }
     await this.flush();
+
+    const [sink, shipper] = await Promise.all([
+      this.fileSink ?? null,
+      this.remoteShipper ?? null,
+    ]);
+    await Promise.all([sink?.close(), shipper?.shutdown()]);
   }
 
   /**
@@ -348,11 +439,13 @@ export class LoggerService {
     bufferSize: number;
     config: LoggerConfig;
     uptime: number;
+    remote: LogShipperStats | null;
   } {
     return {
       bufferSize: this.logBuffer.length,
       config: this.config,
       uptime: process.uptime(),
+      remote: this.remoteStats(),
     };
   }
 }
@@ -365,8 +458,15 @@ export function createLogger(config?: Partial<LoggerConfig>): LoggerService {
     level: process.env.NODE_ENV === 'production' ? 'info' : 'debug',
     enableConsole: true,
     enableFile: process.env.NODE_ENV === 'production',
-    enableRemote: false,
+    // Envio remoto ligado sempre que houver coletor configurado
+    enableRemote: !!process.env.LOG_REMOTE_ENDPOINT,
     remoteEndpoint: process.env.LOG_REMOTE_ENDPOINT,
+    logDirectory: process.env.LOG_DIR,
+    remoteSpoolDirectory: process.env.LOG_REMOTE_SPOOL_DIR,
+    remoteMaxSpoolBytes: Number(process.env.LOG_REMOTE_SPOOL_MAX_BYTES) || undefined,
+    debugSampleRate: process.env.LOG_DEBUG_SAMPLE_RATE
+      ? Number(process.env.LOG_DEBUG_SAMPLE_RATE)
+      : undefined,
     environment: (process.env.NODE_ENV as 'development' | 'production' | 'test') || 'development',
   };
 
@@ -378,6 +478,11 @@ export function createLogger(config?: Partial<LoggerConfig>): LoggerService {
  */
 export const logger = createLogger();
 
+// Buffer, arquivo e envio remoto gravados no encerramento do processo (SIGTERM/SIGINT/fim natural)
+if (typeof window === 'undefined') {
+  registerShutdownTask(logger);
+}
+
 /**
  * 🎯 Middleware para logging de requisições HTTP
  */
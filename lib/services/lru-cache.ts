@@ -0,0 +1,106 @@
+// 🗄️ LRU Cache - Cache em memória limitado por entradas e/ou tamanho
+// Map preserva a ordem de inserção: o primeiro item é sempre o menos usado recentemente
+
+export interface LruCacheOptions<V> {
+  maxEntries: number;
+  maxSize?: number; // soma de sizeOf(valor), ex.: bytes
+  sizeOf?: (_value: V) => number;
+  ttlMs?: number;
+}
+
+interface LruEntry<V> {
+  value: V;
+  size: number;
+  expiresAt: number;
+}
+
+export class LruCache<K, V> {
+  private readonly options: LruCacheOptions<V>;
+  private entries = new Map<K, LruEntry<V>>();
+  private totalSize = 0;
+  private hits = 0;
+  private misses = 0;
+
+  constructor(options: LruCacheOptions<V>) {
+    this.options = options;
+  }
+
+  get(key: K): V | undefined {
+    const entry = this.entries.get(key);
+
+    if (!entry || entry.expiresAt <= Date.now()) {
+      if (entry) this.delete(key);
+      this.misses++;
+      return undefined;
+    }
+
+    // Reinserir para marcar como usado recentemente
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    this.hits++;
+    return entry.value;
+  }
+
+  set(key: K, value: V, ttlMs: number | undefined = this.options.ttlMs): void {
+    const size = this.options.sizeOf ? this.options.sizeOf(value) : 1;
+
+    // Valor maior que o cache inteiro: não armazenar
+    if (this.options.maxSize !== undefined && size > this.options.maxSize) {
+      this.delete(key);
+      return;
+    }
+
+    this.delete(key);
+    this.entries.set(key, {
+      value,
+      size,
+      expiresAt: ttlMs ? Date.now() + ttlMs : Infinity,
+    });
+    this.totalSize += size;
+    this.evict();
+  }
+
+  delete(key: K): boolean {
+    const entry = this.entries.get(key);
+    if (!entry) return false;
+
+    this.entries.delete(key);
+    this.totalSize -= entry.size;
+    return true;
+  }
+
+  // Remover todas as chaves que satisfazem o predicado (ex.: versões antigas)
+  deleteWhere(predicate: (_key: K) => boolean): number {
+    let removed = 0;
+    Array.from(this.entries.keys()).forEach(key => {
+      if (predicate(key) && this.delete(key)) removed++;
+    });
+    return removed;
+  }
+
+  clear(): void {
+    this.entries.clear();
+    this.totalSize = 0;
+  }
+
+  private evict(): void {
+    const { maxEntries, maxSize } = this.options;
+
+    while (
+      this.entries.size > maxEntries ||
+      (maxSize !== undefined && this.totalSize > maxSize)
+    ) {
+      const oldestKey = this.entries.keys().next().value as K;
+      this.delete(oldestKey);
+    }
+  }
+
+  getStats(): { entries: number; size: number; hits: number; misses: number } {
+    return {
+      entries: this.entries.size,
+      size: this.totalSize,
+      hits: this.hits,
+      misses: this.misses,
+    };
+  }
+}
@@ -0,0 +1,370 @@
+// 📉 Metric Rollups - Armazenamento Multi-Resolução de Métricas
+// Consolida métricas brutas em buckets de 1 minuto e 1 hora (count/sum/min/max/histograma)
+// e direciona consultas para a resolução mais grossa que cobre o período pedido
+import { Prisma } from '@prisma/client';
+
+import prisma from '@/lib/prisma';
+
+// ⏱️ Resoluções e Períodos
+export type MetricResolution = 'raw' | '1m' | '1h';
+export type RollupResolution = Exclude<MetricResolution, 'raw'>;
+export type MetricTimeRange = '5m' | '1h' | '24h' | '7d' | '30d';
+
+const MINUTE_MS = 60 * 1000;
+const HOUR_MS = 60 * MINUTE_MS;
+const DAY_MS = 24 * HOUR_MS;
+
+export const METRIC_TIME_RANGE_MS: Record<MetricTimeRange, number> = {
+  '5m': 5 * MINUTE_MS,
+  '1h': HOUR_MS,
+  '24h': DAY_MS,
+  '7d': 7 * DAY_MS,
+  '30d': 30 * DAY_MS,
+};
+
+// 🗄️ Política de Retenção por Resolução
+export interface ResolutionPolicy {
+  bucketMs: number;
+  retentionMs: number;
+}
+
+export const RESOLUTION_POLICIES: Record<MetricResolution, ResolutionPolicy> = {
+  raw: { bucketMs: 0, retentionMs: 2 * DAY_MS },
+  '1m': { bucketMs: MINUTE_MS, retentionMs: 8 * DAY_MS },
+  '1h': { bucketMs: HOUR_MS, retentionMs: 400 * DAY_MS },
+};
+
+// Número mínimo de buckets que uma consulta deve retornar por métrica
+const MIN_BUCKETS_PER_QUERY = 12;
+
+// 📊 Limites superiores dos buckets do histograma (o último bucket é +Inf)
+export const HISTOGRAM_BOUNDS = [
+  5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000,
+];
+
+export interface RollupInput {
+  category: string;
+  name: string;
+  value: number;
+  timestamp: Date;
+}
+
+export interface RollupBucket {
+  resolution: RollupResolution;
+  metricName: string;
+  category: string;
+  bucketStart: Date;
+  count: number;
+  sum: number;
+  min: number;
+  max: number;
+  histogram: number[];
+}
+
+export interface RollupSummary {
+  metricName: string;
+  category: string;
+  resolution: MetricResolution;
+  count: number;
+  sum: number;
+  min: number;
+  max: number;
+  avg: number;
+  histogram: number[];
+}
+
+export interface RollupQuery {
+  since: Date;
+  until?: Date;
+  category?: string;
+  metricNames?: string[];
+}
+
+// 🎯 Escolher a resolução mais grossa que ainda cobre o período
+export function selectResolution(rangeMs: number): MetricResolution {
+  const candidates: RollupResolution[] = ['1h', '1m'];
+
+  for (const resolution of candidates) {
+    const policy = RESOLUTION_POLICIES[resolution];
+    if (
+      policy.retentionMs >= rangeMs &&
+      policy.bucketMs * MIN_BUCKETS_PER_QUERY <= rangeMs
+    ) {
+      return resolution;
+    }
+  }
+
+  return 'raw';
+}
+
+export function histogramBucketIndex(value: number): number {
+  const index = HISTOGRAM_BOUNDS.findIndex(bound => value <= bound);
+  return index === -1 ? HISTOGRAM_BOUNDS.length : index;
+}
+
+export function emptyHistogram(): number[] {
+  return new Array(HISTOGRAM_BOUNDS.length + 1).fill(0);
+}
+
+// 📈 Estimar percentil a partir do histograma (interpolação linear no bucket)
+export function estimateQuantile(
+  histogram: number[],
+  quantile: number,
+  min: number,
+  max: number
+): number {
+  const total = histogram.reduce((sum, count) => sum + count, 0);
+  if (total === 0) return 0;
+
+  const rank = quantile * total;
+  let seen = 0;
+
+  for (let i = 0; i < histogram.length; i++) {
+    const count = histogram[i];
+    if (count === 0) continue;
+
+    if (seen + count >= rank) {
+      const lower = Math.max(i === 0 ? min : HISTOGRAM_BOUNDS[i - 1], min);
+      const upper = Math.min(
+        i < HISTOGRAM_BOUNDS.length ? HISTOGRAM_BOUNDS[i] : max,
+        max
+      );
+      const fraction = (rank - seen) / count;
+      return lower + (upper - lower) * fraction;
+    }
+
+    seen += count;
+  }
+
+  return max;
+}
+
+function mergeHistograms(target: number[], source: number[]): void {
+  for (let i = 0; i < target.length; i++) {
+    target[i] += source[i] || 0;
+  }
+}
+
+export class MetricRollupStore {
+  // 🧮 Agregar métricas brutas em buckets de 1 minuto e 1 hora
+  accumulate(metrics: RollupInput[]): RollupBucket[] {
+    const buckets = new Map<string, RollupBucket>();
+    const resolutions: RollupResolution[] = ['1m', '1h'];
+
+    for (const metric of metrics) {
+      const value = Number.isFinite(metric.value) ? metric.value : 0;
+
+      for (const resolution of resolutions) {
+        const { bucketMs } = RESOLUTION_POLICIES[resolution];
+        const bucketStart =
+          Math.floor(metric.timestamp.getTime() / bucketMs) * bucketMs;
+        const key = `${resolution}|${metric.category}|${metric.name}|${bucketStart}`;
+
+        let bucket = buckets.get(key);
+        if (!bucket) {
+          bucket = {
+            resolution,
+            metricName: metric.name,
+            category: metric.category,
+            bucketStart: new Date(bucketStart),
+            count: 0,
+            sum: 0,
+            min: value,
+            max: value,
+            histogram: emptyHistogram(),
+          };
+          buckets.set(key, bucket);
+        }
+
+        bucket.count += 1;
+        bucket.sum += value;
+        bucket.min = Math.min(bucket.min, value);
+        bucket.max = Math.max(bucket.max, value);
+        bucket.histogram[histogramBucketIndex(value)] += 1;
+      }
+    }
+
+    return Array.from(buckets.values());
+  }
+
+  // 💾 Gravar buckets com upsert incremental (um único statement por flush)
+  async write(metrics: RollupInput[]): Promise<void> {
+    const buckets = this.accumulate(metrics);
+    if (buckets.length === 0) return;
+
+    const rows = buckets.map(
+      bucket => Prisma.sql`(
+        ${bucket.resolution},
+        ${bucket.metricName},
+        ${bucket.category},
+        ${bucket.bucketStart}::timestamptz,
+        ${bucket.count}::int,
+        ${bucket.sum}::double precision,
+        ${bucket.min}::double precision,
+        ${bucket.max}::double precision,
+        ${bucket.histogram}::int[]
+      )`
+    );
+
+    await prisma.$executeRaw`
+      INSERT INTO application_metric_rollups
+        (resolution, metric_name, category, bucket_start, count, sum, min, max, histogram)
+      VALUES ${Prisma.join(rows)}
+      ON CONFLICT (resolution, metric_name, category, bucket_start) DO UPDATE SET
+        count = application_metric_rollups.count + EXCLUDED.count,
+        sum = application_metric_rollups.sum + EXCLUDED.sum,
+        min = LEAST(application_metric_rollups.min, EXCLUDED.min),
+        max = GREATEST(application_metric_rollups.max, EXCLUDED.max),
+        histogram = ARRAY(
+          SELECT COALESCE(a, 0) + COALESCE(b, 0)
+          FROM unnest(application_metric_rollups.histogram, EXCLUDED.histogram)
+            WITH ORDINALITY AS t(a, b, i)
+          ORDER BY i
+        )
+    `;
+  }
+
+  // 🔍 Consultar métricas agregadas na resolução adequada ao período
+  async summarize(query: RollupQuery): Promise<RollupSummary[]> {
+    const until = query.until ?? new Date();
+    const resolution = selectResolution(until.getTime() - query.since.getTime());
+
+    if (resolution === 'raw') {
+      return this.summarizeRaw(query.since, until, query);
+    }
+
+    const { bucketMs } = RESOLUTION_POLICIES[resolution];
+    const alignedSince = new Date(
+      Math.floor(query.since.getTime() / bucketMs) * bucketMs
+    );
+
+    const where: Prisma.ApplicationMetricRollupWhereInput = {
+      resolution,
+      bucketStart: { gte: alignedSince, lt: until },
+    };
+
+    if (query.category) {
+      where.category = query.category;
+    }
+
+    if (query.metricNames && query.metricNames.length > 0) {
+      where.metricName = { in: query.metricNames };
+    }
+
+    const rows = await prisma.applicationMetricRollup.findMany({
+      where,
+      select: {
+        metricName: true,
+        category: true,
+        count: true,
+        sum: true,
+        min: true,
+        max: true,
+        histogram: true,
+      },
+    });
+
+    const summaries = new Map<string, RollupSummary>();
+
+    for (const row of rows) {
+      const key = `${row.category}|${row.metricName}`;
+      let summary = summaries.get(key);
+
+      if (!summary) {
+        summary = {
+          metricName: row.metricName,
+          category: row.category,
+          resolution,
+          count: 0,
+          sum: 0,
+          min: row.min,
+          max: row.max,
+          avg: 0,
+          histogram: emptyHistogram(),
+        };
+        summaries.set(key, summary);
+      }
+
+      summary.count += row.count;
+      summary.sum += row.sum;
+      summary.min = Math.min(summary.min, row.min);
+      summary.max = Math.max(summary.max, row.max);
+      mergeHistograms(summary.histogram, row.histogram);
+    }
+
+    return Array.from(summaries.values()).map(summary => ({
+      ...summary,
+      avg: summary.count > 0 ? summary.sum / summary.count : 0,
+    }));
+  }
+
+  // Períodos curtos ainda são atendidos pela tabela bruta, agregando no banco
+  private async summarizeRaw(
+    since: Date,
+    until: Date,
+    query: RollupQuery
+  ): Promise<RollupSummary[]> {
+    const where: Prisma.ApplicationMetricWhereInput = {
+      timestamp: { gte: since, lt: until },
+    };
+
+    if (query.category) {
+      where.category = query.category;
+    }
+
+    if (query.metricNames && query.metricNames.length > 0) {
+      where.metricName = { in: query.metricNames };
+    }
+
+    const groups = await prisma.applicationMetric.groupBy({
+      by: ['category', 'metricName'],
+      where,
+      _count: { _all: true },
+      _sum: { value: true },
+      _min: { value: true },
+      _max: { value: true },
+    });
+
+    return groups.map(group => {
+      const count = group._count._all;
+      const sum = group._sum.value ?? 0;
+
+      return {
+        metricName: group.metricName,
+        category: group.category,
+        resolution: 'raw' as const,
+        count,
+        sum,
+        min: group._min.value ?? 0,
+        max: group._max.value ?? 0,
+        avg: count > 0 ? sum / count : 0,
+        histogram: [],
+      };
+    });
+  }
+
+  // 🧹 Aplicar política de retenção em cada resolução
+  async pruneExpired(now: Date = new Date()): Promise<void> {
+    const rawCutoff = new Date(
+      now.getTime() - RESOLUTION_POLICIES.raw.retentionMs
+    );
+
+    await prisma.applicationMetric.deleteMany({
+      where: { timestamp: { lt: rawCutoff } },
+    });
+
+    const resolutions: RollupResolution[] = ['1m', '1h'];
+    for (const resolution of resolutions) {
+      const cutoff = new Date(
+        now.getTime() - RESOLUTION_POLICIES[resolution].retentionMs
+      );
+
+      await prisma.applicationMetricRollup.deleteMany({
+        where: { resolution, bucketStart: { lt: cutoff } },
+      });
+    }
+  }
+}
+
+// 🌟 Instância Global
+export const metricRollups = new MetricRollupStore();
@@ -1,8 +1,25 @@
 // 📊 Metrics Service - Sistema de Monitoramento de Performance
 // Coleta e analisa métricas dos serviços de comunicação
 import prisma from '@/lib/prisma';
-
-interface MetricData {
+import {
+  BufferedWriter,
+  BufferedWriterStats,
+} from '@/lib/services/buffered-writer';
+import {
+  QuantileSketch,
+  RollingWindowSketch,
+  WindowSnapshot,
+} from '@/lib/services/metrics-sketch';
+import {
+  communicationOperationDuration,
+  communicationOperationsTotal,
+} from '@/lib/services/prometheus-registry';
+
+const MINUTE_MS = 60 * 1000;
+const HOUR_MS = 60 * MINUTE_MS;
+const DAY_MS = 24 * HOUR_MS;
+
+export interface MetricData {
   service: 'email' | 'sms' | 'whatsapp' | 'communication';
   operation: string;
   duration: number;
@@ -29,7 +46,9 @@ interface PerformanceStats {
   totalRequests: number;
   successRate: number;
   averageResponseTime: number;
+  p50ResponseTime: number;
   p95ResponseTime: number;
+  p99ResponseTime: number;
   errorCount: number;
   lastHour: {
     requests: number;
@@ -43,6 +62,17 @@ interface PerformanceStats {
   };
 }
 
+// 📐 Série por serviço/operação: minutos para a última hora, horas para 7 dias
+interface OperationSeries {
+  service: MetricData['service'];
+  operation: string;
+  minutes: RollingWindowSketch;
+  hours: RollingWindowSketch;
+}
+
+// Ouvinte notificado a cada métrica registrada (ex.: circuit breakers dos canais)
+export type MetricListener = (_metric: MetricData) => void;
+
 interface ServiceHealth {
   service: string;
   status: 'healthy' | 'degraded' | 'down';
@@ -53,53 +83,123 @@ interface ServiceHealth {
 }
 
 export class MetricsService {
-  private metrics: MetricData[] = [];
-  private readonly MAX_MEMORY_METRICS = 1000;
+  private series = new Map<string, OperationSeries>();
+  private listeners = new Set<MetricListener>();
+  private readonly SERIES_TTL = 7 * DAY_MS;
+  private writer = new BufferedWriter<MetricData>({
+    name: 'communication_metrics',
+    maxBatchSize: 200,
+    maxQueueSize: 10000,
+    flushIntervalMs: 5000,
+    persist: batch => this.persistMetrics(batch),
+  });
 
   constructor() {
-    // Limpar métricas antigas da memória a cada 5 minutos
+    // Remover séries sem atividade a cada 5 minutos
     setInterval(
       () => {
-        this.cleanupMemoryMetrics();
+        this.cleanupIdleSeries();
       },
       5 * 60 * 1000
     );
   }
 
   // 📈 Registrar Métrica
-  // Note: Database persistence commented out pending communication_metrics table in Prisma schema
+  // A persistência é enfileirada: o chamador nunca espera pelo INSERT
   async recordMetric(data: Omit<MetricData, 'timestamp'>): Promise<void> {
     const metric: MetricData = {
       ...data,
       timestamp: new Date(),
     };
 
-    // Adicionar à memória para análise rápida
-    this.metrics.push(metric);
+    // Atualizar sketches em memória para análise rápida
+    const series = this.getSeries(metric.service, metric.operation);
+    const timestamp = metric.timestamp.getTime();
+    series.minutes.record(metric.duration, metric.success, timestamp);
+    series.hours.record(metric.duration, metric.success, timestamp);
 
-    // Persistir no banco de dados
-    try {
-      await prisma.communicationMetric.create({
-        data: {
-          service: metric.service,
-          operation: metric.operation,
-          durationMs: metric.duration,
-          success: metric.success,
-          errorMessage: metric.error,
-          metadata: metric.metadata,
-          createdAt: metric.timestamp,
-        },
-      });
-    } catch (error) {
-      console.error('Erro ao salvar métrica:', error);
-    }
+    communicationOperationsTotal.inc({
+      service: metric.service,
+      operation: metric.operation,
+      success: String(metric.success),
+    });
+    communicationOperationDuration.observe(
+      { service: metric.service, operation: metric.operation },
+      metric.duration / 1000
+    );
+
+    this.writer.enqueue(metric);
 
-    console.log('📊 Metric recorded:', { service: metric.service, operation: metric.operation, duration: metric.duration, success: metric.success });
+    this.listeners.forEach(listener => {
+      try {
+        listener(metric);
+      } catch (error) {
+        console.error('Erro em ouvinte de métricas:', error);
+      }
+    });
+  }
+
+  // 👂 Assinar métricas em tempo real; retorna a função para cancelar
+  onMetric(listener: MetricListener): () => void {
+    this.listeners.add(listener);
+    return () => {
+      this.listeners.delete(listener);
+    };
+  }
 
-    // Limpar memória se necessário
-    if (this.metrics.length > this.MAX_MEMORY_METRICS) {
-      this.metrics = this.metrics.slice(-this.MAX_MEMORY_METRICS);
+  // 💾 Gravar um lote de métricas com um único createMany
+  private async persistMetrics(batch: MetricData[]): Promise<void> {
+    await prisma.communicationMetric.createMany({
+      data: batch.map(metric => ({
+        service: metric.service,
+        operation: metric.operation,
+        durationMs: Math.round(metric.duration),
+        success: metric.success,
+        errorMessage: metric.error,
+        metadata: metric.metadata,
+        createdAt: metric.timestamp,
+      })),
+    });
+  }
+
+  // 📦 Estatísticas da fila de persistência (enfileiradas/gravadas/descartadas)
+  getWriterStats(): BufferedWriterStats {
+    return this.writer.getStats();
+  }
+
+  // 🔄 Forçar gravação das métricas pendentes (ex.: antes de encerrar)
+  async flush(): Promise<void> {
+    await this.writer.flush();
+  }
+
+  private getSeries(
+    service: MetricData['service'],
+    operation: string
+  ): OperationSeries {
+    const key = `${service}-${operation}`;
+    let series = this.series.get(key);
+
+    if (!series) {
+      series = {
+        service,
+        operation,
+        minutes: new RollingWindowSketch(MINUTE_MS, 60),
+        hours: new RollingWindowSketch(HOUR_MS, 7 * 24),
+      };
+      this.series.set(key, series);
     }
+
+    return series;
+  }
+
+  // Janela adequada ao período: buckets de minuto até 1h, de hora acima disso
+  private snapshotSeries(
+    series: OperationSeries,
+    rangeMs: number,
+    now: number
+  ): WindowSnapshot {
+    const window = rangeMs <= HOUR_MS ? series.minutes : series.hours;
+    return window.snapshot(now - rangeMs, now);
   }
 
   // ⏱️ Wrapper para medir tempo de execução
@@ -123,7 +223,7 @@ export class MetricsService {
     } finally {
       const duration = Date.now() - startTime;
 
-      await this.recordMetric({
+      void this.recordMetric({
         service,
         operation,
         duration,
@@ -135,111 +235,103 @@ export class MetricsService {
   }
 
   // 📊 Obter Estatísticas de Performance
-  // Note: Using in-memory metrics until communication_metrics table is added to Prisma schema
+  // Calculadas a partir dos sketches: custo proporcional ao número de buckets
   async getPerformanceStats(
     service?: string,
     timeRange: '1h' | '24h' | '7d' = '24h'
   ): Promise<PerformanceStats[]> {
-    const now = new Date();
+    const now = Date.now();
     const timeRangeMs = {
-      '1h': 60 * 60 * 1000,
-      '24h': 24 * 60 * 60 * 1000,
-      '7d': 7 * 24 * 60 * 60 * 1000,
+      '1h': HOUR_MS,
+      '24h': DAY_MS,
+      '7d': 7 * DAY_MS,
     };
 
-    const since = new Date(now.getTime() - timeRangeMs[timeRange]);
+    const stats: PerformanceStats[] = [];
 
-    // Filter in-memory metrics
-    let filteredMetrics = this.metrics.filter(m => m.timestamp >= since);
+    this.series.forEach(series => {
+      if (service && series.service !== service) return;
 
-    if (service) {
-      filteredMetrics = filteredMetrics.filter(m => m.service === service);
-    }
+      const window = this.snapshotSeries(series, timeRangeMs[timeRange], now);
+      if (window.count === 0) return;
 
-    // Group by service and operation
-    const grouped = filteredMetrics.reduce((acc, metric) => {
-      const key = `${metric.service}-${metric.operation}`;
-      if (!acc[key]) {
-        acc[key] = {
-          service: metric.service,
-          operation: metric.operation,
-          metrics: [],
-        };
-      }
-      acc[key].metrics.push(metric);
-      return acc;
-    }, {} as Record<string, { service: string; operation: string; metrics: MetricData[] }>);
+      const lastHour = this.snapshotSeries(series, HOUR_MS, now);
+      const lastDay = this.snapshotSeries(series, DAY_MS, now);
+      const { sketch } = window;
 
-    // Calculate statistics
-    return Object.values(grouped).map((group) => {
-      const { metrics } = group;
-      const totalRequests = metrics.length;
-      const successCount = metrics.filter((m) => m.success).length;
-      const durations = metrics.map((m) => m.duration).sort((a, b) => a - b);
-
-      const lastHourMetrics = metrics.filter((m) =>
-        m.timestamp > new Date(now.getTime() - 60 * 60 * 1000)
-      );
-
-      const lastDayMetrics = metrics.filter((m) =>
-        m.timestamp > new Date(now.getTime() - 24 * 60 * 60 * 1000)
-      );
-
-      const averageResponseTime = durations.length > 0 ? durations.reduce((a, b) => a + b, 0) / durations.length : 0;
-      const p95ResponseTime = durations.length > 0 ? durations[Math.floor(durations.length * 0.95)] : 0;
-
-      const lastHourErrors = lastHourMetrics.filter((m) => !m.success).length;
-      const lastHourAvg = lastHourMetrics.length > 0 ? lastHourMetrics.reduce((sum, m) => sum + m.duration, 0) / lastHourMetrics.length : 0;
-
-      const lastDayErrors = lastDayMetrics.filter((m) => !m.success).length;
-      const lastDayAvg = lastDayMetrics.length > 0 ? lastDayMetrics.reduce((sum, m) => sum + m.duration, 0) / lastDayMetrics.length : 0;
-
-      return {
-        service: group.service,
-        operation: group.operation,
-        totalRequests,
-        successRate: totalRequests > 0 ? (successCount / totalRequests) * 100 : 0,
-        averageResponseTime,
-        p95ResponseTime,
-        errorCount: totalRequests - successCount,
+      stats.push({
+        service: series.service,
+        operation: series.operation,
+        totalRequests: window.count,
+        successRate: ((window.count - window.errors) / window.count) * 100,
+        averageResponseTime: sketch.mean,
+        p50ResponseTime: sketch.quantile(0.5),
+        p95ResponseTime: sketch.quantile(0.95),
+        p99ResponseTime: sketch.quantile(0.99),
+        errorCount: window.errors,
         lastHour: {
-          requests: lastHourMetrics.length,
-          errors: lastHourErrors,
-          avgResponseTime: lastHourAvg,
+          requests: lastHour.count,
+          errors: lastHour.errors,
+          avgResponseTime: lastHour.sketch.mean,
         },
         lastDay: {
-          requests: lastDayMetrics.length,
-          errors: lastDayErrors,
-          avgResponseTime: lastDayAvg,
+          requests: lastDay.count,
+          errors: lastDay.errors,
+          avgResponseTime: lastDay.sketch.mean,
         },
-      };
+      });
     });
+
+    return stats;
+  }
+
+  // Consolidar todas as operações de um serviço em uma única janela
+  private snapshotService(
+    service: string,
+    rangeMs: number,
+    now: number
+  ): WindowSnapshot {
+    const result: WindowSnapshot = {
+      count: 0,
+      errors: 0,
+      sketch: new QuantileSketch(),
+      lastUpdate: 0,
+    };
+
+    this.series.forEach(series => {
+      if (series.service !== service) return;
+
+      const window = this.snapshotSeries(series, rangeMs, now);
+      result.count += window.count;
+      result.errors += window.errors;
+      result.sketch.merge(window.sketch);
+      result.lastUpdate = Math.max(result.lastUpdate, window.lastUpdate);
+    });
+
+    return result;
   }
 
   // 🏥 Verificar Saúde dos Serviços
   async getServiceHealth(): Promise<ServiceHealth[]> {
     const services = ['email', 'sms', 'whatsapp', 'communication'];
-    const healthChecks: ServiceHealth[] = [];
+    const now = Date.now();
 
-    for (const service of services) {
-      const stats = await this.getPerformanceStats(service, '1h');
-      const serviceStats = stats[0];
+    return services.map(service => {
+      const window = this.snapshotService(service, HOUR_MS, now);
 
-      if (!serviceStats) {
-        healthChecks.push({
+      if (window.count === 0) {
+        return {
           service,
-          status: 'down',
+          status: 'down' as const,
           uptime: 0,
           lastCheck: new Date(),
           responseTime: 0,
           errorRate: 100,
-        });
-        continue;
+        };
       }
 
-      const errorRate =
-        (serviceStats.errorCount / serviceStats.totalRequests) * 100;
-      const avgResponseTime = serviceStats.averageResponseTime;
+      const errorRate = (window.errors / window.count) * 100;
+      const avgResponseTime = window.sketch.mean;
 
       let status: ServiceHealth['status'] = 'healthy';
       if (errorRate > 10 || avgResponseTime > 5000) {
@@ -249,17 +341,15 @@ export class MetricsService {
         status = 'down';
       }
 
-      healthChecks.push({
+      return {
         service,
         status,
-        uptime: serviceStats.successRate,
+        uptime: 100 - errorRate,
         lastCheck: new Date(),
         responseTime: avgResponseTime,
         errorRate,
-      });
-    }
-
-    return healthChecks;
+      };
+    });
   }
 
   // 🚨 Detectar Anomalias
@@ -327,10 +417,14 @@ export class MetricsService {
     return anomalies;
   }
 
-  // 🧹 Limpar métricas antigas da memória
-  private cleanupMemoryMetrics(): void {
-    const oneHourAgo = new Date(Date.now() - 60 * 60 * 1000);
-    this.metrics = this.metrics.filter(metric => metric.timestamp > oneHourAgo);
+  // 🧹 Remover séries sem atividade dentro da maior janela
+  private cleanupIdleSeries(): void {
+    const cutoff = Date.now() - this.SERIES_TTL;
+    this.series.forEach((series, key) => {
+      if (series.hours.lastUpdatedAt < cutoff) {
+        this.series.delete(key);
+      }
+    });
   }
 
   // 📈 Obter métricas em tempo real (últimos 5 minutos)
@@ -348,38 +442,30 @@ export class MetricsService {
       }
     >;
   } {
-    const fiveMinutesAgo = new Date(Date.now() - 5 * 60 * 1000);
-    const recentMetrics = this.metrics.filter(
-      m => m.timestamp > fiveMinutesAgo
-    );
+    const now = Date.now();
+    const total = new QuantileSketch();
+    let totalErrors = 0;
 
-    const totalRequests = recentMetrics.length;
-    const successCount = recentMetrics.filter(m => m.success).length;
-    const totalDuration = recentMetrics.reduce((sum, m) => sum + m.duration, 0);
-
-    const byService = recentMetrics.reduce(
-      (acc, metric) => {
-        if (!acc[metric.service]) {
-          acc[metric.service] = { requests: 0, errors: 0, totalDuration: 0 };
-        }
-        acc[metric.service].requests++;
-        if (!metric.success) acc[metric.service].errors++;
-        acc[metric.service].totalDuration += metric.duration;
-        return acc;
-      },
-      {} as Record<string, { requests: number; errors: number; totalDuration: number }>
-    );
+    const byService: Record<
+      string,
+      { requests: number; errors: number; totalDuration: number }
+    > = {};
 
-    // Calcular médias por serviço
-    Object.keys(byService).forEach((service) => {
-      const serviceData = byService[service];
-      // compute avg and remove totalDuration helper
-      (serviceData as { requests: number; errors: number; avgResponseTime?: number }).avgResponseTime =
-        serviceData.totalDuration / serviceData.requests;
-      delete (serviceData as { totalDuration?: number }).totalDuration;
+    this.series.forEach(series => {
+      const window = series.minutes.snapshot(now - 5 * MINUTE_MS, now);
+      if (window.count === 0) return;
+
+      if (!byService[series.service]) {
+        byService[series.service] = { requests: 0, errors: 0, totalDuration: 0 };
+      }
+      byService[series.service].requests += window.count;
+      byService[series.service].errors += window.errors;
+      byService[series.service].totalDuration += window.sketch.sum;
+
+      total.merge(window.sketch);
+      totalErrors += window.errors;
     });
 
-    // Normalize byService to final shape (remove totalDuration)
     const byServiceFinal: Record<string, { requests: number; errors: number; avgResponseTime: number }> = {};
     Object.keys(byService).forEach((service) => {
       const s = byService[service];
@@ -390,12 +476,16 @@ export class MetricsService {
       };
     });
 
+    const totalRequests = total.count;
+
     return {
       totalRequests,
-      successRate: totalRequests > 0 ? (successCount / totalRequests) * 100 : 0,
-      averageResponseTime:
-        totalRequests > 0 ? totalDuration / totalRequests : 0,
-      errorCount: totalRequests - successCount,
+      successRate:
+        totalRequests > 0
+          ? ((totalRequests - totalErrors) / totalRequests) * 100
+          : 0,
+      averageResponseTime: total.mean,
+      errorCount: totalErrors,
       byService: byServiceFinal,
     };
   }
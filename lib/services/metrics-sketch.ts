@@ -0,0 +1,144 @@
+// 📐 Metrics Sketch - Histogramas Compactos para Percentis em Streaming
+// Sketch log-bucketizado (erro relativo limitado) e janelas deslizantes por bucket de tempo
+
+// Erro relativo máximo dos percentis estimados (~1%)
+const RELATIVE_ACCURACY = 0.01;
+const GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY);
+const LOG_GAMMA = Math.log(GAMMA);
+
+// 📊 Sketch de Quantis (valores não negativos, ex.: durações em ms)
+export class QuantileSketch {
+  private bins = new Map<number, number>();
+  private zeroCount = 0;
+  count = 0;
+  sum = 0;
+  min = Infinity;
+  max = -Infinity;
+
+  add(value: number, weight: number = 1): void {
+    if (!Number.isFinite(value) || weight <= 0) return;
+
+    const safeValue = Math.max(value, 0);
+    if (safeValue === 0) {
+      this.zeroCount += weight;
+    } else {
+      const index = Math.ceil(Math.log(safeValue) / LOG_GAMMA);
+      this.bins.set(index, (this.bins.get(index) || 0) + weight);
+    }
+
+    this.count += weight;
+    this.sum += safeValue * weight;
+    this.min = Math.min(this.min, safeValue);
+    this.max = Math.max(this.max, safeValue);
+  }
+
+  merge(other: QuantileSketch): void {
+    if (other.count === 0) return;
+
+    other.bins.forEach((binCount, index) => {
+      this.bins.set(index, (this.bins.get(index) || 0) + binCount);
+    });
+    this.zeroCount += other.zeroCount;
+    this.count += other.count;
+    this.sum += other.sum;
+    this.min = Math.min(this.min, other.min);
+    this.max = Math.max(this.max, other.max);
+  }
+
+  quantile(q: number): number {
+    if (this.count === 0) return 0;
+
+    const rank = Math.min(Math.max(q, 0), 1) * (this.count - 1);
+    if (rank < this.zeroCount) return 0;
+
+    let seen = this.zeroCount;
+    const indexes = Array.from(this.bins.keys()).sort((a, b) => a - b);
+
+    for (const index of indexes) {
+      seen += this.bins.get(index) || 0;
+      if (seen > rank) {
+        // Ponto médio do bucket [gamma^(i-1), gamma^i] em escala relativa
+        const estimate = (2 * Math.pow(GAMMA, index)) / (GAMMA + 1);
+        return Math.min(Math.max(estimate, this.min), this.max);
+      }
+    }
+
+    return this.max;
+  }
+
+  get mean(): number {
+    return this.count > 0 ? this.sum / this.count : 0;
+  }
+}
+
+// 🪣 Bucket de uma janela deslizante
+export interface WindowSnapshot {
+  count: number;
+  errors: number;
+  sketch: QuantileSketch;
+  lastUpdate: number;
+}
+
+interface WindowSlot {
+  epoch: number;
+  count: number;
+  errors: number;
+  sketch: QuantileSketch;
+}
+
+// ⏳ Janela Deslizante em Anel (bucketCount buckets de bucketMs)
+export class RollingWindowSketch {
+  private slots: Array<WindowSlot | undefined>;
+  private lastUpdate = 0;
+
+  constructor(
+    private readonly bucketMs: number,
+    private readonly bucketCount: number
+  ) {
+    this.slots = new Array(bucketCount);
+  }
+
+  record(value: number, success: boolean, timestamp: number = Date.now()): void {
+    const epoch = Math.floor(timestamp / this.bucketMs);
+    const position = epoch % this.bucketCount;
+    let slot = this.slots[position];
+
+    // Slot pertence a um período já expirado: reutilizar
+    if (!slot || slot.epoch !== epoch) {
+      slot = { epoch, count: 0, errors: 0, sketch: new QuantileSketch() };
+      this.slots[position] = slot;
+    }
+
+    slot.count += 1;
+    if (!success) slot.errors += 1;
+    slot.sketch.add(value);
+    this.lastUpdate = Math.max(this.lastUpdate, timestamp);
+  }
+
+  // Agregar os buckets que caem em [since, now]
+  snapshot(sinceMs: number, now: number = Date.now()): WindowSnapshot {
+    const nowEpoch = Math.floor(now / this.bucketMs);
+    const oldestEpoch = nowEpoch - this.bucketCount + 1;
+    const sinceEpoch = Math.max(Math.floor(sinceMs / this.bucketMs), oldestEpoch);
+    const result: WindowSnapshot = {
+      count: 0,
+      errors: 0,
+      sketch: new QuantileSketch(),
+      lastUpdate: this.lastUpdate,
+    };
+
+    for (const slot of this.slots) {
+      if (!slot || slot.epoch < sinceEpoch || slot.epoch > nowEpoch) continue;
+
+      result.count += slot.count;
+      result.errors += slot.errors;
+      result.sketch.merge(slot.sketch);
+    }
+
+    return result;
+  }
+
+  get lastUpdatedAt(): number {
+    return this.lastUpdate;
+  }
+}
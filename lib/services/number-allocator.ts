@@ -0,0 +1,230 @@
+// 🔢 Number Allocator - Numeração de clientes e ordens de serviço
+// Cada chave tem um contador em numeracao_sequencias incrementado com um único UPDATE atômico
+// (sem consulta ordenada, sem colisão entre cadastros simultâneos). Uma chave ainda sem contador
+// é criada a partir do maior número já existente. Com blockSize > 1, cada instância reserva
+// blocos de números e os entrega da memória (pode haver lacunas se a instância reiniciar)
+import prisma from '@/lib/prisma';
+
+export interface NumberAllocatorOptions {
+  blockSize: number;
+}
+
+// Maior número já usado para a chave (ponto de partida de um contador novo)
+type SeedFn = () => Promise<number>;
+
+interface LocalBlock {
+  next: number;
+  end: number;
+}
+
+export class NumberAllocator {
+  private blocks = new Map<string, LocalBlock>();
+  private refills = new Map<string, Promise<void>>();
+
+  constructor(private readonly options: NumberAllocatorOptions) {}
+
+  // ➕ Próximo número da chave
+  async next(key: string, seed: SeedFn): Promise<number> {
+    if (this.options.blockSize <= 1) {
+      const [value] = await this.reserve(key, 1, seed);
+      return value;
+    }
+
+    for (;;) {
+      const block = this.blocks.get(key);
+      if (block && block.next <= block.end) {
+        return block.next++;
+      }
+
+      // Uma única recarga por chave; chamadas concorrentes aguardam a mesma
+      let refill = this.refills.get(key);
+      if (!refill) {
+        refill = this.reserve(key, this.options.blockSize, seed)
+          .then(([first, last]) => {
+            this.blocks.set(key, { next: first, end: last });
+          })
+          .finally(() => this.refills.delete(key));
+        this.refills.set(key, refill);
+      }
+      await refill;
+    }
+  }
+
+  // 📦 Faixa contígua de `count` números (importações em massa); não usa o bloco local
+  async nextRange(key: string, count: number, seed: SeedFn): Promise<number[]> {
+    if (count <= 0) return [];
+
+    const [first] = await this.reserve(key, count, seed);
+    return Array.from({ length: count }, (_, index) => first + index);
+  }
+
+  // Reserva atômica de `count` números; retorna [primeiro, último]
+  private async reserve(key: string, count: number, seed: SeedFn): Promise<[number, number]> {
+    const updated = await prisma.$queryRaw<{ valor: bigint }[]>`
+      UPDATE numeracao_sequencias
+      SET valor = valor + ${count}, updated_at = now()
+      WHERE chave = ${key}
+      RETURNING valor
+    `;
+
+    let last: number;
+    if (updated.length > 0) {
+      last = Number(updated[0].valor);
+    } else {
+      // Contador novo: partir do maior número existente; ON CONFLICT cobre a criação simultânea
+      const base = await seed();
+      const inserted = await prisma.$queryRaw<{ valor: bigint }[]>`
+        INSERT INTO numeracao_sequencias (chave, valor)
+        VALUES (${key}, ${base + count})
+        ON CONFLICT (chave) DO UPDATE
+        SET valor = numeracao_sequencias.valor + ${count}, updated_at = now()
+        RETURNING valor
+      `;
+      last = Number(inserted[0].valor);
+    }
+
+    return [last - count + 1, last];
+  }
+
+  // 🔄 Alinhar o contador ao maior número existente (ex.: após número gravado por fora do alocador)
+  async resync(key: string, seed: SeedFn): Promise<void> {
+    const base = await seed();
+    this.blocks.delete(key);
+
+    await prisma.$executeRaw`
+      INSERT INTO numeracao_sequencias (chave, valor)
+      VALUES (${key}, ${base})
+      ON CONFLICT (chave) DO UPDATE
+      SET valor = GREATEST(numeracao_sequencias.valor, EXCLUDED.valor), updated_at = now()
+    `;
+  }
+
+  getStats() {
+    return {
+      blockSize: this.options.blockSize,
+      blocos: Object.fromEntries(
+        Array.from(this.blocks.entries()).map(([key, block]) => [
+          key,
+          { proximo: block.next, restantes: Math.max(0, block.end - block.next + 1) },
+        ])
+      ),
+    };
+  }
+}
+
+// 🌟 Instância global (sobrevive a hot reload em desenvolvimento)
+const globalForNumberAllocator = globalThis as unknown as {
+  numberAllocator: NumberAllocator | undefined;
+};
+
+export const numberAllocator =
+  globalForNumberAllocator.numberAllocator ??
+  new NumberAllocator({
+    blockSize: Math.max(1, Number(process.env.NUMERACAO_BLOCK_SIZE) || 1),
+  });
+
+if (process.env.NODE_ENV !== 'production') {
+  globalForNumberAllocator.numberAllocator = numberAllocator;
+}
+
+const MAX_CREATE_ATTEMPTS = 3;
+
+/**
+ * Verificar se o erro é violação de unicidade na coluna de numeração
+ * O Prisma informa em meta.target os campos (ex.: ['numeroOs']) ou o nome do índice
+ * (ex.: 'ordens_servico_numero_os_key'); conflitos em outras colunas (email, CPF/CNPJ) não contam
+ */
+export function isNumberConflict(error: unknown, field: string): boolean {
+  const { code, meta } = (error ?? {}) as { code?: string; meta?: { target?: unknown } };
+  if (code !== 'P2002') return false;
+
+  const column = field.replace(/[A-Z]/g, letra => `_${letra.toLowerCase()}`);
+  const targets = ([] as unknown[]).concat(meta?.target ?? []);
+  return targets.some(
+    target => typeof target === 'string' && (target === field || target.includes(column))
+  );
+}
+
+/**
+ * Criar um registro com número alocado
+ * Violação de unicidade indica número gravado por fora do contador (ex.: instância antiga
+ * durante o deploy): o contador é realinhado e a criação repetida com um novo número.
+ * Só conflitos em `field` (o campo de numeração) disparam a nova tentativa
+ */
+export async function createWithAllocatedNumber<T>(
+  field: string,
+  allocate: () => Promise<string>,
+  resync: () => Promise<void>,
+  create: (_numero: string) => Promise<T>
+): Promise<T> {
+  for (let attempt = 1; ; attempt++) {
+    const numero = await allocate();
+    try {
+      return await create(numero);
+    } catch (error) {
+      if (!isNumberConflict(error, field) || attempt >= MAX_CREATE_ATTEMPTS) throw error;
+      console.error(`Número ${numero} já em uso, realinhando contador:`, error);
+      await resync();
+    }
+  }
+}
+
+// 👤 Clientes: CL{ano}{000000}, contador por ano
+const clienteKey = (year: number) => `cliente:${year}`;
+
+function clienteSeed(year: number): SeedFn {
+  return async () => {
+    const lastCliente = await prisma.cliente.findFirst({
+      where: { numeroCliente: { startsWith: `CL${year}` } },
+      orderBy: { numeroCliente: 'desc' },
+      select: { numeroCliente: true },
+    });
+
+    const lastNumber = Number.parseInt(lastCliente?.numeroCliente?.substring(6) ?? '', 10);
+    return Number.isNaN(lastNumber) ? 0 : lastNumber;
+  };
+}
+
+const formatNumeroCliente = (year: number, value: number) =>
+  `CL${year}${value.toString().padStart(6, '0')}`;
+
+export async function nextNumeroCliente(date: Date = new Date()): Promise<string> {
+  const year = date.getFullYear();
+  const value = await numberAllocator.next(clienteKey(year), clienteSeed(year));
+  return formatNumeroCliente(year, value);
+}
+
+export async function allocateNumerosCliente(
+  count: number,
+  date: Date = new Date()
+): Promise<string[]> {
+  const year = date.getFullYear();
+  const values = await numberAllocator.nextRange(clienteKey(year), count, clienteSeed(year));
+  return values.map(value => formatNumeroCliente(year, value));
+}
+
+export async function resyncNumeroCliente(date: Date = new Date()): Promise<void> {
+  const year = date.getFullYear();
+  await numberAllocator.resync(clienteKey(year), clienteSeed(year));
+}
+
+// 🛠️ Ordens de serviço: OS{000000}, contador único
+const ORDEM_SERVICO_KEY = 'ordem_servico';
+
+const ordemServicoSeed: SeedFn = async () => {
+  const [row] = await prisma.$queryRaw<{ ultimo: bigint | null }[]>`
+    SELECT MAX(SUBSTRING(numero_os FROM 3)::BIGINT) AS ultimo
+    FROM ordens_servico
+    WHERE numero_os ~ '^OS[0-9]+$'
+  `;
+  return Number(row?.ultimo ?? 0);
+};
+
+export async function nextNumeroOs(): Promise<string> {
+  const value = await numberAllocator.next(ORDEM_SERVICO_KEY, ordemServicoSeed);
+  return `OS${value.toString().padStart(6, '0')}`;
+}
+
+export async function resyncNumeroOs(): Promise<void> {
+  await numberAllocator.resync(ORDEM_SERVICO_KEY, ordemServicoSeed);
+}
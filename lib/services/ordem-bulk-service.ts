@@ -0,0 +1,371 @@
+// 📦 Ordem Bulk Service - Leitura em lote e alteração em massa de ordens de serviço
+// batch-get: muitas OS em uma consulta, com a mesma projeção (?fields/?include) da listagem.
+// Alteração em massa: N mudanças de status/prioridade/técnico em uma transação (linhas travadas
+// em ordem de id, um updateMany por combinação de valores, histórico com createMany) e uma única
+// notificação Socket.IO ao final
+import { Prisma } from '@prisma/client';
+
+import prisma from '@/lib/prisma';
+import { auditLogService } from '@/lib/services/audit-log-service';
+import {
+  OrdemListProjection,
+  mapOrdemListItem,
+} from '@/lib/services/ordem-list-mapper';
+import {
+  STATUS_VALIDOS,
+  normalizeStatusOrdem,
+  sendStatusChangeSms,
+} from '@/lib/services/ordem-status-service';
+
+const UUID_PATTERN = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i;
+
+// Mesmos valores aceitos por PATCH /api/ordens-servico/[id]/prioridade
+const PRIORIDADE_MAP: Record<string, string> = {
+  Baixa: 'baixa',
+  Média: 'media',
+  Alta: 'alta',
+  Urgente: 'urgente',
+};
+export const PRIORIDADES_VALIDAS = ['baixa', 'media', 'alta', 'urgente'];
+
+export function normalizePrioridadeOrdem(prioridade: unknown): string | null {
+  if (typeof prioridade !== 'string') return null;
+  const normalizada = PRIORIDADE_MAP[prioridade] || prioridade;
+  return PRIORIDADES_VALIDAS.includes(normalizada) ? normalizada : null;
+}
+
+export class OrdemBulkError extends Error {
+  constructor(
+    message: string,
+    readonly status: number,
+    readonly detalhes?: unknown
+  ) {
+    super(message);
+    this.name = 'OrdemBulkError';
+  }
+}
+
+export interface OrdemBulkChange {
+  id: string;
+  status?: string;
+  prioridade?: string;
+  tecnicoId?: string | null;
+}
+
+export interface OrdemBulkActor {
+  id: string;
+  name: string;
+}
+
+export interface OrdemBulkContext {
+  ip?: string | null;
+  userAgent?: string | null;
+  endpoint?: string | null;
+  method?: string | null;
+}
+
+export interface OrdemBulkResult {
+  atualizadas: number;
+  semAlteracao: number;
+  historicos: number;
+  ordens: Array<{
+    id: string;
+    numero_os: string;
+    status: string;
+    prioridade: string;
+    tecnico_id: string | null;
+  }>;
+}
+
+export interface OrdemBulkServiceOptions {
+  maxBatchGet: number;
+  maxChanges: number;
+}
+
+interface LockedOrdem {
+  id: string;
+  numero_os: string;
+  status: string;
+  prioridade: string;
+  tecnico_id: string | null;
+}
+
+type OrdemUpdate = { status?: string; prioridade?: string; tecnicoId?: string | null };
+
+export class OrdemBulkService {
+  constructor(private readonly options: OrdemBulkServiceOptions) {}
+
+  // 🔍 Várias OS em uma consulta, na ordem pedida
+  async batchGet(ids: unknown, projection: OrdemListProjection) {
+    if (!Array.isArray(ids) || ids.length === 0) {
+      throw new OrdemBulkError('Informe a lista de ids', 400);
+    }
+    if (ids.length > this.options.maxBatchGet) {
+      throw new OrdemBulkError(`Máximo de ${this.options.maxBatchGet} ids por requisição`, 400);
+    }
+
+    const invalidos = ids.filter(id => typeof id !== 'string' || !UUID_PATTERN.test(id));
+    if (invalidos.length > 0) {
+      throw new OrdemBulkError('Ids inválidos', 400, invalidos);
+    }
+
+    const unicos = Array.from(new Set(ids as string[]));
+    const orders = await prisma.ordemServico.findMany({
+      where: { id: { in: unicos } },
+      select: projection.select,
+    });
+
+    const porId = new Map(orders.map(order => [(order as { id: string }).id, order]));
+    return {
+      data: unicos.filter(id => porId.has(id)).map(id => mapOrdemListItem(porId.get(id)!, projection)),
+      naoEncontrados: unicos.filter(id => !porId.has(id)),
+    };
+  }
+
+  // ✏️ Aplicar N alterações em uma transação (tudo ou nada)
+  async bulkUpdate(
+    input: unknown,
+    actor: OrdemBulkActor,
+    context: OrdemBulkContext = {}
+  ): Promise<OrdemBulkResult> {
+    const changes = this.parseChanges(input);
+    await this.assertTecnicosExist(changes);
+
+    const ids = changes.map(change => change.id);
+    const now = new Date();
+
+    const { ordens, alteradas, historicos } = await prisma.$transaction(async tx => {
+      // Travar as linhas em ordem de id: evita deadlock entre lotes concorrentes e garante
+      // que o status anterior registrado no histórico é o vigente
+      const atuais = await tx.$queryRaw<LockedOrdem[]>`
+        SELECT id::text AS id, numero_os, status, prioridade, tecnico_id::text AS tecnico_id
+        FROM ordens_servico
+        WHERE id = ANY(${ids}::uuid[])
+        ORDER BY id
+        FOR UPDATE
+      `;
+
+      const porId = new Map(atuais.map(ordem => [ordem.id, ordem]));
+      const naoEncontrados = ids.filter(id => !porId.has(id));
+      if (naoEncontrados.length > 0) {
+        throw new OrdemBulkError('Ordens de serviço não encontradas', 404, naoEncontrados);
+      }
+
+      // Agrupar alterações idênticas: um updateMany por combinação de valores
+      const grupos = new Map<string, { data: OrdemUpdate; ids: string[] }>();
+      const alteradas = new Map<string, { anterior: LockedOrdem; data: OrdemUpdate }>();
+
+      for (const change of changes) {
+        const anterior = porId.get(change.id)!;
+        const data: OrdemUpdate = {};
+        if (change.status !== undefined && change.status !== anterior.status) {
+          data.status = change.status;
+        }
+        if (change.prioridade !== undefined && change.prioridade !== anterior.prioridade) {
+          data.prioridade = change.prioridade;
+        }
+        if (change.tecnicoId !== undefined && change.tecnicoId !== anterior.tecnico_id) {
+          data.tecnicoId = change.tecnicoId;
+        }
+        if (Object.keys(data).length === 0) continue;
+
+        alteradas.set(change.id, { anterior, data });
+        const key = JSON.stringify([data.status, data.prioridade, data.tecnicoId]);
+        const grupo = grupos.get(key) ?? { data, ids: [] };
+        grupo.ids.push(change.id);
+        grupos.set(key, grupo);
+      }
+
+      for (const grupo of Array.from(grupos.values())) {
+        await tx.ordemServico.updateMany({
+          where: { id: { in: grupo.ids } },
+          data: { ...grupo.data, updatedAt: now },
+        });
+      }
+
+      const historicos: Prisma.StatusHistoricoCreateManyInput[] = Array.from(alteradas.values())
+        .filter(({ data }) => data.status !== undefined)
+        .map(({ anterior, data }) => ({
+          ordemServicoId: anterior.id,
+          statusAnterior: anterior.status,
+          statusNovo: data.status!,
+          motivo: `Status alterado para ${data.status} (alteração em massa)`,
+          usuarioId: actor.id,
+          usuarioNome: actor.name,
+          dataMudanca: now,
+        }));
+      if (historicos.length > 0) {
+        await tx.statusHistorico.createMany({ data: historicos });
+      }
+
+      const ordens = changes.map(change => {
+        const anterior = porId.get(change.id)!;
+        const alterada = alteradas.get(change.id)?.data ?? {};
+        return {
+          id: anterior.id,
+          numero_os: anterior.numero_os,
+          status: alterada.status ?? anterior.status,
+          prioridade: alterada.prioridade ?? anterior.prioridade,
+          tecnico_id: alterada.tecnicoId !== undefined ? alterada.tecnicoId : anterior.tecnico_id,
+        };
+      });
+
+      return { ordens, alteradas, historicos: historicos.length };
+    });
+
+    for (const { anterior, data } of Array.from(alteradas.values())) {
+      auditLogService.record({
+        actorId: actor.id,
+        action: 'ordem_servico.bulk_updated',
+        resourceType: 'ordem_servico',
+        resourceId: anterior.id,
+        ...context,
+        details: {
+          statusAnterior: anterior.status,
+          prioridadeAnterior: anterior.prioridade,
+          tecnicoAnterior: anterior.tecnico_id,
+          alteracoes: data,
+        },
+      });
+    }
+
+    if (alteradas.size > 0) {
+      this.notify(ordens.filter(ordem => alteradas.has(ordem.id)), actor);
+
+      const statusAlterados = Array.from(alteradas.values())
+        .filter(({ data }) => data.status !== undefined)
+        .map(({ anterior }) => anterior.id);
+      if (statusAlterados.length > 0) {
+        // SMS fora da requisição: a resposta não espera o provedor
+        void this.sendStatusSms(statusAlterados).catch(error => {
+          console.error('Erro ao enviar SMS da alteração em massa:', error);
+        });
+      }
+    }
+
+    return {
+      atualizadas: alteradas.size,
+      semAlteracao: changes.length - alteradas.size,
+      historicos,
+      ordens,
+    };
+  }
+
+  private parseChanges(input: unknown): OrdemBulkChange[] {
+    if (!Array.isArray(input) || input.length === 0) {
+      throw new OrdemBulkError('Informe a lista de alterações', 400);
+    }
+    if (input.length > this.options.maxChanges) {
+      throw new OrdemBulkError(`Máximo de ${this.options.maxChanges} alterações por requisição`, 400);
+    }
+
+    const erros: Array<{ indice: number; id?: unknown; erro: string }> = [];
+    const vistos = new Set<string>();
+    const changes: OrdemBulkChange[] = [];
+
+    input.forEach((item, indice) => {
+      const raw = (item ?? {}) as Record<string, unknown>;
+      const { id } = raw;
+      const erro = (mensagem: string) => erros.push({ indice, id, erro: mensagem });
+
+      if (typeof id !== 'string' || !UUID_PATTERN.test(id)) return erro('Id inválido');
+      if (vistos.has(id)) return erro('Ordem repetida no lote');
+      vistos.add(id);
+
+      const change: OrdemBulkChange = { id };
+
+      if (raw.status !== undefined) {
+        const status = normalizeStatusOrdem(raw.status);
+        if (!status) return erro(`Status inválido. Status válidos: ${STATUS_VALIDOS.join(', ')}`);
+        change.status = status;
+      }
+
+      if (raw.prioridade !== undefined) {
+        const prioridade = normalizePrioridadeOrdem(raw.prioridade);
+        if (!prioridade) {
+          return erro(`Prioridade inválida. Prioridades válidas: ${PRIORIDADES_VALIDAS.join(', ')}`);
+        }
+        change.prioridade = prioridade;
+      }
+
+      const tecnicoId = raw.tecnico_id !== undefined ? raw.tecnico_id : raw.tecnicoId;
+      if (tecnicoId !== undefined) {
+        if (tecnicoId !== null && (typeof tecnicoId !== 'string' || !UUID_PATTERN.test(tecnicoId))) {
+          return erro('Técnico inválido');
+        }
+        change.tecnicoId = tecnicoId as string | null;
+      }
+
+      if (change.status === undefined && change.prioridade === undefined && change.tecnicoId === undefined) {
+        return erro('Informe status, prioridade ou tecnico_id');
+      }
+
+      changes.push(change);
+    });
+
+    if (erros.length > 0) {
+      throw new OrdemBulkError('Alterações inválidas', 400, erros);
+    }
+    return changes;
+  }
+
+  private async assertTecnicosExist(changes: OrdemBulkChange[]): Promise<void> {
+    const tecnicoIds = Array.from(
+      new Set(changes.map(change => change.tecnicoId).filter((id): id is string => Boolean(id)))
+    );
+    if (tecnicoIds.length === 0) return;
+
+    const encontrados = await prisma.user.findMany({
+      where: { id: { in: tecnicoIds } },
+      select: { id: true },
+    });
+    const existentes = new Set(encontrados.map(user => user.id));
+    const inexistentes = tecnicoIds.filter(id => !existentes.has(id));
+
+    if (inexistentes.length > 0) {
+      throw new OrdemBulkError('Técnicos não encontrados', 400, inexistentes);
+    }
+  }
+
+  // 🔔 Uma notificação para o lote inteiro
+  private notify(ordens: OrdemBulkResult['ordens'], actor: OrdemBulkActor): void {
+    try {
+      // @ts-ignore - Acessar instância global do Socket.IO
+      const { io } = global;
+      io?.emit('orders-bulk-updated', {
+        ordens,
+        usuario: actor.name,
+        timestamp: new Date().toISOString(),
+      });
+    } catch (error) {
+      console.error('Erro ao notificar alteração em massa via Socket.IO:', error);
+    }
+  }
+
+  // 📱 SMS de atualização por OS com status alterado (mesma mensagem do PATCH individual)
+  private async sendStatusSms(ids: string[]): Promise<void> {
+    const ordens = await prisma.ordemServico.findMany({
+      where: { id: { in: ids } },
+      include: {
+        cliente: { select: { id: true, nome: true, email: true, telefone: true } },
+      },
+    });
+
+    for (const ordem of ordens) {
+      if (ordem.cliente) await sendStatusChangeSms(ordem, ordem.cliente);
+    }
+  }
+}
+
+// 🌟 Instância global (sobrevive a hot reload em desenvolvimento)
+const globalForOrdemBulk = globalThis as unknown as {
+  ordemBulkService: OrdemBulkService | undefined;
+};
+
+export const ordemBulkService =
+  globalForOrdemBulk.ordemBulkService ??
+  new OrdemBulkService({ maxBatchGet: 200, maxChanges: 500 });
+
+if (process.env.NODE_ENV !== 'production') {
+  globalForOrdemBulk.ordemBulkService = ordemBulkService;
+}
@@ -0,0 +1,189 @@
+// 📋 Mapeamento de OS (Prisma) para a listagem GET /api/ordens-servico
+// Cada campo da resposta declara as colunas de que precisa: a projeção pedida em ?fields= e
+// ?include= vira um `select` do Prisma e o mapper monta apenas as chaves solicitadas.
+// Sem parâmetros, a resposta é a mesma de sempre (todos os campos, cliente e equipamento)
+import type { Prisma } from '@prisma/client';
+
+type SelectTree = { [key: string]: true | { select: SelectTree } };
+type OrdemRow = Record<string, any>;
+
+interface ProjectionSpec {
+  select: SelectTree;
+  map: (_order: OrdemRow) => unknown;
+}
+
+const column = (name: string): ProjectionSpec => ({
+  select: { [name]: true },
+  map: order => order[name],
+});
+
+// Campos legados: valor do equipamento vinculado, ou do próprio registro da OS
+const equipamentoOuLegado = (equipamentoField: string, ordemField: string): ProjectionSpec => ({
+  select: { [ordemField]: true, equipamento: { select: { [equipamentoField]: true } } },
+  map: order => (order.equipamento ? order.equipamento[equipamentoField] : order[ordemField]),
+});
+
+const FIELD_SPECS = {
+  id: column('id'),
+  numero_os: column('numeroOs'),
+  titulo: column('titulo'),
+  descricao: column('descricao'),
+  status: column('status'),
+  prioridade: column('prioridade'),
+  tipo_servico: column('titulo'),
+  tipo_dispositivo: equipamentoOuLegado('tipo', 'tipoDispositivo'),
+  modelo_dispositivo: equipamentoOuLegado('modelo', 'modeloDispositivo'),
+  serial_number: equipamentoOuLegado('numeroSerie', 'numeroSerie'),
+  valor_servico: column('valorServico'),
+  valor_pecas: column('valorPecas'),
+  valor_total: column('valorTotal'),
+  data_abertura: column('dataAbertura'),
+  data_inicio: column('dataInicio'),
+  data_conclusao: column('dataConclusao'),
+  tecnico_id: column('tecnicoId'),
+  cliente_id: column('clienteId'),
+  equipamento_id: column('equipamentoId'),
+  created_at: column('createdAt'),
+  updated_at: column('updatedAt'),
+} satisfies Record<string, ProjectionSpec>;
+
+const INCLUDE_SPECS = {
+  cliente: {
+    select: {
+      cliente: {
+        select: { id: true, nome: true, email: true, telefone: true, endereco: true, numeroCliente: true },
+      },
+    },
+    map: order =>
+      order.cliente
+        ? {
+          id: order.cliente.id,
+          nome: order.cliente.nome,
+          email: order.cliente.email,
+          telefone: order.cliente.telefone,
+          endereco: order.cliente.endereco,
+          numero_cliente: order.cliente.numeroCliente,
+        }
+        : null,
+  },
+  equipamento: {
+    select: {
+      tipoDispositivo: true,
+      modeloDispositivo: true,
+      numeroSerie: true,
+      equipamento: {
+        select: { id: true, tipo: true, marca: true, modelo: true, numeroSerie: true, imei: true },
+      },
+    },
+    map: order =>
+      order.equipamento
+        ? {
+          id: order.equipamento.id,
+          tipo: order.equipamento.tipo,
+          marca: order.equipamento.marca,
+          modelo: order.equipamento.modelo,
+          numero_serie: order.equipamento.numeroSerie,
+          imei: order.equipamento.imei,
+        }
+        : {
+          // Fallback fields if no relation
+          marca: order.tipoDispositivo,
+          modelo: order.modeloDispositivo,
+          numero_serie: order.numeroSerie,
+        },
+  },
+} satisfies Record<string, ProjectionSpec>;
+
+export type OrdemListField = keyof typeof FIELD_SPECS;
+export type OrdemListInclude = keyof typeof INCLUDE_SPECS;
+
+export const ORDEM_LIST_FIELDS = Object.keys(FIELD_SPECS) as OrdemListField[];
+export const ORDEM_LIST_INCLUDES = Object.keys(INCLUDE_SPECS) as OrdemListInclude[];
+
+export interface OrdemListProjection {
+  fields: OrdemListField[];
+  includes: OrdemListInclude[];
+  select: Prisma.OrdemServicoSelect;
+}
+
+export class InvalidProjectionError extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = 'InvalidProjectionError';
+  }
+}
+
+function mergeSelect(target: SelectTree, source: SelectTree): SelectTree {
+  for (const [key, value] of Object.entries(source)) {
+    const current = target[key];
+    if (value === true) {
+      if (current === undefined) target[key] = true;
+    } else {
+      const nested = current && current !== true ? current : { select: {} };
+      target[key] = { select: mergeSelect(nested.select, value.select) };
+    }
+  }
+  return target;
+}
+
+function buildProjection(fields: OrdemListField[], includes: OrdemListInclude[]): OrdemListProjection {
+  const select: SelectTree = {};
+  for (const field of fields) mergeSelect(select, FIELD_SPECS[field].select);
+  for (const include of includes) mergeSelect(select, INCLUDE_SPECS[include].select);
+
+  return { fields, includes, select: select as Prisma.OrdemServicoSelect };
+}
+
+function parseList<T extends string>(value: string, allowed: readonly T[], label: string): T[] {
+  const requested = value
+    .split(',')
+    .map(item => item.trim())
+    .filter(Boolean);
+
+  const invalid = requested.filter(item => !allowed.includes(item as T));
+  if (invalid.length > 0) {
+    throw new InvalidProjectionError(
+      `${label} inválido(s): ${invalid.join(', ')}. Valores aceitos: ${allowed.join(', ')}`
+    );
+  }
+
+  // Ordem canônica, sem repetições
+  return allowed.filter(item => requested.includes(item));
+}
+
+const DEFAULT_PROJECTION = buildProjection(ORDEM_LIST_FIELDS, ORDEM_LIST_INCLUDES);
+
+/**
+ * Projeção da listagem a partir de ?fields= e ?include=
+ * Sem `fields`, todos os campos; `id` vem sempre. Relações só com `include` quando `fields` é
+ * informado (include=none ou vazio desliga as relações também na resposta completa)
+ */
+export function parseOrdemListProjection(
+  fieldsParam: string | null,
+  includeParam: string | null
+): OrdemListProjection {
+  if (fieldsParam === null && includeParam === null) return DEFAULT_PROJECTION;
+
+  const fields =
+    fieldsParam === null
+      ? ORDEM_LIST_FIELDS
+      : parseList(`id,${fieldsParam}`, ORDEM_LIST_FIELDS, 'Campo(s)');
+
+  let includes: OrdemListInclude[];
+  if (includeParam === null) {
+    includes = fieldsParam === null ? ORDEM_LIST_INCLUDES : [];
+  } else if (includeParam.trim() === 'none') {
+    includes = [];
+  } else {
+    includes = parseList(includeParam, ORDEM_LIST_INCLUDES, 'Relacionamento(s)');
+  }
+
+  return buildProjection(fields, includes);
+}
+
+export function mapOrdemListItem(order: OrdemRow, projection: OrdemListProjection) {
+  const item: Record<string, unknown> = {};
+  for (const field of projection.fields) item[field] = FIELD_SPECS[field].map(order);
+  for (const include of projection.includes) item[include] = INCLUDE_SPECS[include].map(order);
+  return item;
+}
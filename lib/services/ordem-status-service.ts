@@ -0,0 +1,208 @@
+// 🔁 Ordem Status Service - Transição de status de uma OS em uma única ida ao banco
+// Um único comando (CTE) trava a linha, atualiza o status, grava o histórico e devolve a OS já
+// com os dados do cliente usados nas notificações. Efeitos colaterais (Socket.IO, SMS) são
+// disparados depois do commit, sem segurar a resposta
+import type { OrdemServico } from '@prisma/client';
+
+import prisma from '@/lib/prisma';
+import { smsService } from '@/lib/services/sms-service';
+
+// Valores aceitos por PATCH /api/ordens-servico/[id]/status e pela alteração em massa
+const STATUS_MAP: Record<string, string> = {
+  Pendente: 'aberta',
+  'Em andamento': 'em_andamento',
+  Concluída: 'concluida',
+  Cancelada: 'cancelada',
+};
+export const STATUS_VALIDOS = ['aberta', 'em_andamento', 'concluida', 'cancelada'];
+
+// Status normalizado (aceita os rótulos legados), ou null se inválido
+export function normalizeStatusOrdem(status: unknown): string | null {
+  if (typeof status !== 'string') return null;
+  const normalizado = STATUS_MAP[status] || status;
+  return STATUS_VALIDOS.includes(normalizado) ? normalizado : null;
+}
+
+export interface OrdemStatusActor {
+  id: string;
+  name: string;
+}
+
+export interface OrdemStatusTransitionInput {
+  ordemId: string;
+  status: string;
+  motivo: string;
+  actor: OrdemStatusActor;
+}
+
+export interface OrdemStatusCliente {
+  id: string;
+  nome: string;
+  email: string | null;
+  telefone: string | null;
+}
+
+export interface OrdemStatusTransition {
+  statusAnterior: string;
+  ordem: OrdemServico;
+  cliente: OrdemStatusCliente | null;
+}
+
+// Linha de ordens_servico (o.*) mais o status anterior e os dados do cliente
+type TransitionRow = Record<string, unknown> & {
+  status_anterior: string;
+  cliente_nome: string | null;
+  cliente_email: string | null;
+  cliente_telefone: string | null;
+};
+
+// Colunas (snake_case) → campos do modelo Prisma: o @map de OrdemServico é sempre o camelCase
+function toOrdemServico(columns: Record<string, unknown>): OrdemServico {
+  return Object.fromEntries(
+    Object.entries(columns).map(([column, value]) => [
+      column.replace(/_([a-z])/g, (_match, letter: string) => letter.toUpperCase()),
+      value,
+    ])
+  ) as unknown as OrdemServico;
+}
+
+type OrdemParaSms = Pick<
+  OrdemStatusTransition['ordem'],
+  'id' | 'numeroOs' | 'clienteId' | 'status' | 'descricao' | 'valorTotal' | 'createdAt' | 'tecnicoId'
+>;
+
+// 📱 SMS de atualização/conclusão da OS pela fila de saída (compartilhado com a alteração em massa)
+export async function sendStatusChangeSms(ordem: OrdemParaSms, cliente: OrdemStatusCliente): Promise<void> {
+  const tipoSMS = ordem.status === 'concluida' ? 'conclusao' : 'atualizacao';
+
+  await smsService.enqueueOrdemServicoSMS(
+    {
+      id: ordem.id,
+      numero_ordem: ordem.numeroOs,
+      cliente_id: ordem.clienteId,
+      status: ordem.status,
+      descricao_problema: ordem.descricao || '',
+      valor_total: Number(ordem.valorTotal || 0),
+      data_criacao: ordem.createdAt.toISOString(),
+      tecnico_responsavel: ordem.tecnicoId || undefined,
+    },
+    {
+      id: cliente.id,
+      nome: cliente.nome,
+      telefone: cliente.telefone || undefined,
+      celular: cliente.telefone || undefined, // Fallback
+      email: cliente.email || undefined,
+    },
+    tipoSMS
+  );
+}
+
+export class OrdemStatusService {
+  /**
+   * Transição de status em um único comando (trava, update, histórico e leitura do cliente)
+   * Retorna null se a OS não existe; nesse caso nada é gravado
+   */
+  async transition(input: OrdemStatusTransitionInput): Promise<OrdemStatusTransition | null> {
+    const { ordemId, status, motivo, actor } = input;
+
+    const [row] = await prisma.$queryRaw<TransitionRow[]>`
+      WITH anterior AS (
+        SELECT id, status
+        FROM ordens_servico
+        WHERE id = ${ordemId}::uuid
+        FOR UPDATE
+      ),
+      atualizada AS (
+        UPDATE ordens_servico o
+        SET status = ${status}, updated_at = now()
+        FROM anterior a
+        WHERE o.id = a.id
+        RETURNING o.*
+      ),
+      historico AS (
+        INSERT INTO status_historico (
+          ordem_servico_id, status_anterior, status_novo, motivo, usuario_id, usuario_nome, data_mudanca
+        )
+        SELECT a.id, a.status, ${status}, ${motivo}, ${actor.id}::uuid, ${actor.name}, now()
+        FROM anterior a
+      )
+      SELECT
+        o.*,
+        a.status AS status_anterior,
+        c.nome AS cliente_nome, c.email AS cliente_email, c.telefone AS cliente_telefone
+      FROM atualizada o
+      JOIN anterior a ON a.id = o.id
+      LEFT JOIN clientes c ON c.id = o.cliente_id
+    `;
+
+    if (!row) return null;
+
+    const { status_anterior, cliente_nome, cliente_email, cliente_telefone, ...columns } = row;
+    const ordem = toOrdemServico(columns);
+
+    return {
+      statusAnterior: status_anterior,
+      ordem,
+      cliente:
+        cliente_nome !== null
+          ? {
+            id: ordem.clienteId,
+            nome: cliente_nome,
+            email: cliente_email,
+            telefone: cliente_telefone,
+          }
+          : null,
+    };
+  }
+
+  // 🔔 Notificações após o commit; falhas são registradas e não afetam a transição
+  dispatchSideEffects(transition: OrdemStatusTransition): void {
+    if (transition.statusAnterior === transition.ordem.status) return;
+
+    void this.runSideEffects(transition).catch(error => {
+      console.error('Erro ao notificar mudança de status da ordem:', error);
+    });
+  }
+
+  private async runSideEffects({ ordem, cliente }: OrdemStatusTransition): Promise<void> {
+    this.emitStatusChanged(ordem);
+
+    if (cliente) {
+      await sendStatusChangeSms(ordem, cliente);
+    }
+  }
+
+  // Mesmo evento e salas do repasse feito em /api/socket
+  private emitStatusChanged(ordem: OrdemStatusTransition['ordem']): void {
+    try {
+      // @ts-ignore - Acessar instância global do Socket.IO
+      const { io } = global;
+      if (!io) return;
+
+      const payload = {
+        orderId: ordem.id,
+        status: ordem.status,
+        clientId: ordem.clienteId,
+        technicianId: ordem.tecnicoId || undefined,
+        timestamp: ordem.updatedAt.toISOString(),
+      };
+
+      const rooms = [`user-${ordem.clienteId}`, 'admin'];
+      if (ordem.tecnicoId) rooms.push(`technician-${ordem.tecnicoId}`);
+      io.to(rooms).emit('order-status-changed', payload);
+    } catch (error) {
+      console.error('Erro ao emitir mudança de status via Socket.IO:', error);
+    }
+  }
+}
+
+// 🌟 Instância global (sobrevive a hot reload em desenvolvimento)
+const globalForOrdemStatus = globalThis as unknown as {
+  ordemStatusService: OrdemStatusService | undefined;
+};
+
+export const ordemStatusService = globalForOrdemStatus.ordemStatusService ?? new OrdemStatusService();
+
+if (process.env.NODE_ENV !== 'production') {
+  globalForOrdemStatus.ordemStatusService = ordemStatusService;
+}
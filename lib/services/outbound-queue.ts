@@ -0,0 +1,458 @@
+// 📬 Outbound Queue - Fila durável de envio de email, SMS e WhatsApp
+// As mensagens são linhas de comunicacoes_cliente (status 'pendente'); workers por canal reivindicam
+// com FOR UPDATE SKIP LOCKED, respeitam o limite de taxa do provedor, reagendam falhas com backoff
+// exponencial e movem para 'falhou' (dead-letter) ao esgotar as tentativas
+import { randomUUID } from 'crypto';
+import os from 'os';
+
+import prisma from '@/lib/prisma';
+// Os circuitos por canal passam a ouvir as métricas dos envios feitos por esta fila
+import '@/lib/services/channel-health';
+
+export type OutboundChannel = 'email' | 'sms' | 'whatsapp';
+
+export const OUTBOUND_CHANNELS: OutboundChannel[] = ['email', 'sms', 'whatsapp'];
+
+export interface OutboundMessage {
+  id: string;
+  tipo: OutboundChannel;
+  destinatario: string;
+  conteudo: string;
+  assunto: string | null;
+  clienteTelefone: string | null;
+  tentativas: number;
+}
+
+export interface EnqueueOutboundMessage {
+  tipo: OutboundChannel;
+  destinatario: string;
+  conteudo: string;
+  assunto?: string;
+  ordemServicoId?: string;
+  clientePortalId?: string;
+  clienteTelefone?: string;
+}
+
+export type OutboundSender = (_message: OutboundMessage) => Promise<{ messageId?: string }>;
+
+export interface ChannelConfig {
+  concurrency: number;
+  ratePerSecond: number;
+  burst: number;
+  provider: string;
+}
+
+export interface OutboundQueueOptions {
+  channels: Record<OutboundChannel, ChannelConfig>;
+  maxAttempts: number;
+  baseRetryDelayMs: number;
+  maxRetryDelayMs: number;
+  pollIntervalMs: number;
+  staleAfterMs: number;
+  senders?: Partial<Record<OutboundChannel, OutboundSender>>;
+}
+
+interface ChannelStats {
+  enviados: number;
+  reagendados: number;
+  deadLetter: number;
+}
+
+export type DeliveryOutcome = 'enviado' | 'reagendado' | 'falhou';
+
+function sleep(ms: number): Promise<void> {
+  return new Promise(resolve => {
+    const timer = setTimeout(resolve, ms);
+    timer.unref?.();
+  });
+}
+
+// 🪣 Token bucket: limita a taxa de envio por provedor, compartilhado pelos workers do canal
+export class TokenBucket {
+  private tokens: number;
+  private lastRefill = Date.now();
+
+  constructor(
+    private readonly ratePerSecond: number,
+    private readonly burst: number
+  ) {
+    this.tokens = burst;
+  }
+
+  async take(): Promise<void> {
+    while (true) {
+      this.refill();
+      if (this.tokens >= 1) {
+        this.tokens -= 1;
+        return;
+      }
+      await sleep(Math.ceil(((1 - this.tokens) / this.ratePerSecond) * 1000));
+    }
+  }
+
+  private refill(): void {
+    const now = Date.now();
+    this.tokens = Math.min(
+      this.burst,
+      this.tokens + ((now - this.lastRefill) / 1000) * this.ratePerSecond
+    );
+    this.lastRefill = now;
+  }
+}
+
+// 📤 Envio real por canal (serviços carregados sob demanda)
+const defaultSenders: Record<OutboundChannel, OutboundSender> = {
+  email: async message => {
+    const { emailService } = await import('@/lib/services/email-service');
+    return emailService.sendEmail(
+      message.destinatario,
+      message.assunto || 'InterAlpha',
+      message.conteudo
+    );
+  },
+  sms: async message => {
+    const { smsService } = await import('@/lib/services/sms-service');
+    const result = await smsService.sendSMS(
+      message.clienteTelefone || message.destinatario,
+      message.conteudo,
+      { logCommunication: false }
+    );
+    if (!result.success) {
+      throw new Error(result.error || 'Falha no envio de SMS');
+    }
+    return { messageId: result.messageId };
+  },
+  whatsapp: async message => {
+    const { whatsappService } = await import('@/lib/services/whatsapp-service');
+    const result = await whatsappService.sendTextMessage(
+      message.clienteTelefone || message.destinatario,
+      message.conteudo
+    );
+    return { messageId: result.messages[0]?.id };
+  },
+};
+
+export class OutboundQueue {
+  private readonly workerId = `${os.hostname()}:${process.pid}:${randomUUID().slice(0, 8)}`;
+  private readonly buckets: Record<OutboundChannel, TokenBucket>;
+  private readonly senders: Record<OutboundChannel, OutboundSender>;
+  private readonly stats: Record<OutboundChannel, ChannelStats>;
+  private readonly wakeups = new Map<OutboundChannel, Set<() => void>>();
+  private running = false;
+  private activeWorkers = 0;
+
+  constructor(private readonly options: OutboundQueueOptions) {
+    this.buckets = {} as Record<OutboundChannel, TokenBucket>;
+    this.stats = {} as Record<OutboundChannel, ChannelStats>;
+
+    for (const channel of OUTBOUND_CHANNELS) {
+      const config = options.channels[channel];
+      this.buckets[channel] = new TokenBucket(config.ratePerSecond, config.burst);
+      this.stats[channel] = { enviados: 0, reagendados: 0, deadLetter: 0 };
+    }
+
+    this.senders = { ...defaultSenders, ...options.senders };
+  }
+
+  // ➕ Enfileirar mensagem (O(1) para quem chama; o envio acontece nos workers)
+  async enqueue(message: EnqueueOutboundMessage): Promise<string> {
+    const row = await prisma.comunicacaoCliente.create({
+      data: {
+        tipo: message.tipo,
+        destinatario: message.destinatario,
+        conteudo: message.conteudo,
+        assunto: message.assunto ?? null,
+        ordemServicoId: message.ordemServicoId ?? null,
+        clientePortalId: message.clientePortalId ?? null,
+        clienteTelefone: message.clienteTelefone ?? null,
+        provider: this.options.channels[message.tipo].provider,
+        status: 'pendente',
+      },
+      select: { id: true },
+    });
+
+    this.start();
+    this.wake(message.tipo);
+    return row.id;
+  }
+
+  // ▶️ Iniciar `concurrency` workers por canal (idempotente)
+  start(): void {
+    if (this.running) return;
+    this.running = true;
+
+    for (const channel of OUTBOUND_CHANNELS) {
+      for (let i = 0; i < this.options.channels[channel].concurrency; i++) {
+        void this.workerLoop(channel);
+      }
+    }
+  }
+
+  stop(): void {
+    this.running = false;
+    OUTBOUND_CHANNELS.forEach(channel => this.wake(channel));
+  }
+
+  private async workerLoop(channel: OutboundChannel): Promise<void> {
+    this.activeWorkers++;
+    let idleDelay = this.options.pollIntervalMs;
+
+    try {
+      while (this.running) {
+        try {
+          const processed = await this.processNext(channel);
+          if (processed) {
+            idleDelay = this.options.pollIntervalMs;
+            continue;
+          }
+        } catch (error) {
+          console.error(`Erro no worker da fila de ${channel}:`, error);
+        }
+
+        // Fila vazia (ou erro no banco): esperar, dobrando até 8x o intervalo, ou até um enqueue
+        await this.waitForWork(channel, idleDelay);
+        idleDelay = Math.min(idleDelay * 2, this.options.pollIntervalMs * 8);
+      }
+    } finally {
+      this.activeWorkers--;
+    }
+  }
+
+  private waitForWork(channel: OutboundChannel, ms: number): Promise<void> {
+    return new Promise(resolve => {
+      const listeners = this.wakeups.get(channel) ?? new Set();
+      const done = () => {
+        clearTimeout(timer);
+        listeners.delete(done);
+        resolve();
+      };
+      const timer = setTimeout(done, ms);
+      timer.unref?.();
+
+      listeners.add(done);
+      this.wakeups.set(channel, listeners);
+    });
+  }
+
+  // 🔔 Avisar que há mensagens gravadas fora do enqueue (ex.: dentro de outra transação)
+  notify(channel: OutboundChannel): void {
+    this.start();
+    this.wake(channel);
+  }
+
+  private wake(channel: OutboundChannel): void {
+    this.wakeups.get(channel)?.forEach(done => done());
+  }
+
+  // Reivindicar e entregar uma mensagem; retorna null se a fila do canal estiver vazia
+  async processNext(channel: OutboundChannel): Promise<DeliveryOutcome | null> {
+    const message = await this.claim(channel);
+    if (!message) return null;
+
+    await this.buckets[channel].take();
+    return this.deliver(message);
+  }
+
+  // 🔁 Processar até `limit` mensagens agora (compatibilidade com os endpoints de processamento)
+  async processBatch(
+    channel: OutboundChannel,
+    limit: number
+  ): Promise<{ processados: number; enviados: number; reagendados: number; falhas: number }> {
+    const summary = { processados: 0, enviados: 0, reagendados: 0, falhas: 0 };
+
+    while (summary.processados < limit) {
+      const outcome = await this.processNext(channel);
+      if (!outcome) break;
+
+      summary.processados++;
+      if (outcome === 'enviado') summary.enviados++;
+      else if (outcome === 'reagendado') summary.reagendados++;
+      else summary.falhas++;
+    }
+
+    return summary;
+  }
+
+  private async claim(channel: OutboundChannel): Promise<OutboundMessage | null> {
+    const staleBefore = new Date(Date.now() - this.options.staleAfterMs);
+
+    const rows = await prisma.$queryRaw<OutboundMessage[]>`
+      UPDATE comunicacoes_cliente
+      SET status = 'processando',
+          locked_by = ${this.workerId},
+          locked_at = now(),
+          tentativas = tentativas + 1
+      WHERE id = (
+        SELECT id FROM comunicacoes_cliente
+        WHERE tipo = ${channel}
+          AND (
+            (status = 'pendente' AND (proxima_tentativa IS NULL OR proxima_tentativa <= now()))
+            OR (status = 'processando' AND locked_at < ${staleBefore})
+          )
+        ORDER BY data_envio
+        FOR UPDATE SKIP LOCKED
+        LIMIT 1
+      )
+      RETURNING id, tipo, destinatario, conteudo, assunto,
+                cliente_telefone AS "clienteTelefone", tentativas
+    `;
+
+    return rows[0] ?? null;
+  }
+
+  private async deliver(message: OutboundMessage): Promise<DeliveryOutcome> {
+    const stats = this.stats[message.tipo];
+
+    try {
+      if (!message.destinatario && !message.clienteTelefone) {
+        // Sem destino não adianta tentar de novo
+        await this.deadLetter(message, 'Mensagem sem destinatário');
+        stats.deadLetter++;
+        return 'falhou';
+      }
+
+      const { messageId } = await this.senders[message.tipo](message);
+
+      await prisma.comunicacaoCliente.update({
+        where: { id: message.id },
+        data: {
+          status: 'enviado',
+          messageId: messageId ?? null,
+          provider: this.options.channels[message.tipo].provider,
+          erro: null,
+          enviadoEm: new Date(),
+          proximaTentativa: null,
+          lockedBy: null,
+          lockedAt: null,
+        },
+      });
+
+      stats.enviados++;
+      return 'enviado';
+    } catch (error) {
+      const erro = error instanceof Error ? error.message : 'Erro desconhecido';
+      console.error(`Erro ao enviar ${message.tipo} ${message.id} (tentativa ${message.tentativas}):`, error);
+
+      if (message.tentativas >= this.options.maxAttempts) {
+        await this.deadLetter(message, erro);
+        stats.deadLetter++;
+        return 'falhou';
+      }
+
+      await prisma.comunicacaoCliente.update({
+        where: { id: message.id },
+        data: {
+          status: 'pendente',
+          erro,
+          proximaTentativa: new Date(Date.now() + this.retryDelay(message.tentativas)),
+          lockedBy: null,
+          lockedAt: null,
+        },
+      });
+
+      stats.reagendados++;
+      return 'reagendado';
+    }
+  }
+
+  private async deadLetter(message: OutboundMessage, erro: string): Promise<void> {
+    await prisma.comunicacaoCliente.update({
+      where: { id: message.id },
+      data: {
+        status: 'falhou',
+        erro,
+        proximaTentativa: null,
+        lockedBy: null,
+        lockedAt: null,
+      },
+    });
+  }
+
+  // Backoff exponencial com jitter (50% a 100% do atraso)
+  retryDelay(tentativas: number): number {
+    const delay = Math.min(
+      this.options.maxRetryDelayMs,
+      this.options.baseRetryDelayMs * 2 ** Math.max(0, tentativas - 1)
+    );
+    return Math.round(delay * (0.5 + Math.random() * 0.5));
+  }
+
+  // ♻️ Devolver mensagens do dead-letter para a fila
+  async requeueDeadLetters(channel: OutboundChannel): Promise<number> {
+    const { count } = await prisma.comunicacaoCliente.updateMany({
+      where: { tipo: channel, status: 'falhou' },
+      data: { status: 'pendente', tentativas: 0, proximaTentativa: null, erro: null },
+    });
+
+    if (count > 0) {
+      this.start();
+      this.wake(channel);
+    }
+    return count;
+  }
+
+  async getQueueStats(channel: OutboundChannel): Promise<Record<string, number>> {
+    const rows = await prisma.comunicacaoCliente.groupBy({
+      by: ['status'],
+      where: { tipo: channel },
+      _count: { _all: true },
+    });
+
+    return Object.fromEntries(rows.map(row => [row.status, row._count._all]));
+  }
+
+  getWorkerStats() {
+    return {
+      workerId: this.workerId,
+      running: this.running,
+      activeWorkers: this.activeWorkers,
+      channels: Object.fromEntries(
+        OUTBOUND_CHANNELS.map(channel => [
+          channel,
+          { ...this.options.channels[channel], ...this.stats[channel] },
+        ])
+      ),
+    };
+  }
+}
+
+// 🔧 Configuração por canal via ambiente (ex.: OUTBOUND_SMS_CONCURRENCY, OUTBOUND_SMS_RATE_PER_SECOND)
+function channelConfig(
+  channel: OutboundChannel,
+  defaults: ChannelConfig
+): ChannelConfig {
+  const prefix = `OUTBOUND_${channel.toUpperCase()}`;
+  const ratePerSecond = Number(process.env[`${prefix}_RATE_PER_SECOND`]) || defaults.ratePerSecond;
+
+  return {
+    concurrency: Number(process.env[`${prefix}_CONCURRENCY`]) || defaults.concurrency,
+    ratePerSecond,
+    burst: Math.max(1, Math.ceil(ratePerSecond)),
+    provider: defaults.provider,
+  };
+}
+
+// 🌟 Instância global (sobrevive a hot reload em desenvolvimento)
+const globalForOutbound = globalThis as unknown as {
+  outboundQueue: OutboundQueue | undefined;
+};
+
+export const outboundQueue =
+  globalForOutbound.outboundQueue ??
+  new OutboundQueue({
+    channels: {
+      email: channelConfig('email', { concurrency: 4, ratePerSecond: 5, burst: 5, provider: 'nodemailer' }),
+      // Twilio: 1 mensagem/s por número long code
+      sms: channelConfig('sms', { concurrency: 2, ratePerSecond: 1, burst: 1, provider: 'twilio' }),
+      whatsapp: channelConfig('whatsapp', { concurrency: 4, ratePerSecond: 20, burst: 20, provider: 'whatsapp' }),
+    },
+    maxAttempts: 5,
+    baseRetryDelayMs: 30 * 1000,
+    maxRetryDelayMs: 60 * 60 * 1000,
+    pollIntervalMs: 2000,
+    staleAfterMs: 5 * 60 * 1000,
+  });
+
+if (process.env.NODE_ENV !== 'production') {
+  globalForOutbound.outboundQueue = outboundQueue;
+}
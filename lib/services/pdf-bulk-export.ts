@@ -0,0 +1,186 @@
+// 📦 PDF Bulk Export - Exportação de PDFs de OS em um ZIP transmitido sob demanda
+// Lê as OS em páginas, renderiza com concorrência limitada e envia cada PDF assim que fica pronto;
+// a memória fica limitada a uma página de OS + `concurrency` PDFs, independente do total
+import type { Prisma } from '@prisma/client';
+
+import prisma from '@/lib/prisma';
+import {
+  ORDEM_PDF_INCLUDE,
+  OrdemServicoComRelacionamentos,
+  mapOrdemToPdfPayload,
+} from '@/lib/services/ordem-pdf-mapper';
+import { PDFGenerator } from '@/lib/services/pdf-generator';
+import { pdfRenderService } from '@/lib/services/pdf-render-service';
+import { ZipStreamWriter } from '@/lib/services/zip-stream';
+
+export interface OrdensPdfExportFilter {
+  from?: Date;
+  to?: Date;
+  status?: string[];
+  tecnicoId?: string;
+}
+
+export interface OrdensPdfExportOptions {
+  concurrency?: number;
+  pageSize?: number;
+}
+
+interface RenderedPdf {
+  fileName: string;
+  pdf: Buffer;
+  modifiedAt: Date;
+}
+
+const DEFAULT_CONCURRENCY = 4;
+const DEFAULT_PAGE_SIZE = 50;
+
+export function buildOrdensExportWhere(
+  filter: OrdensPdfExportFilter
+): Prisma.OrdemServicoWhereInput {
+  const where: Prisma.OrdemServicoWhereInput = {};
+
+  if (filter.from || filter.to) {
+    where.dataAbertura = {
+      ...(filter.from && { gte: filter.from }),
+      ...(filter.to && { lt: filter.to }),
+    };
+  }
+  if (filter.status?.length) where.status = { in: filter.status };
+  if (filter.tecnicoId) where.tecnicoId = filter.tecnicoId;
+
+  return where;
+}
+
+// 📄 Paginação por cursor (id): nunca carrega mais que uma página
+export async function* iterateOrdensParaPdf(
+  where: Prisma.OrdemServicoWhereInput,
+  pageSize: number = DEFAULT_PAGE_SIZE
+): AsyncGenerator<OrdemServicoComRelacionamentos> {
+  let cursor: string | undefined;
+
+  while (true) {
+    const page = await prisma.ordemServico.findMany({
+      where,
+      include: ORDEM_PDF_INCLUDE,
+      orderBy: { id: 'asc' },
+      take: pageSize,
+      ...(cursor && { cursor: { id: cursor }, skip: 1 }),
+    });
+
+    yield* page;
+
+    if (page.length < pageSize) return;
+    cursor = page[page.length - 1].id;
+  }
+}
+
+// ⚡ Executa fn com no máximo `concurrency` itens em andamento e entrega na ordem de conclusão
+// fn não deve rejeitar: erros devem ser tratados e convertidos em resultado
+export async function* mapWithConcurrency<T, R>(
+  source: AsyncIterable<T>,
+  concurrency: number,
+  fn: (_item: T) => Promise<R>
+): AsyncGenerator<R> {
+  const iterator = source[Symbol.asyncIterator]();
+  const running = new Map<number, Promise<{ key: number; result: R }>>();
+  let nextKey = 0;
+  let exhausted = false;
+
+  const fill = async () => {
+    while (!exhausted && running.size < concurrency) {
+      const next = await iterator.next();
+      if (next.done) {
+        exhausted = true;
+        return;
+      }
+
+      const key = nextKey++;
+      running.set(
+        key,
+        fn(next.value).then(result => ({ key, result }))
+      );
+    }
+  };
+
+  try {
+    await fill();
+
+    while (running.size > 0) {
+      const { key, result } = await Promise.race(running.values());
+      running.delete(key);
+      // Repor a fila antes de entregar, para renderizar enquanto o cliente consome
+      await fill();
+      yield result;
+    }
+  } finally {
+    if (!exhausted) await iterator.return?.();
+  }
+}
+
+export function createOrdensPdfZipStream(
+  filter: OrdensPdfExportFilter,
+  options: OrdensPdfExportOptions = {}
+): ReadableStream<Uint8Array> {
+  const zip = new ZipStreamWriter();
+  const falhas: string[] = [];
+
+  const rendered = mapWithConcurrency(
+    iterateOrdensParaPdf(buildOrdensExportWhere(filter), options.pageSize),
+    options.concurrency ?? DEFAULT_CONCURRENCY,
+    async (ordem): Promise<RenderedPdf | null> => {
+      const payload = mapOrdemToPdfPayload(ordem);
+
+      try {
+        const pdf = await pdfRenderService.renderOrdemServico(payload, {
+          cache: false,
+        });
+        return {
+          fileName: PDFGenerator.generateFileName(payload),
+          pdf,
+          modifiedAt: ordem.updatedAt,
+        };
+      } catch (error) {
+        console.error(`Erro ao gerar PDF da OS ${ordem.numeroOs}:`, error);
+        falhas.push(
+          `${ordem.numeroOs}: ${error instanceof Error ? error.message : 'Erro desconhecido'}`
+        );
+        return null;
+      }
+    }
+  );
+
+  // pull só é chamado quando o cliente consome: o ritmo do download controla a renderização
+  return new ReadableStream<Uint8Array>({
+    async pull(controller) {
+      try {
+        while (true) {
+          const next = await rendered.next();
+
+          if (next.done) {
+            if (falhas.length > 0) {
+              controller.enqueue(
+                await zip.addFile('ERROS.txt', Buffer.from(falhas.join('\n'), 'utf8'))
+              );
+            }
+            controller.enqueue(zip.finish());
+            controller.close();
+            return;
+          }
+
+          if (next.value) {
+            const { fileName, pdf, modifiedAt } = next.value;
+            controller.enqueue(await zip.addFile(fileName, pdf, modifiedAt));
+            return;
+          }
+        }
+      } catch (error) {
+        console.error('Erro na exportação de PDFs em lote:', error);
+        controller.error(error);
+      }
+    },
+
+    async cancel() {
+      await rendered.return(undefined);
+    },
+  });
+}
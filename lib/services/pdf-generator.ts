@@ -13,6 +13,31 @@ import {
   type OrdemServico,
 } from '@/types/ordens-servico';
 
+// Textos fixos do documento (cabeçalho e termos)
+const EMPRESA = {
+  nome: 'InterAlpha Assistência Técnica',
+  subtitulo: 'Especializada em Produtos Apple',
+  endereco: 'Rua Exemplo, 123 - Centro - São Paulo/SP - CEP: 01234-567',
+  contato: 'Tel: (11) 1234-5678 | Email: contato@interalpha.com.br',
+};
+
+const TERMOS = [
+  '1. O prazo de entrega informado é uma estimativa e pode variar conforme a complexidade do reparo.',
+  '2. Peças substituídas ficam disponíveis para retirada pelo cliente por até 30 dias.',
+  '3. A garantia do serviço é de 90 dias para mão de obra e conforme fabricante para peças.',
+  '4. Em caso de desistência do reparo, será cobrada taxa de análise técnica.',
+  '5. Equipamentos não retirados após 90 dias serão considerados abandonados.',
+];
+
+// 🧩 Partes estáticas pré-calculadas uma única vez por processo/worker.
+// O jsPDF não permite clonar documentos, então o layout dos termos (quebra de
+// linhas com métricas de fonte) é calculado uma vez e apenas redesenhado.
+interface PdfStaticTemplate {
+  termosLines: string[][];
+}
+
+let staticTemplate: PdfStaticTemplate | null = null;
+
 export class PDFGenerator {
   private doc: jsPDF;
   private pageWidth: number;
@@ -79,7 +104,7 @@ export class PDFGenerator {
     this.doc.setFont('helvetica', 'bold');
     this.doc.setTextColor(37, 99, 235); // Blue-600
     this.doc.text(
-      'InterAlpha Assistência Técnica',
+      EMPRESA.nome,
       this.pageWidth / 2,
       this.currentY,
       { align: 'center' }
@@ -92,7 +117,7 @@ export class PDFGenerator {
     this.doc.setFont('helvetica', 'normal');
     this.doc.setTextColor(107, 114, 128); // Gray-500
     this.doc.text(
-      'Especializada em Produtos Apple',
+      EMPRESA.subtitulo,
       this.pageWidth / 2,
       this.currentY,
       { align: 'center' }
@@ -103,7 +128,7 @@ export class PDFGenerator {
     // Informações de contato
     this.doc.setFontSize(8);
     this.doc.text(
-      'Rua Exemplo, 123 - Centro - São Paulo/SP - CEP: 01234-567',
+      EMPRESA.endereco,
       this.pageWidth / 2,
       this.currentY,
       { align: 'center' }
@@ -112,7 +137,7 @@ export class PDFGenerator {
     this.currentY += 4;
 
     this.doc.text(
-      'Tel: (11) 1234-5678 | Email: contato@interalpha.com.br',
+      EMPRESA.contato,
       this.pageWidth / 2,
       this.currentY,
       { align: 'center' }
@@ -258,19 +283,9 @@ export class PDFGenerator {
     this.doc.setFont('helvetica', 'normal');
     this.doc.setTextColor(0, 0, 0);
 
-    const termos = [
-      '1. O prazo de entrega informado é uma estimativa e pode variar conforme a complexidade do reparo.',
-      '2. Peças substituídas ficam disponíveis para retirada pelo cliente por até 30 dias.',
-      '3. A garantia do serviço é de 90 dias para mão de obra e conforme fabricante para peças.',
-      '4. Em caso de desistência do reparo, será cobrada taxa de análise técnica.',
-      '5. Equipamentos não retirados após 90 dias serão considerados abandonados.',
-    ];
-
     const lineHeight = 5;
-    const maxWidth = this.pageWidth - 2 * this.margin;
 
-    termos.forEach((termo) => {
-      const splitText = this.doc.splitTextToSize(termo, maxWidth);
+    this.getStaticTemplate().termosLines.forEach((splitText) => {
       this.doc.text(splitText, this.margin, this.currentY);
       this.currentY += splitText.length * lineHeight;
     });
@@ -278,6 +293,23 @@ export class PDFGenerator {
     this.currentY += 5;
   }
 
+  /**
+   * Layout estático calculado na primeira renderização e reutilizado
+   */
+  private getStaticTemplate(): PdfStaticTemplate {
+    if (!staticTemplate) {
+      // Mesma fonte usada em addTermosCondicoes (helvetica normal 8)
+      const maxWidth = this.pageWidth - 2 * this.margin;
+      staticTemplate = {
+        termosLines: TERMOS.map(
+          (termo) => this.doc.splitTextToSize(termo, maxWidth) as string[]
+        ),
+      };
+    }
+
+    return staticTemplate;
+  }
+
   /**
    * Área de assinatura
    */
@@ -0,0 +1,356 @@
+// 🖨️ PDF Render Service - Pool de Workers + Cache de PDFs Prontos
+// Renderiza PDFs de OS em worker threads e mantém em cache o resultado por id + hash do conteúdo
+import { createHash } from 'crypto';
+import os from 'os';
+import type { Worker } from 'worker_threads';
+
+import { LruCache } from '@/lib/services/lru-cache';
+import { PDFGenerator } from '@/lib/services/pdf-generator';
+import type {
+  PdfRenderRequest,
+  PdfRenderResponse,
+} from '@/lib/services/pdf-render.worker';
+import type { OrdemServico } from '@/types/ordens-servico';
+
+export type PdfWorkerFactory = () => Worker | Promise<Worker>;
+
+interface PendingRender {
+  id: number;
+  ordem: OrdemServico;
+  resolve: (_pdf: Buffer) => void;
+  reject: (_error: Error) => void;
+}
+
+interface PoolWorker {
+  worker: Worker;
+  current: PendingRender | null;
+  timer?: ReturnType<typeof setTimeout>;
+}
+
+// Recriação de workers que morrem: espera crescente e limite de falhas por janela
+export interface PdfWorkerRespawnPolicy {
+  maxCrashes: number;
+  windowMs: number;
+  baseDelayMs: number;
+  maxDelayMs: number;
+}
+
+const DEFAULT_RESPAWN_POLICY: PdfWorkerRespawnPolicy = {
+  maxCrashes: 5,
+  windowMs: 60 * 1000,
+  baseDelayMs: 100,
+  maxDelayMs: 5000,
+};
+
+// Renderização travada não pode ocupar a vaga do worker para sempre
+const DEFAULT_RENDER_TIMEOUT_MS = Number(process.env.PDF_RENDER_TIMEOUT_MS) || 30 * 1000;
+
+// 🧵 Pool de worker threads com fila FIFO
+export class PdfWorkerPool {
+  private workers: PoolWorker[] = [];
+  private queue: PendingRender[] = [];
+  private nextId = 0;
+  private starting: Promise<void> | null = null;
+  private crashes: number[] = [];
+  // Sem suporte a workers (ex.: bundler/ambiente) ou workers morrendo em sequência:
+  // renderiza no próprio processo
+  private inline = false;
+
+  constructor(
+    private readonly size: number,
+    private readonly createWorker: PdfWorkerFactory,
+    private readonly respawnPolicy: PdfWorkerRespawnPolicy = DEFAULT_RESPAWN_POLICY,
+    private readonly renderTimeoutMs: number = DEFAULT_RENDER_TIMEOUT_MS
+  ) {}
+
+  async render(ordem: OrdemServico): Promise<Buffer> {
+    await this.ensureStarted();
+
+    if (this.inline) {
+      return this.renderInline(ordem);
+    }
+
+    return new Promise<Buffer>((resolve, reject) => {
+      this.queue.push({ id: this.nextId++, ordem, resolve, reject });
+      this.dispatch();
+    });
+  }
+
+  private ensureStarted(): Promise<void> {
+    if (!this.starting) {
+      this.starting = (async () => {
+        try {
+          for (let i = 0; i < this.size; i++) {
+            this.workers.push(await this.spawn());
+          }
+        } catch (error) {
+          console.error(
+            'Workers de PDF indisponíveis, renderizando no processo principal:',
+            error
+          );
+          await this.destroy();
+          this.inline = true;
+        }
+      })();
+    }
+
+    return this.starting;
+  }
+
+  private async spawn(): Promise<PoolWorker> {
+    const worker = await this.createWorker();
+    const poolWorker: PoolWorker = { worker, current: null };
+
+    // Workers ociosos não mantêm o processo vivo
+    worker.unref();
+
+    worker.on('message', (response: PdfRenderResponse) => {
+      const task = poolWorker.current;
+      if (!task || task.id !== response.id) return;
+
+      clearTimeout(poolWorker.timer);
+      poolWorker.current = null;
+      if (response.pdf) {
+        task.resolve(Buffer.from(response.pdf));
+      } else {
+        task.reject(new Error(response.error || 'Falha ao gerar PDF'));
+      }
+      this.dispatch();
+    });
+
+    worker.on('error', error => {
+      this.replace(poolWorker, error);
+    });
+
+    worker.on('exit', code => {
+      if (code !== 0) {
+        this.replace(poolWorker, new Error(`Worker de PDF encerrado (${code})`));
+      }
+    });
+
+    return poolWorker;
+  }
+
+  private renderInline(ordem: OrdemServico): Promise<Buffer> {
+    return new PDFGenerator().generateOrdemServicoPDF(ordem);
+  }
+
+  // Substituir worker com falha e rejeitar apenas a tarefa que ele executava
+  // A recriação espera cada vez mais; estourado o limite de falhas na janela, o pool passa a
+  // renderizar no processo principal (ex.: worker que morre ao carregar em um build sem o bundle)
+  private replace(poolWorker: PoolWorker, error: Error): void {
+    const index = this.workers.indexOf(poolWorker);
+    if (index === -1) return;
+
+    this.workers.splice(index, 1);
+    clearTimeout(poolWorker.timer);
+    poolWorker.current?.reject(error);
+    poolWorker.current = null;
+
+    const { maxCrashes, windowMs, baseDelayMs, maxDelayMs } = this.respawnPolicy;
+    const now = Date.now();
+    this.crashes = this.crashes.filter(crashedAt => now - crashedAt < windowMs);
+    this.crashes.push(now);
+
+    if (this.crashes.length > maxCrashes) {
+      this.fallBackToInline(error);
+      return;
+    }
+
+    const delay = Math.min(maxDelayMs, baseDelayMs * 2 ** (this.crashes.length - 1));
+    const timer = setTimeout(() => this.respawn(), delay);
+    timer.unref?.();
+  }
+
+  // ⏱️ Renderização acima do tempo limite: rejeitar, encerrar o worker travado e pôr outro no
+  // lugar. Não conta como falha do worker: o fallback para o processo principal travaria o servidor
+  private timeOut(poolWorker: PoolWorker, task: PendingRender): void {
+    if (poolWorker.current !== task) return;
+
+    const index = this.workers.indexOf(poolWorker);
+    if (index === -1) return;
+
+    // Fora da lista antes do terminate: o 'exit' que vem depois não dispara um replace
+    this.workers.splice(index, 1);
+    poolWorker.current = null;
+    task.reject(new Error(`Renderização do PDF excedeu ${this.renderTimeoutMs}ms`));
+
+    void poolWorker.worker.terminate();
+    this.respawn();
+  }
+
+  private respawn(): void {
+    if (this.inline) return;
+
+    void Promise.resolve(this.spawn())
+      .then(replacement => {
+        if (this.inline) {
+          void replacement.worker.terminate();
+          return;
+        }
+        this.workers.push(replacement);
+        this.dispatch();
+      })
+      .catch(spawnError => {
+        console.error('Erro ao recriar worker de PDF:', spawnError);
+        this.fallBackToInline(spawnError);
+      });
+  }
+
+  // Desligar os workers e renderizar no processo principal (inclusive o que estava pendente)
+  private fallBackToInline(error: unknown): void {
+    if (this.inline) return;
+    this.inline = true;
+
+    console.error(
+      `Workers de PDF falharam ${this.crashes.length} vez(es) em ${this.respawnPolicy.windowMs}ms, ` +
+        'renderizando no processo principal:',
+      error
+    );
+
+    const orphaned = [
+      ...this.workers.flatMap(poolWorker => (poolWorker.current ? [poolWorker.current] : [])),
+      ...this.queue,
+    ];
+    this.workers.forEach(poolWorker => {
+      clearTimeout(poolWorker.timer);
+      poolWorker.current = null;
+    });
+    this.queue = [];
+    void this.destroy();
+
+    for (const task of orphaned) {
+      this.renderInline(task.ordem).then(task.resolve, task.reject);
+    }
+  }
+
+  private dispatch(): void {
+    for (const poolWorker of this.workers) {
+      if (this.queue.length === 0) return;
+      if (poolWorker.current) continue;
+
+      const task = this.queue.shift()!;
+      poolWorker.current = task;
+      poolWorker.worker.postMessage({
+        id: task.id,
+        ordem: task.ordem,
+      } satisfies PdfRenderRequest);
+
+      poolWorker.timer = setTimeout(() => this.timeOut(poolWorker, task), this.renderTimeoutMs);
+      poolWorker.timer.unref?.();
+    }
+  }
+
+  getStats(): { workers: number; busy: number; queued: number; inline: boolean } {
+    return {
+      workers: this.workers.length,
+      busy: this.workers.filter(poolWorker => poolWorker.current).length,
+      queued: this.queue.length,
+      inline: this.inline,
+    };
+  }
+
+  async destroy(): Promise<void> {
+    const { workers } = this;
+    this.workers = [];
+    await Promise.all(workers.map(poolWorker => poolWorker.worker.terminate()));
+  }
+}
+
+// 📦 Cache de PDFs prontos: a chave inclui o hash do payload renderizado, então qualquer edição
+// (da OS, do cliente ou das peças) invalida, mesmo sem updated_at atualizado
+export class PdfRenderService {
+  private cache: LruCache<string, Buffer>;
+  private inFlight = new Map<string, Promise<Buffer>>();
+
+  constructor(
+    private readonly pool: PdfWorkerPool,
+    cacheOptions: { maxEntries: number; maxBytes: number } = {
+      maxEntries: 500,
+      maxBytes: 64 * 1024 * 1024,
+    }
+  ) {
+    this.cache = new LruCache<string, Buffer>({
+      maxEntries: cacheOptions.maxEntries,
+      maxSize: cacheOptions.maxBytes,
+      sizeOf: pdf => pdf.byteLength,
+    });
+  }
+
+  static cacheKey(ordem: OrdemServico): string {
+    const hash = createHash('sha1').update(JSON.stringify(ordem)).digest('base64url');
+    return `${ordem.id}:${hash}`;
+  }
+
+  // cache: false evita que exportações em lote expulsem os PDFs mais acessados
+  async renderOrdemServico(
+    ordem: OrdemServico,
+    options: { cache?: boolean } = {}
+  ): Promise<Buffer> {
+    const key = PdfRenderService.cacheKey(ordem);
+    const useCache = options.cache ?? true;
+
+    const cached = this.cache.get(key);
+    if (cached) return cached;
+
+    // Downloads simultâneos da mesma versão compartilham a renderização
+    const pending = this.inFlight.get(key);
+    if (pending) return pending;
+
+    if (!useCache) {
+      return this.pool.render(ordem);
+    }
+
+    const render = this.pool
+      .render(ordem)
+      .then(pdf => {
+        // Versões anteriores da mesma OS não serão mais pedidas
+        this.cache.deleteWhere(
+          cachedKey => cachedKey.startsWith(`${ordem.id}:`) && cachedKey !== key
+        );
+        this.cache.set(key, pdf);
+        return pdf;
+      })
+      .finally(() => {
+        this.inFlight.delete(key);
+      });
+
+    this.inFlight.set(key, render);
+    return render;
+  }
+
+  getStats() {
+    return {
+      pool: this.pool.getStats(),
+      cache: this.cache.getStats(),
+    };
+  }
+}
+
+// 🌟 Instância global (sobrevive a hot reload em desenvolvimento)
+const DEFAULT_POOL_SIZE = Math.max(
+  1,
+  Math.min(
+    Number(process.env.PDF_WORKER_POOL_SIZE) || 2,
+    os.cpus().length
+  )
+);
+
+const globalForPdf = globalThis as unknown as {
+  pdfRenderService: PdfRenderService | undefined;
+};
+
+export const pdfRenderService =
+  globalForPdf.pdfRenderService ??
+  new PdfRenderService(
+    new PdfWorkerPool(DEFAULT_POOL_SIZE, async () => {
+      const { createPdfRenderWorker } = await import(
+        '@/lib/services/pdf-render-worker-factory'
+      );
+      return createPdfRenderWorker();
+    })
+  );
+
+if (process.env.NODE_ENV !== 'production') {
+  globalForPdf.pdfRenderService = pdfRenderService;
+}
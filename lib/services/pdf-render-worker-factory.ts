@@ -0,0 +1,8 @@
+// 🏭 Criação do worker de PDF
+// Isolado em módulo próprio: o bundler reconhece new Worker(new URL(..., import.meta.url))
+// e empacota o worker como entrada separada
+import { Worker } from 'worker_threads';
+
+export function createPdfRenderWorker(): Worker {
+  return new Worker(new URL('./pdf-render.worker.ts', import.meta.url));
+}
@@ -0,0 +1,35 @@
+// 🧵 PDF Render Worker - Renderização de PDFs fora do event loop principal
+// Recebe { id, ordem } e responde { id, pdf } (ArrayBuffer transferido) ou { id, error }
+import { parentPort } from 'worker_threads';
+
+import { PDFGenerator } from '@/lib/services/pdf-generator';
+import type { OrdemServico } from '@/types/ordens-servico';
+
+export interface PdfRenderRequest {
+  id: number;
+  ordem: OrdemServico;
+}
+
+export interface PdfRenderResponse {
+  id: number;
+  pdf?: ArrayBuffer;
+  error?: string;
+}
+
+parentPort?.on('message', async ({ id, ordem }: PdfRenderRequest) => {
+  try {
+    const buffer = await new PDFGenerator().generateOrdemServicoPDF(ordem);
+    // Copiar para um ArrayBuffer próprio e transferir sem cópia adicional
+    const pdf = buffer.buffer.slice(
+      buffer.byteOffset,
+      buffer.byteOffset + buffer.byteLength
+    ) as ArrayBuffer;
+
+    parentPort?.postMessage({ id, pdf } satisfies PdfRenderResponse, [pdf]);
+  } catch (error) {
+    parentPort?.postMessage({
+      id,
+      error: error instanceof Error ? error.message : 'Erro desconhecido',
+    } satisfies PdfRenderResponse);
+  }
+});
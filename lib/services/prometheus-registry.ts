@@ -0,0 +1,435 @@
+// 📡 Prometheus Registry - Contadores, Gauges e Histogramas em Memória
+// Instrumentação síncrona por requisição, exposta no formato texto do Prometheus
+import type { HostConnectionStats } from '@/lib/services/provider-http-client';
+
+export type MetricLabels = Record<string, string>;
+
+// Buckets padrão para durações em segundos
+export const DEFAULT_DURATION_BUCKETS = [
+  0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+];
+
+const LABEL_SEPARATOR = '\u0001';
+
+function escapeLabelValue(value: string): string {
+  return value
+    .replace(/\\/g, '\\\\')
+    .replace(/\n/g, '\\n')
+    .replace(/"/g, '\\"');
+}
+
+function formatValue(value: number): string {
+  if (value === Infinity) return '+Inf';
+  if (value === -Infinity) return '-Inf';
+  if (Number.isNaN(value)) return 'NaN';
+  return String(value);
+}
+
+abstract class RegisteredMetric<TSeries> {
+  protected series = new Map<string, TSeries>();
+
+  constructor(
+    readonly name: string,
+    readonly help: string,
+    readonly type: 'counter' | 'gauge' | 'histogram',
+    readonly labelNames: string[]
+  ) {}
+
+  protected key(labels: MetricLabels): string {
+    return this.labelNames
+      .map(labelName => labels[labelName] ?? '')
+      .join(LABEL_SEPARATOR);
+  }
+
+  protected formatLabels(key: string, extra?: [string, string]): string {
+    const values = key.split(LABEL_SEPARATOR);
+    const pairs = this.labelNames.map(
+      (labelName, index) =>
+        `${labelName}="${escapeLabelValue(values[index] ?? '')}"`
+    );
+
+    if (extra) {
+      pairs.push(`${extra[0]}="${escapeLabelValue(extra[1])}"`);
+    }
+
+    return pairs.length > 0 ? `{${pairs.join(',')}}` : '';
+  }
+
+  protected header(): string[] {
+    return [
+      `# HELP ${this.name} ${this.help.replace(/\n/g, ' ')}`,
+      `# TYPE ${this.name} ${this.type}`,
+    ];
+  }
+
+  reset(): void {
+    this.series.clear();
+  }
+
+  abstract render(): string[];
+}
+
+// ➕ Contador (apenas incrementa)
+export class Counter extends RegisteredMetric<{ value: number }> {
+  constructor(name: string, help: string, labelNames: string[] = []) {
+    super(name, help, 'counter', labelNames);
+  }
+
+  inc(labels: MetricLabels = {}, value: number = 1): void {
+    const key = this.key(labels);
+    const entry = this.series.get(key);
+
+    if (entry) {
+      entry.value += value;
+    } else {
+      this.series.set(key, { value });
+    }
+  }
+
+  get(labels: MetricLabels = {}): number {
+    return this.series.get(this.key(labels))?.value ?? 0;
+  }
+
+  render(): string[] {
+    const lines = this.header();
+    this.series.forEach((entry, key) => {
+      lines.push(`${this.name}${this.formatLabels(key)} ${formatValue(entry.value)}`);
+    });
+    return lines;
+  }
+}
+
+// 🎚️ Gauge (valor instantâneo)
+export class Gauge extends RegisteredMetric<{ value: number }> {
+  constructor(name: string, help: string, labelNames: string[] = []) {
+    super(name, help, 'gauge', labelNames);
+  }
+
+  set(labels: MetricLabels, value: number): void {
+    const key = this.key(labels);
+    const entry = this.series.get(key);
+
+    if (entry) {
+      entry.value = value;
+    } else {
+      this.series.set(key, { value });
+    }
+  }
+
+  inc(labels: MetricLabels = {}, value: number = 1): void {
+    this.set(labels, this.get(labels) + value);
+  }
+
+  dec(labels: MetricLabels = {}, value: number = 1): void {
+    this.set(labels, this.get(labels) - value);
+  }
+
+  get(labels: MetricLabels = {}): number {
+    return this.series.get(this.key(labels))?.value ?? 0;
+  }
+
+  render(): string[] {
+    const lines = this.header();
+    this.series.forEach((entry, key) => {
+      lines.push(`${this.name}${this.formatLabels(key)} ${formatValue(entry.value)}`);
+    });
+    return lines;
+  }
+}
+
+interface HistogramSeries {
+  buckets: number[];
+  sum: number;
+  count: number;
+}
+
+// 📊 Histograma com buckets fixos
+export class Histogram extends RegisteredMetric<HistogramSeries> {
+  readonly buckets: number[];
+
+  constructor(
+    name: string,
+    help: string,
+    labelNames: string[] = [],
+    buckets: number[] = DEFAULT_DURATION_BUCKETS
+  ) {
+    super(name, help, 'histogram', labelNames);
+    this.buckets = [...buckets].sort((a, b) => a - b);
+  }
+
+  observe(labels: MetricLabels, value: number): void {
+    const key = this.key(labels);
+    let entry = this.series.get(key);
+
+    if (!entry) {
+      entry = {
+        buckets: new Array(this.buckets.length).fill(0),
+        sum: 0,
+        count: 0,
+      };
+      this.series.set(key, entry);
+    }
+
+    // Contagem não cumulativa; a soma cumulativa é feita na exposição
+    const index = this.buckets.findIndex(bound => value <= bound);
+    if (index !== -1) {
+      entry.buckets[index]++;
+    }
+    entry.sum += value;
+    entry.count++;
+  }
+
+  render(): string[] {
+    const lines = this.header();
+
+    this.series.forEach((entry, key) => {
+      let cumulative = 0;
+      this.buckets.forEach((bound, index) => {
+        cumulative += entry.buckets[index];
+        lines.push(
+          `${this.name}_bucket${this.formatLabels(key, ['le', formatValue(bound)])} ${cumulative}`
+        );
+      });
+      lines.push(
+        `${this.name}_bucket${this.formatLabels(key, ['le', '+Inf'])} ${entry.count}`
+      );
+      lines.push(`${this.name}_sum${this.formatLabels(key)} ${formatValue(entry.sum)}`);
+      lines.push(`${this.name}_count${this.formatLabels(key)} ${entry.count}`);
+    });
+
+    return lines;
+  }
+}
+
+// 🗂️ Registro de Métricas
+export class MetricsRegistry {
+  private metrics = new Map<string, RegisteredMetric<any>>();
+
+  counter(name: string, help: string, labelNames: string[] = []): Counter {
+    return this.register(name, () => new Counter(name, help, labelNames));
+  }
+
+  gauge(name: string, help: string, labelNames: string[] = []): Gauge {
+    return this.register(name, () => new Gauge(name, help, labelNames));
+  }
+
+  histogram(
+    name: string,
+    help: string,
+    labelNames: string[] = [],
+    buckets: number[] = DEFAULT_DURATION_BUCKETS
+  ): Histogram {
+    return this.register(
+      name,
+      () => new Histogram(name, help, labelNames, buckets)
+    );
+  }
+
+  // Reutiliza a métrica existente (hot reload do Next.js reexecuta módulos)
+  private register<T extends RegisteredMetric<any>>(
+    name: string,
+    create: () => T
+  ): T {
+    const existing = this.metrics.get(name);
+    if (existing) return existing as T;
+
+    const metric = create();
+    this.metrics.set(name, metric);
+    return metric;
+  }
+
+  // 📝 Exposição no formato texto (version 0.0.4)
+  render(): string {
+    const lines: string[] = [];
+    this.metrics.forEach(metric => {
+      lines.push(...metric.render());
+    });
+    return `${lines.join('\n')}\n`;
+  }
+
+  reset(): void {
+    this.metrics.forEach(metric => metric.reset());
+  }
+}
+
+// 🧭 Normalizar caminho para evitar cardinalidade alta (ids viram :id)
+const UUID_SEGMENT =
+  /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i;
+const NUMERIC_SEGMENT = /^\d+$/;
+const TOKEN_SEGMENT = /^(?=.*\d)[A-Za-z0-9_-]{16,}$/;
+
+export function normalizeRoute(path: string): string {
+  return (
+    path
+      .split('/')
+      .map(segment =>
+        UUID_SEGMENT.test(segment) ||
+        NUMERIC_SEGMENT.test(segment) ||
+        TOKEN_SEGMENT.test(segment)
+          ? ':id'
+          : segment
+      )
+      .join('/') || '/'
+  );
+}
+
+// 🌟 Registro Global (sobrevive a hot reload em desenvolvimento)
+const globalForRegistry = globalThis as unknown as {
+  prometheusRegistry: MetricsRegistry | undefined;
+};
+
+export const prometheusRegistry =
+  globalForRegistry.prometheusRegistry ?? new MetricsRegistry();
+
+if (process.env.NODE_ENV !== 'production') {
+  globalForRegistry.prometheusRegistry = prometheusRegistry;
+}
+
+// 🌐 Métricas HTTP
+export const httpRequestsTotal = prometheusRegistry.counter(
+  'http_requests_total',
+  'Total de requisições HTTP processadas',
+  ['route', 'method', 'status']
+);
+
+export const httpRequestDuration = prometheusRegistry.histogram(
+  'http_request_duration_seconds',
+  'Duração das requisições HTTP em segundos',
+  ['route', 'method', 'status']
+);
+
+export const httpRequestsInFlight = prometheusRegistry.gauge(
+  'http_requests_in_flight',
+  'Requisições HTTP em andamento',
+  ['route', 'method']
+);
+
+// 📨 Métricas de Comunicação
+export const communicationOperationsTotal = prometheusRegistry.counter(
+  'communication_operations_total',
+  'Operações dos serviços de comunicação (email, sms, whatsapp)',
+  ['service', 'operation', 'success']
+);
+
+export const communicationOperationDuration = prometheusRegistry.histogram(
+  'communication_operation_duration_seconds',
+  'Duração das operações de comunicação em segundos',
+  ['service', 'operation']
+);
+
+// 🖥️ Métricas do Processo (atualizadas no momento da coleta)
+const processResidentMemory = prometheusRegistry.gauge(
+  'process_resident_memory_bytes',
+  'Memória residente do processo em bytes'
+);
+
+const processHeapUsed = prometheusRegistry.gauge(
+  'nodejs_heap_used_bytes',
+  'Heap do V8 em uso em bytes'
+);
+
+const processUptime = prometheusRegistry.gauge(
+  'process_uptime_seconds',
+  'Tempo de execução do processo em segundos'
+);
+
+export function collectProcessMetrics(): void {
+  const memory = process.memoryUsage();
+  processResidentMemory.set({}, memory.rss);
+  processHeapUsed.set({}, memory.heapUsed);
+  processUptime.set({}, process.uptime());
+}
+
+// 🔌 Pools de conexão com provedores (HTTP por host e SMTP), atualizados no momento da coleta
+export interface SmtpPoolStats {
+  configurado: boolean;
+  ocioso: boolean;
+  maxConnections: number;
+  enviados: number;
+  erros: number;
+}
+
+const providerHttpRequests = prometheusRegistry.gauge(
+  'provider_http_requests',
+  'Requisições feitas pelo cliente HTTP de provedores desde o último reset',
+  ['host']
+);
+
+const providerHttpErrors = prometheusRegistry.gauge(
+  'provider_http_errors',
+  'Requisições com erro (inclui timeouts) desde o último reset',
+  ['host']
+);
+
+const providerHttpTimeouts = prometheusRegistry.gauge(
+  'provider_http_timeouts',
+  'Requisições encerradas por timeout desde o último reset',
+  ['host']
+);
+
+const providerHttpConnectionsOpened = prometheusRegistry.gauge(
+  'provider_http_connections_opened',
+  'Conexões TCP/TLS abertas desde o último reset',
+  ['host']
+);
+
+const providerHttpInFlight = prometheusRegistry.gauge(
+  'provider_http_in_flight',
+  'Requisições em andamento (vagas ocupadas) por host',
+  ['host']
+);
+
+const providerHttpWaiting = prometheusRegistry.gauge(
+  'provider_http_waiting',
+  'Requisições aguardando vaga no limite de conexões do host',
+  ['host']
+);
+
+const providerHttpReuseRatio = prometheusRegistry.gauge(
+  'provider_http_connection_reuse_ratio',
+  'Fração das requisições que reaproveitaram conexão (0..1)',
+  ['host']
+);
+
+const smtpPoolConfigured = prometheusRegistry.gauge(
+  'smtp_pool_configured',
+  'Transporte SMTP configurado (1) ou não (0)'
+);
+
+const smtpPoolIdle = prometheusRegistry.gauge(
+  'smtp_pool_idle',
+  'Há conexão livre no pool SMTP (1) ou não (0)'
+);
+
+const smtpPoolMaxConnections = prometheusRegistry.gauge(
+  'smtp_pool_max_connections',
+  'Limite de conexões do pool SMTP'
+);
+
+const smtpPoolMessages = prometheusRegistry.gauge(
+  'smtp_pool_messages',
+  'Mensagens entregues pelo pool SMTP por resultado',
+  ['result']
+);
+
+export function collectConnectionPoolMetrics(
+  providerHosts: HostConnectionStats[],
+  smtp: SmtpPoolStats
+): void {
+  for (const stats of providerHosts) {
+    const labels = { host: stats.host };
+    providerHttpRequests.set(labels, stats.requests);
+    providerHttpErrors.set(labels, stats.errors);
+    providerHttpTimeouts.set(labels, stats.timeouts);
+    providerHttpConnectionsOpened.set(labels, stats.connectionsOpened);
+    providerHttpInFlight.set(labels, stats.inFlight);
+    providerHttpWaiting.set(labels, stats.waiting);
+    providerHttpReuseRatio.set(labels, stats.reuseRate);
+  }
+
+  smtpPoolConfigured.set({}, smtp.configurado ? 1 : 0);
+  smtpPoolIdle.set({}, smtp.ocioso ? 1 : 0);
+  smtpPoolMaxConnections.set({}, smtp.maxConnections);
+  smtpPoolMessages.set({ result: 'enviado' }, smtp.enviados);
+  smtpPoolMessages.set({ result: 'erro' }, smtp.erros);
+}
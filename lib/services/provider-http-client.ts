@@ -0,0 +1,228 @@
+// 🌐 Provider HTTP Client - Cliente HTTP compartilhado para WhatsApp, Twilio e demais provedores
+// O fetch nativo do Node já mantém um pool keep-alive por origem; este cliente limita as conexões
+// simultâneas por host, aplica timeout por requisição e mede o reuso de conexões a partir dos
+// diagnostics channels do undici embutido (conexões abertas x requisições feitas).
+// A vaga do host só é liberada quando o corpo da resposta termina (lido, cancelado ou com erro),
+// pois a conexão continua ocupada até lá; quem não lê o corpo deve chamar response.body?.cancel()
+import diagnosticsChannel from 'diagnostics_channel';
+
+export interface ProviderHttpClientOptions {
+  maxConnectionsPerHost: number;
+  timeoutMs: number;
+}
+
+export interface HostConnectionStats {
+  host: string;
+  requests: number;
+  errors: number;
+  timeouts: number;
+  inFlight: number;
+  peakInFlight: number;
+  waiting: number;
+  connectionsOpened: number;
+  reuseRate: number; // 0..1: fração das requisições que reaproveitaram conexão
+  avgLatencyMs: number;
+}
+
+interface HostState {
+  requests: number;
+  errors: number;
+  timeouts: number;
+  inFlight: number;
+  peakInFlight: number;
+  connectionsOpened: number;
+  totalLatencyMs: number;
+  waiters: Array<() => void>;
+}
+
+interface UndiciConnectedMessage {
+  connectParams?: { host?: string; hostname?: string; port?: string | number };
+}
+
+export class ProviderTimeoutError extends Error {
+  constructor(host: string, timeoutMs: number) {
+    super(`Timeout de ${timeoutMs}ms aguardando ${host}`);
+    this.name = 'ProviderTimeoutError';
+  }
+}
+
+export class ProviderHttpClient {
+  private hosts = new Map<string, HostState>();
+
+  constructor(private readonly options: ProviderHttpClientOptions) {
+    // Uma mensagem por conexão TCP/TLS nova aberta pelo fetch nativo
+    diagnosticsChannel.subscribe('undici:client:connected', message => {
+      const { connectParams } = message as UndiciConnectedMessage;
+      if (!connectParams) return;
+
+      const host =
+        connectParams.host ??
+        `${connectParams.hostname}${connectParams.port ? `:${connectParams.port}` : ''}`;
+      const state = this.hosts.get(host);
+      if (state) state.connectionsOpened++;
+    });
+  }
+
+  // 📤 fetch com limite de conexões por host e timeout
+  async fetch(
+    url: string,
+    init: RequestInit = {},
+    timeoutMs = this.options.timeoutMs
+  ): Promise<Response> {
+    const { host } = new URL(url);
+    const state = this.getHost(host);
+
+    await this.acquire(state);
+    const startTime = Date.now();
+
+    let released = false;
+    const release = () => {
+      if (released) return;
+      released = true;
+      this.release(state);
+    };
+
+    try {
+      const signal =
+        init.signal ??
+        (typeof AbortSignal.timeout === 'function' ? AbortSignal.timeout(timeoutMs) : undefined);
+
+      const response = await globalThis.fetch(url, { ...init, ...(signal && { signal }) });
+      return this.releaseWhenConsumed(response, release, startTime + timeoutMs);
+    } catch (error) {
+      release();
+      state.errors++;
+      if (error instanceof Error && error.name === 'TimeoutError') {
+        state.timeouts++;
+        throw new ProviderTimeoutError(host, timeoutMs);
+      }
+      throw error;
+    } finally {
+      state.requests++;
+      state.totalLatencyMs += Date.now() - startTime;
+    }
+  }
+
+  // Repassa o corpo e libera a vaga ao fim da leitura, no cancelamento ou no erro. O prazo da
+  // requisição também libera: depois dele o sinal de timeout já abortou a conexão
+  private releaseWhenConsumed(response: Response, release: () => void, deadline: number): Response {
+    if (!response.body) {
+      release();
+      return response;
+    }
+
+    const timer = setTimeout(release, Math.max(0, deadline - Date.now()));
+    timer.unref?.();
+    const done = () => {
+      clearTimeout(timer);
+      release();
+    };
+
+    const reader = response.body.getReader();
+    const body = new ReadableStream<Uint8Array>({
+      async pull(controller) {
+        try {
+          const { done: finished, value } = await reader.read();
+          if (finished) {
+            done();
+            controller.close();
+            return;
+          }
+          controller.enqueue(value);
+        } catch (error) {
+          done();
+          controller.error(error);
+        }
+      },
+      cancel(reason) {
+        done();
+        return reader.cancel(reason);
+      },
+    });
+
+    return new Response(body, {
+      status: response.status,
+      statusText: response.statusText,
+      headers: response.headers,
+    });
+  }
+
+  private getHost(host: string): HostState {
+    let state = this.hosts.get(host);
+    if (!state) {
+      state = {
+        requests: 0,
+        errors: 0,
+        timeouts: 0,
+        inFlight: 0,
+        peakInFlight: 0,
+        connectionsOpened: 0,
+        totalLatencyMs: 0,
+        waiters: [],
+      };
+      this.hosts.set(host, state);
+    }
+    return state;
+  }
+
+  // Requisições além do limite esperam uma vaga: o fetch abre no máximo uma conexão por requisição
+  // simultânea (com corpo ainda aberto), então o limite de requisições é o limite de conexões do pool
+  private async acquire(state: HostState): Promise<void> {
+    if (state.inFlight >= this.options.maxConnectionsPerHost) {
+      await new Promise<void>(resolve => state.waiters.push(resolve));
+    }
+    state.inFlight++;
+    state.peakInFlight = Math.max(state.peakInFlight, state.inFlight);
+  }
+
+  private release(state: HostState): void {
+    state.inFlight--;
+    state.waiters.shift()?.();
+  }
+
+  // 📊 Reuso de conexões por host
+  getStats(): HostConnectionStats[] {
+    return Array.from(this.hosts.entries()).map(([host, state]) => ({
+      host,
+      requests: state.requests,
+      errors: state.errors,
+      timeouts: state.timeouts,
+      inFlight: state.inFlight,
+      peakInFlight: state.peakInFlight,
+      waiting: state.waiters.length,
+      connectionsOpened: state.connectionsOpened,
+      reuseRate:
+        state.requests > 0
+          ? Math.max(0, 1 - state.connectionsOpened / state.requests)
+          : 0,
+      avgLatencyMs: state.requests > 0 ? state.totalLatencyMs / state.requests : 0,
+    }));
+  }
+
+  resetStats(): void {
+    this.hosts.forEach(state => {
+      state.requests = 0;
+      state.errors = 0;
+      state.timeouts = 0;
+      state.peakInFlight = state.inFlight;
+      state.connectionsOpened = 0;
+      state.totalLatencyMs = 0;
+    });
+  }
+}
+
+// 🌟 Instância global (sobrevive a hot reload em desenvolvimento)
+const globalForProviderHttp = globalThis as unknown as {
+  providerHttpClient: ProviderHttpClient | undefined;
+};
+
+export const providerHttpClient =
+  globalForProviderHttp.providerHttpClient ??
+  new ProviderHttpClient({
+    maxConnectionsPerHost: Math.max(1, Number(process.env.PROVIDER_HTTP_MAX_CONNECTIONS) || 10),
+    timeoutMs: Number(process.env.PROVIDER_HTTP_TIMEOUT_MS) || 10000,
+  });
+
+if (process.env.NODE_ENV !== 'production') {
+  globalForProviderHttp.providerHttpClient = providerHttpClient;
+}
@@ -0,0 +1,498 @@
+// 📤 Report Export - Exportação de relatórios em streaming (JSON, CSV, NDJSON)
+// Percorre as tabelas com cursor keyset (created_at, id) e codifica página a página em um ReadableStream;
+// cada página só é lida quando o cliente consome a anterior, então o heap não cresce com o tamanho do relatório
+import type { Prisma } from '@prisma/client';
+
+import prisma from '@/lib/prisma';
+
+export type ReportFormato = 'json' | 'csv' | 'ndjson';
+
+export interface ReportExportFilter {
+  dataInicio: Date;
+  status?: string;
+  tecnicoId?: string;
+}
+
+interface KeysetCursor {
+  createdAt: Date;
+  id: string;
+}
+
+interface ExportColumn<Row> {
+  key: string;
+  header: string;
+  value: (_row: Row) => unknown;
+}
+
+interface ExportDataset<Row extends KeysetCursor> {
+  columns: ExportColumn<Row>[];
+  fetchPage: (
+    _after: KeysetCursor | null,
+    _take: number,
+    _filter: ReportExportFilter
+  ) => Promise<Row[]>;
+}
+
+// Seção do relatório: caminho dentro de `data` (vazio = `data` é a própria lista)
+export interface ReportSection {
+  path: string[];
+  dataset: ExportDatasetName;
+}
+
+export interface ReportExportPlan {
+  sections: ReportSection[];
+  formato: ReportFormato;
+  filter: ReportExportFilter;
+  // Campos de topo do documento JSON (success, metadata, ...)
+  envelope?: Record<string, unknown>;
+  pageSize?: number;
+}
+
+const DEFAULT_PAGE_SIZE = 1000;
+
+// 🔑 Próxima página: (created_at, id) estritamente maior que o último registro enviado
+function keysetWhere(after: KeysetCursor | null) {
+  return after
+    ? {
+        OR: [
+          { createdAt: { gt: after.createdAt } },
+          { createdAt: after.createdAt, id: { gt: after.id } },
+        ],
+      }
+    : {};
+}
+
+const KEYSET_ORDER = [{ createdAt: 'asc' as const }, { id: 'asc' as const }];
+
+function ordensWhere(
+  after: KeysetCursor | null,
+  filter: ReportExportFilter
+): Prisma.OrdemServicoWhereInput {
+  return {
+    AND: [
+      { createdAt: { gte: filter.dataInicio } },
+      ...(filter.status ? [{ status: filter.status }] : []),
+      ...(filter.tecnicoId ? [{ tecnicoId: filter.tecnicoId }] : []),
+      keysetWhere(after),
+    ],
+  };
+}
+
+const toNumber = (value: unknown) => Number(value ?? 0);
+const toIso = (value: Date | null) => value?.toISOString() ?? null;
+
+const clientesDataset: ExportDataset<
+  Prisma.ClienteGetPayload<{
+    select: {
+      id: true;
+      numeroCliente: true;
+      nome: true;
+      email: true;
+      telefone: true;
+      cpfCnpj: true;
+      cidade: true;
+      estado: true;
+      createdAt: true;
+    };
+  }>
+> = {
+  columns: [
+    { key: 'id', header: 'ID', value: row => row.id },
+    { key: 'numero_cliente', header: 'Número Cliente', value: row => row.numeroCliente },
+    { key: 'nome', header: 'Nome', value: row => row.nome },
+    { key: 'email', header: 'Email', value: row => row.email },
+    { key: 'telefone', header: 'Telefone', value: row => row.telefone },
+    { key: 'cpf_cnpj', header: 'CPF/CNPJ', value: row => row.cpfCnpj },
+    { key: 'cidade', header: 'Cidade', value: row => row.cidade },
+    { key: 'estado', header: 'Estado', value: row => row.estado },
+    { key: 'created_at', header: 'Data Criação', value: row => toIso(row.createdAt) },
+  ],
+  fetchPage: (after, take, filter) =>
+    prisma.cliente.findMany({
+      where: {
+        AND: [{ createdAt: { gte: filter.dataInicio } }, keysetWhere(after)],
+      },
+      select: {
+        id: true,
+        numeroCliente: true,
+        nome: true,
+        email: true,
+        telefone: true,
+        cpfCnpj: true,
+        cidade: true,
+        estado: true,
+        createdAt: true,
+      },
+      orderBy: KEYSET_ORDER,
+      take,
+    }),
+};
+
+const ordensDataset: ExportDataset<
+  Prisma.OrdemServicoGetPayload<{
+    select: {
+      id: true;
+      numeroOs: true;
+      status: true;
+      prioridade: true;
+      titulo: true;
+      valorTotal: true;
+      clienteId: true;
+      tecnicoId: true;
+      createdAt: true;
+    };
+  }>
+> = {
+  // As cinco primeiras colunas mantêm o layout do CSV anterior
+  columns: [
+    { key: 'id', header: 'ID', value: row => row.id },
+    { key: 'status', header: 'Status', value: row => row.status },
+    { key: 'valor_total', header: 'Valor Total', value: row => toNumber(row.valorTotal) },
+    { key: 'created_at', header: 'Data Criação', value: row => toIso(row.createdAt) },
+    { key: 'cliente_id', header: 'Cliente ID', value: row => row.clienteId },
+    { key: 'numero_os', header: 'Número OS', value: row => row.numeroOs },
+    { key: 'titulo', header: 'Título', value: row => row.titulo },
+    { key: 'prioridade', header: 'Prioridade', value: row => row.prioridade },
+    { key: 'tecnico_id', header: 'Técnico ID', value: row => row.tecnicoId },
+  ],
+  fetchPage: (after, take, filter) =>
+    prisma.ordemServico.findMany({
+      where: ordensWhere(after, filter),
+      select: {
+        id: true,
+        numeroOs: true,
+        status: true,
+        prioridade: true,
+        titulo: true,
+        valorTotal: true,
+        clienteId: true,
+        tecnicoId: true,
+        createdAt: true,
+      },
+      orderBy: KEYSET_ORDER,
+      take,
+    }),
+};
+
+const ordensFinanceiroDataset: ExportDataset<
+  Prisma.OrdemServicoGetPayload<{
+    select: { id: true; valorTotal: true; status: true; createdAt: true; clienteId: true };
+  }>
+> = {
+  columns: [
+    { key: 'id', header: 'ID', value: row => row.id },
+    { key: 'valor_total', header: 'Valor Total', value: row => toNumber(row.valorTotal) },
+    { key: 'status', header: 'Status', value: row => row.status },
+    { key: 'created_at', header: 'Data Criação', value: row => toIso(row.createdAt) },
+    { key: 'cliente_id', header: 'Cliente ID', value: row => row.clienteId },
+  ],
+  fetchPage: (after, take, filter) =>
+    prisma.ordemServico.findMany({
+      where: ordensWhere(after, filter),
+      select: { id: true, valorTotal: true, status: true, createdAt: true, clienteId: true },
+      orderBy: KEYSET_ORDER,
+      take,
+    }),
+};
+
+const ordensTecnicoDataset: ExportDataset<
+  Prisma.OrdemServicoGetPayload<{
+    select: {
+      id: true;
+      status: true;
+      titulo: true;
+      tecnicoId: true;
+      createdAt: true;
+      updatedAt: true;
+    };
+  }>
+> = {
+  columns: [
+    { key: 'id', header: 'ID', value: row => row.id },
+    { key: 'status', header: 'Status', value: row => row.status },
+    { key: 'tipo_servico', header: 'Tipo Serviço', value: row => row.titulo },
+    { key: 'tecnico_id', header: 'Técnico ID', value: row => row.tecnicoId },
+    { key: 'created_at', header: 'Data Criação', value: row => toIso(row.createdAt) },
+    { key: 'updated_at', header: 'Data Atualização', value: row => toIso(row.updatedAt) },
+  ],
+  fetchPage: (after, take, filter) =>
+    prisma.ordemServico.findMany({
+      where: ordensWhere(after, filter),
+      select: {
+        id: true,
+        status: true,
+        titulo: true,
+        tecnicoId: true,
+        createdAt: true,
+        updatedAt: true,
+      },
+      orderBy: KEYSET_ORDER,
+      take,
+    }),
+};
+
+const equipamentosDataset: ExportDataset<
+  Prisma.EquipamentoGetPayload<{
+    select: {
+      id: true;
+      clienteId: true;
+      tipo: true;
+      marca: true;
+      modelo: true;
+      numeroSerie: true;
+      createdAt: true;
+    };
+  }>
+> = {
+  columns: [
+    { key: 'id', header: 'ID', value: row => row.id },
+    { key: 'cliente_id', header: 'Cliente ID', value: row => row.clienteId },
+    { key: 'tipo', header: 'Tipo', value: row => row.tipo },
+    { key: 'marca', header: 'Marca', value: row => row.marca },
+    { key: 'modelo', header: 'Modelo', value: row => row.modelo },
+    { key: 'numero_serie', header: 'Número de Série', value: row => row.numeroSerie },
+    { key: 'created_at', header: 'Data Criação', value: row => toIso(row.createdAt) },
+  ],
+  // Inventário completo (sem filtro de período), mas ainda paginado
+  fetchPage: (after, take) =>
+    prisma.equipamento.findMany({
+      where: keysetWhere(after),
+      select: {
+        id: true,
+        clienteId: true,
+        tipo: true,
+        marca: true,
+        modelo: true,
+        numeroSerie: true,
+        createdAt: true,
+      },
+      orderBy: KEYSET_ORDER,
+      take,
+    }),
+};
+
+export const EXPORT_DATASETS = {
+  clientes: clientesDataset,
+  ordens_servico: ordensDataset,
+  ordens_financeiro: ordensFinanceiroDataset,
+  ordens_tecnico: ordensTecnicoDataset,
+  equipamentos: equipamentosDataset,
+} as const;
+
+export type ExportDatasetName = keyof typeof EXPORT_DATASETS;
+
+// 📚 Seções de cada tipo de relatório (mesma estrutura de `data` do JSON anterior)
+const REPORT_SECTIONS: Record<'basic' | 'financial' | 'technical', ReportSection[]> = {
+  basic: [
+    { path: ['basic', 'clientes'], dataset: 'clientes' },
+    { path: ['basic', 'ordens_servico'], dataset: 'ordens_servico' },
+  ],
+  financial: [{ path: ['financial'], dataset: 'ordens_financeiro' }],
+  technical: [
+    { path: ['technical', 'ordens'], dataset: 'ordens_tecnico' },
+    { path: ['technical', 'equipamentos'], dataset: 'equipamentos' },
+  ],
+};
+
+export function getReportSections(tipo: string): ReportSection[] {
+  if (tipo === 'all') {
+    return [
+      ...REPORT_SECTIONS.basic,
+      ...REPORT_SECTIONS.financial,
+      ...REPORT_SECTIONS.technical,
+    ];
+  }
+  return REPORT_SECTIONS[tipo as keyof typeof REPORT_SECTIONS] ?? [];
+}
+
+// 🧾 Codificação CSV (RFC 4180)
+export function escapeCsvValue(value: unknown): string {
+  if (value === null || value === undefined) return '';
+
+  let text = value instanceof Date ? value.toISOString() : String(value);
+  // Evitar que planilhas interpretem o texto como fórmula
+  if (typeof value === 'string' && /^[=+\-@\t\r]/.test(text)) {
+    text = `'${text}`;
+  }
+
+  return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+}
+
+export function encodeCsvRow(values: unknown[]): string {
+  return `${values.map(escapeCsvValue).join(',')}\r\n`;
+}
+
+function toRecord<Row extends KeysetCursor>(
+  dataset: ExportDataset<Row>,
+  row: Row
+): Record<string, unknown> {
+  const record: Record<string, unknown> = {};
+  for (const column of dataset.columns) {
+    record[column.key] = column.value(row);
+  }
+  return record;
+}
+
+// 🏗️ Estrutura do JSON: abre/fecha os objetos intermediários de cada seção
+class JsonLayout {
+  private openKeys: string[] = [];
+  private hasEntries: boolean[] = [];
+
+  constructor(private readonly rootIsList: boolean) {}
+
+  start(envelope: Record<string, unknown>): string {
+    const fields = Object.entries(envelope).map(
+      ([key, value]) => `${JSON.stringify(key)}:${JSON.stringify(value)}`
+    );
+    const prefix = `{${fields.join(',')}${fields.length ? ',' : ''}"data":`;
+
+    if (this.rootIsList) return `${prefix}[`;
+    this.hasEntries.push(false);
+    return `${prefix}{`;
+  }
+
+  openSection(path: string[]): string {
+    if (this.rootIsList) return '';
+
+    const parents = path.slice(0, -1);
+    let common = 0;
+    while (
+      common < this.openKeys.length &&
+      common < parents.length &&
+      this.openKeys[common] === parents[common]
+    ) {
+      common++;
+    }
+
+    let out = '';
+    while (this.openKeys.length > common) out += this.closeObject();
+    for (const key of parents.slice(common)) {
+      out += `${this.key(key)}{`;
+      this.openKeys.push(key);
+      this.hasEntries.push(false);
+    }
+
+    return `${out}${this.key(path[path.length - 1])}[`;
+  }
+
+  closeSection(): string {
+    return this.rootIsList ? '' : ']';
+  }
+
+  end(): string {
+    if (this.rootIsList) return ']}';
+
+    let out = '';
+    while (this.openKeys.length > 0) out += this.closeObject();
+    return `${out}}}`;
+  }
+
+  private key(key: string): string {
+    const depth = this.hasEntries.length - 1;
+    const comma = this.hasEntries[depth] ? ',' : '';
+    this.hasEntries[depth] = true;
+    return `${comma}${JSON.stringify(key)}:`;
+  }
+
+  private closeObject(): string {
+    this.openKeys.pop();
+    this.hasEntries.pop();
+    return '}';
+  }
+}
+
+// 🌊 Stream do relatório: uma página por pull (backpressure do próprio ReadableStream)
+export function createReportExportStream(
+  plan: ReportExportPlan
+): ReadableStream<Uint8Array> {
+  const encoder = new TextEncoder();
+  const pageSize = plan.pageSize ?? DEFAULT_PAGE_SIZE;
+  const rootIsList = plan.sections.length === 1 && plan.sections[0].path.length === 0;
+  const layout = new JsonLayout(rootIsList);
+
+  let sectionIndex = -1;
+  let cursor: KeysetCursor | null = null;
+  let rowsInSection = 0;
+  let started = false;
+
+  const nextSection = (): string => {
+    let out = '';
+    if (sectionIndex >= 0 && plan.formato === 'json') out += layout.closeSection();
+
+    sectionIndex++;
+    cursor = null;
+    rowsInSection = 0;
+
+    const section = plan.sections[sectionIndex];
+    if (!section) return out;
+
+    if (plan.formato === 'json') out += layout.openSection(section.path);
+    if (plan.formato === 'csv') {
+      out += encodeCsvRow(EXPORT_DATASETS[section.dataset].columns.map(c => c.header));
+    }
+    return out;
+  };
+
+  const encodeRows = (section: ReportSection, rows: KeysetCursor[]): string => {
+    const dataset = EXPORT_DATASETS[section.dataset] as unknown as ExportDataset<KeysetCursor>;
+
+    switch (plan.formato) {
+      case 'csv':
+        return rows
+          .map(row => encodeCsvRow(dataset.columns.map(column => column.value(row))))
+          .join('');
+      case 'ndjson': {
+        const secao = section.path.join('.') || section.dataset;
+        return rows
+          .map(row => `${JSON.stringify({ _secao: secao, ...toRecord(dataset, row) })}\n`)
+          .join('');
+      }
+      default: {
+        const json = rows.map(row => JSON.stringify(toRecord(dataset, row))).join(',');
+        return rowsInSection > 0 && json ? `,${json}` : json;
+      }
+    }
+  };
+
+  return new ReadableStream<Uint8Array>({
+    async pull(controller) {
+      try {
+        let out = '';
+
+        if (!started) {
+          started = true;
+          // BOM para planilhas reconhecerem UTF-8 (acentos nos cabeçalhos)
+          if (plan.formato === 'csv') out += '\uFEFF';
+          if (plan.formato === 'json') out += layout.start(plan.envelope ?? {});
+          out += nextSection();
+        }
+
+        const section = plan.sections[sectionIndex];
+        if (!section) {
+          if (plan.formato === 'json') out += layout.end();
+          if (out) controller.enqueue(encoder.encode(out));
+          controller.close();
+          return;
+        }
+
+        const dataset = EXPORT_DATASETS[section.dataset] as unknown as ExportDataset<KeysetCursor>;
+        const rows = await dataset.fetchPage(cursor, pageSize, plan.filter);
+
+        out += encodeRows(section, rows);
+        rowsInSection += rows.length;
+
+        if (rows.length < pageSize) {
+          out += nextSection();
+        } else {
+          const last = rows[rows.length - 1];
+          cursor = { createdAt: last.createdAt, id: last.id };
+        }
+
+        controller.enqueue(encoder.encode(out));
+      } catch (error) {
+        console.error('Erro ao gerar página da exportação:', error);
+        controller.error(error);
+      }
+    },
+  });
+}
@@ -0,0 +1,352 @@
+// 📊 Report Generators - Cálculo dos relatórios financeiro, técnico e do dashboard
+// Agregações feitas no banco (groupBy / SQL) em vez de carregar as linhas; usados pela fila de jobs
+import { createHash, randomUUID } from 'crypto';
+
+import prisma from '@/lib/prisma';
+
+export type ReportTipo = 'financial' | 'technical' | 'dashboard';
+
+export interface ReportParams {
+  periodoDias: number;
+  // Dia de referência (YYYY-MM-DD): fixa a janela para que resultados possam ser reutilizados
+  referenceDate: string;
+  charts?: boolean;
+  trends?: boolean;
+}
+
+export type ReportProgress = (_percent: number) => Promise<void>;
+
+type ReportGenerator = (
+  _params: ReportParams,
+  _onProgress: ReportProgress
+) => Promise<Record<string, unknown>>;
+
+const DAY_IN_MS = 24 * 60 * 60 * 1000;
+const STATUS_FINALIZADAS = ['concluida', 'entregue'];
+const STATUS_ABERTAS = ['aberta', 'em_andamento', 'aguardando_peca'];
+
+export const REPORT_TIPOS: ReportTipo[] = ['financial', 'technical', 'dashboard'];
+
+export const REPORT_PERMISSIONS: Record<ReportTipo, string> = {
+  financial: 'relatorios.view_financial',
+  technical: 'relatorios.view_technical',
+  dashboard: 'relatorios.view_basic',
+};
+
+export function createReportParams(
+  periodoDias: number,
+  extra: Pick<ReportParams, 'charts' | 'trends'> = {}
+): ReportParams {
+  return {
+    periodoDias,
+    referenceDate: new Date().toISOString().split('T')[0],
+    ...extra,
+  };
+}
+
+function getDataInicio(params: ReportParams): Date {
+  return new Date(
+    new Date(`${params.referenceDate}T00:00:00.000Z`).getTime() -
+      params.periodoDias * DAY_IN_MS
+  );
+}
+
+function countBy<T extends { _count: { _all: number } }>(
+  rows: T[],
+  key: (_row: T) => string | null
+): Record<string, number> {
+  return rows.reduce<Record<string, number>>((acc, row) => {
+    const name = key(row) ?? 'Não especificado';
+    acc[name] = (acc[name] || 0) + row._count._all;
+    return acc;
+  }, {});
+}
+
+// 🔖 Versão dos dados de origem: contador de escritas por tabela mantido por trigger
+// (migrations/create_relatorios_versao_dados.sql), que vê qualquer INSERT/UPDATE/DELETE
+type SourceTable = 'ordens_servico' | 'clientes' | 'equipamentos' | 'status_historico';
+
+const SOURCE_TABLES: Record<ReportTipo, SourceTable[]> = {
+  financial: ['ordens_servico'],
+  // status_historico: tempo de conclusão pela data em que a OS passou a concluída
+  technical: ['ordens_servico', 'equipamentos', 'status_historico'],
+  dashboard: ['ordens_servico', 'clientes', 'equipamentos'],
+};
+
+let warnedUninitialized = false;
+
+export async function computeDataVersion(tipo: ReportTipo): Promise<string> {
+  const tabelas = SOURCE_TABLES[tipo];
+  const versoes = await prisma.relatorioVersaoDados.groupBy({
+    by: ['tabela'],
+    where: { tabela: { in: tabelas } },
+    _sum: { versao: true },
+  });
+
+  const porTabela = new Map(versoes.map(row => [row.tabela, row._sum.versao ?? BigInt(0)]));
+  // Sem as linhas da migração (ex.: `prisma db push`) o trigger não existe e a versão
+  // nunca mudaria: gera uma versão única para que nenhum resultado seja reaproveitado
+  const ausentes = tabelas.filter(tabela => !porTabela.has(tabela));
+  if (ausentes.length > 0) {
+    if (!warnedUninitialized) {
+      warnedUninitialized = true;
+      console.warn(
+        `Versão dos dados não inicializada para ${ausentes.join(', ')}; relatórios não serão ` +
+          'reaproveitados até aplicar migrations/create_relatorios_versao_dados.sql'
+      );
+    }
+    return `sem-versao:${randomUUID()}`;
+  }
+
+  const fingerprint = tabelas.map(tabela => `${tabela}:${porTabela.get(tabela)}`).join('|');
+
+  return createHash('sha256').update(fingerprint).digest('hex');
+}
+
+// 💰 Relatório financeiro
+const generateFinancial: ReportGenerator = async (params, onProgress) => {
+  const dataInicio = getDataInicio(params);
+  const periodo = { createdAt: { gte: dataInicio } };
+
+  const [porStatus, receita] = await Promise.all([
+    prisma.ordemServico.groupBy({
+      by: ['status'],
+      where: periodo,
+      _count: { _all: true },
+    }),
+    prisma.ordemServico.aggregate({
+      where: { ...periodo, status: { in: STATUS_FINALIZADAS } },
+      _sum: { valorTotal: true },
+      _count: { _all: true },
+    }),
+  ]);
+  await onProgress(50);
+
+  const receitaPorMes = await prisma.$queryRaw<Array<{ mes: string; total: number }>>`
+    SELECT to_char(date_trunc('month', created_at), 'YYYY-MM') AS mes,
+           COALESCE(SUM(valor_total), 0)::float8 AS total
+    FROM ordens_servico
+    WHERE created_at >= ${dataInicio} AND status = ANY(${STATUS_FINALIZADAS})
+    GROUP BY 1
+    ORDER BY 1
+  `;
+  await onProgress(90);
+
+  const receitaTotal = Number(receita._sum.valorTotal ?? 0);
+  const ordensFinalizadas = receita._count._all;
+
+  return {
+    resumo: {
+      receita_total: receitaTotal,
+      ordens_finalizadas: ordensFinalizadas,
+      ticket_medio: ordensFinalizadas > 0 ? receitaTotal / ordensFinalizadas : 0,
+      periodo_dias: params.periodoDias,
+    },
+    receita_por_mes: Object.fromEntries(receitaPorMes.map(row => [row.mes, row.total])),
+    ordens_por_status: countBy(porStatus, row => row.status),
+    metadata: {
+      periodo_dias: params.periodoDias,
+      data_inicio: dataInicio.toISOString(),
+      data_fim: new Date().toISOString(),
+      tipo_relatorio: 'financial',
+      gerado_em: new Date().toISOString(),
+    },
+  };
+};
+
+// 🔧 Relatório técnico
+const generateTechnical: ReportGenerator = async (params, onProgress) => {
+  const dataInicio = getDataInicio(params);
+  const periodo = { createdAt: { gte: dataInicio } };
+
+  const [porStatus, porTipo, porTecnico] = await Promise.all([
+    prisma.ordemServico.groupBy({ by: ['status'], where: periodo, _count: { _all: true } }),
+    prisma.ordemServico.groupBy({ by: ['titulo'], where: periodo, _count: { _all: true } }),
+    prisma.ordemServico.groupBy({ by: ['tecnicoId'], where: periodo, _count: { _all: true } }),
+  ]);
+  await onProgress(40);
+
+  // Conclusão = data_conclusao ou primeira entrada em status finalizado no histórico;
+  // updated_at só como último recurso (muda em qualquer edição posterior)
+  const [resolucao] = await prisma.$queryRaw<Array<{ dias: number; finalizadas: number }>>`
+    SELECT COALESCE(AVG(EXTRACT(EPOCH FROM (
+             COALESCE(o.data_conclusao, h.finalizada_em, o.updated_at) - o.created_at
+           )) / 86400), 0)::float8 AS dias,
+           COUNT(*)::int AS finalizadas
+    FROM ordens_servico o
+    LEFT JOIN LATERAL (
+      SELECT MIN(sh.data_mudanca) AS finalizada_em
+      FROM status_historico sh
+      WHERE sh.ordem_servico_id = o.id AND sh.status_novo = ANY(${STATUS_FINALIZADAS})
+    ) h ON true
+    WHERE o.created_at >= ${dataInicio} AND o.status = ANY(${STATUS_FINALIZADAS})
+  `;
+  await onProgress(70);
+
+  const equipamentosPorTipo = await prisma.equipamento.groupBy({
+    by: ['tipo'],
+    _count: { _all: true },
+  });
+  await onProgress(90);
+
+  const ordensPorStatus = countBy(porStatus, row => row.status);
+  const totalOrdens = Object.values(ordensPorStatus).reduce((acc, count) => acc + count, 0);
+  const finalizadas = resolucao?.finalizadas ?? 0;
+
+  return {
+    performance: {
+      tempo_medio_resolucao_dias: Math.round((resolucao?.dias ?? 0) * 100) / 100,
+      ordens_finalizadas: finalizadas,
+      taxa_finalizacao: totalOrdens ? (finalizadas / totalOrdens) * 100 : 0,
+    },
+    servicos_por_tipo: countBy(porTipo, row => row.titulo),
+    ordens_por_tecnico: countBy(porTecnico, row => row.tecnicoId ?? 'Não atribuído'),
+    equipamentos_por_tipo: countBy(equipamentosPorTipo, row => row.tipo),
+    ordens_por_status: ordensPorStatus,
+    metadata: {
+      periodo_dias: params.periodoDias,
+      data_inicio: dataInicio.toISOString(),
+      data_fim: new Date().toISOString(),
+      tipo_relatorio: 'technical',
+      gerado_em: new Date().toISOString(),
+    },
+  };
+};
+
+function calculateGrowth(current: number, previous: number): number {
+  if (previous === 0) return current > 0 ? 100 : 0;
+  return Math.round(((current - previous) / previous) * 100);
+}
+
+// 📈 Relatório consolidado do dashboard
+const generateDashboard: ReportGenerator = async (params, onProgress) => {
+  const now = new Date();
+  const dataInicio = getDataInicio(params);
+  const periodoAnterior = new Date(dataInicio.getTime() - params.periodoDias * DAY_IN_MS);
+
+  const [
+    totalClientes,
+    clientesNovos,
+    clientesAnteriores,
+    totalOrdens,
+    ordensAbertas,
+    ordensFinalizadas,
+    faturamento,
+  ] = await Promise.all([
+    prisma.cliente.count(),
+    prisma.cliente.count({ where: { createdAt: { gte: dataInicio } } }),
+    prisma.cliente.count({
+      where: { createdAt: { gte: periodoAnterior, lt: dataInicio } },
+    }),
+    prisma.ordemServico.count(),
+    prisma.ordemServico.count({ where: { status: { in: STATUS_ABERTAS } } }),
+    prisma.ordemServico.count({ where: { status: 'concluida' } }),
+    prisma.ordemServico.aggregate({
+      where: { status: 'concluida', createdAt: { gte: dataInicio } },
+      _sum: { valorServico: true },
+    }),
+  ]);
+  await onProgress(40);
+
+  const crescimentoClientes = calculateGrowth(clientesNovos, clientesAnteriores);
+  const summary = {
+    totalClientes,
+    totalOrdens,
+    ordensAbertas,
+    ordensFinalizadas,
+    faturamentoMes: Number(faturamento._sum.valorServico ?? 0),
+    crescimentoClientes,
+  };
+
+  let charts = {};
+  if (params.charts !== false) {
+    const [porStatus, equipamentos, clientes] = await Promise.all([
+      prisma.ordemServico.groupBy({ by: ['status'], _count: { _all: true } }),
+      prisma.equipamento.groupBy({ by: ['tipo'], _count: { _all: true } }),
+      prisma.cliente.groupBy({ by: ['tipoPessoa'], _count: { _all: true } }),
+    ]);
+    const totalChart = porStatus.reduce((acc, row) => acc + row._count._all, 0);
+
+    charts = {
+      ordensStatus: porStatus.map(row => ({
+        status: row.status,
+        count: row._count._all,
+        percentage: totalChart > 0 ? Math.round((row._count._all / totalChart) * 100) : 0,
+      })),
+      equipamentosPorTipo: equipamentos.map(row => ({
+        tipo: row.tipo,
+        count: row._count._all,
+      })),
+      clientesPorTipo: clientes.map(row => ({
+        tipo: row.tipoPessoa || 'Não especificado',
+        count: row._count._all,
+      })),
+      faturamentoPorMes: [],
+    };
+  }
+  await onProgress(70);
+
+  let trends = {};
+  if (params.trends !== false) {
+    const ultimos7Dias = Array.from({ length: 7 }, (_, i) =>
+      new Date(now.getTime() - (6 - i) * DAY_IN_MS).toISOString().split('T')[0]
+    );
+
+    // Uma consulta agrupada em vez de uma contagem por dia
+    const porDia = await prisma.$queryRaw<Array<{ data: string; count: number }>>`
+      SELECT to_char(created_at AT TIME ZONE 'UTC', 'YYYY-MM-DD') AS data, COUNT(*)::int AS count
+      FROM ordens_servico
+      WHERE created_at >= ${new Date(`${ultimos7Dias[0]}T00:00:00.000Z`)}
+      GROUP BY 1
+    `;
+    const contagens = new Map(porDia.map(row => [row.data, row.count]));
+
+    trends = {
+      ordensUltimos7Dias: ultimos7Dias.map(data => ({
+        data,
+        count: contagens.get(data) ?? 0,
+      })),
+      clientesUltimos30Dias: [],
+    };
+  }
+  await onProgress(90);
+
+  const alerts = [];
+  if (ordensAbertas > 10) {
+    alerts.push({
+      id: 'ordens-abertas-alto',
+      type: 'warning' as const,
+      title: 'Muitas ordens abertas',
+      description: `Existem ${ordensAbertas} ordens de serviço abertas`,
+      timestamp: now.toISOString(),
+    });
+  }
+  if (crescimentoClientes < -10) {
+    alerts.push({
+      id: 'crescimento-negativo',
+      type: 'error' as const,
+      title: 'Queda no crescimento de clientes',
+      description: `Crescimento de clientes caiu ${Math.abs(crescimentoClientes)}% no período`,
+      timestamp: now.toISOString(),
+    });
+  }
+
+  return {
+    summary,
+    charts,
+    trends,
+    alerts,
+    metadata: {
+      periodo: `${params.periodoDias} dias`,
+      dataInicio: dataInicio.toISOString(),
+      dataFim: now.toISOString(),
+      geradoEm: now.toISOString(),
+    },
+  };
+};
+
+export const REPORT_GENERATORS: Record<ReportTipo, ReportGenerator> = {
+  financial: generateFinancial,
+  technical: generateTechnical,
+  dashboard: generateDashboard,
+};
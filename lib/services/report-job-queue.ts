@@ -0,0 +1,342 @@
+// 🗂️ Report Job Queue - Geração assíncrona de relatórios com fila no banco
+// Jobs ficam em report_jobs; workers do processo reivindicam com FOR UPDATE SKIP LOCKED,
+// e resultados concluídos são reutilizados enquanto params e versão dos dados forem os mesmos
+import { createHash, randomUUID } from 'crypto';
+import os from 'os';
+
+import type { Prisma, ReportJob } from '@prisma/client';
+
+import prisma from '@/lib/prisma';
+import {
+  REPORT_GENERATORS,
+  ReportParams,
+  ReportTipo,
+  computeDataVersion,
+} from '@/lib/services/report-generators';
+
+export type ReportJobStatus = 'pending' | 'running' | 'completed' | 'failed';
+
+export interface ReportJobView {
+  id: string;
+  tipo: string;
+  status: ReportJobStatus;
+  progress: number;
+  result?: unknown;
+  error?: string;
+  cached: boolean;
+  createdAt: string;
+  startedAt?: string;
+  completedAt?: string;
+}
+
+export interface ReportJobQueueOptions {
+  concurrency: number;
+  pollIntervalMs: number;
+  staleAfterMs: number; // job "running" sem heartbeat é devolvido à fila
+  maxAttempts: number;
+  retentionMs: number;
+}
+
+interface ClaimedJob {
+  id: string;
+  tipo: string;
+  params: ReportParams;
+  attempts: number;
+}
+
+const CLEANUP_INTERVAL_MS = 60 * 60 * 1000;
+
+// JSON com chaves ordenadas: mesmos parâmetros em qualquer ordem geram o mesmo hash
+function stableStringify(value: unknown): string {
+  if (Array.isArray(value)) return `[${value.map(stableStringify).join(',')}]`;
+  if (value && typeof value === 'object') {
+    return `{${Object.keys(value)
+      .sort()
+      .map(key => `${JSON.stringify(key)}:${stableStringify((value as Record<string, unknown>)[key])}`)
+      .join(',')}}`;
+  }
+  return JSON.stringify(value);
+}
+
+export class ReportJobQueue {
+  private readonly workerId = `${os.hostname()}:${process.pid}:${randomUUID().slice(0, 8)}`;
+  private active = 0;
+  private claiming = false;
+  private timer: NodeJS.Timeout | null = null;
+  private waiters = new Map<string, Set<() => void>>();
+  private lastCleanup = 0;
+
+  constructor(private readonly options: ReportJobQueueOptions) {}
+
+  static hashParams(tipo: string, params: ReportParams): string {
+    return createHash('sha256').update(`${tipo}:${stableStringify(params)}`).digest('hex');
+  }
+
+  // ➕ Enfileirar (ou reaproveitar job idêntico já concluído/em andamento)
+  async submit(
+    tipo: ReportTipo,
+    params: ReportParams,
+    requestedBy?: string
+  ): Promise<ReportJobView> {
+    const paramsHash = ReportJobQueue.hashParams(tipo, params);
+    const dataVersion = await computeDataVersion(tipo);
+
+    const existing = await prisma.reportJob.findFirst({
+      where: {
+        tipo,
+        paramsHash,
+        dataVersion,
+        status: { in: ['pending', 'running', 'completed'] },
+      },
+      orderBy: { createdAt: 'desc' },
+    });
+
+    if (existing) {
+      if (existing.status !== 'completed') this.start();
+      return this.toView(existing, existing.status === 'completed');
+    }
+
+    const job = await prisma.reportJob.create({
+      data: {
+        tipo,
+        params: params as unknown as Prisma.InputJsonValue,
+        paramsHash,
+        dataVersion,
+        requestedBy: requestedBy ?? null,
+      },
+    });
+
+    this.start();
+    this.kick();
+    return this.toView(job, false);
+  }
+
+  async get(id: string): Promise<ReportJobView | null> {
+    const job = await prisma.reportJob.findUnique({ where: { id } });
+    return job ? this.toView(job, false) : null;
+  }
+
+  // ⏳ Aguardar conclusão por até timeoutMs (resposta síncrona para relatórios rápidos)
+  async waitFor(id: string, timeoutMs: number): Promise<ReportJobView | null> {
+    await new Promise<void>(resolve => {
+      const done = () => {
+        clearTimeout(timeout);
+        this.waiters.get(id)?.delete(done);
+        resolve();
+      };
+      const timeout = setTimeout(done, timeoutMs);
+
+      const listeners = this.waiters.get(id) ?? new Set();
+      listeners.add(done);
+      this.waiters.set(id, listeners);
+    });
+
+    if (this.waiters.get(id)?.size === 0) this.waiters.delete(id);
+    return this.get(id);
+  }
+
+  async submitAndWait(
+    tipo: ReportTipo,
+    params: ReportParams,
+    waitMs: number,
+    requestedBy?: string
+  ): Promise<ReportJobView> {
+    const job = await this.submit(tipo, params, requestedBy);
+    if (job.status === 'completed' || job.status === 'failed' || waitMs <= 0) {
+      return job;
+    }
+
+    const finished = await this.waitFor(job.id, waitMs);
+    return finished ?? job;
+  }
+
+  // ▶️ Iniciar polling (também recupera jobs pendentes de execuções anteriores)
+  start(): void {
+    if (this.timer) return;
+
+    this.timer = setInterval(() => this.kick(), this.options.pollIntervalMs);
+    this.timer.unref?.();
+    this.kick();
+  }
+
+  stop(): void {
+    if (this.timer) {
+      clearInterval(this.timer);
+      this.timer = null;
+    }
+  }
+
+  kick(): void {
+    void this.fillSlots();
+  }
+
+  private async fillSlots(): Promise<void> {
+    if (this.claiming) return;
+    this.claiming = true;
+
+    try {
+      while (this.active < this.options.concurrency) {
+        const job = await this.claim();
+        if (!job) break;
+
+        this.active++;
+        void this.run(job).finally(() => {
+          this.active--;
+          this.kick();
+        });
+      }
+
+      await this.cleanup();
+    } catch (error) {
+      console.error('Erro ao buscar jobs de relatório:', error);
+    } finally {
+      this.claiming = false;
+    }
+  }
+
+  private async claim(): Promise<ClaimedJob | null> {
+    const staleBefore = new Date(Date.now() - this.options.staleAfterMs);
+
+    const rows = await prisma.$queryRaw<ClaimedJob[]>`
+      UPDATE report_jobs
+      SET status = 'running',
+          locked_by = ${this.workerId},
+          locked_at = now(),
+          started_at = COALESCE(started_at, now()),
+          attempts = attempts + 1,
+          updated_at = now()
+      WHERE id = (
+        SELECT id FROM report_jobs
+        WHERE status = 'pending' OR (status = 'running' AND locked_at < ${staleBefore})
+        ORDER BY created_at
+        FOR UPDATE SKIP LOCKED
+        LIMIT 1
+      )
+      RETURNING id, tipo, params, attempts
+    `;
+
+    return rows[0] ?? null;
+  }
+
+  private async run(job: ClaimedJob): Promise<void> {
+    const generator = REPORT_GENERATORS[job.tipo as ReportTipo];
+
+    try {
+      if (!generator) {
+        throw new Error(`Tipo de relatório desconhecido: ${job.tipo}`);
+      }
+
+      const result = await generator(job.params, progress =>
+        this.updateProgress(job.id, progress)
+      );
+
+      await prisma.reportJob.update({
+        where: { id: job.id },
+        data: {
+          status: 'completed',
+          progress: 100,
+          result: result as Prisma.InputJsonValue,
+          error: null,
+          lockedBy: null,
+          lockedAt: null,
+          completedAt: new Date(),
+        },
+      });
+      this.notify(job.id);
+    } catch (error) {
+      const message = error instanceof Error ? error.message : 'Erro desconhecido';
+      const retry = Boolean(generator) && job.attempts < this.options.maxAttempts;
+      console.error(`Erro no job de relatório ${job.id} (tentativa ${job.attempts}):`, error);
+
+      try {
+        await prisma.reportJob.update({
+          where: { id: job.id },
+          data: {
+            status: retry ? 'pending' : 'failed',
+            error: message,
+            lockedBy: null,
+            lockedAt: null,
+            ...(retry ? {} : { completedAt: new Date() }),
+          },
+        });
+      } catch (updateError) {
+        console.error('Erro ao registrar falha do job de relatório:', updateError);
+      }
+
+      if (!retry) this.notify(job.id);
+    }
+  }
+
+  // Progresso também serve de heartbeat do lock
+  private async updateProgress(id: string, progress: number): Promise<void> {
+    try {
+      await prisma.reportJob.updateMany({
+        where: { id, lockedBy: this.workerId },
+        data: { progress: Math.min(99, Math.round(progress)), lockedAt: new Date() },
+      });
+    } catch (error) {
+      console.error('Erro ao atualizar progresso do job de relatório:', error);
+    }
+  }
+
+  private notify(id: string): void {
+    this.waiters.get(id)?.forEach(done => done());
+    this.waiters.delete(id);
+  }
+
+  // 🧹 Remover jobs finalizados antigos (no máximo uma vez por hora)
+  private async cleanup(): Promise<void> {
+    if (Date.now() - this.lastCleanup < CLEANUP_INTERVAL_MS) return;
+    this.lastCleanup = Date.now();
+
+    await prisma.reportJob.deleteMany({
+      where: {
+        status: { in: ['completed', 'failed'] },
+        updatedAt: { lt: new Date(Date.now() - this.options.retentionMs) },
+      },
+    });
+  }
+
+  getStats(): { workerId: string; active: number; concurrency: number; polling: boolean } {
+    return {
+      workerId: this.workerId,
+      active: this.active,
+      concurrency: this.options.concurrency,
+      polling: this.timer !== null,
+    };
+  }
+
+  private toView(job: ReportJob, cached: boolean): ReportJobView {
+    return {
+      id: job.id,
+      tipo: job.tipo,
+      status: job.status as ReportJobStatus,
+      progress: job.progress,
+      ...(job.status === 'completed' && { result: job.result }),
+      ...(job.error && { error: job.error }),
+      cached,
+      createdAt: job.createdAt.toISOString(),
+      startedAt: job.startedAt?.toISOString(),
+      completedAt: job.completedAt?.toISOString(),
+    };
+  }
+}
+
+// 🌟 Instância global (sobrevive a hot reload em desenvolvimento)
+const globalForReportJobs = globalThis as unknown as {
+  reportJobQueue: ReportJobQueue | undefined;
+};
+
+export const reportJobQueue =
+  globalForReportJobs.reportJobQueue ??
+  new ReportJobQueue({
+    concurrency: Math.max(1, Number(process.env.REPORT_JOB_CONCURRENCY) || 2),
+    pollIntervalMs: 2000,
+    staleAfterMs: 5 * 60 * 1000,
+    maxAttempts: 3,
+    retentionMs: 7 * 24 * 60 * 60 * 1000,
+  });
+
+if (process.env.NODE_ENV !== 'production') {
+  globalForReportJobs.reportJobQueue = reportJobQueue;
+}
@@ -3,6 +3,8 @@
 import prisma from '@/lib/prisma';
 
 import { metricsService } from './metrics-service';
+import { outboundQueue } from './outbound-queue';
+import { providerHttpClient } from './provider-http-client';
 
 // 🔧 Interfaces e Tipos
 interface TwilioConfig {
@@ -44,6 +46,9 @@ interface Cliente {
   email?: string;
 }
 
+// URL base da API (configurável para apontar para um servidor local em testes de carga)
+const TWILIO_API_URL = process.env.TWILIO_API_URL || 'https://api.twilio.com';
+
 // 🏗️ Classe Principal do Serviço SMS
 export class SMSService {
   private config: TwilioConfig;
@@ -98,12 +103,18 @@ export class SMSService {
   }
 
   // 🚀 Envio de SMS Simples
-  async sendSMS(to: string, message: string): Promise<SMSResponse> {
-    return await metricsService.measureOperation(
-      'sms',
-      'sendSMS',
-      async () => {
-        try {
+  // logCommunication: false quando a mensagem já é uma linha da fila de envio
+  async sendSMS(
+    to: string,
+    message: string,
+    options: { logCommunication?: boolean } = {}
+  ): Promise<SMSResponse> {
+    // Falhas propagam pelo measureOperation para serem contadas como erro nas métricas
+    try {
+      return await metricsService.measureOperation(
+        'sms',
+        'sendSMS',
+        async () => {
           const formattedPhone = this.formatPhoneNumber(to);
 
           const smsData: SMSMessage = {
@@ -115,30 +126,32 @@ export class SMSService {
           const response = await this.sendToTwilio(smsData);
 
           // Registrar comunicação no banco
-          await this.logCommunication({
-            cliente_telefone: formattedPhone,
-            tipo: 'sms',
-            conteudo: message,
-            status: response.success ? 'enviado' : 'erro',
-            provider: 'twilio',
-            message_id: response.messageId,
-          });
+          if (options.logCommunication !== false) {
+            await this.logCommunication({
+              cliente_telefone: formattedPhone,
+              tipo: 'sms',
+              conteudo: message,
+              status: response.success ? 'enviado' : 'erro',
+              provider: 'twilio',
+              message_id: response.messageId,
+            });
+          }
 
           return response;
-        } catch (error) {
-          console.error('❌ Erro ao enviar SMS:', error);
-          return {
-            success: false,
-            error: error instanceof Error ? error.message : 'Erro desconhecido',
-            provider: 'twilio',
-          };
+        },
+        {
+          destinatario: to,
+          tamanho_mensagem: message.length,
         }
-      },
-      {
-        destinatario: to,
-        tamanho_mensagem: message.length,
-      }
-    );
+      );
+    } catch (error) {
+      console.error('❌ Erro ao enviar SMS:', error);
+      return {
+        success: false,
+        error: error instanceof Error ? error.message : 'Erro desconhecido',
+        provider: 'twilio',
+      };
+    }
   }
 
   // 🔧 Envio para API do Twilio
@@ -146,7 +159,7 @@ export class SMSService {
     try {
       const { accountSid, authToken } = this.config;
 
-      const url = `https://api.twilio.com/2010-04-01/Accounts/${accountSid}/Messages.json`;
+      const url = `${TWILIO_API_URL}/2010-04-01/Accounts/${accountSid}/Messages.json`;
 
       const body = new URLSearchParams({
         To: smsData.to,
@@ -154,7 +167,7 @@ export class SMSService {
         Body: smsData.body,
       });
 
-      const response = await fetch(url, {
+      const response = await providerHttpClient.fetch(url, {
         method: 'POST',
         headers: {
           Authorization: `Basic ${Buffer.from(`${accountSid}:${authToken}`).toString('base64')}`,
@@ -222,6 +235,28 @@ export class SMSService {
     );
   }
 
+  // 📬 SMS para Ordem de Serviço pela fila de saída (rate limit, retry e dead-letter)
+  // Retorna o id da mensagem enfileirada; o envio acontece nos workers
+  async enqueueOrdemServicoSMS(
+    ordemServico: OrdemServico,
+    cliente: Cliente,
+    tipo: 'criacao' | 'atualizacao' | 'conclusao'
+  ): Promise<string> {
+    const telefone = cliente.celular || cliente.telefone;
+
+    if (!telefone) {
+      throw new Error('Cliente não possui telefone cadastrado');
+    }
+
+    return outboundQueue.enqueue({
+      tipo: 'sms',
+      destinatario: telefone,
+      clienteTelefone: telefone,
+      conteudo: this.generateOrdemServicoMessage(ordemServico, cliente, tipo),
+      ordemServicoId: ordemServico.id,
+    });
+  }
+
   // 📝 Geração de Mensagem para Ordem de Serviço
   private generateOrdemServicoMessage(
     ordemServico: OrdemServico,
@@ -300,13 +335,15 @@ export class SMSService {
           }
 
           // Teste simples de autenticação
-          const url = `https://api.twilio.com/2010-04-01/Accounts/${accountSid}.json`;
+          const url = `${TWILIO_API_URL}/2010-04-01/Accounts/${accountSid}.json`;
 
-          const response = await fetch(url, {
+          const response = await providerHttpClient.fetch(url, {
             headers: {
               Authorization: `Basic ${Buffer.from(`${accountSid}:${authToken}`).toString('base64')}`,
             },
           });
+          // Só o status importa: libera a conexão sem ler o corpo
+          await response.body?.cancel();
 
           if (response.ok) {
             return {
@@ -0,0 +1,303 @@
+// 📨 Webhook Handlers - Conversão e processamento dos eventos de WhatsApp e SMS
+// Os webhooks só convertem o payload em eventos da caixa de entrada (lib/services/webhook-inbox.ts);
+// os handlers rodam depois, nos workers, e precisam ser idempotentes (um evento pode ser reprocessado)
+import prisma from '@/lib/prisma';
+import { outboundQueue } from '@/lib/services/outbound-queue';
+
+export type WebhookProvider = 'whatsapp' | 'sms';
+export type WebhookEventType = 'message' | 'status';
+
+export interface InboxEventInput {
+  provider: WebhookProvider;
+  eventType: WebhookEventType;
+  externalId: string;
+  conversationKey: string;
+  payload: Record<string, unknown>;
+}
+
+export interface InboxEventContext {
+  payload: Record<string, unknown>;
+  receivedAt: Date;
+}
+
+type WebhookHandler = (_event: InboxEventContext) => Promise<void>;
+
+// 🔧 Payload do WhatsApp Cloud API
+interface WhatsAppMetadata {
+  display_phone_number: string;
+  phone_number_id: string;
+}
+
+interface WhatsAppIncomingMessage {
+  from: string;
+  id: string;
+  timestamp: string;
+  text?: {
+    body: string;
+  };
+  type: string;
+}
+
+interface WhatsAppStatusUpdate {
+  id: string;
+  status: string;
+  timestamp: string;
+  recipient_id: string;
+  errors?: Array<{ code: number; title: string }>;
+}
+
+interface WhatsAppWebhookEntry {
+  id: string;
+  changes: Array<{
+    value: {
+      messaging_product: string;
+      metadata: WhatsAppMetadata;
+      contacts?: Array<{
+        profile: {
+          name: string;
+        };
+        wa_id: string;
+      }>;
+      messages?: WhatsAppIncomingMessage[];
+      statuses?: WhatsAppStatusUpdate[];
+    };
+    field: string;
+  }>;
+}
+
+export interface WhatsAppWebhookPayload {
+  object: string;
+  entry: WhatsAppWebhookEntry[];
+}
+
+// Ordens em que o cliente ainda aguarda retorno (ou em que a equipe aguarda o cliente)
+const STATUS_ORDEM_ATIVA = ['aberta', 'em_andamento', 'aguardando_peca', 'aguardando_aprovacao'];
+
+// 📥 Converter payload do WhatsApp em eventos (uma mensagem ou status por evento)
+export function parseWhatsAppWebhook(body: WhatsAppWebhookPayload): InboxEventInput[] {
+  const events: InboxEventInput[] = [];
+
+  for (const entry of body.entry ?? []) {
+    for (const change of entry.changes ?? []) {
+      const { value } = change;
+
+      for (const message of value.messages ?? []) {
+        events.push({
+          provider: 'whatsapp',
+          eventType: 'message',
+          externalId: message.id,
+          conversationKey: message.from,
+          payload: { message, metadata: value.metadata },
+        });
+      }
+
+      // Cada status (sent, delivered, read) é um evento distinto da mesma mensagem
+      for (const status of value.statuses ?? []) {
+        events.push({
+          provider: 'whatsapp',
+          eventType: 'status',
+          externalId: `${status.id}:${status.status}`,
+          conversationKey: status.recipient_id,
+          payload: { status },
+        });
+      }
+    }
+  }
+
+  return events;
+}
+
+// 📥 Converter callback de status do Twilio em evento
+export function parseTwilioStatusWebhook(
+  payload: Record<string, string>
+): InboxEventInput | null {
+  const { MessageSid: messageId, MessageStatus: messageStatus } = payload;
+  if (!messageId || !messageStatus) return null;
+
+  return {
+    provider: 'sms',
+    eventType: 'status',
+    externalId: `${messageId}:${messageStatus}`,
+    conversationKey: payload.To || messageId,
+    payload,
+  };
+}
+
+// Telefones são gravados com e sem código do país
+function phoneVariants(phone: string): string[] {
+  const digits = phone.replace(/\D/g, '');
+  const variants = new Set([phone, digits, `+${digits}`]);
+  if (digits.startsWith('55') && digits.length > 11) {
+    variants.add(digits.slice(2));
+  }
+  return Array.from(variants);
+}
+
+function buildAutoResponse(
+  nome: string,
+  ordemServico: { numeroOs: string; status: string } | null,
+  mensagem: string
+): string | null {
+  const mensagemLower = mensagem.toLowerCase();
+
+  if (mensagemLower.includes('status') || mensagemLower.includes('andamento')) {
+    return ordemServico
+      ? `Olá ${nome}! Sua ordem de serviço ${ordemServico.numeroOs} está com status: ${ordemServico.status}. Em breve entraremos em contato com mais detalhes.`
+      : `Olá ${nome}! No momento você não possui ordens de serviço ativas. Se precisar de ajuda, nossa equipe está à disposição.`;
+  }
+
+  if (
+    mensagemLower.includes('oi') ||
+    mensagemLower.includes('olá') ||
+    mensagemLower.includes('bom dia') ||
+    mensagemLower.includes('boa tarde') ||
+    mensagemLower.includes('boa noite')
+  ) {
+    return `Olá ${nome}! Obrigado por entrar em contato. Nossa equipe analisará sua mensagem e retornará em breve. Para consultar o status de suas ordens de serviço, digite "status".`;
+  }
+
+  if (mensagemLower.includes('urgente') || mensagemLower.includes('emergência')) {
+    return `${nome}, recebemos sua mensagem marcada como urgente. Nossa equipe será notificada imediatamente e entrará em contato o mais breve possível.`;
+  }
+
+  return null;
+}
+
+// 💬 Mensagem recebida no WhatsApp
+const handleWhatsAppMessage: WebhookHandler = async ({ payload }) => {
+  const message = payload.message as WhatsAppIncomingMessage;
+  const metadata = payload.metadata as WhatsAppMetadata;
+  const texto = message.text?.body || '';
+  const recebidoEm = new Date(parseInt(message.timestamp, 10) * 1000);
+
+  // Já registrada em um processamento anterior
+  const existente = await prisma.comunicacaoCliente.findFirst({
+    where: { messageId: message.id, tipo: 'whatsapp' },
+    select: { id: true },
+  });
+  if (existente) return;
+
+  const cliente = await prisma.cliente.findFirst({
+    where: { telefone: { in: phoneVariants(message.from) } },
+    select: { id: true, nome: true, telefone: true },
+  });
+
+  // Número não cadastrado: registrar para a equipe
+  if (!cliente) {
+    await prisma.$executeRaw`
+      INSERT INTO mensagens_whatsapp_nao_identificadas
+        (telefone, mensagem, whatsapp_message_id, timestamp, metadata)
+      SELECT ${message.from}, ${texto}, ${message.id}, ${recebidoEm}, ${JSON.stringify(metadata)}::jsonb
+      WHERE NOT EXISTS (
+        SELECT 1 FROM mensagens_whatsapp_nao_identificadas WHERE whatsapp_message_id = ${message.id}
+      )
+    `;
+    return;
+  }
+
+  const ordemServico = await prisma.ordemServico.findFirst({
+    where: { clienteId: cliente.id, status: { in: STATUS_ORDEM_ATIVA } },
+    orderBy: { createdAt: 'desc' },
+    select: { id: true, numeroOs: true, status: true },
+  });
+
+  const resposta = buildAutoResponse(cliente.nome, ordemServico, texto);
+  const destinatario = cliente.telefone || message.from;
+
+  // Registro da mensagem e resposta automática gravados juntos: um retry não duplica a resposta
+  await prisma.$transaction([
+    prisma.comunicacaoCliente.create({
+      data: {
+        tipo: 'whatsapp',
+        // cliente.id é de clientes, não do portal; as estatísticas casam pelo telefone
+        clientePortalId: null,
+        ordemServicoId: ordemServico?.id ?? null,
+        clienteTelefone: message.from,
+        destinatario: message.from,
+        conteudo: texto,
+        status: 'recebida',
+        provider: 'whatsapp',
+        messageId: message.id,
+        dataEnvio: recebidoEm,
+      },
+    }),
+    ...(resposta
+      ? [
+          prisma.comunicacaoCliente.create({
+            data: {
+              tipo: 'whatsapp',
+              clientePortalId: null,
+              ordemServicoId: ordemServico?.id ?? null,
+              clienteTelefone: destinatario,
+              destinatario,
+              conteudo: resposta,
+              status: 'pendente',
+              provider: 'whatsapp',
+            },
+          }),
+        ]
+      : []),
+  ]);
+
+  if (resposta) {
+    outboundQueue.notify('whatsapp');
+  }
+};
+
+// ✅ Status de entrega no WhatsApp (sent, delivered, read, failed)
+const handleWhatsAppStatus: WebhookHandler = async ({ payload }) => {
+  const status = payload.status as WhatsAppStatusUpdate;
+  const atualizadoEm = new Date(parseInt(status.timestamp, 10) * 1000);
+
+  await prisma.comunicacaoCliente.updateMany({
+    where: {
+      messageId: status.id,
+      tipo: 'whatsapp',
+      // Não regredir para um status mais antigo
+      OR: [{ statusEntregaEm: null }, { statusEntregaEm: { lte: atualizadoEm } }],
+    },
+    data: {
+      statusEntrega: status.status,
+      statusEntregaEm: atualizadoEm,
+      ...(status.status === 'failed' && {
+        erro: status.errors?.[0]?.title ?? 'Falha na entrega do WhatsApp',
+      }),
+    },
+  });
+};
+
+// 📱 Status de entrega do SMS (Twilio)
+const handleSmsStatus: WebhookHandler = async ({ payload, receivedAt }) => {
+  const {
+    MessageSid: messageId,
+    MessageStatus: messageStatus,
+    To: to,
+    ErrorCode: errorCode,
+    ErrorMessage: errorMessage,
+  } = payload as Record<string, string>;
+
+  await prisma.comunicacaoCliente.updateMany({
+    where: {
+      messageId,
+      tipo: 'sms',
+      OR: [{ statusEntregaEm: null }, { statusEntregaEm: { lte: receivedAt } }],
+    },
+    data: {
+      statusEntrega: messageStatus,
+      statusEntregaEm: receivedAt,
+      ...((errorCode || errorMessage) && {
+        erro: [errorCode, errorMessage].filter(Boolean).join(': '),
+      }),
+    },
+  });
+
+  if (messageStatus === 'failed' || messageStatus === 'undelivered') {
+    console.warn(`⚠️ SMS falhou para ${to}: ${messageId}`);
+  }
+};
+
+export const WEBHOOK_HANDLERS: Record<string, WebhookHandler> = {
+  'whatsapp:message': handleWhatsAppMessage,
+  'whatsapp:status': handleWhatsAppStatus,
+  'sms:status': handleSmsStatus,
+};
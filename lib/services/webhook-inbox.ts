@@ -0,0 +1,289 @@
+// 📥 Webhook Inbox - Recebimento rápido e processamento durável de webhooks
+// O webhook grava o evento bruto em webhook_inbox (único por provedor + id externo, então reenvios
+// do provedor são descartados) e responde 200 na hora. Workers reivindicam lotes com SKIP LOCKED,
+// sempre o evento mais antigo de cada conversa, para preservar a ordem por contato
+import { randomUUID } from 'crypto';
+import os from 'os';
+
+import type { Prisma } from '@prisma/client';
+
+import prisma from '@/lib/prisma';
+import {
+  InboxEventInput,
+  WEBHOOK_HANDLERS,
+} from '@/lib/services/webhook-handlers';
+
+export interface WebhookInboxOptions {
+  concurrency: number;
+  batchSize: number;
+  pollIntervalMs: number;
+  staleAfterMs: number;
+  maxAttempts: number;
+  baseRetryDelayMs: number;
+  maxRetryDelayMs: number;
+  retentionMs: number;
+}
+
+interface ClaimedEvent {
+  id: string;
+  provider: string;
+  eventType: string;
+  payload: Record<string, unknown>;
+  receivedAt: Date;
+  tentativas: number;
+}
+
+export type InboxOutcome = 'processado' | 'reagendado' | 'falhou';
+
+const CLEANUP_INTERVAL_MS = 60 * 60 * 1000;
+
+export class WebhookInbox {
+  private readonly workerId = `${os.hostname()}:${process.pid}:${randomUUID().slice(0, 8)}`;
+  private timer: NodeJS.Timeout | null = null;
+  private draining = false;
+  private rerun = false;
+  private lastCleanup = 0;
+  private stats = { processados: 0, reagendados: 0, falhas: 0, duplicados: 0 };
+
+  constructor(private readonly options: WebhookInboxOptions) {}
+
+  // ➕ Gravar eventos; duplicados (reenvio do provedor) são ignorados pela chave única
+  async ingest(events: InboxEventInput[]): Promise<{ recebidos: number; duplicados: number }> {
+    if (events.length === 0) return { recebidos: 0, duplicados: 0 };
+
+    const { count } = await prisma.webhookEvent.createMany({
+      data: events.map(event => ({
+        provider: event.provider,
+        eventType: event.eventType,
+        externalId: event.externalId,
+        conversationKey: event.conversationKey,
+        payload: event.payload as Prisma.InputJsonValue,
+      })),
+      skipDuplicates: true,
+    });
+
+    const duplicados = events.length - count;
+    this.stats.duplicados += duplicados;
+
+    if (count > 0) {
+      this.start();
+      this.kick();
+    }
+
+    return { recebidos: count, duplicados };
+  }
+
+  // ▶️ Iniciar polling (também recupera eventos pendentes de execuções anteriores)
+  start(): void {
+    if (this.timer) return;
+
+    this.timer = setInterval(() => this.kick(), this.options.pollIntervalMs);
+    this.timer.unref?.();
+  }
+
+  stop(): void {
+    if (this.timer) {
+      clearInterval(this.timer);
+      this.timer = null;
+    }
+  }
+
+  kick(): void {
+    if (this.draining) {
+      this.rerun = true;
+      return;
+    }
+    void this.drain();
+  }
+
+  // Processar lotes até a fila esvaziar
+  private async drain(): Promise<void> {
+    this.draining = true;
+
+    try {
+      do {
+        this.rerun = false;
+        while ((await this.processBatch()) > 0) {
+          // continuar enquanto houver eventos prontos
+        }
+      } while (this.rerun);
+
+      await this.cleanup();
+    } catch (error) {
+      console.error('Erro ao processar caixa de entrada de webhooks:', error);
+    } finally {
+      this.draining = false;
+    }
+  }
+
+  // 🔁 Reivindicar e processar um lote; retorna quantos eventos foram processados
+  async processBatch(): Promise<number> {
+    const events = await this.claim();
+    if (events.length === 0) return 0;
+
+    // Cada evento é de uma conversa diferente: podem rodar em paralelo
+    let next = 0;
+    const workers = Array.from(
+      { length: Math.min(this.options.concurrency, events.length) },
+      async () => {
+        while (next < events.length) {
+          await this.handle(events[next++]);
+        }
+      }
+    );
+    await Promise.all(workers);
+
+    return events.length;
+  }
+
+  // Só o evento mais antigo ainda não concluído de cada conversa é elegível: enquanto ele
+  // estiver pendente (inclusive aguardando retry) ou em processamento, os seguintes esperam
+  private async claim(): Promise<ClaimedEvent[]> {
+    const staleBefore = new Date(Date.now() - this.options.staleAfterMs);
+
+    return prisma.$queryRaw<ClaimedEvent[]>`
+      UPDATE webhook_inbox
+      SET status = 'processando',
+          locked_by = ${this.workerId},
+          locked_at = now(),
+          tentativas = tentativas + 1
+      WHERE id IN (
+        SELECT e.id FROM webhook_inbox e
+        WHERE (
+            (e.status = 'pendente' AND (e.proxima_tentativa IS NULL OR e.proxima_tentativa <= now()))
+            OR (e.status = 'processando' AND e.locked_at < ${staleBefore})
+          )
+          AND NOT EXISTS (
+            SELECT 1 FROM webhook_inbox anterior
+            WHERE anterior.conversation_key = e.conversation_key
+              AND anterior.sequencia < e.sequencia
+              AND anterior.status IN ('pendente', 'processando')
+          )
+        ORDER BY e.sequencia
+        FOR UPDATE SKIP LOCKED
+        LIMIT ${this.options.batchSize}
+      )
+      RETURNING id, provider, event_type AS "eventType", payload,
+                received_at AS "receivedAt", tentativas
+    `;
+  }
+
+  private async handle(event: ClaimedEvent): Promise<InboxOutcome> {
+    const handler = WEBHOOK_HANDLERS[`${event.provider}:${event.eventType}`];
+
+    try {
+      if (!handler) {
+        throw new Error(`Evento de webhook sem handler: ${event.provider}:${event.eventType}`);
+      }
+
+      await handler({ payload: event.payload, receivedAt: event.receivedAt });
+
+      await prisma.webhookEvent.update({
+        where: { id: event.id },
+        data: {
+          status: 'processado',
+          erro: null,
+          processedAt: new Date(),
+          lockedBy: null,
+          lockedAt: null,
+        },
+      });
+
+      this.stats.processados++;
+      return 'processado';
+    } catch (error) {
+      const erro = error instanceof Error ? error.message : 'Erro desconhecido';
+      const retry = Boolean(handler) && event.tentativas < this.options.maxAttempts;
+      console.error(`Erro no evento de webhook ${event.id} (tentativa ${event.tentativas}):`, error);
+
+      try {
+        await prisma.webhookEvent.update({
+          where: { id: event.id },
+          data: {
+            // 'falhou' libera os eventos seguintes da conversa
+            status: retry ? 'pendente' : 'falhou',
+            erro,
+            proximaTentativa: retry
+              ? new Date(Date.now() + this.retryDelay(event.tentativas))
+              : null,
+            lockedBy: null,
+            lockedAt: null,
+          },
+        });
+      } catch (updateError) {
+        console.error('Erro ao registrar falha do evento de webhook:', updateError);
+      }
+
+      if (retry) {
+        this.stats.reagendados++;
+        return 'reagendado';
+      }
+      this.stats.falhas++;
+      return 'falhou';
+    }
+  }
+
+  // Backoff exponencial com jitter (50% a 100% do atraso)
+  retryDelay(tentativas: number): number {
+    const delay = Math.min(
+      this.options.maxRetryDelayMs,
+      this.options.baseRetryDelayMs * 2 ** Math.max(0, tentativas - 1)
+    );
+    return Math.round(delay * (0.5 + Math.random() * 0.5));
+  }
+
+  // 🧹 Remover eventos processados antigos (a janela de retenção é a janela de deduplicação)
+  private async cleanup(): Promise<void> {
+    if (Date.now() - this.lastCleanup < CLEANUP_INTERVAL_MS) return;
+    this.lastCleanup = Date.now();
+
+    await prisma.webhookEvent.deleteMany({
+      where: {
+        status: 'processado',
+        receivedAt: { lt: new Date(Date.now() - this.options.retentionMs) },
+      },
+    });
+  }
+
+  async getQueueStats(): Promise<Record<string, number>> {
+    const rows = await prisma.webhookEvent.groupBy({
+      by: ['status'],
+      _count: { _all: true },
+    });
+
+    return Object.fromEntries(rows.map(row => [row.status, row._count._all]));
+  }
+
+  getWorkerStats() {
+    return {
+      workerId: this.workerId,
+      polling: this.timer !== null,
+      draining: this.draining,
+      concurrency: this.options.concurrency,
+      ...this.stats,
+    };
+  }
+}
+
+// 🌟 Instância global (sobrevive a hot reload em desenvolvimento)
+const globalForWebhookInbox = globalThis as unknown as {
+  webhookInbox: WebhookInbox | undefined;
+};
+
+export const webhookInbox =
+  globalForWebhookInbox.webhookInbox ??
+  new WebhookInbox({
+    concurrency: Math.max(1, Number(process.env.WEBHOOK_INBOX_CONCURRENCY) || 4),
+    batchSize: 50,
+    pollIntervalMs: 2000,
+    staleAfterMs: 2 * 60 * 1000,
+    maxAttempts: 5,
+    baseRetryDelayMs: 5 * 1000,
+    maxRetryDelayMs: 10 * 60 * 1000,
+    // Meta reenvia por até 7 dias
+    retentionMs: 7 * 24 * 60 * 60 * 1000,
+  });
+
+if (process.env.NODE_ENV !== 'production') {
+  globalForWebhookInbox.webhookInbox = webhookInbox;
+}
@@ -1,4 +1,6 @@
 import prisma from '@/lib/prisma';
+import { metricsService } from '@/lib/services/metrics-service';
+import { providerHttpClient } from '@/lib/services/provider-http-client';
 
 interface WhatsAppConfig {
   phoneNumberId: string;
@@ -179,29 +181,36 @@ export default class WhatsAppService {
   private async sendMessage(
     messagePayload: WhatsAppMessage
   ): Promise<WhatsAppResponse> {
-    try {
-      const response = await fetch(this.baseUrl, {
-        method: 'POST',
-        headers: {
-          Authorization: `Bearer ${this.config.accessToken}`,
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify(messagePayload),
-      });
-
-      if (!response.ok) {
-        const errorData = await response.json();
-        throw new Error(
-          `WhatsApp API Error: ${errorData.error?.message || response.statusText}`
-        );
-      }
-
-      const data = await response.json();
-      return data;
-    } catch (error) {
-      console.error('Erro na API do WhatsApp:', error);
-      throw error;
-    }
+    return await metricsService.measureOperation(
+      'whatsapp',
+      'sendMessage',
+      async () => {
+        try {
+          const response = await providerHttpClient.fetch(this.baseUrl, {
+            method: 'POST',
+            headers: {
+              Authorization: `Bearer ${this.config.accessToken}`,
+              'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(messagePayload),
+          });
+
+          if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(
+              `WhatsApp API Error: ${errorData.error?.message || response.statusText}`
+            );
+          }
+
+          const data = await response.json();
+          return data;
+        } catch (error) {
+          console.error('Erro na API do WhatsApp:', error);
+          throw error;
+        }
+      },
+      { tipo: messagePayload.type }
+    );
   }
 
   /**
@@ -300,7 +309,7 @@ export default class WhatsAppService {
       // Fazer uma requisição simples para verificar se as credenciais estão válidas
       const testUrl = `${this.config.baseUrl}/${this.config.apiVersion}/${this.config.phoneNumberId}`;
 
-      const response = await fetch(testUrl, {
+      const response = await providerHttpClient.fetch(testUrl, {
         method: 'GET',
         headers: {
           Authorization: `Bearer ${this.config.accessToken}`,
@@ -308,6 +317,7 @@ export default class WhatsAppService {
       });
 
       if (response.ok) {
+        await response.body?.cancel();
         return {
           success: true,
           message: 'Conexão com WhatsApp Business API estabelecida com sucesso',
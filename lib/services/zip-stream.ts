@@ -0,0 +1,181 @@
+// 🗜️ Zip Stream - Escrita incremental de arquivos ZIP
+// Cada arquivo vira um bloco (cabeçalho local + dados) emitido imediatamente;
+// apenas o diretório central (poucos bytes por arquivo) fica em memória até o fim
+import { promisify } from 'util';
+import { deflateRaw } from 'zlib';
+
+const deflateRawAsync = promisify(deflateRaw);
+
+const LOCAL_HEADER_SIGNATURE = 0x04034b50;
+const CENTRAL_HEADER_SIGNATURE = 0x02014b50;
+const END_OF_CENTRAL_DIRECTORY_SIGNATURE = 0x06054b50;
+
+const VERSION = 20; // 2.0: deflate
+const FLAG_UTF8 = 0x0800;
+const METHOD_STORE = 0;
+const METHOD_DEFLATE = 8;
+
+// Sem ZIP64: limites do formato clássico
+const MAX_ENTRIES = 0xffff;
+const MAX_OFFSET = 0xffffffff;
+
+// 🔢 Tabela CRC-32 (polinômio 0xEDB88320)
+const CRC_TABLE = (() => {
+  const table = new Uint32Array(256);
+  for (let n = 0; n < 256; n++) {
+    let c = n;
+    for (let k = 0; k < 8; k++) {
+      c = c & 1 ? 0xedb88320 ^ (c >>> 1) : c >>> 1;
+    }
+    table[n] = c >>> 0;
+  }
+  return table;
+})();
+
+export function crc32(data: Uint8Array): number {
+  let crc = 0xffffffff;
+  for (let i = 0; i < data.length; i++) {
+    crc = CRC_TABLE[(crc ^ data[i]) & 0xff] ^ (crc >>> 8);
+  }
+  return (crc ^ 0xffffffff) >>> 0;
+}
+
+function toDosDateTime(date: Date): { time: number; date: number } {
+  const year = Math.max(date.getFullYear(), 1980);
+  return {
+    time:
+      (date.getHours() << 11) |
+      (date.getMinutes() << 5) |
+      Math.floor(date.getSeconds() / 2),
+    date: ((year - 1980) << 9) | ((date.getMonth() + 1) << 5) | date.getDate(),
+  };
+}
+
+interface CentralDirectoryEntry {
+  name: Buffer;
+  method: number;
+  crc: number;
+  compressedSize: number;
+  size: number;
+  time: number;
+  date: number;
+  offset: number;
+}
+
+export class ZipStreamWriter {
+  private entries: CentralDirectoryEntry[] = [];
+  private names = new Set<string>();
+  private offset = 0;
+  private finished = false;
+
+  // Retorna os bytes do arquivo (cabeçalho local + conteúdo) prontos para envio
+  async addFile(
+    fileName: string,
+    data: Uint8Array,
+    modifiedAt: Date = new Date()
+  ): Promise<Buffer> {
+    if (this.finished) {
+      throw new Error('ZIP já finalizado');
+    }
+    if (this.entries.length >= MAX_ENTRIES) {
+      throw new Error(`Limite de ${MAX_ENTRIES} arquivos por ZIP atingido`);
+    }
+
+    const name = Buffer.from(this.uniqueName(fileName), 'utf8');
+    const crc = crc32(data);
+    const deflated = await deflateRawAsync(data);
+    // Conteúdo já comprimido: armazenar sem compressão
+    const useDeflate = deflated.length < data.length;
+    const content = useDeflate ? deflated : Buffer.from(data);
+    const { time, date } = toDosDateTime(modifiedAt);
+
+    const header = Buffer.alloc(30);
+    header.writeUInt32LE(LOCAL_HEADER_SIGNATURE, 0);
+    header.writeUInt16LE(VERSION, 4);
+    header.writeUInt16LE(FLAG_UTF8, 6);
+    header.writeUInt16LE(useDeflate ? METHOD_DEFLATE : METHOD_STORE, 8);
+    header.writeUInt16LE(time, 10);
+    header.writeUInt16LE(date, 12);
+    header.writeUInt32LE(crc, 14);
+    header.writeUInt32LE(content.length, 18);
+    header.writeUInt32LE(data.length, 22);
+    header.writeUInt16LE(name.length, 26);
+    header.writeUInt16LE(0, 28);
+
+    const chunk = Buffer.concat([header, name, content]);
+    if (this.offset + chunk.length > MAX_OFFSET) {
+      throw new Error('ZIP excede 4 GiB');
+    }
+
+    this.entries.push({
+      name,
+      method: useDeflate ? METHOD_DEFLATE : METHOD_STORE,
+      crc,
+      compressedSize: content.length,
+      size: data.length,
+      time,
+      date,
+      offset: this.offset,
+    });
+    this.offset += chunk.length;
+
+    return chunk;
+  }
+
+  // Diretório central + registro final; depois disso nenhum arquivo pode ser adicionado
+  finish(): Buffer {
+    this.finished = true;
+
+    const centralHeaders = this.entries.map(entry => {
+      const header = Buffer.alloc(46);
+      header.writeUInt32LE(CENTRAL_HEADER_SIGNATURE, 0);
+      header.writeUInt16LE(VERSION, 4);
+      header.writeUInt16LE(VERSION, 6);
+      header.writeUInt16LE(FLAG_UTF8, 8);
+      header.writeUInt16LE(entry.method, 10);
+      header.writeUInt16LE(entry.time, 12);
+      header.writeUInt16LE(entry.date, 14);
+      header.writeUInt32LE(entry.crc, 16);
+      header.writeUInt32LE(entry.compressedSize, 20);
+      header.writeUInt32LE(entry.size, 24);
+      header.writeUInt16LE(entry.name.length, 28);
+      // extra, comentário, disco, atributos internos/externos = 0
+      header.writeUInt32LE(entry.offset, 42);
+      return Buffer.concat([header, entry.name]);
+    });
+
+    const centralDirectory = Buffer.concat(centralHeaders);
+    const end = Buffer.alloc(22);
+    end.writeUInt32LE(END_OF_CENTRAL_DIRECTORY_SIGNATURE, 0);
+    end.writeUInt16LE(this.entries.length, 8);
+    end.writeUInt16LE(this.entries.length, 10);
+    end.writeUInt32LE(centralDirectory.length, 12);
+    end.writeUInt32LE(this.offset, 16);
+
+    this.entries = [];
+    this.names.clear();
+
+    return Buffer.concat([centralDirectory, end]);
+  }
+
+  get fileCount(): number {
+    return this.entries.length;
+  }
+
+  private uniqueName(fileName: string): string {
+    let candidate = fileName;
+    let suffix = 1;
+
+    while (this.names.has(candidate)) {
+      const dot = fileName.lastIndexOf('.');
+      candidate =
+        dot > 0
+          ? `${fileName.slice(0, dot)}_${suffix}${fileName.slice(dot)}`
+          : `${fileName}_${suffix}`;
+      suffix++;
+    }
+
+    this.names.add(candidate);
+    return candidate;
+  }
+}
@@ -0,0 +1,83 @@
+/**
+ * Corrida "hedged" entre provedores equivalentes
+ *
+ * O primeiro provedor começa imediatamente; cada provedor seguinte começa quando o anterior
+ * falha ou quando o atraso de hedge passa sem resposta. A primeira resposta bem-sucedida vence
+ * e as requisições restantes são abortadas. Se todos falharem, rejeita com a lista de erros.
+ */
+
+export type HedgedAttempt<T> = (signal: AbortSignal) => Promise<T>;
+
+export interface HedgedRaceOptions {
+  hedgeDelayMs: number;
+  timeoutMs: number; // timeout de cada tentativa
+}
+
+export class HedgedRaceError extends Error {
+  constructor(public readonly errors: unknown[]) {
+    super('Todos os provedores falharam');
+    this.name = 'HedgedRaceError';
+  }
+}
+
+export function hedgedRace<T>(
+  attempts: HedgedAttempt<T>[],
+  { hedgeDelayMs, timeoutMs }: HedgedRaceOptions
+): Promise<T> {
+  return new Promise<T>((resolve, reject) => {
+    const controllers: AbortController[] = [];
+    const timers: ReturnType<typeof setTimeout>[] = [];
+    let hedgeTimer: ReturnType<typeof setTimeout> | undefined;
+    const errors: unknown[] = [];
+    let started = 0;
+    let settled = false;
+
+    const finish = () => {
+      settled = true;
+      clearTimeout(hedgeTimer);
+      timers.forEach(timer => clearTimeout(timer));
+      controllers.forEach(controller => controller.abort());
+    };
+
+    const startNext = () => {
+      if (settled || started >= attempts.length) return;
+      clearTimeout(hedgeTimer);
+
+      const index = started++;
+      const controller = new AbortController();
+      controllers.push(controller);
+      timers.push(setTimeout(() => controller.abort(), timeoutMs));
+
+      // Hedge: não esperar mais que hedgeDelayMs para acionar o próximo provedor
+      if (started < attempts.length) {
+        hedgeTimer = setTimeout(startNext, hedgeDelayMs);
+      }
+
+      attempts[index](controller.signal).then(
+        value => {
+          if (settled) return;
+          finish();
+          resolve(value);
+        },
+        error => {
+          if (settled) return;
+          errors.push(error);
+
+          if (errors.length === attempts.length) {
+            finish();
+            reject(new HedgedRaceError(errors));
+            return;
+          }
+          // Falhou antes do hedge: acionar o próximo agora
+          if (errors.length === started) startNext();
+        }
+      );
+    };
+
+    if (attempts.length === 0) {
+      reject(new HedgedRaceError([]));
+      return;
+    }
+    startNext();
+  });
+}
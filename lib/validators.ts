@@ -1,5 +1,7 @@
 import { cnpj, cpf } from 'cpf-cnpj-validator';
 
+import { HedgedRaceError, hedgedRace } from '@/lib/utils/hedged-race';
+
 /**
  * Implementar debounce para evitar muitas chamadas de API
  */
@@ -178,7 +180,98 @@ export const validarCEP = (cep: string): boolean => {
   return cleanCep.length === 8;
 };
 
-// Buscar endereço via CEP
+// Consulta de CEP/CNPJ: provedores em corrida hedged (ver lib/utils/hedged-race.ts)
+const CEP_LOOKUP = { hedgeDelayMs: 1500, timeoutMs: 8000 };
+const CNPJ_LOOKUP = { hedgeDelayMs: 2000, timeoutMs: 10000 };
+
+export const CNPJ_NAO_ENCONTRADO = 'CNPJ não encontrado';
+
+// "Não encontrado" de um provedor rejeita a tentativa para que a corrida continue esperando os
+// demais; o CEP só é dado como inexistente quando todos os provedores concordam
+class CEPNaoEncontradoError extends Error {
+  constructor() {
+    super('CEP não encontrado');
+  }
+}
+
+// ViaCEP: { erro: true } significa CEP inexistente
+const consultarViaCEP = async (
+  cleanCep: string,
+  signal: AbortSignal
+): Promise<ViaCepResponse> => {
+  const response = await fetch(`https://viacep.com.br/ws/${cleanCep}/json/`, { signal });
+
+  if (!response.ok) {
+    throw new Error('Erro ao buscar CEP');
+  }
+
+  const data: ViaCepResponse = await response.json();
+  if (data.erro) {
+    throw new CEPNaoEncontradoError();
+  }
+  return data;
+};
+
+// BrasilAPI (v2): 404 significa CEP inexistente
+const consultarCEPBrasilAPI = async (
+  cleanCep: string,
+  signal: AbortSignal
+): Promise<ViaCepResponse> => {
+  const response = await fetch(`https://brasilapi.com.br/api/cep/v2/${cleanCep}`, { signal });
+
+  if (response.status === 404) {
+    throw new CEPNaoEncontradoError();
+  }
+  if (!response.ok) {
+    throw new Error(`BrasilAPI retornou ${response.status}`);
+  }
+
+  const data = await response.json();
+  return {
+    cep: formatarCEP(data.cep || cleanCep),
+    logradouro: data.street || '',
+    complemento: '',
+    bairro: data.neighborhood || '',
+    localidade: data.city || '',
+    uf: data.state || '',
+  };
+};
+
+/**
+ * Consulta de CEP nos provedores (ViaCEP, com BrasilAPI como hedge)
+ * Retorna null só quando todos os provedores dizem que o CEP não existe; lança erro se algum
+ * deles não respondeu (o resultado seria incerto)
+ */
+export const consultarCEP = async (cep: string): Promise<ViaCepResponse | null> => {
+  const cleanCep = cep.replace(/\D/g, '');
+
+  if (!validarCEP(cleanCep)) {
+    throw new Error('CEP inválido');
+  }
+
+  try {
+    return await hedgedRace(
+      [
+        signal => consultarViaCEP(cleanCep, signal),
+        signal => consultarCEPBrasilAPI(cleanCep, signal),
+      ],
+      CEP_LOOKUP
+    );
+  } catch (error) {
+    const errors = error instanceof HedgedRaceError ? error.errors : [error];
+
+    if (errors.length > 0 && errors.every(item => item instanceof CEPNaoEncontradoError)) {
+      return null;
+    }
+    throw error;
+  }
+};
+
+/**
+ * Buscar endereço via CEP
+ * - No cliente: Chama a API Route interna (/api/cep/...), que mantém cache das consultas
+ * - No servidor: Consulta os provedores diretamente
+ */
 export const buscarEnderecoPorCEP = async (
   cep: string
 ): Promise<ViaCepResponse | null> => {
@@ -189,7 +282,11 @@ export const buscarEnderecoPorCEP = async (
       throw new Error('CEP inválido');
     }
 
-    const response = await fetch(`https://viacep.com.br/ws/${cleanCep}/json/`);
+    if (typeof window === 'undefined') {
+      return await consultarCEP(cleanCep);
+    }
+
+    const response = await fetch(`/api/cep/${cleanCep}`);
 
     if (!response.ok) {
       throw new Error('Erro ao buscar CEP');
@@ -208,9 +305,135 @@ export const buscarEnderecoPorCEP = async (
   }
 };
 
+// Resposta da BrasilAPI; 404 não é confiável (base desatualizada), então vira falha e o
+// resultado fica com a ReceitaWS
+const consultarCNPJBrasilAPI = async (
+  cleanCnpj: string,
+  signal: AbortSignal
+): Promise<CNPJResponse> => {
+  console.info('🔍 Consultando BrasilAPI...');
+  const response = await fetch(
+    `https://brasilapi.com.br/api/cnpj/v1/${cleanCnpj}`,
+    { signal }
+  );
+
+  if (!response.ok) {
+    if (response.status !== 404) {
+      console.warn(`⚠️ BrasilAPI retornou ${response.status}`);
+    }
+    throw new Error(`BrasilAPI retornou ${response.status}`);
+  }
+
+  const data = await response.json();
+  console.info('✅ BrasilAPI respondeu com sucesso');
+
+  return {
+    cnpj: data.cnpj,
+    nome: data.razao_social || data.nome_fantasia || '',
+    fantasia: data.nome_fantasia,
+    situacao: data.descricao_situacao_cadastral || 'Ativo',
+    atividade_principal: data.cnae_fiscal
+      ? [
+        {
+          code: data.cnae_fiscal.codigo,
+          text: data.cnae_fiscal.descricao,
+        },
+      ]
+      : [],
+    endereco: {
+      logradouro: data.logradouro || '',
+      numero: data.numero || '',
+      complemento: data.complemento || '',
+      bairro: data.bairro || '',
+      municipio: data.municipio || '',
+      uf: data.uf || '',
+      cep: data.cep ? data.cep.replace(/\D/g, '') : '',
+    },
+    telefone: data.ddd_telefone_1
+      ? `(${data.ddd_telefone_1.substring(0, 2)}) ${data.ddd_telefone_1.substring(2)}`
+      : '',
+    email: data.email || '',
+  };
+};
+
+class LimiteConsultasError extends Error {}
+
+// "Não encontrado" da ReceitaWS rejeita a tentativa para que a corrida continue esperando a
+// BrasilAPI; a resposta só é usada se nenhum provedor encontrar o CNPJ
+class CNPJNaoEncontradoError extends Error {
+  constructor(public readonly resposta: CNPJResponse) {
+    super(resposta.message || CNPJ_NAO_ENCONTRADO);
+  }
+}
+
+const consultarCNPJReceitaWS = async (
+  cleanCnpj: string,
+  signal: AbortSignal
+): Promise<CNPJResponse> => {
+  console.info('🔍 Consultando ReceitaWS...');
+  const response = await fetch(
+    `https://www.receitaws.com.br/v1/cnpj/${cleanCnpj}`,
+    { signal }
+  );
+
+  if (!response.ok) {
+    if (response.status === 404) {
+      throw new CNPJNaoEncontradoError({
+        cnpj: cleanCnpj,
+        nome: '',
+        situacao: CNPJ_NAO_ENCONTRADO,
+        atividade_principal: [],
+        erro: true,
+        message: 'CNPJ não encontrado na base de dados',
+      });
+    }
+    if (response.status === 429) {
+      throw new LimiteConsultasError('ReceitaWS: limite de consultas atingido');
+    }
+    throw new Error(`HTTP ${response.status}`);
+  }
+
+  const data = await response.json();
+
+  // Verificar se há erro na resposta
+  if (data.status === 'ERROR') {
+    throw new CNPJNaoEncontradoError({
+      cnpj: cleanCnpj,
+      nome: '',
+      situacao: CNPJ_NAO_ENCONTRADO,
+      atividade_principal: [],
+      erro: true,
+      message: data.message || 'CNPJ não encontrado',
+    });
+  }
+
+  console.info('✅ ReceitaWS respondeu com sucesso');
+
+  // Mapear dados da ReceitaWS para nossa interface
+  return {
+    cnpj: data.cnpj,
+    nome: data.nome || '',
+    fantasia: data.fantasia,
+    situacao: data.situacao || 'Ativo',
+    atividade_principal: data.atividade_principal || [],
+    endereco: {
+      logradouro: data.logradouro || '',
+      numero: data.numero || '',
+      complemento: data.complemento || '',
+      bairro: data.bairro || '',
+      municipio: data.municipio || '',
+      uf: data.uf || '',
+      cep: data.cep ? data.cep.replace(/\D/g, '') : '',
+    },
+    telefone: data.telefone || '',
+    email: data.email || '',
+  };
+};
+
 /**
  * Serviço interno de busca de CNPJ (Server-side ou via API Route)
- * Tenta BrasilAPI primeiro, depois ReceitaWS
+ * BrasilAPI primeiro; ReceitaWS entra se ela falhar ou demorar (corrida hedged)
+ * "Não encontrado" só é devolvido quando nenhum provedor encontrou o CNPJ
  */
 export const buscarCNPJService = async (
   cnpjValue: string
@@ -226,124 +449,34 @@ export const buscarCNPJService = async (
     return null;
   }
 
-  // TENTATIVA 1: BrasilAPI
   try {
-    console.info('🔍 Tentando BrasilAPI...');
-    const response = await fetch(
-      `https://brasilapi.com.br/api/cnpj/v1/${cleanCnpj}`,
-      { signal: AbortSignal.timeout(8000) }
+    return await hedgedRace(
+      [
+        signal => consultarCNPJBrasilAPI(cleanCnpj, signal),
+        signal => consultarCNPJReceitaWS(cleanCnpj, signal),
+      ],
+      CNPJ_LOOKUP
     );
-
-    if (response.ok) {
-      const data = await response.json();
-      console.info('✅ BrasilAPI respondeu com sucesso');
-
-      return {
-        cnpj: data.cnpj,
-        nome: data.razao_social || data.nome_fantasia || '',
-        fantasia: data.nome_fantasia,
-        situacao: data.descricao_situacao_cadastral || 'Ativo',
-        atividade_principal: data.cnae_fiscal
-          ? [
-            {
-              code: data.cnae_fiscal.codigo,
-              text: data.cnae_fiscal.descricao,
-            },
-          ]
-          : [],
-        endereco: {
-          logradouro: data.logradouro || '',
-          numero: data.numero || '',
-          complemento: data.complemento || '',
-          bairro: data.bairro || '',
-          municipio: data.municipio || '',
-          uf: data.uf || '',
-          cep: data.cep ? data.cep.replace(/\D/g, '') : '',
-        },
-        telefone: data.ddd_telefone_1
-          ? `(${data.ddd_telefone_1.substring(0, 2)}) ${data.ddd_telefone_1.substring(2)}`
-          : '',
-        email: data.email || '',
-      };
-    }
-
-    // Se não for 404, logar o erro mas continuar para fallback
-    if (response.status !== 404) {
-      console.warn(`⚠️ BrasilAPI retornou ${response.status}, tentando fallback...`);
-    }
   } catch (error) {
-    console.warn('⚠️ BrasilAPI falhou:', { error: error instanceof Error ? error.message : 'Erro desconhecido' });
-  }
-
-  // TENTATIVA 2: ReceitaWS (Fallback)
-  try {
-    console.info('🔍 Tentando ReceitaWS (fallback)...');
-    const response = await fetch(
-      `https://www.receitaws.com.br/v1/cnpj/${cleanCnpj}`,
-      { signal: AbortSignal.timeout(10000) }
-    );
+    const errors = error instanceof HedgedRaceError ? error.errors : [error];
 
-    if (!response.ok) {
-      if (response.status === 404) {
-        return {
-          cnpj: cleanCnpj,
-          nome: '',
-          situacao: 'CNPJ não encontrado',
-          atividade_principal: [],
-          erro: true,
-          message: 'CNPJ não encontrado na base de dados',
-        };
-      }
-      if (response.status === 429) {
-        return {
-          cnpj: cleanCnpj,
-          nome: '',
-          situacao: 'Limite de consultas atingido',
-          atividade_principal: [],
-          erro: true,
-          message: 'Aguarde alguns segundos e tente novamente',
-        };
-      }
-      throw new Error(`HTTP ${response.status}`);
+    const naoEncontrado = errors.find(item => item instanceof CNPJNaoEncontradoError);
+    if (naoEncontrado instanceof CNPJNaoEncontradoError) {
+      return naoEncontrado.resposta;
     }
 
-    const data = await response.json();
+    console.error('❌ Nenhum provedor de CNPJ respondeu:', errors);
 
-    // Verificar se há erro na resposta
-    if (data.status === 'ERROR') {
+    if (errors.some(item => item instanceof LimiteConsultasError)) {
       return {
         cnpj: cleanCnpj,
         nome: '',
-        situacao: 'CNPJ não encontrado',
+        situacao: 'Limite de consultas atingido',
         atividade_principal: [],
         erro: true,
-        message: data.message || 'CNPJ não encontrado',
+        message: 'Aguarde alguns segundos e tente novamente',
       };
     }
-
-    console.info('✅ ReceitaWS respondeu com sucesso');
-
-    // Mapear dados da ReceitaWS para nossa interface
-    return {
-      cnpj: data.cnpj,
-      nome: data.nome || '',
-      fantasia: data.fantasia,
-      situacao: data.situacao || 'Ativo',
-      atividade_principal: data.atividade_principal || [],
-      endereco: {
-        logradouro: data.logradouro || '',
-        numero: data.numero || '',
-        complemento: data.complemento || '',
-        bairro: data.bairro || '',
-        municipio: data.municipio || '',
-        uf: data.uf || '',
-        cep: data.cep ? data.cep.replace(/\D/g, '') : '',
-      },
-      telefone: data.telefone || '',
-      email: data.email || '',
-    };
-  } catch (error) {
-    console.error('❌ ReceitaWS também falhou:', error instanceof Error ? error : new Error(String(error)));
   }
 
   // Se ambas as APIs falharam
@@ -0,0 +1,109 @@
+-- Migração: Criar trilha de auditoria particionada por mês
+-- Descrição: Registro durável de quem fez o quê (eventos de segurança, mudanças de status,
+-- ações administrativas). Particionamento por intervalo em occurred_at mantém os índices
+-- de cada mês pequenos e permite descartar meses antigos com DROP TABLE.
+
+CREATE TABLE IF NOT EXISTS audit_logs (
+    id UUID NOT NULL DEFAULT gen_random_uuid(),
+    occurred_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    actor_id VARCHAR(255),
+    actor_type VARCHAR(50),
+    action VARCHAR(100) NOT NULL,
+    resource_type VARCHAR(100),
+    resource_id VARCHAR(255),
+    ip VARCHAR(64),
+    user_agent TEXT,
+    endpoint VARCHAR(500),
+    method VARCHAR(10),
+    severity VARCHAR(20),
+    details JSONB,
+    PRIMARY KEY (id, occurred_at)
+) PARTITION BY RANGE (occurred_at);
+
+-- Partição padrão para linhas fora dos meses já criados
+CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT;
+
+-- Índices no pai são criados em todas as partições
+CREATE INDEX IF NOT EXISTS idx_audit_logs_actor_time
+ON audit_logs (actor_id, occurred_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_audit_logs_resource_time
+ON audit_logs (resource_type, resource_id, occurred_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_audit_logs_ip_time
+ON audit_logs (ip, occurred_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_audit_logs_time
+ON audit_logs (occurred_at DESC, id DESC);
+
+-- Cria (se necessário) a partição mensal que contém a data informada
+-- Linhas do mês que já caíram na partição DEFAULT (mês sem partição no momento da gravação)
+-- impediriam o CREATE TABLE ... PARTITION OF; nesse caso a partição é criada avulsa, recebe as
+-- linhas movidas da DEFAULT e só então é anexada
+CREATE OR REPLACE FUNCTION ensure_audit_log_partition(target DATE)
+RETURNS VOID AS $$
+DECLARE
+    month_start DATE := date_trunc('month', target)::DATE;
+    month_end DATE := (date_trunc('month', target) + INTERVAL '1 month')::DATE;
+    partition_name TEXT := 'audit_logs_' || to_char(month_start, 'YYYY_MM');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    -- Serializar criações concorrentes (várias instâncias gravando o mesmo mês novo)
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_audit_log_partition'));
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    IF NOT EXISTS (
+        SELECT 1 FROM audit_logs_default
+        WHERE occurred_at >= month_start AND occurred_at < month_end
+    ) THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+            partition_name, month_start, month_end
+        );
+        RETURN;
+    END IF;
+
+    -- Bloquear gravações na DEFAULT até o fim da transação (nenhuma linha do mês entra no meio)
+    LOCK TABLE audit_logs_default IN ACCESS EXCLUSIVE MODE;
+
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE audit_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        partition_name
+    );
+    EXECUTE format(
+        'WITH moved AS (
+            DELETE FROM audit_logs_default
+            WHERE occurred_at >= %L AND occurred_at < %L
+            RETURNING *
+        )
+        INSERT INTO %I SELECT * FROM moved',
+        month_start, month_end, partition_name
+    );
+    EXECUTE format(
+        'ALTER TABLE audit_logs ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, month_start, month_end
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Reparar meses que já acumularam linhas na DEFAULT
+SELECT ensure_audit_log_partition(month_start)
+FROM (
+    SELECT DISTINCT date_trunc('month', occurred_at)::DATE AS month_start
+    FROM audit_logs_default
+) AS pending;
+
+-- Mês atual e o próximo
+SELECT ensure_audit_log_partition(CURRENT_DATE);
+SELECT ensure_audit_log_partition((CURRENT_DATE + INTERVAL '1 month')::DATE);
+
+COMMENT ON TABLE audit_logs IS 'Trilha de auditoria particionada por mês (occurred_at)';
+COMMENT ON COLUMN audit_logs.actor_id IS 'Usuário responsável pela ação (quando autenticado)';
+COMMENT ON COLUMN audit_logs.action IS 'Ação executada, ex.: security.failed_login, ordem_servico.status_changed';
+COMMENT ON COLUMN audit_logs.resource_type IS 'Tipo do recurso afetado, ex.: ordem_servico';
+COMMENT ON COLUMN audit_logs.details IS 'Dados adicionais da ação em formato JSON';
@@ -0,0 +1,144 @@
+-- Migração: Contadores pré-agregados de comunicações por cliente e canal
+-- Descrição: O painel de estatísticas lê contadores (total, enviados, por dia) em vez de
+-- contar comunicacoes_cliente. Um trigger mantém os contadores a cada inserção, exclusão ou
+-- mudança de status/canal/cliente/data, qualquer que seja o código que escreveu a linha.
+-- Escopo: cliente_portal_id da comunicação; sem cliente, 'sem_cliente:<n>' (8 fatias escolhidas
+-- pelo backend, para que os workers da fila não disputem a mesma linha). Não há linha de total
+-- geral: o total é a soma dos escopos. A linha sentinela ('#', 'carga') indica que a carga
+-- inicial e os triggers foram aplicados; sem ela o serviço agrega a partir do histórico.
+-- A migração é idempotente: reexecutá-la recarrega os contadores.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS comunicacoes_estatisticas (
+    escopo VARCHAR(64) NOT NULL,
+    tipo VARCHAR(20) NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    enviados INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (escopo, tipo)
+);
+
+CREATE TABLE IF NOT EXISTS comunicacoes_estatisticas_diarias (
+    escopo VARCHAR(64) NOT NULL,
+    tipo VARCHAR(20) NOT NULL,
+    dia DATE NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    enviados INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (escopo, dia, tipo)
+);
+
+-- Aplica um delta nos contadores do escopo informado (ou numa fatia de 'sem_cliente')
+CREATE OR REPLACE FUNCTION aplicar_delta_comunicacao(
+    p_escopo VARCHAR,
+    p_tipo VARCHAR,
+    p_dia DATE,
+    p_total INTEGER,
+    p_enviados INTEGER
+)
+RETURNS VOID AS $$
+DECLARE
+    v_escopo VARCHAR := COALESCE(p_escopo, 'sem_cliente:' || (pg_backend_pid() % 8));
+BEGIN
+    INSERT INTO comunicacoes_estatisticas (escopo, tipo, total, enviados)
+    VALUES (v_escopo, p_tipo, p_total, p_enviados)
+    ON CONFLICT (escopo, tipo) DO UPDATE
+    SET total = comunicacoes_estatisticas.total + EXCLUDED.total,
+        enviados = comunicacoes_estatisticas.enviados + EXCLUDED.enviados,
+        updated_at = NOW();
+
+    INSERT INTO comunicacoes_estatisticas_diarias (escopo, tipo, dia, total, enviados)
+    VALUES (v_escopo, p_tipo, p_dia, p_total, p_enviados)
+    ON CONFLICT (escopo, dia, tipo) DO UPDATE
+    SET total = comunicacoes_estatisticas_diarias.total + EXCLUDED.total,
+        enviados = comunicacoes_estatisticas_diarias.enviados + EXCLUDED.enviados;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION atualizar_estatisticas_comunicacao()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Mesma chave (canal, cliente, dia): só o contador de enviados muda
+    IF TG_OP = 'UPDATE'
+       AND OLD.tipo = NEW.tipo
+       AND OLD.cliente_portal_id IS NOT DISTINCT FROM NEW.cliente_portal_id
+       AND (OLD.data_envio AT TIME ZONE 'UTC')::DATE = (NEW.data_envio AT TIME ZONE 'UTC')::DATE THEN
+        PERFORM aplicar_delta_comunicacao(
+            NEW.cliente_portal_id::VARCHAR,
+            NEW.tipo,
+            (NEW.data_envio AT TIME ZONE 'UTC')::DATE,
+            0,
+            (NEW.status = 'enviado')::INTEGER - (OLD.status = 'enviado')::INTEGER
+        );
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM aplicar_delta_comunicacao(
+            OLD.cliente_portal_id::VARCHAR,
+            OLD.tipo,
+            (OLD.data_envio AT TIME ZONE 'UTC')::DATE,
+            -1,
+            -(OLD.status = 'enviado')::INTEGER
+        );
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM aplicar_delta_comunicacao(
+            NEW.cliente_portal_id::VARCHAR,
+            NEW.tipo,
+            (NEW.data_envio AT TIME ZONE 'UTC')::DATE,
+            1,
+            (NEW.status = 'enviado')::INTEGER
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Bloqueia escritas durante a carga inicial para que nenhuma linha fique fora dos contadores
+LOCK TABLE comunicacoes_cliente IN SHARE ROW EXCLUSIVE MODE;
+
+TRUNCATE comunicacoes_estatisticas, comunicacoes_estatisticas_diarias;
+
+-- Carga inicial a partir do histórico existente
+INSERT INTO comunicacoes_estatisticas_diarias (escopo, tipo, dia, total, enviados)
+SELECT COALESCE(cliente_portal_id::VARCHAR, 'sem_cliente:0'), tipo,
+       (data_envio AT TIME ZONE 'UTC')::DATE,
+       COUNT(*), COUNT(*) FILTER (WHERE status = 'enviado')
+FROM comunicacoes_cliente
+GROUP BY 1, 2, 3;
+
+INSERT INTO comunicacoes_estatisticas (escopo, tipo, total, enviados)
+SELECT escopo, tipo, SUM(total), SUM(enviados)
+FROM comunicacoes_estatisticas_diarias
+GROUP BY escopo, tipo;
+
+-- Sentinela: contadores carregados e mantidos por trigger
+INSERT INTO comunicacoes_estatisticas (escopo, tipo) VALUES ('#', 'carga');
+
+DROP TRIGGER IF EXISTS trg_estatisticas_comunicacao_insert_delete ON comunicacoes_cliente;
+DROP TRIGGER IF EXISTS trg_estatisticas_comunicacao_update ON comunicacoes_cliente;
+
+CREATE TRIGGER trg_estatisticas_comunicacao_insert_delete
+    AFTER INSERT OR DELETE ON comunicacoes_cliente
+    FOR EACH ROW EXECUTE FUNCTION atualizar_estatisticas_comunicacao();
+
+-- Só dispara quando a linha entra/sai de 'enviado' ou muda de chave: as transições
+-- pendente/processando da fila de envio não tocam nos contadores
+CREATE TRIGGER trg_estatisticas_comunicacao_update
+    AFTER UPDATE OF status, tipo, cliente_portal_id, data_envio ON comunicacoes_cliente
+    FOR EACH ROW
+    WHEN (
+        (OLD.status = 'enviado') IS DISTINCT FROM (NEW.status = 'enviado')
+        OR OLD.tipo IS DISTINCT FROM NEW.tipo
+        OR OLD.cliente_portal_id IS DISTINCT FROM NEW.cliente_portal_id
+        OR OLD.data_envio IS DISTINCT FROM NEW.data_envio
+    )
+    EXECUTE FUNCTION atualizar_estatisticas_comunicacao();
+
+COMMIT;
+
+COMMENT ON TABLE comunicacoes_estatisticas IS 'Contadores de comunicações por escopo (cliente_portal_id ou fatia sem_cliente:<n>) e canal, mantidos por trigger; total geral = soma dos escopos';
+COMMENT ON TABLE comunicacoes_estatisticas_diarias IS 'Contadores diários de comunicações por escopo e canal (data_envio em UTC), usados para janelas recentes';
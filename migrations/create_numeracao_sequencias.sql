@@ -0,0 +1,34 @@
+-- Migração: Contadores de numeração de clientes e ordens de serviço
+-- Descrição: numero_cliente (CL{ano}{nnnnnn}) e numero_os (OS{nnnnnn}) passam a vir de um
+-- contador incrementado atomicamente em vez de "maior número existente + 1", que custava uma
+-- consulta ordenada por inserção e gerava colisões em cadastros simultâneos.
+-- Chaves: 'cliente:{ano}' e 'ordem_servico'. Chaves sem linha são criadas pela aplicação a
+-- partir do maior número existente; o backfill abaixo apenas adianta esse passo.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS numeracao_sequencias (
+    chave VARCHAR(50) PRIMARY KEY,
+    valor BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Clientes: um contador por ano presente em numero_cliente
+INSERT INTO numeracao_sequencias (chave, valor)
+SELECT 'cliente:' || SUBSTRING(numero_cliente FROM 3 FOR 4),
+       MAX(SUBSTRING(numero_cliente FROM 7)::BIGINT)
+FROM clientes
+WHERE numero_cliente ~ '^CL[0-9]{4}[0-9]+$'
+GROUP BY SUBSTRING(numero_cliente FROM 3 FOR 4)
+ON CONFLICT (chave) DO UPDATE
+SET valor = GREATEST(numeracao_sequencias.valor, EXCLUDED.valor);
+
+-- Ordens de serviço: contador único
+INSERT INTO numeracao_sequencias (chave, valor)
+SELECT 'ordem_servico', COALESCE(MAX(SUBSTRING(numero_os FROM 3)::BIGINT), 0)
+FROM ordens_servico
+WHERE numero_os ~ '^OS[0-9]+$'
+ON CONFLICT (chave) DO UPDATE
+SET valor = GREATEST(numeracao_sequencias.valor, EXCLUDED.valor);
+
+COMMIT;
@@ -0,0 +1,72 @@
+-- Migração: Versão dos dados de origem dos relatórios
+-- Descrição: computeDataVersion (lib/services/report-generators.ts) lê um contador por tabela
+-- em vez de count + max(updated_at), que não enxerga edições feitas sem tocar em updated_at.
+-- Um trigger por comando incrementa o contador a cada INSERT/UPDATE/DELETE/TRUNCATE, qualquer
+-- que seja o código que escreveu. O contador é dividido em fatias (slot) escolhidas pelo
+-- backend, para que transações concorrentes não disputem a mesma linha; a versão é a soma.
+-- Também passa a manter updated_at nas tabelas de origem (BEFORE UPDATE). status_historico
+-- (lido pelo relatório técnico) não tem updated_at: recebe só o contador.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS relatorios_versao_dados (
+    tabela VARCHAR(64) NOT NULL,
+    slot SMALLINT NOT NULL,
+    versao BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (tabela, slot)
+);
+
+-- 16 fatias por tabela; as linhas existem desde a migração (sentinela de inicialização)
+INSERT INTO relatorios_versao_dados (tabela, slot)
+SELECT tabela, slot
+FROM unnest(ARRAY['ordens_servico', 'clientes', 'equipamentos', 'status_historico']) AS tabela,
+     generate_series(0, 15) AS slot
+ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION incrementar_versao_dados()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE relatorios_versao_dados
+    SET versao = versao + 1
+    WHERE tabela = TG_TABLE_NAME
+      AND slot = pg_backend_pid() % 16;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION manter_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    v_tabela TEXT;
+BEGIN
+    FOREACH v_tabela IN ARRAY ARRAY['ordens_servico', 'clientes', 'equipamentos', 'status_historico'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_versao_dados ON %I', v_tabela);
+        EXECUTE format(
+            'CREATE TRIGGER trg_versao_dados AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION incrementar_versao_dados()',
+            v_tabela
+        );
+    END LOOP;
+
+    FOREACH v_tabela IN ARRAY ARRAY['ordens_servico', 'clientes', 'equipamentos'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_updated_at ON %I', v_tabela);
+        EXECUTE format(
+            'CREATE TRIGGER trg_updated_at BEFORE UPDATE ON %I '
+            'FOR EACH ROW EXECUTE FUNCTION manter_updated_at()',
+            v_tabela
+        );
+    END LOOP;
+END;
+$$;
+
+COMMIT;
+
+COMMENT ON TABLE relatorios_versao_dados IS 'Contadores de escrita por tabela de origem dos relatórios (soma das fatias), mantidos por trigger';
@@ -60,6 +60,7 @@ const isPublicRoute = createRouteMatcher([
   '/api/auth/cliente/login',
   '/api/webhooks(.*)',
   '/api/health',
+  '/api/metrics/prometheus', // protegido por METRICS_SCRAPE_TOKEN (fechado sem token fora de development)
   '/api/cep(.*)',
   '/api/cnpj(.*)',
   '/api/cpf(.*)',
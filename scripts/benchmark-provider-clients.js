@@ -0,0 +1,257 @@
+#!/usr/bin/env node
+/**
+ * Benchmark de conexões com provedores (Twilio via HTTP e SMTP)
+ *
+ * Sobe servidores locais que imitam os provedores (com latência de handshake simulada) e compara
+ * uma conexão por envio com os serviços reais da aplicação apontados para os stand-ins:
+ *   - HTTP: fetch com Connection: close x smsService.sendSMS (providerHttpClient, TWILIO_API_URL)
+ *   - SMTP: nodemailer sem pool x EmailService.sendEmail (pool SMTP_POOL_MAX_CONNECTIONS)
+ *
+ * Os serviços TypeScript de lib/ são carregados direto do código-fonte. Requer `prisma generate`
+ * e o .env da aplicação (DATABASE_URL): as métricas dos envios são gravadas como em produção.
+ *
+ * Uso: node scripts/benchmark-provider-clients.js [envios] [concorrência]
+ */
+
+const fs = require('fs');
+const http = require('http');
+const Module = require('module');
+const net = require('net');
+const path = require('path');
+
+require('dotenv').config();
+
+const TOTAL = Number(process.argv[2]) || 500;
+const CONCURRENCY = Number(process.argv[3]) || 10;
+// Custo simulado de abrir uma conexão (TLS + autenticação no provedor real)
+const HANDSHAKE_MS = 20;
+const RESPONSE_MS = 5;
+
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+
+// 🔧 Carrega os módulos TypeScript de lib/ sem build: transpila com o `typescript` do projeto e
+// resolve o alias @/ como o tsconfig; 'server-only' usa o módulo vazio (condição react-server)
+function registerTypeScript() {
+  const ts = require('typescript');
+  const root = path.resolve(__dirname, '..');
+
+  const originalResolve = Module._resolveFilename;
+  Module._resolveFilename = function (request, ...rest) {
+    if (request === 'server-only') {
+      request = 'server-only/empty';
+    } else if (request.startsWith('@/')) {
+      request = path.join(root, request.slice(2));
+    }
+    return originalResolve.call(this, request, ...rest);
+  };
+
+  Module._extensions['.ts'] = (module, filename) => {
+    const { outputText } = ts.transpileModule(fs.readFileSync(filename, 'utf8'), {
+      fileName: filename,
+      compilerOptions: {
+        module: ts.ModuleKind.CommonJS,
+        target: ts.ScriptTarget.ES2022,
+        esModuleInterop: true,
+      },
+    });
+    module._compile(outputText, filename);
+  };
+}
+
+// 🌐 Stand-in HTTP (Graph API / Twilio): conta conexões abertas
+function startHttpStandIn() {
+  const stats = { connections: 0 };
+  const server = http.createServer(async (req, res) => {
+    req.resume();
+    await sleep(RESPONSE_MS);
+    res.setHeader('Content-Type', 'application/json');
+    res.end(JSON.stringify({ sid: 'SM123', messages: [{ id: 'wamid.123' }] }));
+  });
+
+  server.on('connection', socket => {
+    stats.connections++;
+    socket.pause();
+    setTimeout(() => socket.resume(), HANDSHAKE_MS);
+  });
+
+  return new Promise(resolve => {
+    server.listen(0, '127.0.0.1', () => resolve({ server, stats, port: server.address().port }));
+  });
+}
+
+// 📧 Stand-in SMTP mínimo: EHLO, MAIL, RCPT, DATA, RSET, QUIT
+function startSmtpStandIn() {
+  const stats = { connections: 0, messages: 0 };
+  const server = net.createServer(socket => {
+    stats.connections++;
+    let buffer = '';
+    let inData = false;
+
+    setTimeout(() => socket.write('220 standin ESMTP\r\n'), HANDSHAKE_MS);
+
+    socket.on('data', chunk => {
+      buffer += chunk.toString();
+      let index;
+      while ((index = buffer.indexOf('\r\n')) !== -1) {
+        const line = buffer.slice(0, index);
+        buffer = buffer.slice(index + 2);
+
+        if (inData) {
+          if (line === '.') {
+            inData = false;
+            stats.messages++;
+            setTimeout(() => socket.write('250 OK queued\r\n'), RESPONSE_MS);
+          }
+          continue;
+        }
+
+        const command = line.slice(0, 4).toUpperCase();
+        if (command === 'EHLO') {
+          socket.write('250-standin\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n');
+        } else if (command === 'AUTH') {
+          socket.write('235 2.7.0 Authentication successful\r\n');
+        } else if (command === 'DATA') {
+          inData = true;
+          socket.write('354 End data with <CR><LF>.<CR><LF>\r\n');
+        } else if (command === 'QUIT') {
+          socket.end('221 Bye\r\n');
+        } else {
+          socket.write('250 OK\r\n');
+        }
+      }
+    });
+    socket.on('error', () => {});
+  });
+
+  return new Promise(resolve => {
+    server.listen(0, '127.0.0.1', () => resolve({ server, stats, port: server.address().port }));
+  });
+}
+
+// Executa `total` envios com `concurrency` envios simultâneos
+async function run(total, concurrency, send) {
+  let next = 0;
+  const startTime = Date.now();
+
+  await Promise.all(
+    Array.from({ length: concurrency }, async () => {
+      while (next < total) {
+        next++;
+        await send();
+      }
+    })
+  );
+
+  const elapsedMs = Date.now() - startTime;
+  return { elapsedMs, perSecond: Math.round((total / elapsedMs) * 1000) };
+}
+
+function report(label, result, connections) {
+  console.log(
+    `   ${label.padEnd(28)} ${String(result.perSecond).padStart(6)} envios/s` +
+      `   ${String(result.elapsedMs).padStart(6)} ms   ${String(connections).padStart(5)} conexões`
+  );
+}
+
+async function benchmarkHttp() {
+  console.log('🌐 HTTP (Twilio)');
+  const standIn = await startHttpStandIn();
+
+  // smsService lê a URL e as credenciais ao carregar o módulo
+  process.env.TWILIO_API_URL = `http://127.0.0.1:${standIn.port}`;
+  process.env.TWILIO_ACCOUNT_SID = 'AC123';
+  process.env.TWILIO_AUTH_TOKEN = 'benchmark';
+  process.env.TWILIO_PHONE_NUMBER = '+5511900000000';
+
+  const url = `${process.env.TWILIO_API_URL}/2010-04-01/Accounts/AC123/Messages.json`;
+  const baseline = await run(TOTAL, CONCURRENCY, async () => {
+    const response = await fetch(url, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/x-www-form-urlencoded', Connection: 'close' },
+      body: 'To=%2B5511999999999&Body=teste',
+    });
+    await response.json();
+  });
+  report('conexão por requisição', baseline, standIn.stats.connections);
+
+  const { smsService } = require('../lib/services/sms-service');
+  const { providerHttpClient } = require('../lib/services/provider-http-client');
+
+  standIn.stats.connections = 0;
+  providerHttpClient.resetStats();
+  const pooled = await run(TOTAL, CONCURRENCY, async () => {
+    const result = await smsService.sendSMS('11999999999', 'teste', { logCommunication: false });
+    if (!result.success) throw new Error(result.error);
+  });
+  report('smsService (keep-alive)', pooled, standIn.stats.connections);
+
+  const [stats] = providerHttpClient.getStats();
+  console.log(
+    `   providerHttpClient: pico ${stats.peakInFlight} simultâneas, ` +
+      `reuso ${(stats.reuseRate * 100).toFixed(1)}%`
+  );
+
+  standIn.server.close();
+  standIn.server.closeAllConnections?.();
+}
+
+async function benchmarkSmtp() {
+  console.log('\n📧 SMTP');
+
+  const nodemailer = require('nodemailer');
+  const standIn = await startSmtpStandIn();
+  const auth = { user: 'bench@interalpha.local', pass: 'benchmark' };
+  const message = {
+    from: auth.user,
+    to: 'cliente@interalpha.local',
+    subject: 'Benchmark',
+    html: '<p>teste</p>',
+  };
+
+  const single = nodemailer.createTransport({
+    host: '127.0.0.1',
+    port: standIn.port,
+    secure: false,
+    ignoreTLS: true,
+    auth,
+  });
+  const baseline = await run(TOTAL, CONCURRENCY, () => single.sendMail(message));
+  report('sem pool', baseline, standIn.stats.connections);
+  single.close();
+
+  // EmailService monta o transporte com pool a partir do ambiente
+  process.env.SMTP_HOST = '127.0.0.1';
+  process.env.SMTP_PORT = String(standIn.port);
+  process.env.SMTP_SECURE = 'false';
+  process.env.SMTP_USER = auth.user;
+  process.env.SMTP_PASS = auth.pass;
+  process.env.SMTP_POOL_MAX_CONNECTIONS = String(CONCURRENCY);
+
+  const EmailService = require('../lib/services/email-service').default;
+  const emailService = new EmailService();
+
+  standIn.stats.connections = 0;
+  const pooled = await run(TOTAL, CONCURRENCY, () =>
+    emailService.sendEmail(message.to, message.subject, message.html)
+  );
+  report(`EmailService (pool ${CONCURRENCY})`, pooled, standIn.stats.connections);
+
+  const poolStats = emailService.getPoolStats();
+  console.log(`   EmailService: ${poolStats.enviados} enviados, ${poolStats.erros} erros`);
+
+  standIn.server.close();
+}
+
+async function main() {
+  registerTypeScript();
+  console.log(`🏁 Benchmark de provedores: ${TOTAL} envios, concorrência ${CONCURRENCY}\n`);
+  await benchmarkHttp();
+  await benchmarkSmtp();
+}
+
+main()
+  .then(() => process.exit(0))
+  .catch(error => {
+    console.error('❌ Erro no benchmark:', error);
+    process.exit(1);
+  });
@@ -0,0 +1,275 @@
+#!/usr/bin/env node
+/**
+ * Gera o índice offline de CEPs usado por /api/cep (lib/services/cep-index.ts)
+ *
+ * Entrada: CSV/TSV com cabeçalho (separador ; , ou tab detectado automaticamente) contendo
+ *   cep                      ou  cep_inicio + cep_fim  (faixas, ex.: cidades com CEP único)
+ *   logradouro, bairro, cidade (ou localidade), uf
+ *
+ * Saída: arquivo binário ordenado por CEP, gravado de forma atômica (arquivo temporário +
+ * rename), então pode ser atualizado com o servidor rodando.
+ *
+ * Formato (little-endian):
+ *   cabeçalho (32 bytes): "CEPIDX01" | versão u32 | registros u32 | início dos dados u32 |
+ *                         gerado em (epoch s) u32 | reservado (8 bytes)
+ *   registros (16 bytes cada, ordenados por cep_inicio, sem sobreposição):
+ *     cep_inicio u32 | cep_fim u32 | offset dos dados u32 | tamanho u16 | reservado u16
+ *   dados: "logradouro\tbairro\tcidade\tuf" em UTF-8 (textos repetidos gravados uma vez)
+ *
+ * Uso: node scripts/build-cep-index.js <entrada.csv> [saida.bin]
+ *      (saída padrão: CEP_INDEX_PATH)
+ */
+
+const fs = require('fs');
+const path = require('path');
+const readline = require('readline');
+
+const MAGIC = 'CEPIDX01';
+const VERSION = 1;
+const HEADER_SIZE = 32;
+const RECORD_SIZE = 16;
+
+const onlyDigits = value => String(value || '').replace(/\D/g, '');
+
+function detectDelimiter(headerLine) {
+  const candidates = ['\t', ';', ','];
+  return candidates.reduce((best, delimiter) =>
+    headerLine.split(delimiter).length > headerLine.split(best).length ? delimiter : best
+  );
+}
+
+// Divide uma linha CSV respeitando aspas
+function splitLine(line, delimiter) {
+  const fields = [];
+  let current = '';
+  let quoted = false;
+
+  for (let i = 0; i < line.length; i++) {
+    const char = line[i];
+    if (char === '"') {
+      if (quoted && line[i + 1] === '"') {
+        current += '"';
+        i++;
+      } else {
+        quoted = !quoted;
+      }
+    } else if (char === delimiter && !quoted) {
+      fields.push(current);
+      current = '';
+    } else {
+      current += char;
+    }
+  }
+  fields.push(current);
+  return fields.map(field => field.trim());
+}
+
+async function readRecords(inputPath) {
+  const lines = readline.createInterface({
+    input: fs.createReadStream(inputPath, 'utf8'),
+    crlfDelay: Infinity,
+  });
+
+  const records = [];
+  let columns = null;
+  let delimiter = ',';
+  let ignored = 0;
+
+  for await (const rawLine of lines) {
+    const line = rawLine.replace(/^\uFEFF/, '');
+    if (!line.trim()) continue;
+
+    if (!columns) {
+      delimiter = detectDelimiter(line);
+      columns = splitLine(line, delimiter).map(name => name.toLowerCase());
+      continue;
+    }
+
+    const values = splitLine(line, delimiter);
+    const row = Object.fromEntries(columns.map((name, index) => [name, values[index] || '']));
+
+    const inicio = Number(onlyDigits(row.cep_inicio || row.cep));
+    const fim = Number(onlyDigits(row.cep_fim || row.cep_inicio || row.cep));
+
+    if (!inicio || !fim || fim < inicio || String(fim).length > 8) {
+      ignored++;
+      continue;
+    }
+
+    records.push({
+      inicio,
+      fim,
+      logradouro: row.logradouro || '',
+      bairro: row.bairro || '',
+      cidade: row.cidade || row.localidade || '',
+      uf: (row.uf || '').toUpperCase(),
+    });
+  }
+
+  return { records, ignored };
+}
+
+// Heap mínimo por largura da faixa (empate: registro lido primeiro)
+class RangeHeap {
+  constructor() {
+    this.items = [];
+  }
+
+  static less(a, b) {
+    return (a.fim - a.inicio - (b.fim - b.inicio) || a.ordem - b.ordem) < 0;
+  }
+
+  push(item) {
+    const items = this.items;
+    items.push(item);
+    let i = items.length - 1;
+    while (i > 0) {
+      const parent = (i - 1) >> 1;
+      if (!RangeHeap.less(items[i], items[parent])) break;
+      [items[i], items[parent]] = [items[parent], items[i]];
+      i = parent;
+    }
+  }
+
+  peek() {
+    return this.items[0];
+  }
+
+  pop() {
+    const items = this.items;
+    const top = items[0];
+    const last = items.pop();
+    if (items.length > 0) {
+      items[0] = last;
+      let i = 0;
+      for (;;) {
+        const left = 2 * i + 1;
+        const right = left + 1;
+        let smallest = i;
+        if (left < items.length && RangeHeap.less(items[left], items[smallest])) smallest = left;
+        if (right < items.length && RangeHeap.less(items[right], items[smallest])) smallest = right;
+        if (smallest === i) break;
+        [items[i], items[smallest]] = [items[smallest], items[i]];
+        i = smallest;
+      }
+    }
+    return top;
+  }
+}
+
+/**
+ * Resolve sobreposições: cada CEP fica com o registro mais específico (faixa mais estreita)
+ * que o contém, ex.: CEP de logradouro dentro da faixa geral da cidade
+ */
+function resolveRanges(records) {
+  const sorted = records
+    .map((record, ordem) => ({ ...record, ordem }))
+    .sort((a, b) => a.inicio - b.inicio);
+
+  const boundaries = Array.from(
+    new Set(sorted.flatMap(record => [record.inicio, record.fim + 1]))
+  ).sort((a, b) => a - b);
+
+  const ranges = [];
+  const active = new RangeHeap();
+  let next = 0;
+
+  for (let i = 0; i < boundaries.length - 1; i++) {
+    const inicio = boundaries[i];
+    const fim = boundaries[i + 1] - 1;
+
+    while (next < sorted.length && sorted[next].inicio <= inicio) {
+      active.push(sorted[next++]);
+    }
+    while (active.peek() && active.peek().fim < inicio) {
+      active.pop();
+    }
+
+    const record = active.peek();
+    if (!record) continue;
+
+    const previous = ranges[ranges.length - 1];
+    if (previous && previous.record === record && previous.fim === inicio - 1) {
+      previous.fim = fim;
+    } else {
+      ranges.push({ inicio, fim, record });
+    }
+  }
+
+  return ranges.map(({ inicio, fim, record }) => ({ ...record, inicio, fim }));
+}
+
+/**
+ * Monta o arquivo do índice a partir dos registros
+ */
+function buildCepIndex(records, generatedAt = new Date()) {
+  const ranges = resolveRanges(records);
+
+  const payloads = new Map();
+  const chunks = [];
+  let dataSize = 0;
+
+  const index = Buffer.alloc(ranges.length * RECORD_SIZE);
+  ranges.forEach((range, i) => {
+    const text = [range.logradouro, range.bairro, range.cidade, range.uf]
+      .map(value => value.replace(/[\t\n]/g, ' '))
+      .join('\t');
+
+    let payload = payloads.get(text);
+    if (!payload) {
+      const bytes = Buffer.from(text, 'utf8');
+      payload = { offset: dataSize, length: Math.min(bytes.length, 0xffff) };
+      payloads.set(text, payload);
+      chunks.push(bytes.subarray(0, payload.length));
+      dataSize += payload.length;
+    }
+
+    const position = i * RECORD_SIZE;
+    index.writeUInt32LE(range.inicio, position);
+    index.writeUInt32LE(range.fim, position + 4);
+    index.writeUInt32LE(payload.offset, position + 8);
+    index.writeUInt16LE(payload.length, position + 12);
+  });
+
+  const header = Buffer.alloc(HEADER_SIZE);
+  header.write(MAGIC, 0, 'ascii');
+  header.writeUInt32LE(VERSION, 8);
+  header.writeUInt32LE(ranges.length, 12);
+  header.writeUInt32LE(HEADER_SIZE + index.length, 16);
+  header.writeUInt32LE(Math.floor(generatedAt.getTime() / 1000), 20);
+
+  return Buffer.concat([header, index, ...chunks]);
+}
+
+async function main() {
+  const [inputPath, outputArg] = process.argv.slice(2);
+  const outputPath = outputArg || process.env.CEP_INDEX_PATH;
+
+  if (!inputPath || !outputPath) {
+    console.error('Uso: node scripts/build-cep-index.js <entrada.csv> [saida.bin]');
+    console.error('     (ou defina CEP_INDEX_PATH para a saída)');
+    process.exit(1);
+  }
+
+  console.log(`📥 Lendo ${inputPath}...`);
+  const { records, ignored } = await readRecords(inputPath);
+  const file = buildCepIndex(records);
+
+  fs.mkdirSync(path.dirname(path.resolve(outputPath)), { recursive: true });
+  const tempPath = `${outputPath}.${process.pid}.tmp`;
+  fs.writeFileSync(tempPath, file);
+  fs.renameSync(tempPath, outputPath);
+
+  console.log(`✅ Índice gravado em ${outputPath}`);
+  console.log(`   ${records.length} registros lidos, ${ignored} linhas ignoradas`);
+  console.log(`   ${(file.length / 1024 / 1024).toFixed(1)} MB`);
+}
+
+module.exports = { buildCepIndex, MAGIC, VERSION, HEADER_SIZE, RECORD_SIZE };
+
+if (require.main === module) {
+  main().catch(error => {
+    console.error('❌ Erro ao gerar índice de CEPs:', error);
+    process.exit(1);
+  });
+}
@@ -0,0 +1,78 @@
+#!/usr/bin/env node
+/**
+ * Importação em massa de clientes via POST /api/clientes/importar
+ *
+ * O arquivo (CSV com cabeçalho ou NDJSON, um cliente por linha) é enviado em streaming;
+ * o servidor valida, remove duplicados e insere em lotes, e devolve um relatório por linha.
+ *
+ * Uso: node scripts/import-clientes.js <arquivo.csv|arquivo.ndjson> [--dry-run]
+ *
+ * Variáveis de ambiente:
+ *   IMPORT_API_URL    URL da aplicação (padrão: http://localhost:3000)
+ *   IMPORT_API_TOKEN  Token JWT de um usuário admin, diretor ou gerente_adm
+ */
+
+const fs = require('fs');
+const path = require('path');
+const { Readable } = require('stream');
+
+async function main() {
+  const args = process.argv.slice(2);
+  const filePath = args.find(arg => !arg.startsWith('--'));
+  const dryRun = args.includes('--dry-run');
+
+  const baseUrl = process.env.IMPORT_API_URL || 'http://localhost:3000';
+  const token = process.env.IMPORT_API_TOKEN;
+
+  if (!filePath || !token) {
+    console.error('Uso: IMPORT_API_TOKEN=... node scripts/import-clientes.js <arquivo> [--dry-run]');
+    process.exit(1);
+  }
+
+  const extension = path.extname(filePath).toLowerCase();
+  const format = ['.ndjson', '.jsonl'].includes(extension) ? 'ndjson' : 'csv';
+  const { size } = fs.statSync(filePath);
+
+  console.log(`📦 Importando ${filePath} (${format}, ${(size / 1024 / 1024).toFixed(1)} MB)`);
+  if (dryRun) console.log('   Modo simulação: nada será gravado');
+
+  const startTime = Date.now();
+  const response = await fetch(
+    `${baseUrl}/api/clientes/importar?format=${format}&dryRun=${dryRun}`,
+    {
+      method: 'POST',
+      headers: {
+        Authorization: `Bearer ${token}`,
+        'Content-Type': format === 'ndjson' ? 'application/x-ndjson' : 'text/csv',
+      },
+      body: Readable.toWeb(fs.createReadStream(filePath)),
+      duplex: 'half',
+    }
+  );
+
+  const result = await response.json().catch(() => null);
+  if (!response.ok || !result?.data) {
+    console.error(`❌ Falha na importação (HTTP ${response.status}):`, result?.error || result);
+    process.exit(1);
+  }
+
+  const report = result.data;
+  console.log(`\n✅ Concluído em ${((Date.now() - startTime) / 1000).toFixed(1)}s`);
+  console.log(`   Linhas:      ${report.total}`);
+  console.log(`   Importados:  ${report.importados}`);
+  console.log(`   Duplicados:  ${report.duplicados}`);
+  console.log(`   Inválidos:   ${report.invalidos}`);
+
+  if (report.erros.length > 0) {
+    console.log('\n⚠️  Linhas não importadas:');
+    report.erros.forEach(({ linha, erro }) => console.log(`   linha ${linha}: ${erro}`));
+    if (report.errosOmitidos > 0) {
+      console.log(`   ... e mais ${report.errosOmitidos} linhas`);
+    }
+  }
+}
+
+main().catch(error => {
+  console.error('❌ Erro na importação:', error);
+  process.exit(1);
+});